@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=invalid-name
+"""Add the table for the optional transitive closure of the provenance links."""
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+from django.db import migrations, models
+import django.db.models.deletion
+from aiida.backends.djsite.db.migrations import upgrade_schema_version
+
+REVISION = '1.0.15'
+DOWN_REVISION = '1.0.14'
+
+
+class Migration(migrations.Migration):
+    """Add the table for the optional transitive closure of the provenance links."""
+
+    dependencies = [
+        ('db', '0014_add_node_uuid_unique_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DbClosure',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('depth', models.IntegerField()),
+                ('ancestor', models.ForeignKey(related_name='descendant_closures', to='db.DbNode',
+                                               on_delete=django.db.models.deletion.CASCADE)),
+                ('descendant', models.ForeignKey(related_name='ancestor_closures', to='db.DbNode',
+                                                 on_delete=django.db.models.deletion.CASCADE)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AlterUniqueTogether(
+            name='dbclosure',
+            unique_together=set([('ancestor', 'descendant', 'depth')]),
+        ),
+        upgrade_schema_version(REVISION, DOWN_REVISION)
+    ]
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=invalid-name
+"""Add the indexed table of the node hashes, populated from the `_aiida_hash` extras."""
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+from django.db import migrations, models
+import django.db.models.deletion
+from aiida.backends.djsite.db.migrations import upgrade_schema_version
+
+REVISION = '1.0.16'
+DOWN_REVISION = '1.0.15'
+
+
+class Migration(migrations.Migration):
+    """Add the indexed table of the node hashes, populated from the `_aiida_hash` extras."""
+
+    dependencies = [
+        ('db', '0015_add_closure_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DbNodeHash',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('hash', models.CharField(max_length=255)),
+                ('type', models.CharField(max_length=255)),
+                ('dbnode', models.OneToOneField(related_name='dbhash', to='db.DbNode',
+                                                on_delete=django.db.models.deletion.CASCADE)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AlterIndexTogether(
+            name='dbnodehash',
+            index_together=set([('hash', 'type')]),
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO db_dbnodehash (dbnode_id, hash, type)
+            SELECT db_dbnode.id, db_dbextra.tval, db_dbnode.type
+            FROM db_dbextra JOIN db_dbnode ON db_dbnode.id = db_dbextra.dbnode_id
+            WHERE db_dbextra.key = '_aiida_hash' AND db_dbextra.datatype = 'txt' AND db_dbextra.tval IS NOT NULL;
+            """,
+            reverse_sql=''),
+        upgrade_schema_version(REVISION, DOWN_REVISION)
+    ]
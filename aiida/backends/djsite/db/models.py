@@ -10,6 +10,7 @@
 from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
+import json
 import sys
 
 import six
@@ -277,6 +278,43 @@ class DbLink(m.Model):
             self.output.pk, )
 
 
+@python_2_unicode_compatible
+class DbClosure(m.Model):
+    """
+    Transitive closure of the CREATE and INPUT links between dbnodes, with the depth of every path between them.
+
+    The table is optional and only filled when the closure is built, see `aiida.manage.database.closure`.
+    """
+    ancestor = m.ForeignKey('DbNode', related_name='descendant_closures', on_delete=m.CASCADE)
+    descendant = m.ForeignKey('DbNode', related_name='ancestor_closures', on_delete=m.CASCADE)
+    # The number of links between the two nodes minus one, as for the recursive queries of the QueryBuilder
+    depth = m.IntegerField()
+
+    class Meta:
+        unique_together = ("ancestor", "descendant", "depth")
+
+    def __str__(self):
+        return "{} --> {} (depth {})".format(self.ancestor_id, self.descendant_id, self.depth)
+
+
+@python_2_unicode_compatible
+class DbNodeHash(m.Model):
+    """
+    The hash of a stored dbnode, indexed together with the node type to quickly find the nodes that can be used as a
+    cache. The same hash is also stored in the `_aiida_hash` extra of the node.
+    """
+    dbnode = m.OneToOneField('DbNode', related_name='dbhash', on_delete=m.CASCADE)
+    hash = m.CharField(max_length=255)
+    # Copy of the type of the dbnode, such that the index covers the lookups of the nodes of a given type
+    type = m.CharField(max_length=255)
+
+    class Meta:
+        index_together = [["hash", "type"]]
+
+    def __str__(self):
+        return "{} (node {})".format(self.hash, self.dbnode_id)
+
+
 attrdatatype_choice = (
     ('float', 'float'),
     ('int', 'int'),
@@ -288,6 +326,13 @@ attrdatatype_choice = (
     ('list', 'list'),
     ('none', 'none'))
 
+# The fields of the attribute tables that store a key and its value, in the order of the rows of
+# `DbMultipleValueAttributeBaseClass.create_value_rows`
+ATTRIBUTE_ROW_FIELDS = ('key', 'datatype', 'tval', 'fval', 'ival', 'bval', 'dval')
+
+# The number of attribute rows inserted with a single statement by `DbAttributeBaseClass.bulk_insert_rows`
+ATTRIBUTE_INSERT_PAGE_SIZE = 1000
+
 from aiida.common.exceptions import AiidaException
 
 
@@ -526,6 +571,14 @@ def deserialize_attributes(data, sep, original_class=None, original_pk=None):
     """
     from collections import defaultdict
 
+    # Consistent data is rebuilt in a single pass, the recursive deserialization below reports the errors
+    try:
+        return _build_attributes_from_rows(
+            [(key,) + tuple(value.get(field) for field in ATTRIBUTE_ROW_FIELDS[1:]) for key, value in data.items()],
+            sep)
+    except _InconsistentAttributeRows:
+        pass
+
     # I group results by zero-level entity
     found_mainitems = {}
     found_subitems = defaultdict(dict)
@@ -558,6 +611,123 @@ def deserialize_attributes(data, sep, original_class=None, original_pk=None):
     return retval
 
 
+class _InconsistentAttributeRows(Exception):
+    """Raised by `_build_attributes_from_rows` when the rows do not describe consistent attributes."""
+    pass
+
+
+def _get_row_value(datatype, tval, fval, ival, bval, dval):
+    """
+    Return the value of an attribute row that is not a list or a dict.
+
+    :raise _InconsistentAttributeRows: if the datatype is not known or the json field cannot be decoded
+    """
+    if datatype == 'none':
+        return None
+    elif datatype == 'bool':
+        return bval
+    elif datatype == 'int':
+        return ival
+    elif datatype == 'float':
+        return fval
+    elif datatype == 'txt':
+        return tval
+    elif datatype == 'date':
+        if timezone.is_naive(dval):
+            return timezone.make_aware(dval, timezone.get_current_timezone())
+        return dval
+    elif datatype == 'json':
+        try:
+            return json.loads(tval)
+        except ValueError:
+            raise _InconsistentAttributeRows()
+
+    raise _InconsistentAttributeRows()
+
+
+def _build_attributes_from_rows(rows, sep):
+    """
+    Rebuild the attributes from their rows in a single pass over them.
+
+    The values of all rows are created first, with empty lists and dicts for the containers, then each row is put in
+    the container of its parent key.
+
+    :param rows: a list of tuples with the fields of ATTRIBUTE_ROW_FIELDS
+    :param sep: the separator between subfields
+    :return: a dictionary with the level-zero attributes
+    :raise _InconsistentAttributeRows: if the rows do not describe consistent attributes, e.g. with missing list
+        elements or the wrong number of dict keys
+    """
+    values = {}
+    for key, datatype, tval, fval, ival, bval, dval in rows:
+        if datatype == 'list':
+            values[key] = (datatype, ival, [None] * ival)
+        elif datatype == 'dict':
+            values[key] = (datatype, ival, {})
+        else:
+            values[key] = (datatype, ival, _get_row_value(datatype, tval, fval, ival, bval, dval))
+
+    attributes = {}
+    list_counts = {}
+    for key, (_, _, value) in values.items():
+        parent_key, thissep, subkey = key.rpartition(sep)
+        if not thissep:
+            attributes[key] = value
+            continue
+
+        try:
+            parent_datatype, parent_length, parent_value = values[parent_key]
+        except KeyError:
+            raise _InconsistentAttributeRows()
+
+        if parent_datatype == 'dict':
+            parent_value[subkey] = value
+        elif parent_datatype == 'list':
+            try:
+                index = int(subkey)
+            except ValueError:
+                raise _InconsistentAttributeRows()
+            if not 0 <= index < parent_length or subkey != '{:d}'.format(index):
+                raise _InconsistentAttributeRows()
+            parent_value[index] = value
+            list_counts[parent_key] = list_counts.get(parent_key, 0) + 1
+        else:
+            raise _InconsistentAttributeRows()
+
+    # Every list element and dict key should have been found exactly once
+    for key, (datatype, length, value) in values.items():
+        if datatype == 'list' and list_counts.get(key, 0) != length:
+            raise _InconsistentAttributeRows()
+        if datatype == 'dict' and len(value) != length:
+            raise _InconsistentAttributeRows()
+
+    return attributes
+
+
+def deserialize_attribute_rows(rows, sep, original_class=None, original_pk=None):
+    """
+    Deserialize the attributes from the rows of the attribute tables, as returned by a single
+    ``values_list(*ATTRIBUTE_ROW_FIELDS)`` query, in a single pass over them.
+
+    :param rows: an iterable of tuples with the fields of ATTRIBUTE_ROW_FIELDS
+    :param sep: a string, the separator between subfields
+    :param original_class: see :py:func:`deserialize_attributes`
+    :param original_pk: see :py:func:`deserialize_attributes`
+
+    :return: a dictionary, where for each level-zero key the corresponding value is
+      returned, deserialized back to lists, dictionaries, etc.
+    :raise aiida.backends.djsite.db.models.DeserializationException: if an error occurs
+    """
+    rows = list(rows)
+
+    try:
+        return _build_attributes_from_rows(rows, sep)
+    except _InconsistentAttributeRows:
+        # The recursive deserialization reports what is wrong with the content of the rows
+        data = {row[0]: dict(zip(ATTRIBUTE_ROW_FIELDS[1:], row[1:])) for row in rows}
+        return deserialize_attributes(data, sep, original_class=original_class, original_pk=original_pk)
+
+
 class DbMultipleValueAttributeBaseClass(m.Model):
     """
     Abstract base class for tables storing attribute + value data, of
@@ -862,6 +1032,59 @@ class DbMultipleValueAttributeBaseClass(m.Model):
 
         return list_to_return
 
+    @classmethod
+    def create_value_rows(cls, key, value):
+        """
+        Return the rows of the table for the current key/value pair, with the same content of the instances returned
+        by `create_value`, but as tuples of the fields in ATTRIBUTE_ROW_FIELDS, without creating any class instance.
+
+        :param key: a string with the key to create
+        :param value: the value to store (a basic data type or a list or a dict)
+        :return: a list of tuples ``(key, datatype, tval, fval, ival, bval, dval)``
+        """
+        import json
+        import datetime
+        from aiida.utils.timezone import is_naive, make_aware, get_current_timezone
+
+        rows = []
+        # Nested values are expanded with a stack rather than with recursion
+        to_expand = [(key, value)]
+        while to_expand:
+            key, value = to_expand.pop()
+
+            if value is None:
+                rows.append((key, 'none', '', None, None, None, None))
+            elif isinstance(value, bool):
+                rows.append((key, 'bool', '', None, None, value, None))
+            elif isinstance(value, six.integer_types):
+                rows.append((key, 'int', '', None, value, None, None))
+            elif isinstance(value, float):
+                rows.append((key, 'float', '', value, None, None, None))
+            elif isinstance(value, six.string_types):
+                rows.append((key, 'txt', value, None, None, None, None))
+            elif isinstance(value, datetime.datetime):
+                # current timezone is taken from the settings file of django
+                if is_naive(value):
+                    value = make_aware(value, get_current_timezone())
+                rows.append((key, 'date', '', None, None, None, value))
+            elif isinstance(value, (list, tuple)):
+                rows.append((key, 'list', '', None, len(value), None, None))
+                to_expand.extend(("{}{}{:d}".format(key, cls._sep, i), subv) for i, subv in enumerate(value))
+            elif isinstance(value, dict):
+                rows.append((key, 'dict', '', None, len(value), None, None))
+                for subk, subv in value.items():
+                    cls.validate_key(subk)
+                    to_expand.append(("{}{}{}".format(key, cls._sep, subk), subv))
+            else:
+                try:
+                    jsondata = json.dumps(value)
+                except TypeError:
+                    raise ValueError("Unable to store the value: it must be "
+                                     "either a basic datatype, or json-serializable")
+                rows.append((key, 'json', jsondata, None, None, None, None))
+
+        return rows
+
     @classmethod
     def get_query_dict(cls, value):
         """
@@ -1094,23 +1317,12 @@ class DbAttributeBaseClass(DbMultipleValueAttributeBaseClass):
             stored in the Db table, correctly converted
             to the right type.
         """
-        dballsubvalues = cls.objects.filter(dbnode__id=dbnodepk).values_list(
-            'key', 'datatype', 'tval', 'fval',
-            'ival', 'bval', 'dval')
-
-        data = {_[0]: {
-            "datatype": _[1],
-            "tval": _[2],
-            "fval": _[3],
-            "ival": _[4],
-            "bval": _[5],
-            "dval": _[6],
-        } for _ in dballsubvalues
-        }
+        dballsubvalues = cls.objects.filter(dbnode__id=dbnodepk).values_list(*ATTRIBUTE_ROW_FIELDS)
+
         try:
-            return deserialize_attributes(data, sep=cls._sep,
-                                          original_class=cls,
-                                          original_pk=dbnodepk)
+            return deserialize_attribute_rows(dballsubvalues, sep=cls._sep,
+                                              original_class=cls,
+                                              original_pk=dbnodepk)
         except DeserializationException as exc:
             exc = DbContentError(exc)
             exc.original_exception = exc
@@ -1134,21 +1346,25 @@ class DbAttributeBaseClass(DbMultipleValueAttributeBaseClass):
             else:
                 dbnode_node = dbnode
 
-            # create_value returns a list of nodes to store
-            for k, v in attributes.items():
-                nodes_to_store.extend(
-                    cls.create_value(k, v,
-                                     subspecifier_value=dbnode_node,
-                                     ))
-
             if return_not_store:
+                # create_value returns a list of nodes to store
+                for k, v in attributes.items():
+                    nodes_to_store.extend(
+                        cls.create_value(k, v,
+                                         subspecifier_value=dbnode_node,
+                                         ))
                 return nodes_to_store
             else:
+                # The rows are inserted directly, without creating an instance for each of them
+                rows_to_store = []
+                for k, v in attributes.items():
+                    rows_to_store.extend(cls.create_value_rows(k, v))
+
                 # Reset. For set, use also a filter for key__in=attributes.keys()
                 cls.objects.filter(dbnode=dbnode_node).delete()
 
-                if nodes_to_store:
-                    cls.objects.bulk_create(nodes_to_store)
+                if rows_to_store:
+                    cls.bulk_insert_rows(dbnode_node.pk, rows_to_store)
 
             if with_transaction:
                 transaction.savepoint_commit(sid)
@@ -1157,6 +1373,45 @@ class DbAttributeBaseClass(DbMultipleValueAttributeBaseClass):
                 transaction.savepoint_rollback(sid)
             raise
 
+    @classmethod
+    def bulk_insert_rows(cls, dbnode_pk, rows):
+        """
+        Insert rows for the given dbnode, as returned by `create_value_rows`.
+
+        :param dbnode_pk: the PK of the dbnode
+        :param rows: a list of tuples with the fields of ATTRIBUTE_ROW_FIELDS
+        """
+        cls.bulk_insert_node_rows([(dbnode_pk,) + row for row in rows])
+
+    @classmethod
+    def bulk_insert_node_rows(cls, node_rows):
+        """
+        Insert rows for any number of dbnodes.
+
+        On PostgreSQL the rows are inserted with multi-row INSERT statements of ATTRIBUTE_INSERT_PAGE_SIZE rows each,
+        on other databases with a Django bulk_create().
+
+        :param node_rows: a list of tuples with the PK of the dbnode followed by the fields of ATTRIBUTE_ROW_FIELDS
+        """
+        from django.db import connection
+
+        if connection.vendor != 'postgresql':
+            cls.objects.bulk_create(
+                [cls(dbnode_id=row[0], **dict(zip(ATTRIBUTE_ROW_FIELDS, row[1:]))) for row in node_rows],
+                batch_size=ATTRIBUTE_INSERT_PAGE_SIZE)
+            return
+
+        from psycopg2.extras import execute_values
+
+        quote_name = connection.ops.quote_name
+        columns = (cls._meta.get_field(cls._subspecifier_field_name).column,) + ATTRIBUTE_ROW_FIELDS
+        sql = "INSERT INTO {} ({}) VALUES %s".format(
+            quote_name(cls._meta.db_table), ", ".join(quote_name(column) for column in columns))
+
+        with connection.cursor() as cursor:
+            # execute_values needs the psycopg2 cursor wrapped by Django
+            execute_values(cursor.cursor, sql, node_rows, page_size=ATTRIBUTE_INSERT_PAGE_SIZE)
+
     @classmethod
     def set_value_for_node(cls, dbnode, key, value, with_transaction=True,
                            stop_if_existing=False):
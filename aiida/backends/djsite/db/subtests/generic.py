@@ -179,3 +179,65 @@ class TestDbExtrasDjango(AiidaTestCase):
         self.assertEquals(n1.get_extras(), new_attrs)
         # Also check that other nodes were not damaged
         self.assertEquals(n2.get_extras(), {'pippo2': [3, 4, 'b'], '_aiida_hash': n2.get_hash()})
+
+
+class TestDbAttributesBulkDjango(AiidaTestCase):
+    """
+    Test the bulk storage and retrieval of DbAttributes.
+    """
+
+    def test_rows_match_instances(self):
+        """
+        The rows of create_value_rows should have the same content as the instances of create_value.
+        """
+        from aiida.backends.djsite.db.models import DbAttribute, ATTRIBUTE_ROW_FIELDS
+        from aiida.utils.timezone import now
+
+        dbnode = Node().store()._dbnode
+        value = {'a': [1, 2.5, None, True, 'text'], 'b': {'c': {'d': now()}, 'e': []}, 'f': (1, 2)}
+
+        instances = DbAttribute.create_value('key', value, subspecifier_value=dbnode)
+        rows = DbAttribute.create_value_rows('key', value)
+
+        self.assertEquals(sorted(rows, key=lambda row: row[0]),
+                          sorted([tuple(getattr(instance, field) for field in ATTRIBUTE_ROW_FIELDS)
+                                  for instance in instances], key=lambda row: row[0]))
+
+    def test_large_and_nested(self):
+        """
+        Store and read back many and deeply nested attributes.
+        """
+        from aiida.backends.djsite.db.models import DbAttribute
+
+        nested = {'level': 0}
+        innermost = nested
+        for level in range(1, 50):
+            innermost['nested'] = {'level': level, 'values': [level, str(level)]}
+            innermost = innermost['nested']
+
+        attributes = {
+            'sites': [{'kind_name': 'Si', 'position': [0.1 * i, 0.2 * i, 0.3 * i]} for i in range(100)],
+            'parameters': {'key_{}'.format(i): {'value': i, 'unit': 'eV'} for i in range(50)},
+            'nested': nested,
+        }
+
+        dbnode = Node().store()._dbnode
+
+        DbAttribute.reset_values_for_node(dbnode, attributes=attributes)
+        self.assertEquals(DbAttribute.get_all_values_for_node(dbnode), attributes)
+        self.assertEquals(DbAttribute.get_value_for_node(dbnode, 'parameters'), attributes['parameters'])
+
+    def test_inconsistent_rows(self):
+        """
+        Attributes with missing rows should still raise when they are retrieved.
+        """
+        from aiida.backends.djsite.db.models import DbAttribute
+        from aiida.common.exceptions import DbContentError
+
+        dbnode = Node().store()._dbnode
+        DbAttribute.reset_values_for_node(dbnode, attributes={'list': [1, 2, 3], 'dict': {'a': 1}})
+        self.assertEquals(DbAttribute.get_all_values_for_node(dbnode), {'list': [1, 2, 3], 'dict': {'a': 1}})
+
+        DbAttribute.objects.filter(dbnode=dbnode, key='list.1').delete()
+        with self.assertRaises(DbContentError):
+            DbAttribute.get_all_values_for_node(dbnode)
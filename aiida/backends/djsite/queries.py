@@ -33,6 +33,18 @@ class DjangoQueryManager(AbstractQueryManager):
 
         return results
 
+    def execute(self, queries):
+        """Execute raw SQL statements that do not return a result, atomically within the current transaction.
+
+        :param queries: a list of strings containing raw SQL statements
+        """
+        from django.db import connection, transaction
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for query in queries:
+                    cursor.execute(query)
+
     def query_jobcalculations_by_computer_user_state(
             self, state, computer=None, user=None,
             only_computer_user_pairs=False,
@@ -202,7 +214,7 @@ class DjangoQueryManager(AbstractQueryManager):
         from aiida.common.utils import grouper
         from aiida.backends.djsite.db import models
         from aiida.orm.backend import construct_backend
-        from aiida.orm.data.structure import (get_formula, get_symbols_string)
+        from aiida.orm.data.structure import (get_formula, get_symbols_string, get_stored_site_kindnames)
         from aiida.orm.data.array.bands import BandsData
 
         backend = construct_backend()
@@ -278,8 +290,11 @@ class DjangoQueryManager(AbstractQueryManager):
                                                                  k['weights'])
                                    for k in deser_data[struc_pk]['kinds']}
                     try:
-                        symbol_list = [symbol_dict[s['kind_name']]
-                                       for s in deser_data[struc_pk]['sites']]
+                        kind_names = get_stored_site_kindnames(struc_pk, deser_data[struc_pk].get('sites'))
+                        if kind_names is None:
+                            # Neither the sites attribute nor compact sites
+                            raise KeyError('sites')
+                        symbol_list = [symbol_dict[kind_name] for kind_name in kind_names]
                         formula = get_formula(symbol_list,
                                               mode=args.formulamode)
                     # If for some reason there is no kind with the name
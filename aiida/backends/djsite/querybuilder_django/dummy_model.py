@@ -81,6 +81,20 @@ class DbLink(Base):
     label = Column(String(255), index=True, nullable=False)
 
 
+class DbClosure(Base):
+    __tablename__ = "db_dbclosure"
+    id = Column(Integer, primary_key=True)
+    ancestor_id = Column(
+        Integer,
+        ForeignKey('db_dbnode.id', deferrable=True, initially="DEFERRED")
+    )
+    descendant_id = Column(
+        Integer,
+        ForeignKey('db_dbnode.id', deferrable=True, initially="DEFERRED")
+    )
+    depth = Column(Integer)
+
+
 class DbCalcState(Base):
     __tablename__ = "db_dbcalcstate"
     id = Column(Integer, primary_key=True)
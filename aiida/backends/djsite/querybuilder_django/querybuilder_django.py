@@ -67,6 +67,10 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
     def Link(self):
         return dummy_model.DbLink
 
+    @property
+    def Closure(self):
+        return dummy_model.DbClosure
+
     @property
     def Computer(self):
         return dummy_model.DbComputer
@@ -614,3 +618,47 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
                             }
                             for tag, projected_entities_dict in tag_to_projected_entity_dict.items()
                         }
+
+    def itercolumns(self, query, batch_size, tag_to_projected_entity_dict):
+        """
+        Iterate over the results in chunks of at most `batch_size` rows, where each chunk is a dictionary of columns.
+        The rows are fetched from the cursor of the underlying statement, such that no ORM instances are created.
+
+        :returns: a generator of dictionaries, with for every tag a dictionary of the projected keys and the tuples of
+            their values in the chunk
+        """
+        from django.db import transaction
+
+        with transaction.atomic():
+            results = self.get_session().execute(query.statement.execution_options(stream_results=True))
+            while True:
+                rows = results.fetchmany(batch_size)
+                if not rows:
+                    break
+                columns = list(zip(*rows))
+                yield {
+                    tag: {
+                        attrkey: self.get_aiida_column(attrkey, columns[index_in_sql_result])
+                        for attrkey, index_in_sql_result in projected_entities_dict.items()
+                    }
+                    for tag, projected_entities_dict in tag_to_projected_entity_dict.items()
+                }
+
+    def get_aiida_column(self, key, values):
+        """
+        Convert a column of values returned by the cursor to their AiiDA values, like :meth:`get_aiida_res` does for
+        every single value. The rows of projected attributes and extras are fetched with a single query per column.
+
+        :param key: the key that the column is returned with
+        :param values: the tuple of values of the column
+
+        :returns: a tuple of aiida-compatible values
+        """
+        if key.startswith('attributes.') or key.startswith('extras.'):
+            model = DbAttribute if key.startswith('attributes.') else DbExtra
+            rows = model.objects.in_bulk([value for value in values if value is not None])
+            # If the row does not exist, return None. This is consistent with SQLAlchemy inside the JSON
+            return tuple(rows[value].getvalue() if value in rows else None for value in values)
+        elif key in ('attributes', 'extras', '_metadata', 'transport_params'):
+            return tuple(self.get_aiida_res(key, value) for value in values)
+        return values
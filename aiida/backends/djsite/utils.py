@@ -168,21 +168,35 @@ def get_db_schema_version():
         return None
 
 
-def delete_nodes_and_connections_django(pks_to_delete):  # pylint: disable=invalid-name
+def delete_nodes_and_connections_django(pks_to_delete, chunk_size=1000, callback=None):  # pylint: disable=invalid-name
     """
     Delete all nodes corresponding to pks in the input.
+
+    The nodes are deleted in chunks of at most `chunk_size` pks, such that the queries stay bounded, but all chunks
+    are deleted in the same transaction.
+
     :param pks_to_delete: A list, tuple or set of pks that should be deleted.
+    :param chunk_size: the maximum number of nodes deleted by the same queries
+    :param callback: if not None, called with the number of nodes deleted so far after each chunk
     """
     from django.db import transaction
     from django.db.models import Q
     from aiida.backends.djsite.db import models
+    from aiida.common.utils import grouper
+
+    deleted = 0
     with transaction.atomic():
-        # This is fixed in pylint-django>=2, but this supports only py3
-        # pylint: disable=no-member
-        # Delete all links pointing to or from a given node
-        models.DbLink.objects.filter(Q(input__in=pks_to_delete) | Q(output__in=pks_to_delete)).delete()
-        # now delete nodes
-        models.DbNode.objects.filter(pk__in=pks_to_delete).delete()
+        for pks in grouper(chunk_size, sorted(pks_to_delete)):
+            # This is fixed in pylint-django>=2, but this supports only py3
+            # pylint: disable=no-member
+            # Delete all links pointing to or from a given node
+            models.DbLink.objects.filter(Q(input__in=pks) | Q(output__in=pks)).delete()
+            # now delete nodes
+            models.DbNode.objects.filter(pk__in=pks).delete()
+
+            deleted += len(pks)
+            if callback is not None:
+                callback(deleted)
 
 
 def pass_to_django_manage(argv, profile=None):
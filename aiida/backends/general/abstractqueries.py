@@ -33,6 +33,16 @@ class AbstractQueryManager(object):
         """
         pass
 
+    @abstractmethod
+    def execute(self, queries):
+        """Execute raw SQL statements that do not return a result, atomically within the current transaction.
+
+        The current transaction is not committed, such that the statements are part of the transaction of the caller.
+
+        :param queries: a list of strings containing raw SQL statements
+        """
+        pass
+
     def get_duplicate_node_uuids(self):
         """
         Return a list of nodes that have an identical UUID
@@ -231,7 +241,7 @@ class AbstractQueryManager(object):
         from aiida.utils import timezone
         from aiida.orm.querybuilder import QueryBuilder
         from aiida.orm.implementation import Group
-        from aiida.orm.data.structure import (get_formula, get_symbols_string)
+        from aiida.orm.data.structure import (get_formula, get_symbols_string, get_stored_site_kindnames)
         from aiida.orm.data.array.bands import BandsData
         from aiida.orm.data.structure import StructureData
         from aiida.orm.user import User
@@ -305,7 +315,8 @@ class AbstractQueryManager(object):
                     continue
 
             # We want only the StructureData that have attributes
-            if akinds is None or asites is None:
+            kind_names = None if akinds is None else get_stored_site_kindnames(sid, asites)
+            if kind_names is None:
                 continue
 
             symbol_dict = {}
@@ -317,8 +328,8 @@ class AbstractQueryManager(object):
 
             try:
                 symbol_list = []
-                for s in asites:
-                    symbol_list.append(symbol_dict[s['kind_name']])
+                for kind_name in kind_names:
+                    symbol_list.append(symbol_dict[kind_name])
                 formula = get_formula(symbol_list,
                                       mode=args.formulamode)
             # If for some reason there is no kind with the name
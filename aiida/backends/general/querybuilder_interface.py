@@ -35,6 +35,13 @@ class QueryBuilderInterface:
         """
         pass
 
+    @abstractmethod
+    def Closure(self):
+        """
+        A property, decorated with @property. Returns the implementation for the DbClosure
+        """
+        pass
+
     @abstractmethod
     def Computer(self):
         """
@@ -189,4 +196,12 @@ class QueryBuilderInterface:
         """
         pass
 
+    @abstractmethod
+    def itercolumns(self, query, batch_size, tag_to_projected_entity_dict):
+        """
+        :returns: An iterator over chunks of at most `batch_size` rows of the results, each as a dictionary of
+            columns, fetched from the cursor without instantiating ORM objects.
+        """
+        pass
+
 
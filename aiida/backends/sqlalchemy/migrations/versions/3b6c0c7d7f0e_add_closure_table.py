@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Add the table for the optional transitive closure of the provenance links
+
+Revision ID: 3b6c0c7d7f0e
+Revises: 62fe0d36de90
+Create Date: 2018-09-03 11:12:07.518246
+
+"""
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3b6c0c7d7f0e'
+down_revision = '62fe0d36de90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('db_dbclosure',
+    sa.Column('id', sa.INTEGER(), nullable=False),
+    sa.Column('ancestor_id', sa.INTEGER(), nullable=True),
+    sa.Column('descendant_id', sa.INTEGER(), nullable=True),
+    sa.Column('depth', sa.INTEGER(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], [u'db_dbnode.id'], name=u'db_dbclosure_ancestor_id_fkey',
+                            ondelete=u'CASCADE', initially=u'DEFERRED', deferrable=True),
+    sa.ForeignKeyConstraint(['descendant_id'], [u'db_dbnode.id'], name=u'db_dbclosure_descendant_id_fkey',
+                            ondelete=u'CASCADE', initially=u'DEFERRED', deferrable=True),
+    sa.PrimaryKeyConstraint('id', name=u'db_dbclosure_pkey'),
+    sa.UniqueConstraint('ancestor_id', 'descendant_id', 'depth',
+                        name=u'db_dbclosure_ancestor_id_descendant_id_depth_key')
+    )
+    op.create_index('ix_db_dbclosure_ancestor_id', 'db_dbclosure', ['ancestor_id'], unique=False)
+    op.create_index('ix_db_dbclosure_descendant_id', 'db_dbclosure', ['descendant_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_db_dbclosure_descendant_id', table_name='db_dbclosure')
+    op.drop_index('ix_db_dbclosure_ancestor_id', table_name='db_dbclosure')
+    op.drop_table('db_dbclosure')
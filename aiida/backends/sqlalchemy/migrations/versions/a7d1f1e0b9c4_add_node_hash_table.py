@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Add the indexed table of the node hashes, populated from the `_aiida_hash` extras
+
+Revision ID: a7d1f1e0b9c4
+Revises: 3b6c0c7d7f0e
+Create Date: 2018-09-05 15:41:22.301874
+
+"""
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7d1f1e0b9c4'
+down_revision = '3b6c0c7d7f0e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('db_dbnodehash',
+    sa.Column('id', sa.INTEGER(), nullable=False),
+    sa.Column('dbnode_id', sa.INTEGER(), nullable=True),
+    sa.Column('hash', sa.VARCHAR(length=255), nullable=False),
+    sa.Column('type', sa.VARCHAR(length=255), nullable=False),
+    sa.ForeignKeyConstraint(['dbnode_id'], [u'db_dbnode.id'], name=u'db_dbnodehash_dbnode_id_fkey',
+                            ondelete=u'CASCADE', initially=u'DEFERRED', deferrable=True),
+    sa.PrimaryKeyConstraint('id', name=u'db_dbnodehash_pkey'),
+    sa.UniqueConstraint('dbnode_id', name=u'db_dbnodehash_dbnode_id_key')
+    )
+    op.create_index('ix_db_dbnodehash_hash_type', 'db_dbnodehash', ['hash', 'type'], unique=False)
+    op.execute("""
+        INSERT INTO db_dbnodehash (dbnode_id, hash, type)
+        SELECT id, extras->>'_aiida_hash', type FROM db_dbnode
+        WHERE jsonb_typeof(extras->'_aiida_hash') = 'string'
+        """)
+
+
+def downgrade():
+    op.drop_index('ix_db_dbnodehash_hash_type', table_name='db_dbnodehash')
+    op.drop_table('db_dbnodehash')
@@ -18,7 +18,7 @@ from sqlalchemy.orm import (
 )
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm.attributes import flag_modified
-from sqlalchemy.schema import Column, UniqueConstraint
+from sqlalchemy.schema import Column, Index, UniqueConstraint
 from sqlalchemy.types import Integer, String, Boolean, DateTime, Text
 # Specific to PGSQL. If needed to be agnostic
 # http://docs.sqlalchemy.org/en/rel_0_9/core/custom_types.html?highlight=guid#backend-agnostic-guid-type
@@ -388,3 +388,58 @@ class DbLink(Base):
             self.output.get_simple_name(invalid_result="Unknown node"),
             self.output.pk
         )
+
+
+class DbClosure(Base):
+    """
+    Transitive closure of the CREATE and INPUT links between dbnodes, with the depth of every path between them.
+
+    The table is optional and only filled when the closure is built, see `aiida.manage.database.closure`.
+    """
+    __tablename__ = "db_dbclosure"
+
+    id = Column(Integer, primary_key=True)
+    ancestor_id = Column(
+        Integer,
+        ForeignKey('db_dbnode.id', ondelete="CASCADE", deferrable=True, initially="DEFERRED"),
+        index=True
+    )
+    descendant_id = Column(
+        Integer,
+        ForeignKey('db_dbnode.id', ondelete="CASCADE", deferrable=True, initially="DEFERRED"),
+        index=True
+    )
+    # The number of links between the two nodes minus one, as for the recursive queries of the QueryBuilder
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('ancestor_id', 'descendant_id', 'depth'),
+    )
+
+    def __str__(self):
+        return "{} --> {} (depth {})".format(self.ancestor_id, self.descendant_id, self.depth)
+
+
+class DbNodeHash(Base):
+    """
+    The hash of a stored dbnode, indexed together with the node type to quickly find the nodes that can be used as a
+    cache. The same hash is also stored in the `_aiida_hash` extra of the node.
+    """
+    __tablename__ = "db_dbnodehash"
+
+    id = Column(Integer, primary_key=True)
+    dbnode_id = Column(
+        Integer,
+        ForeignKey('db_dbnode.id', ondelete="CASCADE", deferrable=True, initially="DEFERRED"),
+        unique=True
+    )
+    hash = Column(String(255), nullable=False)
+    # Copy of the type of the dbnode, such that the index covers the lookups of the nodes of a given type
+    type = Column(String(255), nullable=False)
+
+    __table_args__ = (
+        Index('ix_db_dbnodehash_hash_type', 'hash', 'type'),
+    )
+
+    def __str__(self):
+        return "{} (node {})".format(self.hash, self.dbnode_id)
@@ -34,6 +34,20 @@ class SqlaQueryManager(AbstractQueryManager):
 
         return result.fetchall()
 
+    def execute(self, queries):
+        """Execute raw SQL statements that do not return a result, atomically within the current transaction.
+
+        The statements are executed in a savepoint of the transaction of the shared session, which is not committed.
+
+        :param queries: a list of strings containing raw SQL statements
+        """
+        from aiida.backends.sqlalchemy import get_scoped_session
+
+        session = get_scoped_session()
+        with session.begin_nested():
+            for query in queries:
+                session.execute(query)
+
     def get_creation_statistics(
             self,
             user_pk=None
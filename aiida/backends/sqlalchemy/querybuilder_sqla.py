@@ -106,6 +106,11 @@ class QueryBuilderImplSQLA(QueryBuilderInterface):
         import aiida.backends.sqlalchemy.models.node
         return aiida.backends.sqlalchemy.models.node.DbLink
 
+    @property
+    def Closure(self):
+        import aiida.backends.sqlalchemy.models.node
+        return aiida.backends.sqlalchemy.models.node.DbClosure
+
     @property
     def Computer(self):
         import aiida.backends.sqlalchemy.models.computer
@@ -608,3 +613,43 @@ class QueryBuilderImplSQLA(QueryBuilderInterface):
         except Exception as e:
             self.get_session().rollback()
             raise e
+
+    def itercolumns(self, query, batch_size, tag_to_projected_entity_dict):
+        """
+        Iterate over the results in chunks of at most `batch_size` rows, where each chunk is a dictionary of columns.
+        The rows are fetched from the cursor of the underlying statement, such that no ORM instances are created.
+
+        :returns: a generator of dictionaries, with for every tag a dictionary of the projected keys and the tuples of
+            their values in the chunk
+        """
+        try:
+            results = self.get_session().execute(query.statement.execution_options(stream_results=True))
+            while True:
+                rows = results.fetchmany(batch_size)
+                if not rows:
+                    break
+                columns = list(zip(*rows))
+                yield {
+                    tag: {
+                        attrkey: self.get_aiida_column(attrkey, columns[index_in_sql_result])
+                        for attrkey, index_in_sql_result in projected_entities_dict.items()
+                    }
+                    for tag, projected_entities_dict in tag_to_projected_entity_dict.items()
+                }
+        except Exception:
+            self.get_session().rollback()
+            raise
+
+    def get_aiida_column(self, key, values):
+        """
+        Convert a column of values returned by the cursor to their AiiDA values, like :meth:`get_aiida_res` does for
+        every single value. Only the values of choice columns need to be converted.
+
+        :param key: The key
+        :param values: the tuple of values of the column
+
+        :returns: a tuple of aiida-compatible values
+        """
+        if any(isinstance(value, Choice) for value in values):
+            return tuple(value.value if isinstance(value, Choice) else value for value in values)
+        return values
@@ -498,30 +498,45 @@ def alembic_command(selected_command, *args, **kwargs):
             al_command(alembic_cfg, *args, **kwargs)
 
 
-def delete_nodes_and_connections_sqla(pks_to_delete):
+def delete_nodes_and_connections_sqla(pks_to_delete, chunk_size=1000, callback=None):
     """
     Delete all nodes corresponding to pks in the input.
+
+    The nodes are deleted in chunks of at most `chunk_size` pks, such that the statements stay bounded, but all
+    chunks are deleted in the same transaction.
+
     :param pks_to_delete: A list, tuple or set of pks that should be deleted.
+    :param chunk_size: the maximum number of nodes deleted by the same statements
+    :param callback: if not None, called with the number of nodes deleted so far after each chunk
     """
     from aiida.backends import sqlalchemy as sa
     from aiida.backends.sqlalchemy.models.node import DbNode, DbLink
     from aiida.backends.sqlalchemy.models.group import table_groups_nodes
+    from aiida.common.utils import grouper
 
     session = sa.get_scoped_session()
     try:
-        # I am first making a statement to delete the membership of these nodes to groups.
-        # Since table_groups_nodes is a sqlalchemy.schema.Table, I am using expression language to compile
-        # a stmt to be executed by the session. It works, but it's not nice that two different ways are used!
-        # Can this be changed?
-        stmt = table_groups_nodes.delete().where(table_groups_nodes.c.dbnode_id.in_(list(pks_to_delete)))
-        session.execute(stmt)
-        # First delete links, then the Nodes, since we are not cascading deletions.
-        # Here I delete the links coming out of the nodes marked for deletion.
-        session.query(DbLink).filter(DbLink.input_id.in_(list(pks_to_delete))).delete(synchronize_session='fetch')
-        # Here I delete the links pointing to the nodes marked for deletion.
-        session.query(DbLink).filter(DbLink.output_id.in_(list(pks_to_delete))).delete(synchronize_session='fetch')
-        # Now I am deleting the nodes
-        session.query(DbNode).filter(DbNode.id.in_(list(pks_to_delete))).delete(synchronize_session='fetch')
+        deleted = 0
+        for pks in grouper(chunk_size, sorted(pks_to_delete)):
+            pks = list(pks)
+            # I am first making a statement to delete the membership of these nodes to groups.
+            # Since table_groups_nodes is a sqlalchemy.schema.Table, I am using expression language to compile
+            # a stmt to be executed by the session. It works, but it's not nice that two different ways are used!
+            # Can this be changed?
+            stmt = table_groups_nodes.delete().where(table_groups_nodes.c.dbnode_id.in_(pks))
+            session.execute(stmt)
+            # First delete links, then the Nodes, since we are not cascading deletions.
+            # The objects of the session are not synchronized row by row: they are all expired by the commit.
+            # Here I delete the links coming out of the nodes marked for deletion.
+            session.query(DbLink).filter(DbLink.input_id.in_(pks)).delete(synchronize_session=False)
+            # Here I delete the links pointing to the nodes marked for deletion.
+            session.query(DbLink).filter(DbLink.output_id.in_(pks)).delete(synchronize_session=False)
+            # Now I am deleting the nodes
+            session.query(DbNode).filter(DbNode.id.in_(pks)).delete(synchronize_session=False)
+
+            deleted += len(pks)
+            if callback is not None:
+                callback(deleted)
         # Here I commit this scoped session!
         session.commit()
     except Exception as e:
@@ -85,6 +85,7 @@ db_test_list = {
         'common.archive': ['aiida.backends.tests.common.test_archive'],
         'common.datastructures': ['aiida.backends.tests.common.test_datastructures'],
         'daemon.client': ['aiida.backends.tests.daemon.test_client'],
+        'manage.database.closure': ['aiida.backends.tests.manage.database.test_closure'],
         'orm.computer': ['aiida.backends.tests.computer'],
         'orm.authinfo': ['aiida.backends.tests.orm.authinfo'],
         'orm.data.frozendict': ['aiida.backends.tests.orm.data.frozendict'],
@@ -107,6 +108,7 @@ db_test_list = {
         'work.utils': ['aiida.backends.tests.work.test_utils'],
         'work.work_chain': ['aiida.backends.tests.work.work_chain'],
         'work.workfunctions': ['aiida.backends.tests.work.test_workfunctions'],
+        'work.job_calcs': ['aiida.backends.tests.work.test_job_calcs'],
         'work.job_processes': ['aiida.backends.tests.work.job_processes'],
         'plugin_loader': ['aiida.backends.tests.test_plugin_loader'],
         'daemon': ['aiida.backends.tests.daemon'],
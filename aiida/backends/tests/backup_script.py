@@ -13,6 +13,7 @@ from __future__ import absolute_import
 import datetime
 import importlib
 import json
+import os
 import shutil
 import sys
 import tempfile
@@ -21,6 +22,9 @@ from dateutil.parser import parse
 
 from aiida.common import utils
 from aiida.common.additions.backup_script import backup_setup
+from aiida.common.additions.backup_script.backup_engine import BackupEngine, sync_directory
+from aiida.common.additions.backup_script.backup_engine import JOURNAL_FILENAME, LATEST_SNAPSHOT_LINKNAME
+from aiida.common.utils import are_dir_trees_equal
 from aiida.orm.node import Node
 from aiida.backends.utils import is_dbenv_loaded, load_dbenv, BACKEND_SQLA, BACKEND_DJANGO
 from aiida.backends.settings import BACKEND
@@ -66,6 +70,12 @@ class TestBackupScriptUnit(AiidaTestCase):
         '"days_to_backup": null, ' \
         '"backup_dir": "/scratch/./aiida_user////backup//"}'
 
+    _json_test_input_7 = '{"backup_length_threshold": 2, "periodicity": 2,' + \
+        ' "oldest_object_backedup": "2014-07-18 13:54:53.688484+00:00", ' + \
+        '"end_date_of_backup": null, "days_to_backup": null, "backup_dir": ' +\
+        '"/scratch/aiida_user/backupScriptDest", "copy_workers": 8, ' + \
+        '"snapshots": true}'
+
     def setUp(self):
         super(TestBackupScriptUnit, self).setUp()
         if not is_dbenv_loaded():
@@ -262,6 +272,18 @@ class TestBackupScriptUnit(AiidaTestCase):
 
         self.check_full_deserialization_serialization(input_string, backup_inst)
 
+    def test_full_deserialization_serialization_5(self):
+        """
+        This method tests the correct deserialization / serialization of the
+        optional variables of the backup engine.
+        """
+        input_string = self._json_test_input_7
+        backup_inst = self._backup_setup_inst
+
+        self.check_full_deserialization_serialization(input_string, backup_inst)
+        self.assertEqual(backup_inst._copy_workers, 8)
+        self.assertTrue(backup_inst._snapshots)
+
     def test_timezone_addition_and_dir_correction(self):
         """
         This method tests if the timezone is added correctly to timestamps
@@ -296,6 +318,110 @@ class TestBackupScriptUnit(AiidaTestCase):
             "not normalized as expected.")
 
 
+class TestBackupEngine(AiidaTestCase):
+    """
+    Test the incremental, resumable and snapshot copies of the backup engine.
+    """
+
+    def setUp(self):
+        super(TestBackupEngine, self).setUp()
+        self._temp_folder = tempfile.mkdtemp()
+        self._source = os.path.join(self._temp_folder, 'source')
+        self._backup = os.path.join(self._temp_folder, 'backup')
+        os.makedirs(self._backup)
+
+        self._directories = []
+        for index in range(10):
+            relative_dir = os.path.join('repository', 'node', '{:02d}'.format(index), 'uuid{}'.format(index))
+            os.makedirs(os.path.join(self._source, relative_dir, 'path'))
+            for file_index in range(3):
+                with open(os.path.join(self._source, relative_dir, 'path', 'file{}'.format(file_index)), 'w') as handle:
+                    handle.write('content' * (index + file_index))
+            self._directories.append(relative_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_folder, ignore_errors=True)
+        super(TestBackupEngine, self).tearDown()
+
+    def backup(self, directories, **kwargs):
+        """Run a backup of the given directories, and return the number of directories copied."""
+        engine = BackupEngine(self._source, self._backup, **kwargs)
+        engine.start()
+        copied = engine.copy_directories([(relative_dir, None) for relative_dir in directories])
+        engine.finish()
+        return copied
+
+    def test_incremental_copy(self):
+        """
+        Verify that the files are only copied again if they changed, and that deleted files are removed.
+        """
+        self.assertEqual(self.backup(self._directories), len(self._directories))
+        res, msg = are_dir_trees_equal(os.path.join(self._source, 'repository'),
+                                       os.path.join(self._backup, 'repository'))
+        self.assertTrue(res, msg)
+        self.assertFalse(os.path.exists(os.path.join(self._backup, JOURNAL_FILENAME)))
+
+        source_dir = os.path.join(self._source, self._directories[0])
+        destination_dir = os.path.join(self._backup, self._directories[0])
+        self.assertEqual(sync_directory(source_dir, destination_dir), 0)
+
+        with open(os.path.join(source_dir, 'path', 'file0'), 'w') as handle:
+            handle.write('modified content')
+        os.remove(os.path.join(source_dir, 'path', 'file1'))
+        self.assertEqual(sync_directory(source_dir, destination_dir), 1)
+        res, msg = are_dir_trees_equal(source_dir, destination_dir)
+        self.assertTrue(res, msg)
+
+    def test_resume(self):
+        """
+        Verify that a backup that was interrupted does not copy again the directories that it copied.
+        """
+        engine = BackupEngine(self._source, self._backup)
+        engine.start()
+        engine.copy_directories([(relative_dir, 0.) for relative_dir in self._directories[:4]])
+        # The backup is interrupted before it is finished
+        del engine
+
+        engine = BackupEngine(self._source, self._backup)
+        engine.start()
+        counts = []
+        copied = engine.copy_directories([(relative_dir, 0.) for relative_dir in self._directories],
+                                         callback=counts.append)
+        engine.finish()
+
+        self.assertEqual(copied, len(self._directories) - 4)
+        self.assertEqual(counts[-1], len(self._directories))
+        res, msg = are_dir_trees_equal(os.path.join(self._source, 'repository'),
+                                       os.path.join(self._backup, 'repository'))
+        self.assertTrue(res, msg)
+
+    def test_snapshots(self):
+        """
+        Verify that a snapshot links the files that did not change to the previous snapshot, that is not modified.
+        """
+        self.backup(self._directories, snapshots=True)
+        first = os.path.realpath(os.path.join(self._backup, LATEST_SNAPSHOT_LINKNAME))
+
+        changed = os.path.join(self._directories[1], 'path', 'file0')
+        with open(os.path.join(self._source, changed), 'w') as handle:
+            handle.write('modified content')
+
+        self.assertEqual(self.backup([self._directories[1]], snapshots=True), 1)
+        second = os.path.realpath(os.path.join(self._backup, LATEST_SNAPSHOT_LINKNAME))
+        self.assertNotEqual(first, second)
+
+        res, msg = are_dir_trees_equal(os.path.join(self._source, 'repository'), os.path.join(second, 'repository'))
+        self.assertTrue(res, msg)
+
+        unchanged = os.path.join(self._directories[0], 'path', 'file0')
+        self.assertEqual(os.stat(os.path.join(first, unchanged)).st_ino,
+                         os.stat(os.path.join(second, unchanged)).st_ino)
+        self.assertNotEqual(os.stat(os.path.join(first, changed)).st_ino,
+                            os.stat(os.path.join(second, changed)).st_ino)
+        with open(os.path.join(first, changed)) as handle:
+            self.assertEqual(handle.read(), 'content')
+
+
 class TestBackupScriptIntegration(AiidaTestCase):
 
     _aiida_rel_path = ".aiida"
@@ -763,6 +763,15 @@ class TestVerdiDataStructure(AiidaTestCase, TestVerdiDataListable, TestVerdiData
     def test_list(self):
         self.data_listing_test(StructureData, 'BaO3Ti', self.ids)
 
+    def test_list_compact(self):
+        """The formula of a structure with compact sites is listed."""
+        struc = StructureData(cell=((5., 0., 0.), (0., 5., 0.), (0., 0., 5.)))
+        struc.set_sites_from_arrays(['Fe', 'Fe', 'O', 'O', 'O'], [[float(i), 0., 0.] for i in range(5)], compact=True)
+        struc.store()
+
+        res = self.cli_runner.invoke(cmd_structure.structure_list, ['--raw'], catch_exceptions=False)
+        self.assertIn(['{}'.format(struc.pk), 'Fe2O3'], [line.split()[:2] for line in res.output.splitlines()])
+
     def test_export(self):
         from aiida.cmdline.commands.cmd_data.cmd_structure import EXPORT_FORMATS
         self.data_export_test(StructureData, self.ids, EXPORT_FORMATS)
@@ -154,6 +154,7 @@ class TestVerdiExport(AiidaTestCase):
         archives = [
             'export_v0.1.aiida',
             'export_v0.2.aiida',
+            'export_v0.3.aiida',
         ]
 
         for archive in archives:
@@ -179,13 +180,20 @@ class TestVerdiExport(AiidaTestCase):
         for archive in archives:
 
             filename_input = get_archive_file(archive)
+            filename_recent = next(tempfile._get_candidate_names())  # pylint: disable=protected-access
             filename_output = next(tempfile._get_candidate_names())  # pylint: disable=protected-access
 
             try:
-                options = [filename_input, filename_output]
+                # First migrate the archive to the current version
+                options = [filename_input, filename_recent]
+                result = self.cli_runner.invoke(cmd_export.migrate, options)
+                self.assertIsNone(result.exception)
+
+                options = [filename_recent, filename_output]
                 result = self.cli_runner.invoke(cmd_export.migrate, options)
                 self.assertIsNotNone(result.exception)
             finally:
+                delete_temporary_file(filename_recent)
                 delete_temporary_file(filename_output)
 
     def test_migrate_force(self):
@@ -45,6 +45,18 @@ class TestVerdiRehash(AiidaTestCase):
         self.assertTrue('{} nodes'.format(expected_node_count) in result.output)
         self.assertIsNone(result.exception)
 
+    def test_rehash_incremental(self):
+        """The hash of all 5 nodes is up to date, so the incremental mode should not update any of them."""
+        options = ['--incremental']
+        result = self.runner.invoke(cmd_rehash.rehash, options)
+        self.assertIsNone(result.exception)
+        self.assertTrue('0 nodes re-hashed, 5 nodes unchanged' in result.output)
+
+        self.node_int.clear_hash()
+        result = self.runner.invoke(cmd_rehash.rehash, options)
+        self.assertIsNone(result.exception)
+        self.assertTrue('1 nodes re-hashed, 4 nodes unchanged' in result.output)
+
     def test_rehash_bool(self):
         """Limiting the queryset by defining an entry point, in this case bool, should limit nodes to 2."""
         expected_node_count = 2
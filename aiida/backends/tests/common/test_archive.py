@@ -7,8 +7,9 @@ from __future__ import absolute_import
 import os
 
 from aiida.backends.testbase import AiidaTestCase
-from aiida.common.archive import Archive
+from aiida.common.archive import Archive, ArchiveDataReader, ArchiveDataWriter, LINKS_SECTION
 from aiida.common.exceptions import InvalidOperation
+from aiida.common.folders import SandboxFolder
 
 
 def get_archive_file(archive):
@@ -41,3 +42,70 @@ class TestCommonArchive(AiidaTestCase):
         filepath = get_archive_file('export_v0.1.aiida')
         with Archive(filepath) as archive:
             self.assertEqual(archive.version_format, '0.1')
+
+    def test_data_writer_reader(self):
+        """Verify that the records written in chunks by `ArchiveDataWriter` are read back by `ArchiveDataReader`."""
+        records = [[pk, {'uuid': str(pk)}] for pk in range(5)]
+
+        with SandboxFolder() as folder:
+            with ArchiveDataWriter(folder, records_per_file=2) as writer:
+                for record in records:
+                    writer.write('Node', record)
+
+            self.assertEqual(writer.files, {'Node': ['data/Node.0.jsonl', 'data/Node.1.jsonl', 'data/Node.2.jsonl']})
+
+            reader = ArchiveDataReader(folder, {'data_files': writer.files})
+            self.assertTrue(reader.is_streaming)
+            self.assertEqual(reader.get_sections(), ['Node'])
+            self.assertEqual(list(reader.iter_records('Node')), records)
+            self.assertEqual([len(batch) for batch in reader.iter_batches('Node', 3)], [3, 2])
+            self.assertEqual(list(reader.iter_records(LINKS_SECTION)), [])
+            self.assertEqual(reader.count('Node'), len(records))
+
+    def test_data_previous_format(self):
+        """Verify that the data file of the previous format is read in the same records as the streaming format."""
+        filepath = get_archive_file('export_v0.3.aiida')
+
+        with Archive(filepath) as archive:
+            legacy_reader = archive.reader
+            self.assertFalse(legacy_reader.is_streaming)
+
+            with SandboxFolder() as folder:
+                with ArchiveDataWriter(folder, records_per_file=2) as writer:
+                    writer.write_data(archive.data)
+
+                reader = ArchiveDataReader(folder, {'data_files': writer.files})
+                self.assertEqual(sorted(reader.get_sections()), sorted(legacy_reader.get_sections()))
+
+                for section in legacy_reader.get_sections():
+                    self.assertEqual(list(reader.iter_records(section)), list(legacy_reader.iter_records(section)))
+
+    def test_data_memory(self):
+        """Verify that the peak memory of writing and reading the data records does not grow with their number."""
+        try:
+            import tracemalloc
+        except ImportError:
+            self.skipTest('tracemalloc is not available')
+
+        def get_peak_memory(number_records):
+            """Return the peak memory of writing and reading back `number_records` node records."""
+            with SandboxFolder() as folder:
+                tracemalloc.start()
+                try:
+                    with ArchiveDataWriter(folder, records_per_file=100) as writer:
+                        for pk in range(number_records):
+                            writer.write('Node', [pk, {'uuid': str(pk), 'label': 'x' * 100}])
+
+                    reader = ArchiveDataReader(folder, {'data_files': writer.files})
+                    for _ in reader.iter_batches('Node', 100):
+                        pass
+
+                    return tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+
+        peak_small = get_peak_memory(1000)
+        peak_large = get_peak_memory(20000)
+
+        # The records of 20 times more data should take well below twice the memory
+        self.assertLess(peak_large, 2 * peak_small)
@@ -2118,6 +2118,225 @@ Ag 0 0
             with self.assertRaises(TypeError):
                 StructureData()._parse_xyz(xyz_string)
 
+    def test_set_sites_from_arrays(self):
+        """
+        Test setting the kinds and sites from arrays
+        """
+        import numpy as np
+        from aiida.orm.data.structure import StructureData
+
+        s = StructureData(cell=((5., 0., 0.), (0., 5., 0.), (0., 0., 5.)))
+        s.append_atom(position=(0., 0., 0.), symbols='Ba')
+
+        s.set_sites_from_arrays(['Fe', 'O', 'Fe', 'O'], np.array([[0., 0., 0.], [1., 0., 0.], [2., 0., 0.], [3., 0., 0.]]),
+                                kind_names=['Fe1', 'O', 'Fe2', 'O'])
+        s._validate()
+
+        self.assertEquals(s.get_kind_names(), ['Fe1', 'O', 'Fe2'])
+        self.assertEquals([k.symbol for k in s.kinds], ['Fe', 'O', 'Fe'])
+        self.assertEquals(s.get_site_kindnames(), ['Fe1', 'O', 'Fe2', 'O'])
+        self.assertEquals([list(site.position) for site in s.sites],
+                          [[0., 0., 0.], [1., 0., 0.], [2., 0., 0.], [3., 0., 0.]])
+        self.assertEquals(s.get_kind('Fe2').symbol, 'Fe')
+
+        # Atoms can still be appended afterwards
+        s.append_atom(position=(4., 0., 0.), symbols='O')
+        self.assertEquals(s.get_site_kindnames(), ['Fe1', 'O', 'Fe2', 'O', 'O'])
+
+        with self.assertRaises(ValueError):
+            # Same kind name for different symbols
+            s.set_sites_from_arrays(['Fe', 'O'], [[0., 0., 0.], [1., 0., 0.]], kind_names=['X', 'X'])
+        with self.assertRaises(ValueError):
+            s.set_sites_from_arrays(['Fe', 'O'], [[0., 0., 0.]])
+        with self.assertRaises(ValueError):
+            s.set_sites_from_arrays(['Fe'], [[0., 0., np.nan]])
+        with self.assertRaises(ValueError):
+            s.set_sites_from_arrays(['Xx'], [[0., 0., 0.]])
+
+    def test_kinds_index(self):
+        """
+        Test that the kinds used to append sites follow the changes of the kinds
+        """
+        from aiida.orm.data.structure import StructureData, Kind, Site
+
+        s = StructureData(cell=((5., 0., 0.), (0., 5., 0.), (0., 0., 5.)))
+        s.append_atom(position=(0., 0., 0.), symbols='Ba')
+        s.append_atom(position=(1., 0., 0.), symbols='Ba', mass=100.)
+        self.assertEquals(s.get_kind_names(), ['Ba', 'Ba1'])
+
+        s.clear_kinds()
+        with self.assertRaises(ValueError):
+            s.append_site(Site(kind_name='Ba', position=(0., 0., 0.)))
+
+        s.append_kind(Kind(symbols='Ti', name='Ti'))
+        s.append_site(Site(kind_name='Ti', position=(0., 0., 0.)))
+        with self.assertRaises(ValueError):
+            s.append_kind(Kind(symbols='Ti', name='Ti'))
+
+        s._set_attr('kinds', [Kind(symbols='O', name='O').get_raw()])
+        s._set_attr('sites', [])
+        s.append_site(Site(kind_name='O', position=(0., 0., 0.)))
+        self.assertEquals(s.get_site_kindnames(), ['O'])
+
+    def test_large_structure(self):
+        """
+        Build a structure of many atoms from arrays, and compare it with appending the atoms one by one
+        """
+        import numpy as np
+        from aiida.orm.data.structure import StructureData
+
+        count = 3000
+        cell = ((100., 0., 0.), (0., 100., 0.), (0., 0., 100.))
+        symbols = np.array(['Si', 'O', 'O'])[np.arange(count) % 3]
+        positions = np.random.RandomState(0).uniform(0., 100., (count, 3))
+
+        s_arrays = StructureData(cell=cell)
+        s_arrays.set_sites_from_arrays(symbols, positions)
+        s_arrays._validate()
+
+        self.assertEquals(len(s_arrays.sites), count)
+        self.assertEquals(s_arrays.get_composition(), {'Si': 1000, 'O': 2000})
+
+        s_append = StructureData(cell=cell)
+        for symbol, position in zip(symbols, positions):
+            s_append.append_atom(symbols=symbol, position=position)
+
+        self.assertEquals(s_append.get_kind_names(), ['Si', 'O'])
+        self.assertEquals([kind.get_raw() for kind in s_arrays.kinds], [kind.get_raw() for kind in s_append.kinds])
+        self.assertEquals(s_arrays.get_site_kindnames(), s_append.get_site_kindnames())
+        self.assertEquals([list(site.position) for site in s_arrays.sites],
+                          [list(site.position) for site in s_append.sites])
+
+    def test_compact_sites(self):
+        """
+        Test storing the sites as arrays in the repository rather than in the attributes
+        """
+        import numpy as np
+        from aiida.orm.data.structure import StructureData, Site, SiteArrayView
+
+        positions = [[0., 0., 0.], [1., 0., 0.], [2., 0., 0.], [3., 0., 0.]]
+        s = StructureData(cell=((5., 0., 0.), (0., 5., 0.), (0., 0., 5.)))
+        s.set_sites_from_arrays(['Fe', 'O', 'Fe', 'O'], positions, kind_names=['Fe1', 'O', 'Fe2', 'O'], compact=True)
+        s._validate()
+
+        self.assertTrue(s.has_compact_sites())
+        self.assertNotIn('sites', s.get_attrs())
+        self.assertIsInstance(s.sites, SiteArrayView)
+        self.assertEquals(len(s.sites), 4)
+        self.assertEquals(s.sites[-1].kind_name, 'O')
+        self.assertEquals([list(site.position) for site in s.sites], positions)
+        self.assertEquals([site.kind_name for site in s.sites[1:3]], ['O', 'Fe2'])
+        self.assertEquals(s.get_site_kindnames(), ['Fe1', 'O', 'Fe2', 'O'])
+        self.assertEquals(s.get_site_kind_indices().tolist(), [0, 1, 2, 1])
+        self.assertEquals(s.get_site_positions().tolist(), positions)
+        self.assertEquals(s.get_composition(), {'Fe': 2, 'O': 2})
+        self.assertEquals(s.get_formula(), 'Fe2O2')
+
+        s.reset_sites_positions(np.array(positions) + 1.)
+        self.assertEquals(s.get_site_positions().tolist(), (np.array(positions) + 1.).tolist())
+        with self.assertRaises(ValueError):
+            s.reset_sites_positions(positions[:2])
+
+        s.store()
+        loaded = load_node(s.pk)
+        self.assertTrue(loaded.has_compact_sites())
+        self.assertEquals([site.get_raw() for site in loaded.sites], [site.get_raw() for site in s.sites])
+        self.assertEquals(loaded.get_hash(), s.get_hash())
+
+        # Appending a site moves the sites back to the attribute
+        s = StructureData(cell=((5., 0., 0.), (0., 5., 0.), (0., 0., 5.)))
+        s.set_sites_from_arrays(['Fe', 'O'], positions[:2], compact=True)
+        s.append_site(Site(kind_name='O', position=positions[2]))
+        s._validate()
+        self.assertFalse(s.has_compact_sites())
+        self.assertEquals(s.get_site_kindnames(), ['Fe', 'O', 'O'])
+        self.assertEquals(s.get_folder_list(), [])
+
+        s.set_sites_from_arrays(['Fe', 'O'], positions[:2], compact=True)
+        s.clear_sites()
+        self.assertFalse(s.has_compact_sites())
+        self.assertEquals(len(s.sites), 0)
+
+    def test_compact_sites_invalid(self):
+        """
+        Test the validation of the compact sites
+        """
+        import numpy as np
+        from aiida.common.exceptions import ValidationError
+        from aiida.orm.data.structure import StructureData
+
+        s = StructureData(cell=((5., 0., 0.), (0., 5., 0.), (0., 0., 5.)))
+        s.set_sites_from_arrays(['Fe', 'O'], [[0., 0., 0.], [1., 0., 0.]], compact=True)
+
+        s._set_sites_array('kind_indices', np.array([0, 2]))
+        with self.assertRaises(ValidationError):
+            s._validate()
+
+        s._set_sites_array('kind_indices', np.array([0, 0]))
+        with self.assertRaises(ValidationError):
+            # Kind 'O' has no sites
+            s._validate()
+
+        s._set_sites_array('kind_indices', np.array([0, 1, 1]))
+        with self.assertRaises(ValidationError):
+            s._validate()
+
+    @unittest.skipIf(not has_ase(), "Unable to import ase")
+    def test_compact_sites_ase(self):
+        """
+        Test the conversion of compact sites from and to ase, compared to the sites in the attributes
+        """
+        import ase
+        from aiida.orm.data.structure import StructureData
+
+        asecell = ase.Atoms('Fe3O2', cell=((6., 0., 0.), (0., 6., 0.), (0., 0., 6.)),
+                            positions=[[0, 0, 0], [1, 0, 0], [2, 0, 0], [3, 0, 0], [4, 0, 0]])
+        asecell[0].mass = 12.
+        asecell[2].tag = 2
+
+        structures = []
+        for compact in (False, True):
+            s = StructureData()
+            s.set_ase(asecell, compact=compact)
+            s._validate()
+            self.assertEquals(s.has_compact_sites(), compact)
+            structures.append(s)
+
+        self.assertEquals([k.get_raw() for k in structures[1].kinds], [k.get_raw() for k in structures[0].kinds])
+        self.assertEquals(structures[1].get_site_kindnames(), structures[0].get_site_kindnames())
+        self.assertEquals(structures[0].get_kind_names(), ['Fe', 'Fe1', 'Fe2', 'O'])
+
+        for s in structures:
+            newasecell = s.get_ase()
+            self.assertEquals(newasecell, asecell)
+            self.assertEquals(newasecell.get_tags().tolist(), [0, 1, 2, 0, 0])
+            self.assertEquals(newasecell.get_masses().tolist(), asecell.get_masses().tolist())
+
+    def test_large_compact_structure(self):
+        """
+        Store a structure of many atoms with its sites in the attributes and as arrays, and compare them once loaded
+        """
+        import numpy as np
+        from aiida.orm.data.structure import StructureData, get_stored_site_kindnames
+
+        count = 3000
+        cell = ((100., 0., 0.), (0., 100., 0.), (0., 0., 100.))
+        symbols = np.array(['Si', 'O', 'O'])[np.arange(count) % 3]
+        positions = np.random.RandomState(0).uniform(0., 100., (count, 3))
+
+        for compact in (False, True):
+            s = StructureData(cell=cell)
+            s.set_sites_from_arrays(symbols, positions, compact=compact)
+            s.store()
+
+            loaded = load_node(s.pk)
+            self.assertEquals(loaded.has_compact_sites(), compact)
+            self.assertEquals('sites' in loaded.get_attrs(), not compact)
+            self.assertEquals(loaded.get_composition(), {'Si': 1000, 'O': 2000})
+            self.assertEquals(loaded.get_site_positions().tolist(), positions.tolist())
+            self.assertEquals(loaded.get_site_kindnames(), symbols.tolist())
+            self.assertEquals(get_stored_site_kindnames(s.pk, loaded.get_attr('sites', None)), symbols.tolist())
+
 
 class TestStructureDataLock(AiidaTestCase):
     """
@@ -3039,6 +3258,73 @@ class TestArrayData(AiidaTestCase):
         self.assertEquals(first.shape, n.get_shape('first'))
         self.assertEquals(second.shape, n.get_shape('second'))
 
+    def test_lazy_access(self):
+        """
+        Check the memory-mapped and sliced access to the arrays, and the
+        bounded cache of the arrays of stored nodes.
+        """
+        from aiida.orm.data.array import ArrayData, ARRAY_CACHE, ArrayCache
+        import mock
+        import numpy
+
+        first = numpy.random.rand(20, 3)
+        second = numpy.arange(1000)
+
+        n = ArrayData()
+        n.set_array('first', first)
+        n.set_array('second', second)
+
+        for node in [n, n.store()]:
+            mmapped = node.get_array('first', mmap=True)
+            self.assertIsInstance(mmapped, numpy.memmap)
+            self.assertTrue(numpy.array_equal(mmapped, first))
+            self.assertTrue(numpy.array_equal(node.get_array_slice('first', numpy.s_[5:10, 1]), first[5:10, 1]))
+            self.assertEqual(node.get_array_slice('second', 7), 7)
+            with self.assertRaises(KeyError):
+                node.get_array_slice('nonexistent_array', 0)
+
+        # Memory-mapped and sliced access does not fill the cache
+        self.assertNotIn((n.uuid, 'first'), ARRAY_CACHE)
+        self.assertTrue(numpy.array_equal(n.get_array('first'), first))
+        self.assertIn((n.uuid, 'first'), ARRAY_CACHE)
+
+        # The cached arrays are shared, so they cannot be modified in place
+        cached = n.get_array('first')
+        with self.assertRaises(ValueError):
+            cached *= 2
+        self.assertTrue(numpy.array_equal(n.get_array('first'), first))
+        self.assertTrue(numpy.array_equal(n.get_array_slice('first', 3), first[3]))
+        n.clear_internal_cache()
+        self.assertNotIn((n.uuid, 'first'), ARRAY_CACHE)
+
+        # The arrays of stored nodes are read-only also if they are too large to be cached
+        with mock.patch.object(ARRAY_CACHE, '_max_size', first.nbytes):
+            for name, array in [('first', first), ('second', second)]:
+                stored = n.get_array(name)
+                self.assertEqual((n.uuid, name) in ARRAY_CACHE, array.nbytes <= first.nbytes)
+                with self.assertRaises(ValueError):
+                    stored *= 2
+                self.assertTrue(numpy.array_equal(n.get_array(name), array))
+        n.clear_internal_cache()
+
+        # The least recently used arrays are evicted when the size is exceeded
+        cache = ArrayCache(max_size=first.nbytes + second.nbytes)
+        cache.put('first', first)
+        cache.put('second', second)
+        self.assertEqual(cache.size, first.nbytes + second.nbytes)
+        self.assertIs(cache.get('first'), first)
+        cache.put('third', first)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('second'))
+        self.assertIs(cache.get('first'), first)
+        self.assertEqual(cache.size, 2 * first.nbytes)
+
+        # Arrays larger than the maximum size are not cached
+        cache.put('large', numpy.zeros(second.size * 2))
+        self.assertNotIn('large', cache)
+        cache.clear()
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
     def test_iteration(self):
         """
         Check the functionality of the iterarrays() iterator
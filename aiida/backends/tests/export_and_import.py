@@ -331,6 +331,7 @@ class TestSimple(AiidaTestCase):
         import tempfile
 
         from aiida.orm.importexport import export
+        from aiida.common.archive import ArchiveDataWriter, LINKS_SECTION
         from aiida.common.folders import SandboxFolder
         from aiida.orm.data.structure import StructureData
         from aiida.orm import load_node
@@ -351,14 +352,17 @@ class TestSimple(AiidaTestCase):
                     filename, "r:gz", format=tarfile.PAX_FORMAT) as tar:
                 tar.extractall(unpack.abspath)
 
-            with open(unpack.get_abs_path('data.json'), 'r') as f:
+            with open(unpack.get_abs_path('metadata.json'), 'r') as f:
                 metadata = json.load(f)
-            metadata['links_uuid'].append({
-                'output': sd.uuid,
-                'input': 'non-existing-uuid',
-                'label': 'parent'
-            })
-            with open(unpack.get_abs_path('data.json'), 'w') as f:
+            with ArchiveDataWriter(unpack, records_per_file=1) as writer:
+                writer.write(LINKS_SECTION, {
+                    'output': sd.uuid,
+                    'input': 'non-existing-uuid',
+                    'label': 'parent'
+                })
+            metadata['data_files'].setdefault(LINKS_SECTION, []).extend(
+                writer.files[LINKS_SECTION])
+            with open(unpack.get_abs_path('metadata.json'), 'w') as f:
                 json.dump(metadata, f)
 
             with tarfile.open(
@@ -756,6 +760,139 @@ class TestSimple(AiidaTestCase):
             # Deleting the created temporary folder
             shutil.rmtree(temp_folder, ignore_errors=True)
 
+    def test_chunked_export_import(self):
+        """
+        Test that an archive whose data is split over many data files is
+        imported correctly, also when it is imported in many batches
+        """
+        import json
+        import os
+        import shutil
+        import tarfile
+        import tempfile
+
+        from aiida.common.archive import LINKS_SECTION, NODE_ATTRIBUTES_SECTION
+        from aiida.common.links import LinkType
+        from aiida.orm import importexport, load_node
+        from aiida.orm.calculation import Calculation
+        from aiida.orm.data.base import Int
+        from aiida.orm.group import Group
+        from aiida.orm.importexport import export
+        from aiida.orm.querybuilder import QueryBuilder
+
+        temp_folder = tempfile.mkdtemp()
+        import_batch_size = importexport.IMPORT_BATCH_SIZE
+        try:
+            values = list(range(7))
+            inputs = [Int(value).store() for value in values]
+            calc = Calculation().store()
+            for index, node in enumerate(inputs):
+                calc.add_link_from(node, label='input_{}'.format(index), link_type=LinkType.INPUT)
+
+            group = Group(name='chunked_group')
+            group.store()
+            group.add_nodes(inputs)
+            group_uuid = group.uuid
+            input_uuids = [node.uuid for node in inputs]
+            calc_uuid = calc.uuid
+
+            filename = os.path.join(temp_folder, 'export.tar.gz')
+            export([group, calc], outfile=filename, silent=True, records_per_file=3)
+
+            with tarfile.open(filename, 'r:gz', format=tarfile.PAX_FORMAT) as tar:
+                metadata = json.load(tar.extractfile('metadata.json'))
+            self.assertEquals(metadata['export_version'], '0.4')
+            self.assertEquals(len(metadata['data_files']['Node']), 3)
+            self.assertEquals(len(metadata['data_files'][NODE_ATTRIBUTES_SECTION]), 3)
+            self.assertEquals(len(metadata['data_files'][LINKS_SECTION]), 3)
+
+            self.clean_db()
+            self.insert_data()
+
+            importexport.IMPORT_BATCH_SIZE = 2
+            import_data(filename, silent=True)
+
+            for uuid, value in zip(input_uuids, values):
+                self.assertEquals(load_node(uuid).value, value)
+            self.assertEquals(
+                sorted(label for label, _ in load_node(calc_uuid).get_inputs(also_labels=True)),
+                sorted('input_{}'.format(index) for index in values))
+            qb = QueryBuilder()
+            qb.append(Group, filters={'uuid': group_uuid}, tag='group')
+            qb.append(Int, project=['uuid'], member_of='group')
+            self.assertEquals(sorted(str(uuid) for uuid, in qb.all()), sorted(input_uuids))
+        finally:
+            importexport.IMPORT_BATCH_SIZE = import_batch_size
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
+    def test_deduplicated_export_import(self):
+        """
+        Test that the files with the same content are stored only once in an
+        archive exported with deduplicate=True, and that all of them are
+        imported again, for both archive formats
+        """
+        import io
+        import json
+        import os
+        import shutil
+        import tarfile
+        import tempfile
+        import zipfile
+
+        from aiida.orm import load_node
+        from aiida.orm.data import Data
+        from aiida.orm.importexport import export, export_zip
+
+        temp_folder = tempfile.mkdtemp()
+        try:
+            src_same = os.path.join(temp_folder, 'same.txt')
+            with io.open(src_same, 'w', encoding='utf8') as handle:
+                handle.write(u'same content')
+
+            nodes_uuid = []
+            for index in range(3):
+                src_other = os.path.join(temp_folder, 'other.txt')
+                with io.open(src_other, 'w', encoding='utf8') as handle:
+                    handle.write(u'content {}'.format(index))
+                node = Data()
+                node.add_path(src_same, 'same.txt')
+                node.add_path(src_other, 'other.txt')
+                node.store()
+                nodes_uuid.append(node.uuid)
+            nodes = [load_node(uuid) for uuid in nodes_uuid]
+
+            filename_tar = os.path.join(temp_folder, 'export.tar.gz')
+            filename_zip = os.path.join(temp_folder, 'export.zip')
+            export(nodes, outfile=filename_tar, silent=True,
+                   deduplicate=True, copy_workers=2)
+            export_zip(nodes, outfile=filename_zip, silent=True,
+                       deduplicate=True, copy_workers=2)
+
+            with tarfile.open(filename_tar, 'r:gz', format=tarfile.PAX_FORMAT) as tar:
+                metadata = json.load(tar.extractfile('metadata.json'))
+                tar_names = tar.getnames()
+            with zipfile.ZipFile(filename_zip) as zip_file:
+                zip_metadata = json.loads(zip_file.read('metadata.json').decode('utf8'))
+
+            self.assertEquals(len(metadata['duplicate_files']), 2)
+            self.assertEquals(metadata['duplicate_files'], zip_metadata['duplicate_files'])
+            for path in metadata['duplicate_files']:
+                self.assertNotIn(path, tar_names)
+
+            for filename in (filename_tar, filename_zip):
+                self.clean_db()
+                self.insert_data()
+                import_data(filename, silent=True, copy_workers=2)
+
+                for index, uuid in enumerate(nodes_uuid):
+                    node = load_node(uuid)
+                    with io.open(node.get_abs_path('same.txt'), encoding='utf8') as handle:
+                        self.assertEquals(handle.read(), u'same content')
+                    with io.open(node.get_abs_path('other.txt'), encoding='utf8') as handle:
+                        self.assertEquals(handle.read(), u'content {}'.format(index))
+        finally:
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
     def test_workfunction_1(self):
         import shutil, os, tempfile
 
@@ -1797,6 +1934,38 @@ class TestLinks(AiidaTestCase):
             finally:
                 shutil.rmtree(tmp_folder, ignore_errors=True)
 
+    def test_retrieve_linked_nodes_rules(self):
+        """
+        Check the set of nodes to export for the different link rules, when the graph is traversed frontier by
+        frontier with chunks smaller than the frontiers.
+        """
+        from aiida.orm import importexport
+        from aiida.orm.importexport import retrieve_linked_nodes
+
+        graph_nodes, _ = self.construct_complex_graph()
+        d1, d2, d3, d4, d5, d6, pw1, pw2, wc1, wc2 = graph_nodes
+
+        def expand(calculations=(), data=(), **kwargs):
+            return retrieve_linked_nodes([_.pk for _ in calculations], [_.pk for _ in data], **kwargs)
+
+        def pks(*nodes):
+            return {_.pk for _ in nodes}
+
+        chunk_size = importexport.EXPORT_TRAVERSAL_CHUNK_SIZE
+        importexport.EXPORT_TRAVERSAL_CHUNK_SIZE = 1
+        try:
+            self.assertEqual(expand(data=[d3]), pks(d1, d3, d4, pw1))
+            self.assertEqual(expand(data=[d3], create_reversed=False), pks(d3))
+            self.assertEqual(expand(calculations=[pw2]), pks(d1, d3, d4, d5, d6, pw1, pw2))
+            self.assertEqual(expand(calculations=[wc1], data=[d2]), pks(d1, d2, d3, d4, pw1, wc1, wc2))
+
+            # These rules had no effect in the node by node traversal, and still have none
+            self.assertEqual(expand(data=[d3], return_reversed=True), pks(d1, d3, d4, pw1))
+            self.assertEqual(expand(calculations=[pw1], call_reversed=True), pks(d1, d3, d4, pw1))
+            self.assertEqual(expand(data=[d1], input_forward=True), pks(d1))
+        finally:
+            importexport.EXPORT_TRAVERSAL_CHUNK_SIZE = chunk_size
+
     def test_recursive_export_input_and_create_links_proper(self):
         """
         Check that CALL, INPUT, RETURN and CREATE links are followed
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Tests for the transitive closure table of the provenance links."""
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+from aiida.backends.testbase import AiidaTestCase
+from aiida.common.links import LinkType
+from aiida.manage.database import closure
+
+
+class TestClosure(AiidaTestCase):
+    """Tests for the transitive closure table of the provenance links."""
+
+    def setUp(self):
+        super(TestClosure, self).setUp()
+        from aiida.orm import Node
+
+        # A chain of nodes, where every node is also linked to the one two steps further down the chain
+        self.nodes = [Node().store() for _ in range(6)]
+        for index, node in enumerate(self.nodes[1:], start=1):
+            node.add_link_from(self.nodes[index - 1], label='prev', link_type=LinkType.INPUT)
+            if index > 1:
+                node.add_link_from(self.nodes[index - 2], label='prevprev', link_type=LinkType.CREATE)
+
+    def tearDown(self):
+        closure.drop_closure()
+        super(TestClosure, self).tearDown()
+
+    def get_descendants(self, node, **kwargs):
+        """Return the sorted (id, depth) of the descendants of a node, pruning visited nodes."""
+        from aiida.orm import Node
+        from aiida.orm.querybuilder import QueryBuilder
+
+        builder = QueryBuilder().append(Node, filters={'id': node.pk}, tag='anc')
+        builder.append(Node, descendant_of='anc', project='id', edge_project='depth', prune_visited=True, **kwargs)
+        return sorted(tuple(row) for row in builder.all())
+
+    def test_build_and_update(self):
+        """The closure table is used by the QueryBuilder only when it is up to date, and gives the same results."""
+        from aiida.orm import Node
+
+        expected = self.get_descendants(self.nodes[0])
+        expected_limited = self.get_descendants(self.nodes[0], max_depth=2)
+
+        self.assertIsNone(closure.get_closure_state())
+        self.assertFalse(closure.is_closure_up_to_date())
+        self.assertIsNone(closure.update_closure())
+
+        closure.build_closure()
+        self.assertTrue(closure.is_closure_up_to_date())
+        self.assertEqual(closure.verify_closure(), (0, 0))
+        self.assertEqual(self.get_descendants(self.nodes[0]), expected)
+        self.assertEqual(self.get_descendants(self.nodes[0], max_depth=2), expected_limited)
+
+        # Stored links are only added by an update, and the table is not used until then
+        new_node = Node().store()
+        new_node.add_link_from(self.nodes[-1], label='prev', link_type=LinkType.INPUT)
+        self.assertFalse(closure.is_closure_up_to_date())
+        expected = self.get_descendants(self.nodes[0])
+
+        self.assertEqual(closure.update_closure(batch_size=1), 1)
+        self.assertTrue(closure.is_closure_up_to_date())
+        self.assertEqual(closure.verify_closure(), (0, 0))
+        self.assertEqual(self.get_descendants(self.nodes[0]), expected)
+        self.assertEqual(closure.update_closure(), 0)
+
+    def test_incremental_equals_build(self):
+        """Updating the closure link by link gives the same table as building it."""
+        closure.build_closure()
+        built = closure._get_query_manager().raw(  # pylint: disable=protected-access
+            'SELECT ancestor_id, descendant_id, depth FROM db_dbclosure ORDER BY 1, 2, 3')
+
+        closure.drop_closure()
+        closure.build_closure()
+        closure._get_query_manager().execute(['TRUNCATE db_dbclosure'])  # pylint: disable=protected-access
+        closure._set_closure_state(0, [])  # pylint: disable=protected-access
+        closure.update_closure(batch_size=2)
+
+        updated = closure._get_query_manager().raw(  # pylint: disable=protected-access
+            'SELECT ancestor_id, descendant_id, depth FROM db_dbclosure ORDER BY 1, 2, 3')
+        self.assertEqual([tuple(row) for row in updated], [tuple(row) for row in built])
+        self.assertEqual(closure.verify_closure(), (0, 0))
+
+    def test_missing_ranges(self):
+        """The ranges of missing link ids are detected."""
+        # pylint: disable=protected-access
+        self.assertEqual(closure._get_missing_ranges([1, 2, 3], 1, 7), [])
+        self.assertEqual(closure._get_missing_ranges([3, 4, 8], 1, 7), [[1, 2, 7], [5, 7, 7]])
+
+    def test_acquire_updater_lock(self):
+        """The updater lock is kept by the connection that holds it, without stacking it."""
+        # pylint: disable=protected-access
+        self.assertTrue(closure.acquire_updater_lock())
+        self.assertTrue(closure.acquire_updater_lock())
+
+        query_manager = closure._get_query_manager()
+        unlock = 'SELECT pg_advisory_unlock({})'.format(closure._CLOSURE_UPDATER_LOCK_KEY)
+        self.assertTrue(query_manager.raw(unlock)[0][0])
+        self.assertFalse(query_manager.raw(unlock)[0][0])
@@ -172,6 +172,38 @@ class TestNodeHashing(AiidaTestCase):
             self.assertNotEquals(a1.uuid, a2.uuid)
             self.assertFalse('_aiida_cached_from' in a2.extras())
 
+    def test_hash_table(self):
+        """
+        Tests that the same nodes are found through the indexed hash table, which is kept in sync with the hash extra.
+        """
+        from aiida.orm.data.int import Int
+
+        n1 = self.create_simple_node(1.0, 2.0)
+        n1.store()
+        hash_ = n1.get_hash()
+        self.assertEqual(n1._get_db_hash(), hash_)
+        self.assertEqual(n1.get_extra('_aiida_hash'), hash_)
+
+        # Nodes of a different type with the same hash are not returned
+        n2 = self.create_simple_node(1.0, 2.0)
+        self.assertEqual(n2._get_same_node_pks(hash_), [n1.pk])
+        self.assertEqual([n.uuid for n in n2.get_all_same_nodes()], [n1.uuid])
+        self.assertEqual(Int(5)._get_same_node_pks(hash_), [])
+
+        n2.store()
+        self.assertEqual(n2._get_same_node_pks(hash_), [n1.pk, n2.pk])
+
+        n1.clear_hash()
+        self.assertIsNone(n1._get_db_hash())
+        self.assertIsNone(n1.get_extra('_aiida_hash'))
+        self.assertEqual(n2._get_same_node_pks(hash_), [n2.pk])
+        self.assertEqual(n2._get_same_node().uuid, n2.uuid)
+
+        self.assertTrue(n1.rehash(incremental=True))
+        self.assertFalse(n1.rehash(incremental=True))
+        self.assertEqual(n1._get_db_hash(), hash_)
+        self.assertEqual(n2._get_same_node_pks(hash_), [n1.pk, n2.pk])
+
     def test_updatable_attributes(self):
         """
         Tests that updatable attributes are ignored.
@@ -2199,6 +2231,98 @@ class TestSubNodesAndLinks(AiidaTestCase):
         self.assertEquals(len(node_origin.get_inputs(link_type=LinkType.INPUT)), 1)
 
 
+class TestNodeStoreMany(AiidaTestCase):
+    """
+    Test storing many nodes at once with Node.store_many
+    """
+
+    def test_store_many(self):
+        """
+        Test that attributes, files, links and hashes are stored as with store
+        """
+        import tempfile
+
+        calc = Calculation().store()
+        stored_node = Data().store()
+
+        nodes = []
+        for i in range(5):
+            node = Data()
+            node._set_attr('index', i)
+            node._set_attr('nested', {'list': [i, 'value'], 'dict': {'key': i}})
+            with tempfile.NamedTemporaryFile(mode='w') as handle:
+                handle.write('content {}'.format(i))
+                handle.flush()
+                node.add_path(handle.name, 'file.txt')
+            node.add_link_from(calc, label='output_{}'.format(i), link_type=LinkType.CREATE)
+            nodes.append(node)
+
+        self.assertEquals(Node.store_many(nodes + [stored_node, nodes[0]]), nodes + [stored_node, nodes[0]])
+
+        for i, node in enumerate(nodes):
+            self.assertTrue(node.is_stored)
+            self.assertIsNotNone(node.pk)
+
+            loaded = load_node(node.pk)
+            self.assertEquals(loaded.get_attr('index'), i)
+            self.assertEquals(loaded.get_attr('nested'), {'list': [i, 'value'], 'dict': {'key': i}})
+            with open(loaded.get_abs_path('file.txt')) as handle:
+                self.assertEquals(handle.read(), 'content {}'.format(i))
+            self.assertEquals(loaded.get_extra('_aiida_hash'), loaded.get_hash())
+            self.assertIn(node.pk, [n.pk for n in loaded.get_all_same_nodes()])
+
+        self.assertEquals(sorted(label for label, _ in calc.get_outputs(also_labels=True)),
+                          ['output_{}'.format(i) for i in range(5)])
+
+    def test_store_many_unstored_parents(self):
+        """
+        Test that nothing is stored if one of the nodes has an unstored input node
+        """
+        node = Data()
+        unstored_parent = Calculation()
+        node_with_unstored_parent = Data()
+        node_with_unstored_parent.add_link_from(unstored_parent, label='output', link_type=LinkType.CREATE)
+
+        with self.assertRaises(ModificationNotAllowed):
+            Node.store_many([node, node_with_unstored_parent])
+
+        self.assertFalse(node.is_stored)
+        self.assertFalse(node_with_unstored_parent.is_stored)
+
+    def test_store_many_linked_nodes(self):
+        """
+        Test that new nodes can be linked to each other, whatever their order
+        """
+        calc = Calculation().store()
+        output = Data()
+        output.add_link_from(calc, label='output', link_type=LinkType.CREATE)
+        child_calc = Calculation()
+        child_calc.add_link_from(output, label='input', link_type=LinkType.INPUT)
+        child_output = Data()
+        child_output.add_link_from(child_calc, label='output', link_type=LinkType.CREATE)
+
+        Node.store_many([child_output, child_calc, output])
+
+        self.assertTrue(all(node.is_stored for node in [output, child_calc, child_output]))
+        self.assertEquals([node.pk for node in load_node(child_calc.pk).get_inputs()], [output.pk])
+        self.assertEquals([node.pk for node in load_node(child_output.pk).get_inputs()], [child_calc.pk])
+
+    def test_store_many_loop(self):
+        """
+        Test that nothing is stored if the links between the new nodes form a loop
+        """
+        first = Calculation()
+        second = Calculation()
+        first.add_link_from(second, label='input', link_type=LinkType.CALL)
+        second.add_link_from(first, label='input', link_type=LinkType.CALL)
+
+        with self.assertRaises(ValueError):
+            Node.store_many([first, second])
+
+        self.assertFalse(first.is_stored)
+        self.assertFalse(second.is_stored)
+
+
 class AnyValue(object):
     """
     Helper class that compares equal to everything.
@@ -2373,3 +2497,36 @@ class TestNodeDeletion(AiidaTestCase):
             delete_nodes([called.pk], verbosity=2, force=True, follow_returns=True)
 
         self._check_existence(uuids_check_existence, uuids_check_deleted)
+
+    def test_deletion_in_chunks(self):
+        """
+        Check that the nodes and their repository folders are deleted also when the pks are queried and deleted in
+        many chunks, and that the progress is reported for every chunk
+        """
+        import os
+        from aiida.backends.utils import delete_nodes_and_connections
+        from aiida.utils import delete_nodes as delete_nodes_module
+
+        nodes = [Node().store() for i in range(7)]
+        for i in range(1, 7):
+            nodes[i].add_link_from(nodes[i - 1], link_type=LinkType.INPUT)
+        uuids_check_deleted = [n.uuid for n in nodes[:5]]
+        folders = [n.folder.abspath for n in nodes[:5]]
+
+        chunk_size = delete_nodes_module.DELETE_QUERY_CHUNK_SIZE
+        delete_nodes_module.DELETE_QUERY_CHUNK_SIZE = 2
+        try:
+            with Capturing():
+                delete_nodes([nodes[0].pk], force=True, verbosity=2)
+        finally:
+            delete_nodes_module.DELETE_QUERY_CHUNK_SIZE = chunk_size
+
+        self._check_existence([], uuids_check_deleted + [nodes[5].uuid, nodes[6].uuid])
+        for folder in folders:
+            self.assertFalse(os.path.exists(folder))
+
+        nodes = [Node().store() for i in range(5)]
+        progress = []
+        delete_nodes_and_connections([n.pk for n in nodes], chunk_size=2, callback=progress.append)
+        self.assertEquals(progress, [2, 4, 5])
+        self._check_existence([], [n.uuid for n in nodes])
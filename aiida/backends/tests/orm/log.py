@@ -154,3 +154,87 @@ class TestBackendLog(AiidaTestCase):
 
         self.assertEquals(len(logs), 1)
         self.assertEquals(logs[0].message, message)
+
+    def test_create_entries(self):
+        """
+        Test creating many log entries at once
+        """
+        count = 10
+        records = []
+        for pk in range(count):
+            record = dict(self._record)
+            record['objpk'] = pk
+            records.append(record)
+
+        self._backend.logs.create_entries(records)
+
+        entries = self._backend.logs.find(order_by=[OrderSpecifier('objpk', ASCENDING)])
+        self.assertEquals([entry.objpk for entry in entries], list(range(count)))
+        self.assertEquals(entries[0].metadata, self._record['metadata'])
+
+    def test_db_log_handler_asynchronous(self):
+        """
+        Verify that the asynchronous db log handler stores the records in the order they were logged, both when it is
+        flushed and when it is closed with records still in its queue
+        """
+        from aiida.common.log import DBLogHandler
+
+        count = 20
+        calc = Calculation().store()
+        extra = {'objpk': calc.pk, 'objname': 'node.' + calc._plugin_type_string}
+        order_by = [OrderSpecifier('id', ASCENDING)]
+        messages = ['Message {}'.format(index) for index in range(count)]
+        logger = logging.getLogger('aiida.test_db_log_handler_asynchronous')
+        logger.propagate = False
+
+        # The records are only stored on flush, since the batch size and flush interval are never reached
+        handler = DBLogHandler(asynchronous=True, batch_size=count * 10, flush_interval=60000)
+        logger.addHandler(handler)
+        try:
+            for index in range(count):
+                logger.warning('Message %d', index, extra=extra)
+            handler.flush()
+
+            entries = self._backend.logs.find(filter_by={'objpk': calc.pk}, order_by=order_by)
+            self.assertEquals([entry.message for entry in entries], messages)
+            self._backend.logs.delete_many({})
+
+            for index in range(count):
+                logger.warning('Message %d', index, extra=extra)
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+        # Closing the handler stores the records that are still queued
+        entries = self._backend.logs.find(filter_by={'objpk': calc.pk}, order_by=order_by)
+        self.assertEquals([entry.message for entry in entries], messages)
+        self.assertEquals(handler.dropped, 0)
+
+    def test_db_log_handler_asynchronous_invalid_entry(self):
+        """
+        Verify that an entry that cannot be stored does not lose the others of its batch, that are then stored one by
+        one with the database session of the background thread
+        """
+        import mock
+        from aiida.common.log import DBLogHandler
+
+        calc = Calculation().store()
+        extra = {'objpk': calc.pk, 'objname': 'node.' + calc._plugin_type_string}
+        logger = logging.getLogger('aiida.test_db_log_handler_asynchronous_invalid_entry')
+        logger.propagate = False
+
+        handler = DBLogHandler(asynchronous=True, batch_size=10, flush_interval=60000)
+        logger.addHandler(handler)
+        try:
+            # `create_entry` uses the session of the thread that imported the backend on SQLAlchemy
+            with mock.patch.object(type(self._backend.logs), 'create_entry', side_effect=AssertionError):
+                logger.warning('Message 0', extra=extra)
+                logger.warning('Message 1', extra=dict(extra, invalid=object()))
+                logger.warning('Message 2', extra=extra)
+                handler.flush()
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+        entries = self._backend.logs.find(filter_by={'objpk': calc.pk}, order_by=[OrderSpecifier('id', ASCENDING)])
+        self.assertEquals([entry.message for entry in entries], ['Message 0', 'Message 2'])
@@ -643,6 +643,52 @@ class QueryBuilderLimitOffsetsTest(AiidaTestCase):
         self.assertEqual(res, tuple(range(4, 1, -1)))
 
 
+class QueryBuilderColumnsTest(AiidaTestCase):
+
+    def test_columns(self):
+        """The columns of the results are the same as the transposed rows returned by `all`."""
+        import numpy as np
+        from aiida.common.exceptions import InputValidationError
+        from aiida.orm import Node
+        from aiida.orm.querybuilder import QueryBuilder
+
+        for i in range(10):
+            n = Node()
+            n._set_attr('foo', i)
+            n._set_attr('bar', i / 2.)
+            n.store()
+
+        qb = QueryBuilder().append(
+            Node, project=['id', 'attributes.foo', 'attributes.bar'], tag='node',
+            filters={'attributes.foo': {'>': -1}}
+        ).order_by({Node: 'ctime'})
+
+        ids, foos, bars = zip(*qb.all())
+        columns = qb.columns(batch_size=3)
+        self.assertEqual(set(columns.keys()), {'node'})
+        self.assertEqual(columns['node']['id'], list(ids))
+        self.assertEqual(columns['node']['attributes.foo'], list(foos))
+        self.assertEqual(columns['node']['attributes.bar'], list(bars))
+
+        arrays = qb.columns(as_arrays=True)['node']
+        self.assertIsInstance(arrays['attributes.bar'], np.ndarray)
+        self.assertTrue(np.array_equal(arrays['attributes.bar'], np.arange(10) / 2.))
+        self.assertTrue(np.array_equal(arrays['id'], np.array(ids)))
+
+        chunks = list(qb.itercolumns(batch_size=4))
+        self.assertEqual([len(chunk['node']['id']) for chunk in chunks], [4, 4, 2])
+
+        qb.limit(2)
+        self.assertEqual(qb.columns()['node']['attributes.foo'], [0, 1])
+
+        qb = QueryBuilder().append(Node, project=['id'], filters={'id': -1}, tag='node')
+        self.assertEqual(qb.columns(), {'node': {'id': []}})
+        self.assertEqual(len(qb.columns(as_arrays=True)['node']['id']), 0)
+
+        with self.assertRaises(InputValidationError):
+            QueryBuilder().append(Node, project='*').columns()
+
+
 class QueryBuilderJoinsTests(AiidaTestCase):
     def test_joins1(self):
         from aiida.orm import Node, Data, Calculation
@@ -921,6 +967,72 @@ class QueryBuilderPath(AiidaTestCase):
         qb.add_filter('edge', {'depth': 6})
         self.assertTrue(set(next(zip(*qb.all()))), set([6]))
 
+    def test_query_path_recursion_options(self):
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.orm import Node
+        from aiida.common.exceptions import InputValidationError
+        from aiida.common.links import LinkType
+
+        # A chain of nodes, where every node is also linked to the one two steps further down the chain
+        nodes = [Node().store() for _ in range(8)]
+        for index, node in enumerate(nodes[1:], start=1):
+            node.add_link_from(nodes[index - 1], label='prev', link_type=LinkType.INPUT)
+            if index > 1:
+                node.add_link_from(nodes[index - 2], label='prevprev', link_type=LinkType.CREATE)
+
+        def get_descendants(**kwargs):
+            qb = QueryBuilder().append(Node, filters={'id': nodes[0].pk}, tag='anc')
+            qb.append(Node, descendant_of='anc', project='id', edge_project='depth', **kwargs)
+            return sorted(tuple(row) for row in qb.all())
+
+        def get_ancestors(**kwargs):
+            qb = QueryBuilder().append(Node, filters={'id': nodes[-1].pk}, tag='desc')
+            qb.append(Node, ancestor_of='desc', project='id', edge_project='depth', **kwargs)
+            return sorted(tuple(row) for row in qb.all())
+
+        # The rows when only walking the chain, the depth is the number of links minus one
+        chain_descendants = sorted((node.pk, index - 1) for index, node in enumerate(nodes) if index > 0)
+        chain_ancestors = sorted((node.pk, 6 - index) for index, node in enumerate(nodes) if index < 7)
+
+        for get_relatives, chain in ((get_descendants, chain_descendants), (get_ancestors, chain_ancestors)):
+            unlimited = get_relatives()
+            for max_depth in (1, 3, 7):
+                expected = [row for row in unlimited if row[1] < max_depth]
+                self.assertEqual(get_relatives(max_depth=max_depth), expected)
+                self.assertEqual(get_relatives(edge_filters={'depth': {'<': max_depth}}), expected)
+                self.assertEqual(get_relatives(edge_filters={'depth': {'<': max_depth}}, max_depth=3),
+                                 [row for row in expected if row[1] < 3])
+
+            # Pruning only removes duplicate rows, which come from different paths of the same length
+            self.assertEqual(get_relatives(prune_visited=True), sorted(set(unlimited)))
+            self.assertEqual(get_relatives(prune_visited=True, max_depth=2),
+                             sorted(set(row for row in unlimited if row[1] < 2)))
+
+            # Following only the INPUT links walks only the chain, only the CREATE links every second node
+            self.assertEqual(get_relatives(link_types=[LinkType.INPUT]), chain)
+            self.assertEqual(len(get_relatives(link_types=LinkType.CREATE.value)), 3)
+
+        # Projecting the path and pruning does not walk nodes that are already on the path
+        qb = QueryBuilder().append(Node, filters={'id': nodes[0].pk}, tag='anc')
+        qb.append(Node, descendant_of='anc', filters={'id': nodes[-1].pk}, edge_project='path', prune_visited=True)
+        self.assertEqual(
+            len(qb.all()),
+            QueryBuilder().append(Node, filters={'id': nodes[0].pk}, tag='anc').append(
+                Node, descendant_of='anc', filters={'id': nodes[-1].pk}).count())
+
+        # The options are kept in the queryhelp
+        qb = QueryBuilder().append(Node, filters={'id': nodes[0].pk}, tag='anc')
+        qb.append(Node, descendant_of='anc', project='id', max_depth=2, link_types=[LinkType.INPUT])
+        self.assertEqual(sorted(QueryBuilder(**qb.get_json_compatible_queryhelp()).all()), sorted(qb.all()))
+        self.assertEqual(sorted(qb.all()), sorted([[nodes[1].pk], [nodes[2].pk]]))
+
+        with self.assertRaises(InputValidationError):
+            QueryBuilder().append(Node, tag='anc').append(Node, output_of='anc', max_depth=2)
+        with self.assertRaises(InputValidationError):
+            QueryBuilder().append(Node, tag='anc').append(Node, descendant_of='anc', max_depth=0)
+        with self.assertRaises(InputValidationError):
+            QueryBuilder().append(Node, tag='anc').append(Node, descendant_of='anc', link_types=['nolink'])
+
 
 class TestConsistency(AiidaTestCase):
     def test_create_node_and_query(self):
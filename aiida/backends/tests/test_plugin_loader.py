@@ -10,8 +10,11 @@
 from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
+import mock
+
 from aiida.backends.testbase import AiidaTestCase
-from aiida.plugins.entry_point import get_entry_points
+from aiida.plugins.entry_point import get_entry_points, get_entry_point, get_entry_point_from_class
+from aiida.plugins.entry_point import reset_entry_point_index, ENTRY_POINT_INDEX
 from aiida.orm import CalculationFactory, DataFactory, WorkflowFactory
 from aiida.orm import Workflow
 from aiida.parsers import Parser, ParserFactory
@@ -24,6 +27,11 @@ from aiida.tools.dbimporters import DbImporter, DbImporterFactory
 from aiida.work import WorkChain
 
 
+def get_scanned_groups(iter_entry_points):
+    """Return the groups of the calls of a mock of `iter_entry_points`, in order."""
+    return [kwargs.get('group', args[0] if args else None) for args, kwargs in iter_entry_points.call_args_list]
+
+
 class TestExistingPlugins(AiidaTestCase):
     """
     Test the get_entry_points function and the plugin Factories.
@@ -129,3 +137,84 @@ class TestExistingPlugins(AiidaTestCase):
             cls = DbImporterFactory(entry_point.name)
             self.assertTrue(issubclass(cls, DbImporter),
                 'DbImporter plugin class {} is not subclass of {}'.format(cls, BaseTcodtranslator))
+
+
+class TestEntryPointIndex(AiidaTestCase):
+    """
+    Test the index of the registered entry points, and benchmark the lookups that use it.
+    """
+
+    def tearDown(self):
+        reset_entry_point_index()
+        super(TestEntryPointIndex, self).tearDown()
+
+    def test_lookups(self):
+        """
+        Verify that the index returns the registered entry points, also after it is reset
+        """
+        from aiida.plugins.entry_point import epm
+
+        for group in ('aiida.calculations', 'aiida.data'):
+            registered = [entry_point.name for entry_point in epm.iter_entry_points(group=group)]
+            self.assertEquals([entry_point.name for entry_point in get_entry_points(group)], registered)
+
+            reset_entry_point_index()
+            for name in registered:
+                self.assertEquals(get_entry_point(group, name).name, name)
+
+        group, entry_point = get_entry_point_from_class('aiida.orm.data.structure', 'StructureData')
+        self.assertEquals(group, 'aiida.data')
+        self.assertEquals(entry_point.name, 'structure')
+        self.assertEquals(get_entry_point_from_class('aiida.orm.data.structure', 'Unknown'), (None, None))
+
+    def test_loaded_classes(self):
+        """
+        Verify that the class of an entry point is only loaded once, until the index is reset
+        """
+        self.assertIs(DataFactory('structure'), DataFactory('structure'))
+        self.assertIn(('aiida.data', 'structure'), ENTRY_POINT_INDEX._loaded)  # pylint: disable=protected-access
+
+        reset_entry_point_index()
+        self.assertNotIn(('aiida.data', 'structure'), ENTRY_POINT_INDEX._loaded)  # pylint: disable=protected-access
+        self.assertIs(DataFactory('structure'), DataFactory('structure'))
+
+    def test_data_factory_scans(self):
+        """
+        Verify that DataFactory scans the entry points of the group only once for all calls, until the index is reset
+        """
+        from aiida.plugins.entry_point import epm
+
+        names = [entry_point.name for entry_point in get_entry_points('aiida.data')]
+
+        reset_entry_point_index()
+        with mock.patch.object(epm, 'iter_entry_points', wraps=epm.iter_entry_points) as iter_entry_points:
+            for _ in range(3):
+                for name in names:
+                    DataFactory(name)
+            self.assertEquals(get_scanned_groups(iter_entry_points).count('aiida.data'), 1)
+
+            reset_entry_point_index()
+            DataFactory(names[0])
+            self.assertEquals(get_scanned_groups(iter_entry_points).count('aiida.data'), 2)
+
+    def test_load_node_scans(self):
+        """
+        Verify that loading nodes of different types scans the entry points of each group at most once
+        """
+        from aiida.plugins.entry_point import epm
+        from aiida.orm import load_node
+        from aiida.orm.data.base import Int, Str, Float
+        from aiida.orm.data.parameter import ParameterData
+
+        nodes = []
+        for index in range(3):
+            nodes.extend([Int(index), Str(str(index)), Float(index), ParameterData(dict={'index': index})])
+        pks = [node.store().pk for node in nodes]
+
+        reset_entry_point_index()
+        with mock.patch.object(epm, 'iter_entry_points', wraps=epm.iter_entry_points) as iter_entry_points:
+            for pk, node in zip(pks, nodes):
+                self.assertIs(type(load_node(pk)), type(node))
+
+        groups = get_scanned_groups(iter_entry_points)
+        self.assertEquals(len(groups), len(set(groups)))
@@ -16,12 +16,31 @@ import tempfile
 import six
 
 from aiida.backends.testbase import AiidaTestCase
-from aiida.work.persistence import AiiDAPersister
+from aiida.work.persistence import AiiDAPersister, CHECKPOINT_PREFIX
 from aiida.work import Process
 from aiida.work.test_utils import DummyProcess
 from aiida import work
 
 
+class ContextWorkChain(work.WorkChain):
+    """A work chain whose context can be filled before saving its checkpoint."""
+
+    @classmethod
+    def define(cls, spec):
+        super(ContextWorkChain, cls).define(spec)
+        spec.outline(cls.step)
+
+    def step(self):
+        pass
+
+
+def build_context(depth, width):
+    """Return a dictionary nested `depth` times, with `width` items at each level."""
+    if depth == 0:
+        return ['value {}'.format(index) for index in range(width)] + [float(index) for index in range(width)]
+    return {'level{}_{}'.format(depth, index): build_context(depth - 1, width) for index in range(width)}
+
+
 class TestProcess(AiidaTestCase):
     """ Test the basic saving and loading of process states """
 
@@ -67,3 +86,103 @@ class TestAiiDAPersister(AiidaTestCase):
 
         self.persister.delete_checkpoint(process.pid)
         self.assertEquals(process.calc.checkpoint, None)
+
+    def test_save_load_checkpoint_codecs(self):
+        """Verify that the checkpoints saved with each codec are loaded by a persister with any codec."""
+        for codec in ('yaml', 'pickle'):
+            process = DummyProcess()
+            bundle_saved = AiiDAPersister(codec=codec).save_checkpoint(process)
+            self.assertEquals(process.calc.checkpoint.startswith(CHECKPOINT_PREFIX), codec != 'yaml')
+
+            for load_codec in ('yaml', 'pickle'):
+                bundle_loaded = AiiDAPersister(codec=load_codec).load_checkpoint(process.calc.pk)
+                self.assertEquals(bundle_saved, bundle_loaded)
+
+        with self.assertRaises(ValueError):
+            AiiDAPersister(codec='unknown')
+
+    def test_delta_checkpoint(self):
+        """Verify that only the changes since the full checkpoint are saved, while they are small enough."""
+        persister = AiiDAPersister(codec='pickle')
+        process = ContextWorkChain()
+        process.ctx.data = build_context(4, 4)
+
+        persister.save_checkpoint(process)
+        checkpoint = process.calc.checkpoint
+        self.assertIsNone(process.calc.checkpoint_delta)
+
+        process.ctx.counter = 1
+        bundle_saved = persister.save_checkpoint(process)
+        self.assertEquals(process.calc.checkpoint, checkpoint)
+        self.assertLess(len(process.calc.checkpoint_delta), len(checkpoint) // 2)
+        self.assertEquals(AiiDAPersister(codec='pickle').load_checkpoint(process.calc.pk), bundle_saved)
+
+        # A persister that loaded the checkpoint saves the following changes as a delta too
+        other_persister = AiiDAPersister(codec='pickle')
+        other_persister.load_checkpoint(process.calc.pk)
+        process.ctx.counter = 2
+        bundle_saved = other_persister.save_checkpoint(process)
+        self.assertEquals(process.calc.checkpoint, checkpoint)
+        self.assertEquals(persister.load_checkpoint(process.calc.pk), bundle_saved)
+
+        # Replacing most of the context saves a new full checkpoint
+        process.ctx.data = build_context(4, 5)
+        bundle_saved = persister.save_checkpoint(process)
+        self.assertNotEquals(process.calc.checkpoint, checkpoint)
+        self.assertIsNone(process.calc.checkpoint_delta)
+        self.assertEquals(AiiDAPersister(codec='pickle').load_checkpoint(process.calc.pk), bundle_saved)
+
+        persister.delete_checkpoint(process.pid)
+        self.assertIsNone(process.calc.checkpoint)
+        self.assertIsNone(process.calc.checkpoint_delta)
+
+    def test_stale_delta_checkpoint(self):
+        """Verify that a delta checkpoint left from a previous full checkpoint is ignored."""
+        persister = AiiDAPersister(codec='pickle')
+        process = ContextWorkChain()
+        process.ctx.data = build_context(4, 4)
+
+        persister.save_checkpoint(process)
+        process.ctx.counter = 1
+        persister.save_checkpoint(process)
+        stale_delta = process.calc.checkpoint_delta
+        self.assertIsNotNone(stale_delta)
+
+        # As if the process stopped after saving a new full checkpoint, but before deleting the delta
+        process.ctx.data = build_context(4, 5)
+        bundle_saved = persister.save_checkpoint(process)
+        process.calc.set_checkpoint_delta(stale_delta)
+
+        self.assertEquals(AiiDAPersister(codec='pickle').load_checkpoint(process.calc.pk), bundle_saved)
+
+    def test_discard_full_checkpoint(self):
+        """Verify that the next checkpoint is a full one once the full checkpoint of a process is discarded."""
+        persister = AiiDAPersister(codec='pickle')
+        process = ContextWorkChain()
+        process.ctx.data = build_context(4, 4)
+
+        persister.save_checkpoint(process)
+        checkpoint = process.calc.checkpoint
+
+        persister.discard_full_checkpoint(process.pid)
+        process.ctx.counter = 1
+        bundle_saved = persister.save_checkpoint(process)
+        self.assertNotEquals(process.calc.checkpoint, checkpoint)
+        self.assertIsNone(process.calc.checkpoint_delta)
+        self.assertEquals(AiiDAPersister(codec='pickle').load_checkpoint(process.calc.pk), bundle_saved)
+
+    def test_checkpoint_size(self):
+        """Verify that the checkpoints of a work chain with a deep context are smaller with pickle than with yaml."""
+        process = ContextWorkChain()
+        process.ctx.data = build_context(4, 4)
+
+        sizes = {}
+        for codec in ('yaml', 'pickle'):
+            persister = AiiDAPersister(codec=codec)
+            for counter in range(3):
+                process.ctx.counter = counter
+                persister.save_checkpoint(process)
+            sizes[codec] = len(process.calc.checkpoint) + len(process.calc.checkpoint_delta or '')
+            self.assertEquals(persister.load_checkpoint(process.calc.pk)[ContextWorkChain._CONTEXT]['counter'], counter)
+
+        self.assertLess(sizes['pickle'], sizes['yaml'])
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import mock
+from tornado import gen
+
+from aiida.backends.testbase import AiidaTestCase
+from aiida.scheduler.datastructures import JobInfo, JOB_STATES
+from aiida.work.job_calcs import JobsList
+from aiida.work.transports import TransportQueue
+
+
+def get_job_info(job_id, job_state):
+    """Return a JobInfo with the given job id and state."""
+    job_info = JobInfo()
+    job_info.job_id = job_id
+    job_info.job_state = job_state
+    return job_info
+
+
+class TestJobsList(AiidaTestCase):
+    """Tests for the JobsList, with the scheduler responses given directly."""
+
+    def setUp(self):
+        super(TestJobsList, self).setUp()
+        self.authinfo = mock.MagicMock()
+        self.authinfo.computer.get_minimum_job_poll_interval.return_value = 0.
+        self.authinfo.computer.get_scheduler.return_value.get_feature.return_value = True
+        self.jobs_list = JobsList(self.authinfo, TransportQueue())
+        self.scheduler_response = {}
+
+    def update(self):
+        """Update the jobs list with the current scheduler response."""
+
+        @gen.coroutine
+        def get_jobs_from_scheduler():
+            raise gen.Return((dict(self.scheduler_response), list(self.jobs_list._job_update_requests)))
+
+        with mock.patch.object(self.jobs_list, '_get_jobs_from_scheduler', get_jobs_from_scheduler):
+            self.jobs_list._loop.run_sync(self.jobs_list._update_job_info)
+
+    def request(self, job_id):
+        """Return a future of an update request of a job."""
+        with mock.patch.object(self.jobs_list, '_ensure_updating'):
+            with self.jobs_list.request_job_info_update(job_id) as request:
+                return request
+
+    def test_state_delivered_to_request(self):
+        """A request registered after a state change still receives that change."""
+        self.scheduler_response = {'1': get_job_info('1', JOB_STATES.RUNNING)}
+        request = self.request('1')
+        self.update()
+        self.assertEqual(request.result().job_state, JOB_STATES.RUNNING)
+
+        # The job is done at the next update, but nobody is waiting for it
+        self.scheduler_response = {'1': get_job_info('1', JOB_STATES.DONE)}
+        self.update()
+
+        # The request registered after the transition receives the done state, which it has not seen yet
+        request = self.request('1')
+        self.update()
+        self.assertEqual(request.result().job_state, JOB_STATES.DONE)
+
+        # A further request is only resolved once the job changes state again, here by disappearing
+        request = self.request('1')
+        self.update()
+        self.assertFalse(request.done())
+
+        self.scheduler_response = {}
+        self.update()
+        self.assertIsNone(request.result())
+
+    def test_done_requests_are_discarded(self):
+        """The futures that are cancelled or that failed are not kept."""
+        request = self.request('1')
+        request.cancel()
+        self.update()
+        self.assertEqual(self.jobs_list._job_update_requests, {})
+
+        @gen.coroutine
+        def get_jobs_from_scheduler():
+            raise RuntimeError('scheduler not available')
+
+        request = self.request('2')
+        with mock.patch.object(self.jobs_list, '_get_jobs_from_scheduler', get_jobs_from_scheduler):
+            with self.assertRaises(RuntimeError):
+                self.jobs_list._loop.run_sync(self.jobs_list._update_job_info)
+
+        self.assertIsInstance(request.exception(), RuntimeError)
+        self.assertEqual(self.jobs_list._job_update_requests, {})
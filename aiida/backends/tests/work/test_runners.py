@@ -78,6 +78,42 @@ class TestWorkchain(AiidaTestCase):
         self._run_loop_for(10.)
         self.assertTrue(future.result())
 
+    def test_call_on_calculation_finish_batched(self):
+        """Verify that all the awaited calculations are checked with a single query per poll."""
+        from aiida.orm.calculation import Calculation
+
+        poll_interval = 0.05
+        self.runner.close()
+        self.runner = work.Runner(poll_interval=poll_interval, enable_persistence=False)
+
+        count = 100
+        calcs = [Calculation().store() for _ in range(count)]
+        finished = []
+
+        for calc in calcs:
+            self.runner.call_on_calculation_finish(calc.pk, finished.append)
+
+        self._run_loop_for(10 * poll_interval)
+        self.assertEqual(finished, [])
+        # One poll when the calculations were added, and then one every interval
+        self.assertLessEqual(self.runner.watcher.num_queries, 12)
+
+        for calc in calcs[:count // 2]:
+            calc._set_process_state(work.ProcessState.FINISHED)
+        self._run_loop_for(4 * poll_interval)
+        self.assertEqual(sorted(finished), sorted(calc.pk for calc in calcs[:count // 2]))
+
+        for calc in calcs[count // 2:]:
+            calc._set_process_state(work.ProcessState.EXCEPTED)
+        self._run_loop_for(4 * poll_interval)
+        self.assertEqual(sorted(finished), sorted(calc.pk for calc in calcs))
+        self.assertEqual(self.runner.watcher.num_waiting, 0)
+
+        # Nothing is polled anymore once there is nothing to wait for
+        num_queries = self.runner.watcher.num_queries
+        self._run_loop_for(4 * poll_interval)
+        self.assertEqual(self.runner.watcher.num_queries, num_queries)
+
     def _run_loop_for(self, seconds):
         loop = self.runner.loop
         loop.call_later(seconds, the_hans_klok_comeback, self.runner.loop)
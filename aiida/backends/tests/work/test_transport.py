@@ -145,3 +145,78 @@ class TestTransportQueue(AiidaTestCase):
 
         finally:
             transport_class._DEFAULT_SAFE_OPEN_INTERVAL = original_interval
+
+    def test_pool_reuse(self):
+        """Verify that a pooled transport is kept open after use and reused by the next request."""
+        queue = TransportQueue(idle_timeout=60)
+        loop = queue.loop()
+
+        @coroutine
+        def test():
+            with queue.request_transport(self.authinfo) as request:
+                trans = yield request
+            raise Return(trans)
+
+        try:
+            trans1 = loop.run_sync(lambda: test())
+            self.assertTrue(trans1.is_open)
+            trans2 = loop.run_sync(lambda: test())
+            self.assertIs(trans1, trans2)
+
+            statistics = queue.get_statistics()
+            self.assertEqual(statistics['misses'], 1)
+            self.assertEqual(statistics['hits'], 1)
+            self.assertEqual(statistics['opened'], 1)
+            self.assertEqual(statistics['closed'], 0)
+        finally:
+            queue.close()
+
+        self.assertFalse(trans1.is_open)
+        self.assertEqual(queue.get_statistics()['closed'], 1)
+
+    def test_pool_unhealthy(self):
+        """Verify that a pooled transport that fails the health check is not reused."""
+        queue = TransportQueue(idle_timeout=60)
+        loop = queue.loop()
+
+        @coroutine
+        def test():
+            with queue.request_transport(self.authinfo) as request:
+                trans = yield request
+            raise Return(trans)
+
+        try:
+            trans1 = loop.run_sync(lambda: test())
+            trans1.is_alive = lambda: False
+            trans2 = loop.run_sync(lambda: test())
+            self.assertIsNot(trans1, trans2)
+            self.assertFalse(trans1.is_open)
+            self.assertEqual(queue.get_statistics()['misses'], 2)
+        finally:
+            queue.close()
+
+    def test_pool_max_channels(self):
+        """Verify that no more than the maximum number of channels use the same transport at the same time."""
+        from tornado.gen import sleep
+
+        queue = TransportQueue(max_channels=2)
+        loop = queue.loop()
+        active = []
+        maximum = []
+
+        @coroutine
+        def test():
+            with queue.request_transport(self.authinfo) as request:
+                yield request
+                active.append(None)
+                maximum.append(len(active))
+                yield sleep(0.01)
+                active.pop()
+
+        @coroutine
+        def run_all():
+            yield [test() for _ in range(6)]
+
+        loop.run_sync(run_all)
+        self.assertEqual(max(maximum), 2)
+        self.assertEqual(len(maximum), 6)
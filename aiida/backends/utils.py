@@ -196,7 +196,18 @@ def get_current_profile():
         return None
 
 
-def delete_nodes_and_connections(pks):
+# The number of nodes whose rows are deleted with the same statements
+DELETE_CHUNK_SIZE = 1000
+
+
+def delete_nodes_and_connections(pks, chunk_size=DELETE_CHUNK_SIZE, callback=None):
+    """
+    Delete the nodes with the given pks, with their links and group memberships, in a single transaction.
+
+    :param pks: a list, tuple or set of pks that should be deleted
+    :param chunk_size: the maximum number of nodes deleted by the same statements
+    :param callback: if not None, called with the number of nodes deleted so far after each chunk
+    """
     if settings.BACKEND == BACKEND_DJANGO:
         from aiida.backends.djsite.utils import delete_nodes_and_connections_django as delete_nodes_backend
     elif settings.BACKEND == BACKEND_SQLA:
@@ -204,7 +215,7 @@ def delete_nodes_and_connections(pks):
     else:
         raise Exception("unknown backend {}".format(settings.BACKEND))
 
-    delete_nodes_backend(pks)
+    delete_nodes_backend(pks, chunk_size=chunk_size, callback=callback)
 
 
 def _get_column(colname, alias):
@@ -44,7 +44,7 @@ def structure():
 def structure_list(elements, raw, formula_mode, past_days, groups, all_users):
     """List stored StructureData objects."""
     from aiida.orm.data.structure import StructureData
-    from aiida.orm.data.structure import (get_formula, get_symbols_string)
+    from aiida.orm.data.structure import (get_formula, get_symbols_string, get_stored_site_kindnames)
     from tabulate import tabulate
 
     elements_only = False
@@ -66,7 +66,8 @@ def structure_list(elements, raw, formula_mode, past_days, groups, all_users):
                 echo.echo_critical("Not implemented elements-only search")
 
         # We want only the StructureData that have attributes
-        if akinds is None or asites is None:
+        kind_names = None if akinds is None else get_stored_site_kindnames(pid, asites)
+        if kind_names is None:
             continue
 
         symbol_dict = {}
@@ -77,8 +78,8 @@ def structure_list(elements, raw, formula_mode, past_days, groups, all_users):
 
         try:
             symbol_list = []
-            for site in asites:
-                symbol_list.append(symbol_dict[site['kind_name']])
+            for kind_name in kind_names:
+                symbol_list.append(symbol_dict[kind_name])
             formula = get_formula(symbol_list, mode=formula_mode)
         # If for some reason there is no kind with the name
         # referenced by the site
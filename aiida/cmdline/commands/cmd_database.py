@@ -15,7 +15,8 @@ from __future__ import absolute_import
 import click
 
 from aiida.cmdline.commands.cmd_verdi import verdi
-from aiida.cmdline.utils import echo
+from aiida.cmdline.params import options
+from aiida.cmdline.utils import decorators, echo
 
 
 @verdi.group('database')
@@ -70,3 +71,95 @@ def database_integrity(apply_patch):
             echo.echo_success('integrity patch completed')
         else:
             echo.echo_success('dry-run of integrity patch completed')
+
+
+@verdi_database.group('closure')
+def verdi_database_closure():
+    """Manage the transitive closure table of the provenance links.
+
+    When the table is built and up to date, queries for the ancestors or descendants of nodes that prune visited nodes
+    use it instead of walking the links recursively. Stored links are added to the table by `verdi database closure
+    update` or periodically by the daemon, if the `closure.update_interval` property is set.
+    """
+    pass
+
+
+@verdi_database_closure.command('build')
+@decorators.with_dbenv()
+def closure_build():
+    """Build the closure table from scratch from the current links."""
+    from aiida.manage.database.closure import build_closure
+
+    count = build_closure()
+    echo.echo_success('closure table built with {} rows'.format(count))
+
+
+@verdi_database_closure.command('update')
+@click.option('-b', '--batch-size', type=click.INT, default=1000, show_default=True,
+              help='Number of links processed per transaction.')
+@decorators.with_dbenv()
+def closure_update(batch_size):
+    """Add the links stored since the last update to the closure table."""
+    from aiida.manage.database.closure import update_closure
+
+    processed = update_closure(batch_size=batch_size)
+
+    if processed is None:
+        echo.echo_critical('the closure table was not built: run `verdi database closure build` first')
+
+    echo.echo_success('{} links processed'.format(processed))
+
+
+@verdi_database_closure.command('status')
+@decorators.with_dbenv()
+def closure_status():
+    """Show how up to date the closure table is."""
+    from aiida.manage.database.closure import get_closure_state, is_closure_up_to_date
+
+    state = get_closure_state()
+
+    if state is None:
+        echo.echo_info('the closure table was not built')
+        return
+
+    echo.echo('Last processed link: {}'.format(state['watermark']))
+    echo.echo('Ranges of link ids to check again: {}'.format(len(state['gaps'])))
+
+    if is_closure_up_to_date():
+        echo.echo_success('the closure table is up to date')
+    else:
+        echo.echo_warning('the closure table is not up to date: run `verdi database closure update`')
+
+
+@verdi_database_closure.command('verify')
+@decorators.with_dbenv()
+def closure_verify():
+    """Compare the closure table with the closure computed from the processed links."""
+    from aiida.manage.database.closure import verify_closure
+
+    result = verify_closure()
+
+    if result is None:
+        echo.echo_critical('the closure table was not built: run `verdi database closure build` first')
+
+    missing, extra = result
+
+    if missing or extra:
+        echo.echo_critical('the closure table misses {} rows and contains {} rows too many: '
+                           'run `verdi database closure build` to rebuild it'.format(missing, extra))
+
+    echo.echo_success('the closure table is consistent with the processed links')
+
+
+@verdi_database_closure.command('drop')
+@options.FORCE()
+@decorators.with_dbenv()
+def closure_drop(force):
+    """Empty the closure table, such that it is no longer used nor updated."""
+    from aiida.manage.database.closure import drop_closure
+
+    if not force:
+        click.confirm('Are you sure you want to drop the closure table?', abort=True)
+
+    drop_closure()
+    echo.echo_success('closure table dropped')
@@ -87,8 +87,13 @@ def inspect(archive, version, data, meta_data):
     default=False,
     show_default=True,
     help='Follow reverse CALL links (recursively) when calculating the node set to export.')
+@click.option(
+    '--deduplicate/--no-deduplicate',
+    default=False,
+    show_default=True,
+    help='Store the repository files with the same content only once in the archive.')
 def create(output_file, codes, computers, groups, nodes, input_forward, create_reversed, return_reversed, call_reversed,
-           force, archive_format):
+           deduplicate, force, archive_format):
     """
     Export various entities, such as Codes, Computers, Groups and Nodes, to an archive file for backup or
     sharing purposes.
@@ -114,6 +119,7 @@ def create(output_file, codes, computers, groups, nodes, input_forward, create_r
         'create_reversed': create_reversed,
         'return_reversed': return_reversed,
         'call_reversed': call_reversed,
+        'deduplicate': deduplicate,
         'overwrite': force,
     }
 
@@ -165,15 +171,22 @@ def migrate(input_file, output_file, force, silent, archive_format):
             echo.echo_critical('invalid file format, expected either a zip archive or gzipped tarball')
 
         try:
-            with open(folder.get_abs_path('data.json')) as handle:
-                data = json.load(handle)
             with open(folder.get_abs_path('metadata.json')) as handle:
                 metadata = json.load(handle)
         except IOError:
-            echo.echo_critical('export archive does not contain the required file {}'.format(handle.filename))
+            echo.echo_critical('export archive does not contain the required file metadata.json')
 
         old_version = verify_metadata_version(metadata)
 
+        if old_version not in ['0.1', '0.2', '0.3']:
+            echo.echo_critical('cannot migrate from version {}'.format(old_version))
+
+        try:
+            with open(folder.get_abs_path('data.json')) as handle:
+                data = json.load(handle)
+        except IOError:
+            echo.echo_critical('export archive does not contain the required file data.json')
+
         try:
             if old_version == '0.1':
                 migrate_v1_to_v2(metadata, data)
@@ -182,15 +195,19 @@ def migrate(input_file, output_file, force, silent, archive_format):
                     migrate_v2_to_v3(metadata, data)
                 except DanglingLinkError:
                     echo.echo_critical('export file is invalid because it contains dangling links')
-            else:
-                echo.echo_critical('cannot migrate from version {}'.format(old_version))
+            elif old_version == '0.3':
+                migrate_v3_to_v4(metadata, data, folder)
         except ValueError as exception:
             echo.echo_critical(exception)
 
         new_version = verify_metadata_version(metadata)
 
-        with open(folder.get_abs_path('data.json'), 'w') as handle:
-            json.dump(data, handle)
+        # Since version 0.4 the data is stored in the JSON Lines files of the data subfolder
+        if 'data_files' in metadata:
+            folder.remove_path('data.json')
+        else:
+            with open(folder.get_abs_path('data.json'), 'w') as handle:
+                json.dump(data, handle)
 
         with open(folder.get_abs_path('metadata.json'), 'w') as handle:
             json.dump(metadata, handle)
@@ -426,3 +443,30 @@ def migrate_v2_to_v3(metadata, data):  # pylint: disable=too-many-locals,too-man
             if old_key in data[field]:
                 data[field][new_key] = data[field][old_key]
                 del data[field][old_key]
+
+
+def migrate_v3_to_v4(metadata, data, folder):
+    """
+    Migration of export files from v0.3 to v0.4, which means splitting the
+    content of the data.json file over the JSON Lines files of the data
+    subfolder, with a bounded number of records each
+
+    :param data: the content of an export archive data.json file
+    :param metadata: the content of an export archive metadata.json file
+    :param folder: the folder with the unpacked export archive
+    """
+    from aiida.common.archive import ArchiveDataWriter
+
+    old_version = '0.3'
+    new_version = '0.4'
+
+    try:
+        verify_metadata_version(metadata, old_version)
+        update_metadata(metadata, new_version)
+    except ValueError:
+        raise
+
+    with ArchiveDataWriter(folder) as writer:
+        writer.write_data(data)
+
+    metadata['data_files'] = writer.files
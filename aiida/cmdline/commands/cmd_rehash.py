@@ -27,8 +27,15 @@ from aiida.cmdline.utils import decorators, echo
     type=PluginParamType(group=('node', 'calculations', 'data'), load=True),
     default='node',
     help='Only include nodes that are class or sub class of the class identified by this entry point.')
+@click.option(
+    '-i',
+    '--incremental',
+    is_flag=True,
+    default=False,
+    help='Only update the stored hash of nodes whose hash changed. Repository files whose size and modification time '
+    'did not change since they were last hashed are not read again.')
 @decorators.with_dbenv()
-def rehash(nodes, entry_point):
+def rehash(nodes, entry_point, incremental):
     """Recompute the hash for nodes in the database
 
     The set of nodes that will be rehashed can be filtered by their identifier and/or based on their class.
@@ -52,8 +59,11 @@ def rehash(nodes, entry_point):
         if i % 100 == 0:
             echo.echo('.', nl=False)
 
-        node.rehash()
-        count += 1
+        if node.rehash(incremental=incremental):
+            count += 1
 
     echo.echo('')
-    echo.echo_success('{} nodes re-hashed'.format(count))
+    if incremental:
+        echo.echo_success('{} nodes re-hashed, {} nodes unchanged'.format(count, len(to_hash) - count))
+    else:
+        echo.echo_success('{} nodes re-hashed'.format(count))
@@ -10,6 +10,7 @@
 from __future__ import print_function
 from __future__ import absolute_import
 from __future__ import division
+import calendar
 import json
 import datetime
 import shutil
@@ -23,6 +24,8 @@ from dateutil.parser import parse
 from aiida.utils import timezone as dtimezone
 from pytz import timezone as ptimezone
 
+from aiida.common.additions.backup_script.backup_engine import BackupEngine, DEFAULT_COPY_WORKERS
+
 
 @six.add_metaclass(ABCMeta)
 class AbstractBackup(object):
@@ -42,6 +45,8 @@ class AbstractBackup(object):
     END_DATE_OF_BACKUP_KEY = "end_date_of_backup"
     PERIODICITY_KEY = "periodicity"
     BACKUP_LENGTH_THRESHOLD_KEY = "backup_length_threshold"
+    COPY_WORKERS_KEY = "copy_workers"
+    SNAPSHOTS_KEY = "snapshots"
 
     # Backup parameters that will be populated by the JSON file
 
@@ -63,6 +68,13 @@ class AbstractBackup(object):
     # the backup should not start.
     _backup_length_threshold = None
 
+    # The number of threads that copy the directories (optional)
+    _copy_workers = None
+
+    # Whether every backup is made in a new snapshot directory, where the
+    # unchanged files are hard links to the previous snapshot (optional)
+    _snapshots = None
+
     # The end of the backup dates (or days) until the end are translated to
     # the following internal variable containing the end date
     _internal_end_date_of_backup = None
@@ -232,6 +244,20 @@ class AbstractBackup(object):
                                "an integer")
             raise
 
+        # Parse the number of threads that copy the directories
+        if backup_variables.get(self.COPY_WORKERS_KEY) is not None:
+            try:
+                self._copy_workers = int(backup_variables.get(
+                    self.COPY_WORKERS_KEY))
+            except ValueError:
+                self._logger.error("The number of copy workers should be "
+                                   "an integer")
+                raise
+
+        # Parse whether the backup is made in snapshots
+        if backup_variables.get(self.SNAPSHOTS_KEY) is not None:
+            self._snapshots = bool(backup_variables.get(self.SNAPSHOTS_KEY))
+
     def _dictionarize_backup_info(self):
         """
         This dictionarises the backup information and returns the dictionary.
@@ -249,6 +275,12 @@ class AbstractBackup(object):
                 int(self._backup_length_threshold.total_seconds() // 3600)
         }
 
+        # The optional variables are only written if they were set
+        if self._copy_workers is not None:
+            backup_variables[self.COPY_WORKERS_KEY] = self._copy_workers
+        if self._snapshots is not None:
+            backup_variables[self.SNAPSHOTS_KEY] = self._snapshots
+
         return backup_variables
 
     def _store_backup_info(self, backup_info_file_name):
@@ -335,12 +367,36 @@ class AbstractBackup(object):
 
         return REPOSITORY_PATH
 
-    def _backup_needed_files(self, query_sets):
+    def _create_backup_engine(self):
+        """
+        Create the engine that copies the directories of the repository to
+        the backup directory.
+        """
+        return BackupEngine(
+            self._get_repository_path(), self._backup_dir,
+            workers=self._copy_workers or DEFAULT_COPY_WORKERS,
+            snapshots=bool(self._snapshots), logger=self._logger)
+
+    def _backup_needed_files(self, query_sets, engine=None):
+        """
+        Copy the repository directories of the items of the query sets to
+        the backup directory.
+
+        :param query_sets: the query sets of the items to backup
+        :param engine: the started BackupEngine to copy the directories with.
+            If None, a backup is started and finished for these query sets only.
+        """
+        if engine is None:
+            engine = self._create_backup_engine()
+            engine.start()
+            self._backup_needed_files(query_sets, engine)
+            engine.finish()
+            return
+
         REPOSITORY_PATH = self._get_repository_path()
         repository_path = os.path.normpath(REPOSITORY_PATH)
 
         parent_dir_set = set()
-        copy_counter = 0
 
         dir_no_to_copy = 0
 
@@ -349,9 +405,7 @@ class AbstractBackup(object):
 
         self._logger.info("Start copying {} directories".format(dir_no_to_copy))
 
-        last_progress_print = datetime.datetime.now()
-        percent_progress = 0
-
+        directories = []
         for query_set in query_sets:
             iterator = self._get_query_set_iterator(query_set)
 
@@ -361,47 +415,26 @@ class AbstractBackup(object):
                 # Get the relative directory without the / which
                 # separates the repository_path from the relative_dir.
                 relative_dir = source_dir[(len(repository_path) + 1):]
-                destination_dir = os.path.join(self._backup_dir, relative_dir)
-
-                # Remove the destination directory if it already exists
-                if os.path.exists(destination_dir):
-                    shutil.rmtree(destination_dir)
-
-                # Copy the needed directory
-                try:
-                    shutil.copytree(source_dir, destination_dir, True, None)
-                except EnvironmentError as e:
-                    self._logger.warning(
-                        "Problem copying directory {} ".format(source_dir) +
-                        "to {}. ".format(destination_dir) +
-                        "More information: {} (Error no: {})".format(
-                            e.strerror,
-                            e.errno))
-                    # Raise envEr
+                directories.append((relative_dir, self._get_item_mtime(item)))
 
                 # Extract the needed parent directories
                 AbstractBackup._extract_parent_dirs(relative_dir, parent_dir_set)
-                copy_counter += 1
-
-                if (self._logger.getEffectiveLevel() <= logging.INFO and
-                            (datetime.datetime.now() -
-                                 last_progress_print).seconds > 60):
-                    last_progress_print = datetime.datetime.now()
-                    percent_progress = copy_counter * 100 / dir_no_to_copy
-                    self._logger.info(
-                        "Copied {} ".format(copy_counter) +
-                        "directories [{}]".format(item.__class__.__name__, ) +
-                        " ({}/100)".format(percent_progress))
-
-                if (self._logger.getEffectiveLevel() <= logging.INFO and
-                            percent_progress < (
-                                        copy_counter * 100 / dir_no_to_copy)):
-                    percent_progress = (copy_counter * 100 / dir_no_to_copy)
-                    last_progress_print = datetime.datetime.now()
-                    self._logger.info(
-                        "Copied {} ".format(copy_counter) +
-                        "directories [{}]".format(item.__class__.__name__, ) +
-                        " ({}/100)".format(percent_progress))
+
+        progress = {'last_print': datetime.datetime.now(), 'percent': 0}
+
+        def print_progress(count):
+            """Print the progress every minute, or at every new percent."""
+            if self._logger.getEffectiveLevel() > logging.INFO:
+                return
+            percent_progress = count * 100 // max(len(directories), 1)
+            if ((datetime.datetime.now() - progress['last_print']).seconds > 60 or
+                    percent_progress > progress['percent']):
+                progress['last_print'] = datetime.datetime.now()
+                progress['percent'] = percent_progress
+                self._logger.info(
+                    "Processed {} directories ({}/100)".format(count, percent_progress))
+
+        copy_counter = engine.copy_directories(directories, callback=print_progress)
 
         self._logger.info("{} directories copied".format(copy_counter))
 
@@ -410,11 +443,11 @@ class AbstractBackup(object):
         for tempRelPath in parent_dir_set:
             try:
                 shutil.copystat(os.path.join(repository_path, tempRelPath),
-                                os.path.join(self._backup_dir, tempRelPath))
+                                os.path.join(engine.destination, tempRelPath))
             except OSError as e:
                 self._logger.warning(
                     "Problem setting permissions to directory " +
-                    "{}.".format(os.path.join(self._backup_dir,
+                    "{}.".format(os.path.join(engine.destination,
                                               tempRelPath)))
                 self._logger.warning(os.path.join(repository_path, tempRelPath))
                 self._logger.warning("More information: " +
@@ -430,6 +463,17 @@ class AbstractBackup(object):
                           "less or equal to {}".format(
             self._oldest_object_bk))
 
+    @staticmethod
+    def _get_item_mtime(item):
+        """
+        Return the modification time of a node or workflow in seconds since
+        the epoch, or None if it is unknown.
+        """
+        mtime = getattr(item, 'mtime', None)
+        if mtime is None or mtime.tzinfo is None:
+            return None
+        return calendar.timegm(mtime.utctimetuple()) + mtime.microsecond / 1e6
+
     @staticmethod
     def _extract_parent_dirs(given_rel_dir, parent_dir_set):
         """
@@ -446,17 +490,25 @@ class AbstractBackup(object):
         return parent_dir_set
 
     def run(self):
+        # The engine is started with the first round that has files to
+        # backup, and all the rounds are backed up in the same snapshot
+        engine = None
         while True:
             self._read_backup_info_from_file(self._backup_info_filepath)
             item_sets_to_backup = self._find_files_to_backup()
             if item_sets_to_backup[0] == -1:
                 break
-            self._backup_needed_files(item_sets_to_backup[1])
+            if engine is None:
+                engine = self._create_backup_engine()
+                engine.start()
+            self._backup_needed_files(item_sets_to_backup[1], engine)
             self._store_backup_info(self._backup_info_filepath)
             if item_sets_to_backup[0] == -2:
                 self._logger.info("Threshold is 0. "
                                   "Backed up one round and exiting.")
                 break
+        if engine is not None:
+            engine.finish()
 
     @abstractmethod
     def _query_first_workflow(self):
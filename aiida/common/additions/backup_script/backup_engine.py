@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Copy of the directories of the repository to the backup, with a pool of threads, incremental and resumable."""
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+import datetime
+import errno
+import json
+import logging
+import os
+import shutil
+import time
+from multiprocessing.pool import ThreadPool
+
+# The number of threads that copy the directories
+DEFAULT_COPY_WORKERS = 4
+
+# The journal of the backup in progress, in the backup directory
+JOURNAL_FILENAME = '.backup_journal'
+
+# The directory of the snapshots in the backup directory, and the link to the last complete snapshot
+SNAPSHOTS_DIRNAME = 'snapshots'
+LATEST_SNAPSHOT_LINKNAME = 'latest'
+
+# Suffix of the files that are being copied, that are renamed to their final name once complete
+PARTIAL_FILE_SUFFIX = '.backup-partial'
+
+
+class BackupEngine(object):
+    """
+    Copy directories of the repository to the backup directory.
+
+    The directories are copied by a pool of threads, and the files whose size and modification time did not change
+    since they were backed up are not copied again. Every directory that is copied is recorded in a journal in the
+    backup directory, such that a backup that is interrupted resumes where it stopped. The journal is removed once
+    the backup is finished.
+
+    With snapshots, every backup is made in a new directory in the `snapshots` directory, where the files that did not
+    change since the previous snapshot are hard links to its files, like `rsync --link-dest` does. The `latest` link
+    in the backup directory points to the last complete snapshot.
+    """
+
+    def __init__(self, source_root, backup_dir, workers=DEFAULT_COPY_WORKERS, snapshots=False, logger=None):
+        """
+        :param source_root: the directory of the repository, that the directories to copy are relative to
+        :param backup_dir: the destination directory of the backup
+        :param workers: the number of threads that copy the directories
+        :param snapshots: if True, make each backup in a new snapshot directory
+        :param logger: the logger of the backup
+        """
+        self._source_root = os.path.normpath(source_root)
+        self._backup_dir = os.path.normpath(backup_dir)
+        self._workers = max(int(workers), 1)
+        self._snapshots = snapshots
+        self._logger = logger or logging.getLogger('aiida.aiida_backup')
+        self._destination = None
+        self._journal = None
+        self._copied = {}  # Mapping: {relative_dir: time at which its copy started}
+
+    @property
+    def destination(self):
+        """Return the directory that the directories are copied to: the backup directory or the current snapshot."""
+        return self._destination
+
+    @property
+    def journal_path(self):
+        """Return the path of the journal of the backup in progress."""
+        return os.path.join(self._backup_dir, JOURNAL_FILENAME)
+
+    @property
+    def latest_snapshot_path(self):
+        """Return the path of the link to the last complete snapshot."""
+        return os.path.join(self._backup_dir, LATEST_SNAPSHOT_LINKNAME)
+
+    def start(self):
+        """
+        Start a backup, or resume the backup that was interrupted if its journal is found.
+        """
+        entries = self._read_journal()
+        snapshot = None
+        cloned = False
+
+        for entry in entries:
+            if 'snapshot' in entry:
+                snapshot = entry['snapshot']
+            elif 'cloned' in entry:
+                cloned = True
+            elif 'directory' in entry:
+                self._copied[entry['directory']] = entry['time']
+
+        if entries:
+            self._logger.info("Resuming the interrupted backup, {} directories were already copied".format(
+                len(self._copied)))
+
+        self._journal = open(self.journal_path, 'a')
+
+        if not self._snapshots:
+            self._destination = self._backup_dir
+            return
+
+        if snapshot is None:
+            snapshot = datetime.datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+            self._write_journal({'snapshot': snapshot})
+
+        self._destination = os.path.join(self._backup_dir, SNAPSHOTS_DIRNAME, snapshot)
+        if not os.path.isdir(self._destination):
+            os.makedirs(self._destination)
+
+        previous = self._get_latest_snapshot()
+        if not cloned and previous is not None and previous != self._destination:
+            self._logger.info("Linking the files of the snapshot {} to the new snapshot".format(previous))
+            self._clone_snapshot(previous, self._destination)
+            self._write_journal({'cloned': True})
+
+    def copy_directories(self, directories, callback=None):
+        """
+        Copy directories of the repository to the destination, skipping those that were already copied by the backup
+        that is resumed, unless they were modified since.
+
+        :param directories: iterable of tuples of the path of a directory relative to the repository, and its
+            modification time in seconds since the epoch, or None if it is unknown
+        :param callback: function called with the number of directories processed so far, after each of them
+        :return: the number of directories that were copied
+        """
+        to_copy = []
+        resumed = 0
+        for relative_dir, mtime in directories:
+            copied_time = self._copied.get(relative_dir, None)
+            if copied_time is not None and mtime is not None and mtime <= copied_time:
+                resumed += 1
+                continue
+            to_copy.append(relative_dir)
+
+        skipped = 0
+        copy_counter = 0
+        pool = ThreadPool(self._workers)
+        try:
+            for count, (relative_dir, start_time, copied) in enumerate(
+                    pool.imap_unordered(self._copy_directory, to_copy), start=1):
+                if copied:
+                    self._copied[relative_dir] = start_time
+                    self._write_journal({'directory': relative_dir, 'time': start_time})
+                    copy_counter += 1
+                else:
+                    skipped += 1
+                if callback is not None:
+                    callback(resumed + count)
+        finally:
+            pool.terminate()
+
+        if skipped:
+            self._logger.warning("{} directories could not be copied".format(skipped))
+
+        return copy_counter
+
+    def finish(self):
+        """
+        Finish the backup: point the link to the last complete snapshot to the new one, and remove the journal.
+        """
+        if self._snapshots and self._destination is not None:
+            temporary_link = '{}.{}'.format(self.latest_snapshot_path, os.getpid())
+            if os.path.lexists(temporary_link):
+                os.remove(temporary_link)
+            os.symlink(os.path.relpath(self._destination, self._backup_dir), temporary_link)
+            os.rename(temporary_link, self.latest_snapshot_path)
+
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def _read_journal(self):
+        """Return the list of the entries of the journal of the interrupted backup, if any."""
+        entries = []
+
+        if not os.path.exists(self.journal_path):
+            return entries
+
+        with open(self.journal_path, 'r') as handle:
+            for line in handle:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # The last line is incomplete if the backup was killed while writing it
+                    break
+
+        return entries
+
+    def _write_journal(self, entry):
+        """Append an entry to the journal, and flush it such that it survives an interruption."""
+        self._journal.write(json.dumps(entry) + '\n')
+        self._journal.flush()
+
+    def _get_latest_snapshot(self):
+        """Return the path of the last complete snapshot, or None if there is none."""
+        if not os.path.isdir(self.latest_snapshot_path):
+            return None
+        return os.path.normpath(os.path.join(self._backup_dir, os.readlink(self.latest_snapshot_path)))
+
+    def _copy_directory(self, relative_dir):
+        """
+        Copy a directory of the repository to the destination, in one of the threads of the pool.
+
+        :param relative_dir: the path of the directory relative to the repository
+        :return: tuple of the relative path, the time at which the copy started and whether it succeeded
+        """
+        start_time = time.time()
+        source_dir = os.path.join(self._source_root, relative_dir)
+        destination_dir = os.path.join(self._destination, relative_dir)
+
+        try:
+            sync_directory(source_dir, destination_dir)
+        except EnvironmentError as exception:
+            self._logger.warning(
+                "Problem copying directory {} ".format(source_dir) +
+                "to {}. ".format(destination_dir) +
+                "More information: {} (Error no: {})".format(exception.strerror, exception.errno))
+            return relative_dir, start_time, False
+
+        return relative_dir, start_time, True
+
+    def _clone_snapshot(self, source_dir, destination_dir):
+        """
+        Make the destination a copy of the source snapshot where the files are hard links, with a pool of threads.
+
+        :param source_dir: the previous snapshot
+        :param destination_dir: the new snapshot
+        """
+        relative_dirs = []
+        for dirpath, dirnames, _ in os.walk(source_dir):
+            relative_dirs.append(os.path.relpath(dirpath, source_dir))
+            for dirname in list(dirnames):
+                # The links to directories are recreated as links, and not followed
+                if os.path.islink(os.path.join(dirpath, dirname)):
+                    dirnames.remove(dirname)
+
+        def link_directory(relative_dir):
+            """Link the files of a directory of the previous snapshot, without its subdirectories."""
+            source = os.path.normpath(os.path.join(source_dir, relative_dir))
+            destination = os.path.normpath(os.path.join(destination_dir, relative_dir))
+            if not os.path.isdir(destination):
+                os.makedirs(destination)
+            for name in os.listdir(source):
+                source_path = os.path.join(source, name)
+                destination_path = os.path.join(destination, name)
+                if os.path.lexists(destination_path) or (os.path.isdir(source_path) and
+                                                         not os.path.islink(source_path)):
+                    continue
+                if os.path.islink(source_path):
+                    os.symlink(os.readlink(source_path), destination_path)
+                else:
+                    try:
+                        os.link(source_path, destination_path)
+                    except OSError:
+                        # The file system does not support hard links
+                        shutil.copy2(source_path, destination_path)
+            return relative_dir
+
+        pool = ThreadPool(self._workers)
+        try:
+            for _ in pool.imap_unordered(link_directory, relative_dirs):
+                pass
+        finally:
+            pool.terminate()
+
+        # The directories are created by the links of their content, so their times are set once all are linked
+        for relative_dir in reversed(relative_dirs):
+            shutil.copystat(os.path.join(source_dir, relative_dir), os.path.join(destination_dir, relative_dir))
+
+
+def sync_directory(source_dir, destination_dir):
+    """
+    Make the destination directory a copy of the source directory, copying only the files whose size or modification
+    time differ. A file is copied to a temporary file that replaces the destination file, such that a destination file
+    that is a hard link to the file of a snapshot is replaced rather than modified.
+
+    :param source_dir: the source directory
+    :param destination_dir: the destination directory
+    :return: the number of files that were copied
+    """
+    if not os.path.isdir(source_dir):
+        raise OSError(errno.ENOENT, os.strerror(errno.ENOENT), source_dir)
+
+    copied = 0
+    directories = []
+
+    for dirpath, dirnames, filenames in os.walk(source_dir):
+        relative_dir = os.path.relpath(dirpath, source_dir)
+        destination = os.path.normpath(os.path.join(destination_dir, relative_dir))
+        directories.append((dirpath, destination))
+
+        if os.path.lexists(destination) and not os.path.isdir(destination):
+            os.remove(destination)
+        if not os.path.isdir(destination):
+            os.makedirs(destination)
+
+        obsolete = set(os.listdir(destination))
+
+        for name in filenames:
+            obsolete.discard(name)
+            if copy_file_if_changed(os.path.join(dirpath, name), os.path.join(destination, name)):
+                copied += 1
+
+        for name in list(dirnames):
+            obsolete.discard(name)
+            source_path = os.path.join(dirpath, name)
+            if os.path.islink(source_path):
+                # The links to directories are recreated as links, and not followed
+                dirnames.remove(name)
+                copy_file_if_changed(source_path, os.path.join(destination, name))
+
+        # Remove what was deleted from the source since the last backup, and what an interrupted copy left behind
+        for name in obsolete:
+            path = os.path.join(destination, name)
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+
+    for source, destination in reversed(directories):
+        shutil.copystat(source, destination)
+
+    return copied
+
+
+def copy_file_if_changed(source_path, destination_path):
+    """
+    Copy a file with its permissions and times, unless the destination has the same size and modification time.
+    Symbolic links are copied as links.
+
+    :param source_path: the source file
+    :param destination_path: the destination file
+    :return: True if the file was copied, False if it was unchanged
+    """
+    source_stat = os.lstat(source_path)
+
+    if os.path.islink(source_path):
+        target = os.readlink(source_path)
+        if os.path.islink(destination_path) and os.readlink(destination_path) == target:
+            return False
+        if os.path.lexists(destination_path):
+            os.remove(destination_path)
+        os.symlink(target, destination_path)
+        return True
+
+    if os.path.lexists(destination_path):
+        destination_stat = os.lstat(destination_path)
+        # Modification times are compared to the second, as some file systems do not store them more precisely
+        if (destination_stat.st_size == source_stat.st_size and
+                int(destination_stat.st_mtime) == int(source_stat.st_mtime) and
+                not os.path.islink(destination_path)):
+            return False
+        if os.path.isdir(destination_path) and not os.path.islink(destination_path):
+            shutil.rmtree(destination_path)
+
+    partial_path = destination_path + PARTIAL_FILE_SUFFIX
+    shutil.copy2(source_path, partial_path)
+    os.rename(partial_path, destination_path)
+
+    return True
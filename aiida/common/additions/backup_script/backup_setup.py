@@ -170,6 +170,18 @@ class BackupSetup(object):
 
  * ``backup_dir``: The destination directory of the backup. e.g.
    ``"backup_dir": "/scratch/aiida_user/backup_script_dest"``
+
+ * ``copy_workers`` (optional): The number of threads that copy the
+   directories of the repository in parallel (4 by default). The files whose
+   size and modification time did not change since the last backup are not
+   copied again. E.g. ``"copy_workers": 8``
+
+ * ``snapshots`` (optional): If ``true``, every run of the backup creates a new
+   snapshot directory in ``backup_dir/snapshots``, where the files that did not
+   change since the previous snapshot are hard links to its files (like
+   ``rsync --link-dest``), and ``backup_dir/latest`` links to the last complete
+   snapshot. If ``false`` or not set, the backup directory is updated in place.
+   E.g. ``"snapshots": true``
 """
         sys.stdout.write(info_str)
 
@@ -23,6 +23,17 @@ from six.moves import range
 from aiida.common.exceptions import ContentNotExistent, InvalidOperation
 from aiida.common.folders import SandboxFolder
 
+# The subfolder of an archive with the data files of the streaming format, introduced with export version 0.4
+DATA_FOLDER = 'data'
+
+# The default maximum number of records of a single data file
+DEFAULT_RECORDS_PER_FILE = 10000
+
+# The sections of the data that are not entities: entities are stored in a section with the name of the entity
+NODE_ATTRIBUTES_SECTION = 'node_attributes'
+LINKS_SECTION = 'links_uuid'
+GROUPS_SECTION = 'groups_uuid'
+
 
 class Archive(object):
     """
@@ -123,13 +134,26 @@ class Archive(object):
         """
         Return the loaded content of the data file
 
+        For archives in the streaming format, the content of all data files is loaded in the structure of the data
+        file of the previous format.
+
         :return: dictionary with contents of data file
         """
         if self._data is None:
-            self._data = self._read_json_file(self.FILENAME_DATA)
+            self._data = self.reader.get_data()
 
         return self._data
 
+    @property
+    @ensure_within_context
+    def reader(self):
+        """
+        Return a reader of the data records of the archive
+
+        :return: :class:`aiida.common.archive.ArchiveDataReader`
+        """
+        return ArchiveDataReader(self.folder, self.meta_data)
+
     @property
     @ensure_within_context
     def meta_data(self):
@@ -173,20 +197,14 @@ class Archive(object):
 
         :return: a dictionary with basic details
         """
-        export_data = self.data.get('export_data', {})
-        links_data = self.data.get('links_uuid', {})
-
-        computers = export_data.get('Computer', {})
-        groups = export_data.get('Group', {})
-        nodes = export_data.get('Node', {})
-        users = export_data.get('User', {})
+        reader = self.reader
 
         statistics = {
-            'computers': len(computers),
-            'groups': len(groups),
-            'links': len(links_data),
-            'nodes': len(nodes),
-            'users': len(users),
+            'computers': reader.count('Computer'),
+            'groups': reader.count('Group'),
+            'links': reader.count(LINKS_SECTION),
+            'nodes': reader.count('Node'),
+            'users': reader.count('User'),
         }
 
         return statistics
@@ -237,6 +255,280 @@ class Archive(object):
             return json.load(handle)
 
 
+class ArchiveDataWriter(object):
+    """
+    Write the data of an export archive as JSON Lines files with a bounded number of records.
+
+    Every section of the data, i.e. the entries of each entity, the node attributes, the links and the group
+    memberships, is split over the files `data/<section>.<index>.jsonl` with at most `records_per_file` records, one
+    JSON document per line. Only the records of the file that is being filled are kept in memory. The paths of the
+    files of each section, relative to the archive folder, are returned by `files` and should be stored in the
+    `data_files` key of the metadata, such that `ArchiveDataReader` can find them. Example::
+
+        with ArchiveDataWriter(folder) as writer:
+            writer.write(LINKS_SECTION, {'input': input_uuid, 'output': output_uuid, 'label': label, 'type': type})
+
+        metadata['data_files'] = writer.files
+
+    The records have the following format:
+
+        * entities: `[pk, fields]`
+        * node attributes: `[pk, attributes, attributes_conversion]`
+        * links: `{'input': uuid, 'output': uuid, 'label': label, 'type': type}`
+        * group memberships: `[group_uuid, [node_uuid, ...]]`, a group can have more than one record
+    """
+
+    def __init__(self, folder, records_per_file=DEFAULT_RECORDS_PER_FILE):
+        """
+        :param folder: the folder of the archive, a :py:class:`Folder <aiida.common.folders.Folder>` or a
+            :py:class:`ZipFolder <aiida.orm.importexport.ZipFolder>`
+        :param records_per_file: the maximum number of records of a single data file
+        """
+        if records_per_file < 1:
+            raise ValueError('records_per_file should be a positive integer')
+
+        self._folder = folder
+        self._records_per_file = records_per_file
+        self._subfolder = None
+        self._buffers = {}
+        self._files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    @property
+    def files(self):
+        """
+        Return the data files that were written so far
+
+        :return: dictionary with the list of paths of the data files, relative to the archive folder, per section
+        """
+        return self._files
+
+    def write(self, section, record):
+        """
+        Write a record to a section of the data.
+
+        :param section: the name of the section, the name of the entity for entity records
+        :param record: the JSON serializable record
+        """
+        lines = self._buffers.setdefault(section, [])
+        lines.append(json.dumps(record))
+
+        if len(lines) >= self._records_per_file:
+            self._flush(section)
+
+    def write_data(self, data):
+        """
+        Write all the records of data in the structure of the data file of the previous format, version 0.3.
+
+        :param data: dictionary with the content of a `data.json` file
+        """
+        for entity_name, entries in data.get('export_data', {}).items():
+            for pk, fields in entries.items():
+                self.write(entity_name, [int(pk), fields])
+
+        conversions = data.get('node_attributes_conversion', {})
+        for pk, attributes in data.get('node_attributes', {}).items():
+            self.write(NODE_ATTRIBUTES_SECTION, [int(pk), attributes, conversions[pk]])
+
+        for link in data.get('links_uuid', []):
+            self.write(LINKS_SECTION, link)
+
+        for group_uuid, node_uuids in data.get('groups_uuid', {}).items():
+            self.write(GROUPS_SECTION, [group_uuid, node_uuids])
+
+    def close(self):
+        """Write the records of the data files that are not full yet."""
+        for section in list(self._buffers.keys()):
+            self._flush(section)
+
+    def _flush(self, section):
+        """Write the buffered records of a section to a new data file."""
+        lines = self._buffers.pop(section, None)
+
+        if not lines:
+            return
+
+        if self._subfolder is None:
+            self._subfolder = self._folder.get_subfolder(DATA_FOLDER, create=True, reset_limit=True)
+
+        files = self._files.setdefault(section, [])
+        filename = '{}.{}.jsonl'.format(section, len(files))
+
+        with self._subfolder.open(filename, 'w') as handle:
+            handle.write('\n'.join(lines))
+            handle.write('\n')
+
+        # Paths inside archives always use forward slashes
+        files.append('{}/{}'.format(DATA_FOLDER, filename))
+
+
+class ArchiveDataReader(object):
+    """
+    Read the data of an unpacked export archive record by record.
+
+    The data files of archives in the streaming format, listed in the `data_files` key of the metadata, are read one
+    line at a time. For archives in the previous format, the `data.json` file is loaded as a whole instead, and its
+    content is returned in the same records. See :py:class:`ArchiveDataWriter` for the format of the records.
+    """
+
+    def __init__(self, folder, metadata):
+        """
+        :param folder: the folder with the unpacked archive
+        :param metadata: dictionary with the content of the metadata file of the archive
+        """
+        self._folder = folder
+        self._files = metadata.get('data_files', None)
+        self._data = None
+
+    @property
+    def is_streaming(self):
+        """Return whether the archive is in the streaming format."""
+        return self._files is not None
+
+    def get_sections(self):
+        """
+        Return the sections of the data that contain records.
+
+        :return: list of section names
+        """
+        if self.is_streaming:
+            return [section for section, files in self._files.items() if files]
+
+        data = self._get_data()
+        sections = [entity_name for entity_name, entries in data.get('export_data', {}).items() if entries]
+
+        for section in (NODE_ATTRIBUTES_SECTION, LINKS_SECTION, GROUPS_SECTION):
+            if data.get(section, None):
+                sections.append(section)
+
+        return sections
+
+    def iter_records(self, section):
+        """
+        Iterate over the records of a section of the data.
+
+        :param section: the name of the section, the name of the entity for entity records
+        :return: generator of records
+        """
+        if self.is_streaming:
+            for path in self._files.get(section, []):
+                with open(self._folder.get_abs_path(path), 'r') as handle:
+                    for line in handle:
+                        if line.strip():
+                            yield json.loads(line)
+            return
+
+        data = self._get_data()
+
+        if section == NODE_ATTRIBUTES_SECTION:
+            conversions = data.get('node_attributes_conversion', {})
+            for pk, attributes in data.get(NODE_ATTRIBUTES_SECTION, {}).items():
+                yield [int(pk), attributes, conversions[pk]]
+        elif section == LINKS_SECTION:
+            for link in data.get(LINKS_SECTION, []):
+                yield link
+        elif section == GROUPS_SECTION:
+            for group_uuid, node_uuids in data.get(GROUPS_SECTION, {}).items():
+                yield [group_uuid, node_uuids]
+        else:
+            for pk, fields in data.get('export_data', {}).get(section, {}).items():
+                yield [int(pk), fields]
+
+    def iter_batches(self, section, batch_size):
+        """
+        Iterate over the records of a section of the data in batches.
+
+        :param section: the name of the section, the name of the entity for entity records
+        :param batch_size: the maximum number of records of a batch
+        :return: generator of tuples of records
+        """
+        from aiida.common.utils import grouper
+        return grouper(batch_size, self.iter_records(section))
+
+    def count(self, section):
+        """
+        Return the number of records of a section of the data.
+
+        :param section: the name of the section, the name of the entity for entity records
+        :return: the number of records
+        """
+        return sum(1 for _ in self.iter_records(section))
+
+    def get_data(self):
+        """
+        Return the whole data in the structure of the data file of the previous format, version 0.3.
+
+        Note that this loads all the data in memory.
+
+        :return: dictionary with the content of a `data.json` file
+        """
+        if not self.is_streaming:
+            return self._get_data()
+
+        data = {
+            'export_data': {},
+            'node_attributes': {},
+            'node_attributes_conversion': {},
+            'links_uuid': [],
+            'groups_uuid': {},
+        }
+
+        for section in self.get_sections():
+            if section == NODE_ATTRIBUTES_SECTION:
+                for pk, attributes, conversion in self.iter_records(section):
+                    data['node_attributes'][str(pk)] = attributes
+                    data['node_attributes_conversion'][str(pk)] = conversion
+            elif section == LINKS_SECTION:
+                data['links_uuid'].extend(self.iter_records(section))
+            elif section == GROUPS_SECTION:
+                for group_uuid, node_uuids in self.iter_records(section):
+                    data['groups_uuid'].setdefault(group_uuid, []).extend(node_uuids)
+            else:
+                entries = data['export_data'].setdefault(section, {})
+                for pk, fields in self.iter_records(section):
+                    entries[str(pk)] = fields
+
+        return data
+
+    def _get_data(self):
+        """Return the loaded content of the data file of an archive in the previous format."""
+        if self._data is None:
+            with open(self._folder.get_abs_path(Archive.FILENAME_DATA), 'r') as handle:
+                self._data = json.load(handle)
+
+        return self._data
+
+
+def restore_duplicate_files(folder, metadata):
+    """
+    Copy back the files that were left out of an archive exported with `deduplicate=True`.
+
+    The `duplicate_files` key of the metadata maps the path of each file that was left out to the path of the file
+    with the same content that is in the archive, both relative to the archive folder.
+
+    :param folder: the folder with the unpacked archive
+    :param metadata: dictionary with the content of the metadata file of the archive
+    """
+    import shutil
+
+    for path, original_path in metadata.get('duplicate_files', {}).items():
+        for relpath in (path, original_path):
+            if os.path.normpath(relpath).split(os.sep)[0] == os.pardir:
+                raise ValueError('invalid path of a duplicate file in the archive: {}'.format(relpath))
+
+        abspath = folder.get_abs_path(path)
+        dirpath = os.path.dirname(abspath)
+        if not os.path.isdir(dirpath):
+            os.makedirs(dirpath)
+        shutil.copyfile(folder.get_abs_path(original_path), abspath)
+
+
 def extract_zip(infile, folder, nodes_export_subfolder="nodes",
                 silent=False):
     """
@@ -261,18 +553,23 @@ def extract_zip(infile, folder, nodes_export_subfolder="nodes",
 
             zip.extract(path=folder.abspath,
                    member='metadata.json')
-            zip.extract(path=folder.abspath,
-                   member='data.json')
+
+            # Archives in the streaming format have a data subfolder
+            # instead of the data file
+            if 'data.json' in zip.namelist():
+                zip.extract(path=folder.abspath,
+                       member='data.json')
 
             if not silent:
                 print("EXTRACTING NODE DATA...")
 
             for membername in zip.namelist():
-                # Check that we are only exporting nodes within
-                # the subfolder!
+                # Check that we are only exporting nodes and data files
+                # within their subfolders!
                 # TODO: better check such that there are no .. in the
                 # path; use probably the folder limit checks
-                if not membername.startswith(nodes_export_subfolder+os.sep):
+                if not (membername.startswith(nodes_export_subfolder+os.sep) or
+                        membername.startswith(DATA_FOLDER+os.sep)):
                     continue
                 zip.extract(path=folder.abspath,
                             member=membername)
@@ -301,8 +598,15 @@ def extract_tar(infile, folder, nodes_export_subfolder="nodes",
 
             tar.extract(path=folder.abspath,
                    member=tar.getmember('metadata.json'))
-            tar.extract(path=folder.abspath,
-                   member=tar.getmember('data.json'))
+
+            # Archives in the streaming format have a data subfolder
+            # instead of the data file
+            try:
+                data_member = tar.getmember('data.json')
+            except KeyError:
+                pass
+            else:
+                tar.extract(path=folder.abspath, member=data_member)
 
             if not silent:
                 print("EXTRACTING NODE DATA...")
@@ -319,11 +623,12 @@ def extract_tar(infile, folder, nodes_export_subfolder="nodes",
                     print("WARNING, link found inside the import file: {}"
                           .format(member.name), file=sys.stderr)
                     continue
-                # Check that we are only exporting nodes within
-                # the subfolder!
+                # Check that we are only exporting nodes and data files
+                # within their subfolders!
                 # TODO: better check such that there are no .. in the
                 # path; use probably the folder limit checks
-                if not member.name.startswith(nodes_export_subfolder+os.sep):
+                if not (member.name.startswith(nodes_export_subfolder+os.sep) or
+                        member.name.startswith(DATA_FOLDER+os.sep)):
                     continue
                 tar.extract(path=folder.abspath,
                             member=member)
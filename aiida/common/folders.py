@@ -395,7 +395,12 @@ class Folder(object):
         # Create parent dir, if needed, with the right mode
         pardir = os.path.dirname(self.abspath)
         if not os.path.exists(pardir):
-            os.makedirs(pardir, mode=self.mode_dir)
+            try:
+                os.makedirs(pardir, mode=self.mode_dir)
+            except OSError:
+                # Another thread may have created it in the meantime
+                if not os.path.isdir(pardir):
+                    raise
 
         if move:
             shutil.move(srcdir, self.abspath)
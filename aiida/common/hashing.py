@@ -14,7 +14,11 @@ Common password and hash generation functions.
 from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
+import binascii
 import hashlib
+import io
+import json
+import os
 try:  # Python3
     from hashlib import blake2b
 except ImportError:  # Python2
@@ -132,6 +136,9 @@ BLAKE2B_OPTIONS = {
     'inner_size': 64,  # ... but still use 64 as the inner size
 }
 
+# Size in bytes of the chunks in which file contents and arrays are fed to the hash, to keep the memory usage bounded
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
 
 def make_hash(object_to_hash, **kwargs):
     """
@@ -183,6 +190,169 @@ def _single_digest(obj_type, obj_bytes=b''):
     return blake2b(obj_bytes, person=obj_type.encode('ascii'), node_depth=0, **BLAKE2B_OPTIONS).digest()
 
 
+def _chunked_digest(obj_type, chunks):
+    """
+    Compute the same digest as `_single_digest` of the concatenation of the given chunks of bytes, without ever
+    holding more than one chunk in memory.
+
+    :param obj_type: the type string of the object
+    :param chunks: iterable of bytes
+    """
+    digest = blake2b(person=obj_type.encode('ascii'), node_depth=0, **BLAKE2B_OPTIONS)
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.digest()
+
+
+def _iter_file_chunks(fhandle, chunk_size=None):
+    """
+    Yield the content of a file opened in binary mode in chunks of at most `chunk_size` bytes.
+    """
+    chunk_size = chunk_size or HASH_CHUNK_SIZE
+    while True:
+        chunk = fhandle.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _iter_array_chunks(arr, truncate=False, chunk_size=None):
+    """
+    Yield the little-endian bytes of an array, in C order, in chunks of at most `chunk_size` bytes.
+
+    Only one block of the array is copied at a time, such that also memory-mapped arrays can be hashed without
+    being loaded entirely in memory.
+
+    :param arr: the numpy array
+    :param truncate: if True, the array is converted to float64 and its values truncated as with `truncate_array64`
+    """
+    chunk_size = chunk_size or HASH_CHUNK_SIZE
+    # A view for contiguous (and memory-mapped) arrays, a copy only for non-contiguous ones
+    flat = np.ravel(arr, order='C')
+    block_length = max(chunk_size // max(flat.itemsize, 1), 1)
+
+    for start in range(0, flat.shape[0], block_length):
+        block = flat[start:start + block_length]
+
+        if truncate:
+            block = np.array(block, dtype=np.float64)
+            truncated = block.view(np.int64)
+            truncated &= ~(2**4 - 1)
+        elif sys.byteorder != 'little':
+            block = np.array(block)
+
+        if sys.byteorder != 'little':
+            block.byteswap(True)
+
+        yield block.tobytes()
+
+
+class FileDigestMemo(object):
+    """
+    Memo of the content digests of the files in a folder, stored in a file outside of the folder.
+
+    Each digest is recorded together with the size and modification time of the file it was computed for, such that a
+    file is only read again if either of them changed. Pass an instance as the `file_digest_memo` keyword argument of
+    `make_hash` and call `save` afterwards to persist the digests that were computed.
+    """
+
+    # Bump whenever the digest of the file content changes, to invalidate all existing memos
+    VERSION = 1
+
+    # Files modified less than this many seconds ago are not memoized: a further change within the resolution of the
+    # file system timestamps would not be detected
+    RACY_INTERVAL = 2.
+
+    def __init__(self, folder_path, filepath):
+        """
+        :param folder_path: absolute path of the folder whose file digests are memoized
+        :param filepath: absolute path of the file in which the memo is stored, which must not be in the folder, such
+            that the content of the folder is never modified
+        """
+        self._folder_path = os.path.abspath(folder_path)
+        self._filepath = os.path.abspath(filepath)
+        self._entries = self._load()
+        self._visited = set()
+        self._modified = False
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        """Read the entries of the memo from its file, an invalid or missing file gives an empty memo."""
+        try:
+            with io.open(self._filepath, 'r', encoding='utf8') as handle:
+                content = json.load(handle)
+        except (IOError, OSError, ValueError):
+            return {}
+
+        if not isinstance(content, dict) or content.get('version') != self.VERSION:
+            return {}
+
+        return content.get('entries', {})
+
+    def get_digest(self, path, compute_digest):
+        """
+        Return the memoized digest of a file, calling `compute_digest` only if the file changed since it was memoized.
+
+        :param path: absolute path of the file
+        :param compute_digest: callable without arguments that returns the digest of the file content as bytes
+        :return: the digest of the file content
+        """
+        relpath = os.path.relpath(path, self._folder_path)
+
+        if relpath.startswith(os.pardir):
+            return compute_digest()
+
+        stat = os.stat(path)
+        mtime = getattr(stat, 'st_mtime_ns', None) or int(stat.st_mtime * 1e9)
+        self._visited.add(relpath)
+
+        entry = self._entries.get(relpath)
+        if entry is not None and entry[0] == stat.st_size and entry[1] == mtime:
+            self.hits += 1
+            return binascii.unhexlify(entry[2])
+
+        self.misses += 1
+        digest = compute_digest()
+
+        if stat.st_mtime < time.time() - self.RACY_INTERVAL:
+            self._entries[relpath] = [stat.st_size, mtime, binascii.hexlify(digest).decode('ascii')]
+            self._modified = True
+        elif self._entries.pop(relpath, None) is not None:
+            self._modified = True
+
+        return digest
+
+    def save(self):
+        """
+        Write the memo to its file, dropping the entries of files that were not visited since it was loaded.
+
+        Failing to write the memo, e.g. because its directory is read-only, is not an error: the digests are then
+        simply computed again the next time.
+        """
+        for relpath in set(self._entries) - self._visited:
+            del self._entries[relpath]
+            self._modified = True
+
+        if not self._modified:
+            return
+
+        temppath = '{}.{}.tmp'.format(self._filepath, uuid.uuid4().hex)
+        try:
+            if not os.path.isdir(os.path.dirname(self._filepath)):
+                os.makedirs(os.path.dirname(self._filepath))
+            with io.open(temppath, 'w', encoding='utf8') as handle:
+                handle.write(six.text_type(json.dumps({'version': self.VERSION, 'entries': self._entries})))
+            os.rename(temppath, self._filepath)
+        except (IOError, OSError):
+            try:
+                os.remove(temppath)
+            except OSError:
+                pass
+        else:
+            self._modified = False
+
+
 _END_DIGEST = _single_digest(')')
 
 
@@ -302,9 +472,16 @@ def _(folder, **kwargs):
     """
     Hash the content of a Folder object. The name of the folder itself is actually ignored
     :param ignored_folder_content: list of filenames to be ignored for the hashing
+    :param file_digest_memo: optional `FileDigestMemo` of the folder, to skip reading the files that did not change
     """
 
     ignored_folder_content = kwargs.get('ignored_folder_content', [])
+    file_digest_memo = kwargs.get('file_digest_memo', None)
+
+    def file_digest(subfolder, name):
+        """returns the digest of the content of a file in the given folder"""
+        with subfolder.open(name, mode='rb') as fhandle:
+            return _chunked_digest('fcontent', _iter_file_chunks(fhandle))
 
     def folder_digests(subfolder):
         """traverses the given folder and yields digests for the contained objects"""
@@ -314,8 +491,11 @@ def _(folder, **kwargs):
 
             if isfile:
                 yield _single_digest('fname', name.encode('utf-8'))
-                with subfolder.open(name, mode='rb') as fhandle:
-                    yield _single_digest('fcontent', fhandle.read())
+                if file_digest_memo is None:
+                    yield file_digest(subfolder, name)
+                else:
+                    yield file_digest_memo.get_digest(
+                        subfolder.get_abs_path(name), lambda: file_digest(subfolder, name))  # pylint: disable=cell-var-from-loop
             else:
                 yield _single_digest('dir(', name.encode('utf-8'))
                 for digest in folder_digests(subfolder.get_subfolder(name)):
@@ -327,24 +507,22 @@ def _(folder, **kwargs):
 
 @_make_hash.register(np.ndarray)
 def _(arr, **kwargs):
-    """Hashing for Numpy arrays"""
-
-    def little_endian_array(array):
-        if sys.byteorder == 'little':
-            return array
-        return array.byteswap()
+    """
+    Hashing for Numpy arrays
 
+    The array is fed to the hash in blocks, which keeps the memory usage bounded also for large memory-mapped arrays.
+    """
     if arr.dtype == np.float64:
-        return [_single_digest('arr.float', little_endian_array(truncate_array64(arr)).tobytes())]
+        return [_chunked_digest('arr.float', _iter_array_chunks(arr, truncate=True))]
 
     if arr.dtype == np.complex128:
+        # The bytes of the real and imaginary parts enter the final hash directly, without an intermediate digest
         return [
             _single_digest('arr.complex'),
-            little_endian_array(truncate_array64(arr.real)).tobytes() + little_endian_array(truncate_array64(
-                arr.imag)).tobytes()
+            b''.join(chain(_iter_array_chunks(arr.real, truncate=True), _iter_array_chunks(arr.imag, truncate=True)))
         ]
 
-    return [_single_digest('arr.*', little_endian_array(arr).tobytes())]
+    return [_chunked_digest('arr.*', _iter_array_chunks(arr))]
 
 
 def truncate_float64(value, num_bits=4):
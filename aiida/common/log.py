@@ -11,6 +11,8 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
 import logging
+import os
+import threading
 from copy import deepcopy
 from aiida.common import setup
 
@@ -48,6 +50,51 @@ class NotInTestingFilter(logging.Filter):
 
 # A logging handler that will store the log record in the database DbLog table
 class DBLogHandler(logging.Handler):
+    """
+    A logging handler that stores the log records in the DbLog table.
+
+    By default every record is stored as soon as it is emitted. If `asynchronous` is True, the records are put in a
+    queue of at most `queue_size` records instead, and a background thread stores them in batches, as soon as
+    `batch_size` records are waiting or `flush_interval` milliseconds after the first of them was queued. When the
+    queue is full, new records are dropped if `queue_full_policy` is 'drop', or the logging call waits for room in the
+    queue if it is 'block'. `flush` and `close`, which the logging module also calls at exit, store all queued records.
+    """
+
+    # Marker put in the queue to make the background thread store its batch right away
+    _FLUSH = object()
+
+    def __init__(self, level=logging.NOTSET, asynchronous=False, queue_size=10000, batch_size=100,
+                 flush_interval=1000, queue_full_policy='drop'):
+        if queue_full_policy not in ('drop', 'block'):
+            raise ValueError("queue_full_policy should be either 'drop' or 'block'")
+
+        super(DBLogHandler, self).__init__(level)
+        self.asynchronous = asynchronous
+        self._queue_size = queue_size
+        self._batch_size = max(batch_size, 1)
+        self._flush_interval = flush_interval / 1000.
+        self._queue_full_policy = queue_full_policy
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._dropped = 0
+        # Not the lock of the handler, that the emitting thread can hold while it waits for the background thread
+        self._dropped_lock = threading.Lock()
+
+    @property
+    def dropped(self):
+        """Return the number of records that were dropped because the queue was full, since the last report."""
+        return self._dropped
+
+    def handle(self, record):
+        # The background thread should not wait for the lock of the handler, since `flush` holds it while it waits for
+        # the background thread
+        if self._thread is not None and threading.current_thread() is self._thread:
+            if self.filter(record):
+                self.emit(record)
+            return
+
+        super(DBLogHandler, self).handle(record)
 
     def emit(self, record):
         # If this is reached before a backend is defined, simply pass
@@ -55,12 +102,16 @@ class DBLogHandler(logging.Handler):
         if not is_dbenv_loaded():
             return
 
-        from aiida.orm.backend import construct_backend
         from django.core.exceptions import ImproperlyConfigured
 
         try:
-            backend = construct_backend()
-            backend.logs.create_entry_from_record(record)
+            if not self.asynchronous:
+                from aiida.orm.backend import construct_backend
+
+                backend = construct_backend()
+                backend.logs.create_entry_from_record(record)
+            else:
+                self._enqueue(record)
 
         except ImproperlyConfigured:
             # Probably, the logger was called without the
@@ -74,6 +125,133 @@ class DBLogHandler(logging.Handler):
 
             traceback.print_exc()
 
+    def flush(self):
+        """Store all the queued records, waiting for the background thread to do so."""
+        queue = self._queue
+        if queue is None or self._pid != os.getpid() or threading.current_thread() is self._thread:
+            return
+
+        self._put(self._FLUSH, block=True)
+        queue.join()
+
+    def close(self):
+        """Store all the queued records and stop the background thread."""
+        try:
+            self.flush()
+        finally:
+            self._queue = None
+            self._thread = None
+            super(DBLogHandler, self).close()
+
+    def _enqueue(self, record):
+        """Put the log entry of a record in the queue, starting the background thread if needed."""
+        from aiida.orm.log import get_entry_from_record
+
+        entry = get_entry_from_record(record)
+
+        # Records without objpk or objname are not stored anyway
+        if entry is None:
+            return
+
+        # The record could still be changed by the handlers that follow
+        entry['metadata'] = dict(entry['metadata'])
+
+        # Entries logged while storing a batch are stored right away, the queue could be full
+        if threading.current_thread() is self._thread:
+            self._store([entry])
+            return
+
+        self._start()
+        if not self._put(entry, block=self._queue_full_policy == 'block'):
+            with self._dropped_lock:
+                self._dropped += 1
+
+    def _put(self, item, block):
+        """Put an item in the queue and return whether it was put."""
+        from six.moves import queue as queue_module
+
+        try:
+            self._queue.put(item, block=block)
+        except queue_module.Full:
+            return False
+
+        return True
+
+    def _start(self):
+        """Start the background thread, also again in a forked process."""
+        from six.moves import queue as queue_module
+
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self.lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+
+            self._pid = os.getpid()
+            self._queue = queue_module.Queue(maxsize=self._queue_size)
+            self._thread = threading.Thread(target=self._run, args=(self._queue,), name='DBLogHandler')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self, queue):
+        """Store the queued entries in batches, run by the background thread."""
+        import time
+        from six.moves import queue as queue_module
+
+        while True:
+            items = [queue.get()]
+            deadline = time.time() + self._flush_interval
+
+            while items[-1] is not self._FLUSH and len(items) < self._batch_size:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(queue.get(timeout=timeout))
+                except queue_module.Empty:
+                    break
+
+            try:
+                self._store([item for item in items if item is not self._FLUSH])
+            finally:
+                for _ in items:
+                    queue.task_done()
+
+    def _store(self, entries):
+        """Store log entries with a single query, or one by one if that fails."""
+        import sys
+        import traceback
+        from aiida.orm.backend import construct_backend
+
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, 0
+
+        if dropped:
+            sys.stderr.write('DBLogHandler: {} log records were dropped because the queue was full\n'.format(dropped))
+
+        if not entries:
+            return
+
+        backend = construct_backend()
+        try:
+            backend.logs.create_entries(entries)
+        except Exception:  # pylint: disable=broad-except
+            # One entry that cannot be stored, e.g. with metadata that cannot be serialized, should not lose the others.
+            # They are stored with `create_entries` too, that uses the session of this thread
+            for entry in entries:
+                try:
+                    backend.logs.create_entries([entry])
+                except Exception:  # pylint: disable=broad-except
+                    traceback.print_exc()
+
+
+def flush_db_log_handlers():
+    """Store the log records queued by the asynchronous DBLogHandlers of the AiiDA logger."""
+    for handler in aiidalogger.handlers:
+        if isinstance(handler, DBLogHandler):
+            handler.flush()
+
 
 # The default logging dictionary for AiiDA that can be used in conjunction
 # with the config.dictConfig method of python's logging module
@@ -110,6 +288,10 @@ LOGGING = {
             #   command and similar ones (getproperty, describeproperties, ...)
             'level': setup.get_property('logging.db_loglevel'),
             'class': 'aiida.common.log.DBLogHandler',
+            'queue_size': setup.get_property('logging.db_queue_size'),
+            'batch_size': setup.get_property('logging.db_batch_size'),
+            'flush_interval': setup.get_property('logging.db_flush_interval'),
+            'queue_full_policy': setup.get_property('logging.db_queue_full_policy'),
         },
     },
     'loggers': {
@@ -189,6 +371,10 @@ def configure_logging(daemon=False, daemon_log_file=None):
         for name, logger in config.get('loggers', {}).items():
             logger.setdefault('handlers', []).append(daemon_handler_name)
 
+        # The daemon stores the log records in the database in batches, from a background thread
+        if 'dblogger' in config.get('handlers', {}):
+            config['handlers']['dblogger']['asynchronous'] = True
+
     dictConfig(config)
 
 
@@ -26,6 +26,7 @@ CIRCUS_LOG_FILE_TEMPLATE = os.path.join(CONFIG_DIR, DAEMON_LOG_DIR, 'circus-{}.l
 DAEMON_LOG_FILE_TEMPLATE = os.path.join(CONFIG_DIR, DAEMON_LOG_DIR, 'aiida-{}.log')
 CIRCUS_PORT_FILE_TEMPLATE = os.path.join(CONFIG_DIR, DAEMON_DIR, 'circus-{}.port')
 CIRCUS_SOCKET_FILE_TEMPATE = os.path.join(CONFIG_DIR, DAEMON_DIR, 'circus-{}.sockets')
+HASH_MEMO_DIR_TEMPLATE = os.path.join(CONFIG_DIR, 'cache', 'hash_memo-{}')
 CIRCUS_CONTROLLER_SOCKET_TEMPLATE = 'circus.c.sock'
 CIRCUS_PUBSUB_SOCKET_TEMPLATE = 'circus.p.sock'
 CIRCUS_STATS_SOCKET_TEMPLATE = 'circus.s.sock'
@@ -105,5 +106,21 @@ class ProfileConfig(object):
             'daemon': {
                 'log': DAEMON_LOG_FILE_TEMPLATE.format(self.profile_name),
                 'pid': DAEMON_PID_FILE_TEMPLATE.format(self.profile_name),
-            }
+            },
+            'hash_memo': HASH_MEMO_DIR_TEMPLATE.format(self.profile_name),
         }
+
+
+def get_hash_memo_filepath(node_uuid, profile_name=None):
+    """
+    Return the path of the file in which the memo of the digests of the repository files of a node is stored.
+
+    The memos are kept in a cache directory of the profile, outside of the repository, such that the repository
+    folders of the nodes are never modified and the memos are not exported or backed up with them.
+
+    :param node_uuid: the UUID of the node
+    :param profile_name: the name of the profile, by default the current one
+    :return: the absolute path of the file
+    """
+    memo_dir = HASH_MEMO_DIR_TEMPLATE.format(profile_name or get_current_profile_name())
+    return os.path.join(os.path.expanduser(memo_dir), node_uuid[:2], '{}.json'.format(node_uuid[2:]))
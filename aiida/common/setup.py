@@ -883,6 +883,92 @@ _property_table = {
         "Minimum level to log to the DbLog table",
         "REPORT",
         ["CRITICAL", "ERROR", "WARNING", "REPORT", "INFO", "DEBUG"]),
+    "logging.db_queue_size": (
+        "logging_db_queue_size",
+        "int",
+        "Maximum number of log records that the daemon keeps in memory before storing them in the DbLog table",
+        10000,
+        None),
+    "logging.db_batch_size": (
+        "logging_db_batch_size",
+        "int",
+        "Number of log records that the daemon stores in the DbLog table with a single query",
+        100,
+        None),
+    "logging.db_flush_interval": (
+        "logging_db_flush_interval",
+        "int",
+        "Maximum time in milliseconds that the daemon keeps a log record in memory before storing it in the DbLog table",
+        1000,
+        None),
+    "logging.db_queue_full_policy": (
+        "logging_db_queue_full_policy",
+        "string",
+        "What the daemon does with a new log record when logging.db_queue_size records are waiting to be stored: "
+        "drop it, or block until there is room for it",
+        "drop",
+        ["drop", "block"]),
+    "transport.pool_idle_timeout": (
+        "transport_pool_idle_timeout",
+        "int",
+        "Seconds that the daemon keeps a transport open after its last use, such that it can be reused without "
+        "reconnecting. Set to 0 to close transports as soon as they are no longer used",
+        0,
+        None),
+    "transport.pool_max_idle": (
+        "transport_pool_max_idle",
+        "int",
+        "Maximum number of unused transports that the daemon keeps open; when exceeded, the least recently used "
+        "transport is closed. Set to 0 for no limit",
+        10,
+        None),
+    "transport.pool_max_channels": (
+        "transport_pool_max_channels",
+        "int",
+        "Maximum number of daemon tasks that can use the same transport at the same time. Set to 0 for no limit",
+        0,
+        None),
+    "transport.pool_keepalive_interval": (
+        "transport_pool_keepalive_interval",
+        "int",
+        "Seconds between keepalive messages sent over transports that the daemon keeps open while unused. "
+        "Set to 0 to disable the keepalive",
+        60,
+        None),
+    "runner.broadcast_poll_interval": (
+        "runner_broadcast_poll_interval",
+        "int",
+        "Seconds between the checks of the calculations awaited by the processes of a runner that receives their "
+        "state change broadcasts; the checks only catch the broadcasts that were missed",
+        10,
+        None),
+    "persistence.checkpoint_codec": (
+        "persistence_checkpoint_codec",
+        "string",
+        "Format of the checkpoints of the processes: 'pickle' for compressed pickles, saving only the changes since "
+        "the last full checkpoint when possible, or 'yaml' for the legacy format",
+        "pickle",
+        ["pickle", "yaml"]),
+    "closure.update_interval": (
+        "closure_update_interval",
+        "int",
+        "Seconds between the updates of the transitive closure table of the provenance links by one of the daemon "
+        "workers, if the table was built with `verdi database closure build`. Set to 0 to disable the updates",
+        0,
+        None),
+    "array.cache_size": (
+        "array_cache_size",
+        "int",
+        "Maximum total size in MB of the arrays of stored ArrayData nodes that are cached in memory; when exceeded, "
+        "the least recently used arrays are evicted",
+        256,
+        None),
+    "export.copy_workers": (
+        "export_copy_workers",
+        "int",
+        "Number of threads that copy the repository files of the nodes into export archives and out of imported archives",
+        4,
+        None),
     "tcod.depositor_username": (
         "tcod_depositor_username",
         "string",
@@ -18,6 +18,8 @@ import itertools
 import collections
 import uuid
 import math
+import os
+import time
 from datetime import datetime
 
 import numpy as np
@@ -228,3 +230,110 @@ class MakeHashTest(unittest.TestCase):
 
             self.assertNotEqual(make_hash(folder), folder_hash)
             self.assertEqual(make_hash(folder, ignored_folder_content=['file3.npy', 'some_subdir']), folder_hash)
+
+
+class ChunkedHashTest(unittest.TestCase):
+    """
+    Tests that hashing folder content and arrays in chunks gives the same hashes as hashing them at once.
+    """
+
+    def setUp(self):
+        from aiida.common import hashing
+        self._hashing = hashing
+        self._chunk_size = hashing.HASH_CHUNK_SIZE
+
+    def tearDown(self):
+        self._hashing.HASH_CHUNK_SIZE = self._chunk_size
+
+    def test_numpy_arrays(self):
+        arrays = [
+            np.arange(1000).reshape(10, 100)[:, ::3],
+            np.linspace(0., 1., 1000).reshape(40, 25).T,
+            np.array([1 + 2j, 3.5 - 4j] * 100),
+            np.array([]),
+        ]
+        hashes = [make_hash(array) for array in arrays]
+
+        self._hashing.HASH_CHUNK_SIZE = 64
+        self.assertEqual([make_hash(array) for array in arrays], hashes)
+
+    def test_numpy_memmap(self):
+        array = np.linspace(0., 1., 1000).reshape(100, 10)
+
+        with SandboxFolder(sandbox_in_repo=False) as folder:
+            with folder.open('array.npy', 'wb') as fhandle:
+                np.save(fhandle, array)
+
+            self._hashing.HASH_CHUNK_SIZE = 64
+            memmapped = np.load(folder.get_abs_path('array.npy'), mmap_mode='r')
+            self.assertEqual(make_hash(memmapped), make_hash(array))
+
+    def test_folder(self):
+        with SandboxFolder(sandbox_in_repo=False) as folder:
+            with folder.open('file1', 'w') as fhandle:
+                fhandle.write('hello there!\n' * 100)
+
+            folder_hash = make_hash(folder)
+            self._hashing.HASH_CHUNK_SIZE = 64
+            self.assertEqual(make_hash(folder), folder_hash)
+
+
+class FileDigestMemoTest(unittest.TestCase):
+    """
+    Tests for the memo of the digests of the files in a folder.
+    """
+
+    @staticmethod
+    def _write(folder, name, content):
+        """Write a file and set its modification time in the past, such that its digest can be memoized."""
+        with folder.open(name, 'w') as fhandle:
+            fhandle.write(content)
+        mtime = time.time() - 60
+        os.utime(folder.get_abs_path(name), (mtime, mtime))
+
+    def test_memo(self):
+        from aiida.common.hashing import FileDigestMemo
+
+        with SandboxFolder(sandbox_in_repo=False) as folder, SandboxFolder(sandbox_in_repo=False) as memo_folder:
+            memo_filepath = memo_folder.get_abs_path(os.path.join('memos', 'memo.json'))
+            self._write(folder, 'file1', 'hello there!\n')
+            self._write(folder.get_subfolder('subdir', create=True), 'file2', 'general kenobi\n')
+            folder_hash = make_hash(folder)
+            folder_content = sorted(folder.get_content_list())
+
+            memo = FileDigestMemo(folder.abspath, memo_filepath)
+            self.assertEqual(make_hash(folder, file_digest_memo=memo), folder_hash)
+            self.assertEqual((memo.hits, memo.misses), (0, 2))
+            memo.save()
+
+            # the memo is stored outside of the folder, whose content is not modified
+            self.assertTrue(os.path.isfile(memo_filepath))
+            self.assertEqual(sorted(folder.get_content_list()), folder_content)
+
+            memo = FileDigestMemo(folder.abspath, memo_filepath)
+            self.assertEqual(make_hash(folder, file_digest_memo=memo), folder_hash)
+            self.assertEqual((memo.hits, memo.misses), (2, 0))
+
+            # changing a file changes its size or modification time, so its content is read again
+            self._write(folder, 'file1', 'hello there?\n')
+            memo = FileDigestMemo(folder.abspath, memo_filepath)
+            self.assertEqual(make_hash(folder, file_digest_memo=memo), make_hash(folder))
+            self.assertNotEqual(make_hash(folder), folder_hash)
+            self.assertEqual((memo.hits, memo.misses), (1, 1))
+
+    def test_racy_files(self):
+        """Files that were modified too recently are not memoized."""
+        from aiida.common.hashing import FileDigestMemo
+
+        with SandboxFolder(sandbox_in_repo=False) as folder, SandboxFolder(sandbox_in_repo=False) as memo_folder:
+            memo_filepath = memo_folder.get_abs_path('memo.json')
+            with folder.open('file1', 'w') as fhandle:
+                fhandle.write('hello there!\n')
+
+            memo = FileDigestMemo(folder.abspath, memo_filepath)
+            make_hash(folder, file_digest_memo=memo)
+            memo.save()
+
+            memo = FileDigestMemo(folder.abspath, memo_filepath)
+            make_hash(folder, file_digest_memo=memo)
+            self.assertEqual((memo.hits, memo.misses), (0, 1))
@@ -28,6 +28,7 @@ from aiida.common.links import LinkType
 from aiida.common.log import get_dblogger_extra
 from aiida.orm import DataFactory
 from aiida.orm.data.folder import FolderData
+from aiida.orm.node import Node
 from aiida.scheduler.datastructures import JOB_STATES
 
 REMOTE_WORK_DIRECTORY_LOST_FOUND = 'lost+found'
@@ -135,31 +136,33 @@ def upload_calculation(calculation, transport, calc_info, script_filename):
     workdir = transport.getcwd()
     calculation._set_remote_workdir(workdir)
 
+    # local_copy_list is a list of tuples,
+    # each with (src_abs_path, dest_rel_path)
+    # NOTE: validation of these lists are done
+    # inside calculation._presubmit()
+    local_copy_list = calc_info.local_copy_list
+    remote_copy_list = calc_info.remote_copy_list
+    remote_symlink_list = calc_info.remote_symlink_list
+
     # I first create the code files, so that the code can put
     # default files to be overwritten by the plugin itself.
     # Still, beware! The code file itself could be overwritten...
     # But I checked for this earlier.
+    upload_entries = []
+    executables = []
     for code in input_codes:
         if code.is_local():
             # Note: this will possibly overwrite files
             for f in code.get_folder_list():
-                transport.put(code.get_abs_path(f), f)
-            transport.chmod(code.get_local_executable(), 0o755)  # rwxr-xr-x
+                upload_entries.append((code.get_abs_path(f), f))
+            executables.append(code.get_local_executable())
 
     # copy all files, recursively with folders
     for f in folder.get_content_list():
         execlogger.debug("[submission of calculation {}] "
                          "copying file/folder {}...".format(calculation.pk, f),
                          extra=logger_extra)
-        transport.put(folder.get_abs_path(f), f)
-
-    # local_copy_list is a list of tuples,
-    # each with (src_abs_path, dest_rel_path)
-    # NOTE: validation of these lists are done
-    # inside calculation._presubmit()
-    local_copy_list = calc_info.local_copy_list
-    remote_copy_list = calc_info.remote_copy_list
-    remote_symlink_list = calc_info.remote_symlink_list
+        upload_entries.append((folder.get_abs_path(f), f))
 
     if local_copy_list is not None:
         for src_abs_path, dest_rel_path in local_copy_list:
@@ -167,7 +170,16 @@ def upload_calculation(calculation, transport, calc_info, script_filename):
                              "copying local file/folder to {}".format(
                 calculation.pk, dest_rel_path),
                 extra=logger_extra)
+            upload_entries.append((src_abs_path, dest_rel_path))
+
+    if computer.get_upload_as_archive():
+        # Pack everything in a single archive, such that the upload costs one copy and one remote command
+        transport.put_archive(upload_entries, executables=executables)
+    else:
+        for src_abs_path, dest_rel_path in upload_entries:
             transport.put(src_abs_path, dest_rel_path)
+        for executable in executables:
+            transport.chmod(executable, 0o755)  # rwxr-xr-x
 
     if remote_copy_list is not None:
         for (remote_computer_uuid, remote_abs_path,
@@ -268,29 +280,28 @@ def retrieve_calculation(calculation, transport, retrieved_temporary_folder):
     with transport:
         transport.chdir(workdir)
 
-        # First, retrieve the files of folderdata
         retrieve_list = calculation._get_retrieve_list()
         retrieve_temporary_list = calculation._get_retrieve_temporary_list()
         retrieve_singlefile_list = calculation._get_retrieve_singlefile_list()
 
-        with SandboxFolder() as folder:
-            retrieve_files_from_list(calculation, transport, folder.abspath, retrieve_list)
-            # Here I retrieved everything; now I store them inside the calculation
-            retrieved_files.replace_with_folder(folder.abspath, overwrite=True)
-
-        # Second, retrieve the singlefiles
-        with SandboxFolder() as folder:
-            _retrieve_singlefiles(calculation, transport, folder, retrieve_singlefile_list, logger_extra)
-
-        # Retrieve the temporary files in the retrieved_temporary_folder if any files were
-        # specified in the 'retrieve_temporary_list' key
-        if retrieve_temporary_list:
-            retrieve_files_from_list(calculation, transport, retrieved_temporary_folder, retrieve_temporary_list)
-
-            # Log the files that were retrieved in the temporary folder
-            for filename in os.listdir(retrieved_temporary_folder):
-                execlogger.debug("[retrieval of calc {}] Retrieved temporary file or folder '{}'".format(
-                    calculation.pk, filename), extra=logger_extra)
+        if calculation.get_computer().get_retrieve_as_archive():
+            # Resolve and pack everything on the remote, such that the retrieval costs a constant number of
+            # round-trips. The files are then retrieved from the unpacked archive with the normal logic, through a
+            # local transport, such that the semantics of the retrieve lists are exactly the same
+            remote_paths = _get_retrieve_remote_paths(retrieve_list, retrieve_temporary_list, retrieve_singlefile_list)
+            with SandboxFolder() as archive_folder:
+                if transport.get_archive(remote_paths, archive_folder.abspath):
+                    from aiida.transport.plugins.local import LocalTransport
+                    with LocalTransport() as local_transport:
+                        local_transport.chdir(archive_folder.abspath)
+                        _retrieve_all(calculation, local_transport, retrieved_files, retrieved_temporary_folder,
+                                      retrieve_list, retrieve_temporary_list, retrieve_singlefile_list, logger_extra)
+                else:
+                    _retrieve_all(calculation, transport, retrieved_files, retrieved_temporary_folder, retrieve_list,
+                                  retrieve_temporary_list, retrieve_singlefile_list, logger_extra)
+        else:
+            _retrieve_all(calculation, transport, retrieved_files, retrieved_temporary_folder, retrieve_list,
+                          retrieve_temporary_list, retrieve_singlefile_list, logger_extra)
 
         # Store everything
         execlogger.debug(
@@ -300,6 +311,62 @@ def retrieve_calculation(calculation, transport, retrieved_temporary_folder):
         retrieved_files.store()
 
 
+def _retrieve_all(calculation, transport, retrieved_files, retrieved_temporary_folder, retrieve_list,
+                  retrieve_temporary_list, retrieve_singlefile_list, logger_extra=None):
+    """
+    Retrieve the files of the retrieve lists of a calculation, from the current working directory of the transport.
+
+    :param calculation: the instance of JobCalculation to update.
+    :param transport: an already opened transport, whose working directory is the one to retrieve from
+    :param retrieved_files: the FolderData in which to store the files of the retrieve_list
+    :param retrieved_temporary_folder: the absolute path to a directory in which to store the files
+        of the retrieve_temporary_list
+    :param retrieve_list: the list of files to retrieve in the retrieved_files
+    :param retrieve_temporary_list: the list of files to retrieve in the retrieved_temporary_folder
+    :param retrieve_singlefile_list: the list of singlefiles to retrieve
+    :param logger_extra: the extra for the logger
+    """
+    # First, retrieve the files of folderdata
+    with SandboxFolder() as folder:
+        retrieve_files_from_list(calculation, transport, folder.abspath, retrieve_list)
+        # Here I retrieved everything; now I store them inside the calculation
+        retrieved_files.replace_with_folder(folder.abspath, overwrite=True)
+
+    # Second, retrieve the singlefiles
+    with SandboxFolder() as folder:
+        _retrieve_singlefiles(calculation, transport, folder, retrieve_singlefile_list, logger_extra)
+
+    # Retrieve the temporary files in the retrieved_temporary_folder if any files were
+    # specified in the 'retrieve_temporary_list' key
+    if retrieve_temporary_list:
+        retrieve_files_from_list(calculation, transport, retrieved_temporary_folder, retrieve_temporary_list)
+
+        # Log the files that were retrieved in the temporary folder
+        for filename in os.listdir(retrieved_temporary_folder):
+            execlogger.debug("[retrieval of calc {}] Retrieved temporary file or folder '{}'".format(
+                calculation.pk, filename), extra=logger_extra)
+
+
+def _get_retrieve_remote_paths(retrieve_list, retrieve_temporary_list, retrieve_singlefile_list):
+    """
+    Return the remote paths, possibly with wildcards, that are referenced in the retrieve lists of a calculation.
+
+    :param retrieve_list: the list of files to retrieve in the retrieved_files
+    :param retrieve_temporary_list: the list of files to retrieve in the retrieved_temporary_folder
+    :param retrieve_singlefile_list: the list of singlefiles to retrieve
+    :return: list of remote paths, without duplicates
+    """
+    remote_paths = []
+
+    for item in (retrieve_list or []) + (retrieve_temporary_list or []):
+        remote_paths.append(item[0] if isinstance(item, (list, tuple)) else item)
+
+    for _, _, filename in retrieve_singlefile_list or []:
+        remote_paths.append(filename)
+
+    return sorted(set(remote_paths))
+
+
 def kill_calculation(calculation, transport):
     """
     Kill the calculation through the scheduler
@@ -384,7 +451,9 @@ def parse_results(job, retrieved_temporary_folder=None):
 
         for label, n in new_nodes_tuple:
             n.add_link_from(job, label=label, link_type=LinkType.CREATE)
-            n.store()
+
+        # The output nodes are stored all at once, parsers can create many of them
+        Node.store_many([n for _, n in new_nodes_tuple])
 
     try:
         if exit_code.status == 0:
@@ -428,12 +497,13 @@ def _retrieve_singlefiles(job, transport, folder, retrieve_file_list, logger_ext
         singlefile.add_link_from(job, label=linkname, link_type=LinkType.CREATE)
         singlefiles.append(singlefile)
 
+    Node.store_many(singlefiles)
+
     for fil in singlefiles:
         execlogger.debug(
             "[retrieval of calc {}] "
-            "Storing retrieved_singlefile={}".format(job.pk, fil.dbnode.pk),
+            "Stored retrieved_singlefile={}".format(job.pk, fil.pk),
             extra=logger_extra)
-        fil.store()
 
 
 def retrieve_files_from_list(calculation, transport, folder, retrieve_list):
@@ -14,7 +14,7 @@ import logging
 import signal
 from functools import partial
 
-from aiida.common.log import configure_logging
+from aiida.common.log import configure_logging, flush_db_log_handlers
 from aiida.daemon.client import DaemonClient
 from aiida.work.rmq import get_rmq_config
 from aiida.work import DaemonRunner, set_runner
@@ -58,6 +58,9 @@ def start_daemon():
 
     logger.info('Daemon runner stopped')
 
+    # Store the log records that are still queued before the process exits
+    flush_db_log_handlers()
+
 
 def tick_legacy_workflows(runner, interval=DAEMON_LEGACY_WORKFLOW_INTERVAL):
     """
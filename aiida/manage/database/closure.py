@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Functions to build and maintain the optional transitive closure of the provenance links.
+
+The `db_dbclosure` table stores a row (ancestor_id, descendant_id, depth) for every pair of nodes connected by a path of
+CREATE and INPUT links, for every distinct length of such paths. As for the recursive queries of the QueryBuilder, the
+depth is the number of links of the path minus one.
+
+Rather than through triggers on every stored link, the table is updated in batches by `update_closure`, for example
+periodically by the daemon. The links are processed in the order of their id and the id of the last processed link,
+the watermark, is stored in the global settings. Links with a lower id that were not yet committed when the batch was
+processed leave a gap, that is checked again at every update until the transactions that could still commit it are
+finished. Only if there are no gaps and the watermark is not behind the last link, the closure is up to date and the
+QueryBuilder uses it.
+
+The rows added to the table are committed together with the state of the closure, which is stored after each batch.
+"""
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+from aiida.common.links import LinkType
+
+CLOSURE_STATE_KEY = 'closure|state'
+CLOSURE_STATE_DESCRIPTION = 'The watermark and gaps of the links processed in the transitive closure table'
+
+# The link types that are followed by the closure, the same that the recursive queries of the QueryBuilder follow
+CLOSURE_LINK_TYPES = (LinkType.CREATE.value, LinkType.INPUT.value)
+
+# Number of links processed per transaction by `update_closure`
+DEFAULT_BATCH_SIZE = 1000
+
+# Key of the advisory lock that serializes the updates of the closure table
+_CLOSURE_LOCK_KEY = 738120514
+
+# Key of the advisory lock held by the process that updates the closure table periodically, e.g. one daemon worker
+_CLOSURE_UPDATER_LOCK_KEY = 738120515
+
+
+def _get_query_manager():
+    """Return the query manager of the current backend."""
+    from aiida.orm.backend import construct_backend
+    return construct_backend().query_manager
+
+
+def _get_link_types_sql():
+    return ', '.join("'{}'".format(link_type) for link_type in CLOSURE_LINK_TYPES)
+
+
+def get_closure_state():
+    """
+    Return the state of the closure table.
+
+    :return: a dictionary with the `watermark`, the id of the last processed link, and the `gaps`, a list of ranges
+        `[first_id, last_id, txid]` of link ids below the watermark that were missing when they were processed, where
+        `txid` is higher than the id of any transaction that could still commit them. None if the closure was not
+        built.
+    """
+    from aiida.backends.utils import get_global_setting
+
+    try:
+        return get_global_setting(CLOSURE_STATE_KEY)
+    except KeyError:
+        return None
+
+
+def _set_closure_state(watermark, gaps):
+    from aiida.backends.utils import set_global_setting
+    set_global_setting(CLOSURE_STATE_KEY, {'watermark': watermark, 'gaps': gaps}, CLOSURE_STATE_DESCRIPTION)
+
+
+def _get_transaction_ids(query_manager):
+    """
+    Return the bounds of the transaction ids that are currently running, without starting a new transaction.
+
+    :return: tuple with the lowest transaction id that was not yet assigned and the lowest one that is still running
+    """
+    return tuple(query_manager.raw(
+        'SELECT txid_snapshot_xmax(txid_current_snapshot()), txid_snapshot_xmin(txid_current_snapshot())')[0])
+
+
+def _get_missing_ranges(link_ids, first_id, txid):
+    """
+    Return the ranges of ids that are missing in a sorted list of link ids.
+
+    :param link_ids: the sorted list of link ids
+    :param first_id: the first id that is expected
+    :param txid: the transaction id to record with the ranges
+    :return: list of ranges `[first_id, last_id, txid]`
+    """
+    ranges = []
+    expected = first_id
+    for link_id in link_ids:
+        if link_id > expected:
+            ranges.append([expected, link_id - 1, txid])
+        expected = link_id + 1
+    return ranges
+
+
+def _get_link_closure_sql(input_id, output_id):
+    """
+    Return the statement that adds to the closure all the paths through the link from `input_id` to `output_id`.
+
+    Every ancestor of the input node (or the input node itself) is connected to every descendant of the output node (or
+    the output node itself), with a path of the combined depth. Existing rows are skipped, such that processing the
+    same link more than once is harmless.
+    """
+    input_id = int(input_id)
+    output_id = int(output_id)
+    return """
+        INSERT INTO db_dbclosure (ancestor_id, descendant_id, depth)
+        SELECT DISTINCT a.ancestor_id, d.descendant_id, a.depth + d.depth + 2
+        FROM (
+            SELECT ancestor_id, depth FROM db_dbclosure WHERE descendant_id = {input_id}
+            UNION ALL SELECT {input_id}, -1
+        ) AS a
+        CROSS JOIN (
+            SELECT descendant_id, depth FROM db_dbclosure WHERE ancestor_id = {output_id}
+            UNION ALL SELECT {output_id}, -1
+        ) AS d
+        WHERE NOT EXISTS (
+            SELECT 1 FROM db_dbclosure AS c
+            WHERE c.ancestor_id = a.ancestor_id AND c.descendant_id = d.descendant_id
+            AND c.depth = a.depth + d.depth + 2
+        )
+        """.format(input_id=input_id, output_id=output_id)
+
+
+def _process_links(query_manager, links):
+    """
+    Add the paths through the given links to the closure, in a single transaction.
+
+    :param links: list of tuples (id, input_id, output_id, type)
+    """
+    queries = [
+        _get_link_closure_sql(input_id, output_id)
+        for _, input_id, output_id, link_type in links
+        if link_type in CLOSURE_LINK_TYPES
+    ]
+
+    if queries:
+        # Updates by different processes are serialized, such that the check for existing rows is reliable
+        query_manager.execute(['SELECT pg_advisory_xact_lock({})'.format(_CLOSURE_LOCK_KEY)] + queries)
+
+
+def build_closure():
+    """
+    Build the closure table from scratch from the current links, replacing its content.
+
+    :return: the number of rows in the closure table
+    """
+    query_manager = _get_query_manager()
+    watermark = query_manager.raw('SELECT coalesce(max(id), 0) FROM db_dblink')[0][0]
+    link_types = _get_link_types_sql()
+
+    # The links below the watermark that are missing, either because they were deleted or because they were not yet
+    # committed, are recorded as gaps, before the closure is computed such that none of the links is skipped. Any
+    # transaction that can still commit them has already been assigned its transaction id.
+    missing = query_manager.raw("""
+        SELECT coalesce(previous_id, 0) + 1, id - 1 FROM (
+            SELECT id, lag(id) OVER (ORDER BY id) AS previous_id FROM db_dblink WHERE id <= {watermark}
+        ) AS links
+        WHERE id > coalesce(previous_id, 0) + 1
+        """.format(watermark=int(watermark)))
+    txid, _ = _get_transaction_ids(query_manager)
+    gaps = [[int(first_id), int(last_id), txid] for first_id, last_id in missing]
+
+    query_manager.execute([
+        'SELECT pg_advisory_xact_lock({})'.format(_CLOSURE_LOCK_KEY),
+        'TRUNCATE db_dbclosure',
+        """
+        INSERT INTO db_dbclosure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE walk(ancestor_id, descendant_id, depth) AS (
+            SELECT input_id, output_id, 0 FROM db_dblink
+            WHERE type IN ({link_types}) AND id <= {watermark}
+            UNION
+            SELECT walk.ancestor_id, link.output_id, walk.depth + 1
+            FROM walk JOIN db_dblink AS link ON link.input_id = walk.descendant_id
+            WHERE link.type IN ({link_types}) AND link.id <= {watermark}
+        )
+        SELECT ancestor_id, descendant_id, depth FROM walk
+        """.format(link_types=link_types, watermark=int(watermark)),
+    ])
+
+    _set_closure_state(int(watermark), gaps)
+
+    return query_manager.raw('SELECT count(*) FROM db_dbclosure')[0][0]
+
+
+def update_closure(batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """
+    Add the links that were stored since the last update to the closure table, in batches.
+
+    :param batch_size: the number of links processed per transaction
+    :param max_batches: the maximum number of batches to process, None to process all new links
+    :return: the number of links that were processed, or None if the closure was not built
+    """
+    state = get_closure_state()
+
+    if state is None:
+        return None
+
+    query_manager = _get_query_manager()
+    watermark = state['watermark']
+    gaps = [list(gap) for gap in state['gaps']]
+    processed = 0
+
+    _, oldest_txid = _get_transaction_ids(query_manager)
+
+    # Check whether the links missing in the gaps were committed in the meantime
+    if gaps:
+        condition = ' OR '.join(
+            'id BETWEEN {} AND {}'.format(int(first_id), int(last_id)) for first_id, last_id, _ in gaps)
+        links = query_manager.raw(
+            'SELECT id, input_id, output_id, type FROM db_dblink WHERE {} ORDER BY id'.format(condition))
+        _process_links(query_manager, links)
+        processed += len(links)
+
+        found = set(link[0] for link in links)
+        remaining = []
+        for first_id, last_id, gap_txid in gaps:
+            ids = sorted(link_id for link_id in found if first_id <= link_id <= last_id)
+            if gap_txid > oldest_txid:
+                # A transaction that started before the gap was recorded may still commit links in it
+                remaining.extend(_get_missing_ranges(ids + [last_id + 1], first_id, gap_txid))
+        gaps = remaining
+
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        links = query_manager.raw(
+            'SELECT id, input_id, output_id, type FROM db_dblink WHERE id > {} ORDER BY id LIMIT {}'.format(
+                int(watermark), int(batch_size)))
+
+        if not links:
+            break
+
+        _process_links(query_manager, links)
+        processed += len(links)
+        batches += 1
+
+        # Any transaction that can still commit a link missing in this batch has already been assigned its id
+        txid, _ = _get_transaction_ids(query_manager)
+        gaps.extend(_get_missing_ranges([link[0] for link in links], watermark + 1, txid))
+        watermark = links[-1][0]
+        _set_closure_state(watermark, gaps)
+
+        if len(links) < batch_size:
+            break
+
+    # Storing the state also commits the rows added for the links of the gaps
+    if processed or gaps != state['gaps'] or watermark != state['watermark']:
+        _set_closure_state(watermark, gaps)
+
+    return processed
+
+
+def acquire_updater_lock():
+    """
+    Try to become the process that updates the closure table periodically, without waiting.
+
+    The advisory lock is held by the database connection until it is closed, so another process can take over only
+    when the holder exits. Calling this again from the holder keeps the lock.
+
+    :return: True if the current database connection holds the lock
+    """
+    return bool(_get_query_manager().raw("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_locks
+            WHERE locktype = 'advisory' AND pid = pg_backend_pid() AND classid = 0 AND objid = {key} AND granted
+        ) OR pg_try_advisory_lock({key})""".format(key=_CLOSURE_UPDATER_LOCK_KEY))[0][0])
+
+
+def is_closure_up_to_date():
+    """
+    Return whether the closure table contains all the paths of the committed links.
+
+    :return: True if the closure was built, there are no gaps and the watermark is not behind the last link
+    """
+    state = get_closure_state()
+
+    if state is None or state['gaps']:
+        return False
+
+    last_link_id = _get_query_manager().raw('SELECT coalesce(max(id), 0) FROM db_dblink')[0][0]
+
+    return state['watermark'] >= last_link_id
+
+
+def verify_closure():
+    """
+    Compare the closure table with the closure computed from the links that were processed.
+
+    :return: tuple with the number of rows that are missing from the closure table and the number of rows that it
+        contains but should not, or None if the closure was not built
+    """
+    state = get_closure_state()
+
+    if state is None:
+        return None
+
+    query_manager = _get_query_manager()
+
+    link_filter = 'type IN ({}) AND id <= {}'.format(_get_link_types_sql(), int(state['watermark']))
+    for first_id, last_id, _ in state['gaps']:
+        link_filter += ' AND id NOT BETWEEN {} AND {}'.format(int(first_id), int(last_id))
+
+    missing, extra = query_manager.raw("""
+        WITH RECURSIVE walk(ancestor_id, descendant_id, depth) AS (
+            SELECT input_id, output_id, 0 FROM db_dblink WHERE {link_filter}
+            UNION
+            SELECT walk.ancestor_id, link.output_id, walk.depth + 1
+            FROM walk JOIN (SELECT * FROM db_dblink WHERE {link_filter}) AS link ON link.input_id = walk.descendant_id
+        )
+        SELECT
+            (SELECT count(*) FROM (
+                SELECT ancestor_id, descendant_id, depth FROM walk
+                EXCEPT SELECT ancestor_id, descendant_id, depth FROM db_dbclosure) AS missing),
+            (SELECT count(*) FROM (
+                SELECT ancestor_id, descendant_id, depth FROM db_dbclosure
+                EXCEPT SELECT ancestor_id, descendant_id, depth FROM walk) AS extra)
+        """.format(link_filter=link_filter))[0]
+
+    return missing, extra
+
+
+def drop_closure():
+    """
+    Empty the closure table and remove its state, such that it is no longer used nor updated.
+
+    Nothing is done if the closure was not built: the table is then not used, and is emptied when it is built.
+    """
+    from aiida.backends.utils import del_global_setting
+
+    if get_closure_state() is None:
+        return
+
+    _get_query_manager().execute([
+        'SELECT pg_advisory_xact_lock({})'.format(_CLOSURE_LOCK_KEY),
+        'TRUNCATE db_dbclosure',
+    ])
+
+    # Removing the state also commits the truncation of the table
+    del_global_setting(CLOSURE_STATE_KEY)
@@ -109,6 +109,10 @@ class Computer(CollectionEntry):
 
     PROPERTY_MINIMUM_SCHEDULER_POLL_INTERVAL = 'minimum_scheduler_poll_interval'  # pylint: disable=invalid-name
     PROPERTY_MINIMUM_SCHEDULER_POLL_INTERVAL__DEFAULT = 10.  # pylint: disable=invalid-name
+    PROPERTY_UPLOAD_AS_ARCHIVE = 'upload_as_archive'
+    PROPERTY_UPLOAD_AS_ARCHIVE__DEFAULT = False
+    PROPERTY_RETRIEVE_AS_ARCHIVE = 'retrieve_as_archive'
+    PROPERTY_RETRIEVE_AS_ARCHIVE__DEFAULT = False
 
     @staticmethod
     def get_schema():
@@ -583,6 +587,44 @@ class Computer(CollectionEntry):
         """
         self._set_property(self.PROPERTY_MINIMUM_SCHEDULER_POLL_INTERVAL, interval)
 
+    def get_upload_as_archive(self):
+        """
+        Get whether the input files of calculations on this computer are uploaded as a single tar archive,
+        instead of being copied one by one.
+
+        :return: True if the files are uploaded as an archive
+        :rtype: bool
+        """
+        return self._get_property(self.PROPERTY_UPLOAD_AS_ARCHIVE, self.PROPERTY_UPLOAD_AS_ARCHIVE__DEFAULT)
+
+    def set_upload_as_archive(self, upload_as_archive):
+        """
+        Set whether the input files of calculations on this computer are uploaded as a single tar archive.
+
+        :param upload_as_archive: True to upload the files as an archive
+        :type upload_as_archive: bool
+        """
+        self._set_property(self.PROPERTY_UPLOAD_AS_ARCHIVE, bool(upload_as_archive))
+
+    def get_retrieve_as_archive(self):
+        """
+        Get whether the output files of calculations on this computer are packed on the remote and retrieved as a
+        single tar archive, instead of being copied one by one.
+
+        :return: True if the files are retrieved as an archive
+        :rtype: bool
+        """
+        return self._get_property(self.PROPERTY_RETRIEVE_AS_ARCHIVE, self.PROPERTY_RETRIEVE_AS_ARCHIVE__DEFAULT)
+
+    def set_retrieve_as_archive(self, retrieve_as_archive):
+        """
+        Set whether the output files of calculations on this computer are retrieved as a single tar archive.
+
+        :param retrieve_as_archive: True to retrieve the files as an archive
+        :type retrieve_as_archive: bool
+        """
+        self._set_property(self.PROPERTY_RETRIEVE_AS_ARCHIVE, bool(retrieve_as_archive))
+
     @abc.abstractmethod
     def get_transport_params(self):
         pass
@@ -10,9 +10,109 @@
 from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
+from collections import OrderedDict
+
 from aiida.orm import Data
 
 
+class ArrayCache(object):
+    """
+    Cache of the arrays read from the repository of stored :py:class:`ArrayData` nodes, shared by all the nodes in the
+    process. The total size of the cached arrays is bounded: when it is exceeded, the least recently used arrays are
+    evicted, and arrays larger than the bound are never cached.
+
+    The cached arrays are read-only, since the same array is returned to every caller: an in-place modification would
+    otherwise change the array of the node for the whole process.
+    """
+
+    def __init__(self, max_size=None):
+        """
+        :param max_size: the maximum total size in bytes of the cached arrays, if None it is read from the
+            `array.cache_size` property (in MB) on first use
+        """
+        self._max_size = max_size
+        self._arrays = OrderedDict()
+        self._size = 0
+
+    @property
+    def max_size(self):
+        """Return the maximum total size in bytes of the cached arrays."""
+        if self._max_size is None:
+            from aiida.common.setup import get_property
+            self._max_size = get_property('array.cache_size') * 1024 * 1024
+        return self._max_size
+
+    @property
+    def size(self):
+        """Return the total size in bytes of the cached arrays."""
+        return self._size
+
+    def __len__(self):
+        return len(self._arrays)
+
+    def __contains__(self, key):
+        return key in self._arrays
+
+    def get(self, key):
+        """
+        Return a cached array and mark it as the most recently used one.
+
+        :param key: the key of the array
+        :return: the array or None if it is not cached
+        """
+        array = self._arrays.pop(key, None)
+        if array is not None:
+            self._arrays[key] = array
+        return array
+
+    def put(self, key, array):
+        """
+        Cache an array, evicting the least recently used arrays if the maximum size is exceeded.
+
+        :param key: the key of the array
+        :param array: the numpy array, which is made read-only
+        """
+        self.remove(key)
+        array.flags.writeable = False
+
+        if array.nbytes > self.max_size:
+            return
+
+        self._arrays[key] = array
+        self._size += array.nbytes
+
+        while self._size > self.max_size:
+            _, evicted = self._arrays.popitem(last=False)
+            self._size -= evicted.nbytes
+
+    def remove(self, key):
+        """
+        Remove an array from the cache, if it is cached.
+
+        :param key: the key of the array
+        """
+        array = self._arrays.pop(key, None)
+        if array is not None:
+            self._size -= array.nbytes
+
+    def remove_node(self, uuid):
+        """
+        Remove all the arrays of a node from the cache.
+
+        :param uuid: the UUID of the node
+        """
+        for key in [key for key in self._arrays if key[0] == uuid]:
+            self.remove(key)
+
+    def clear(self):
+        """Remove all the arrays from the cache."""
+        self._arrays = OrderedDict()
+        self._size = 0
+
+
+# The cache of the arrays of all the stored ArrayData nodes, keyed on the UUID of the node and the name of the array
+ARRAY_CACHE = ArrayCache()
+
 
 class ArrayData(Data):
     """
@@ -26,16 +126,17 @@ class ArrayData(Data):
       :py:meth:`.get_array` call, the array will be re-read from disk.
       If instead the ArrayData node has already been stored,
       the array is cached in memory after the first read, and the cached array
-      is used thereafter.
-      If too much RAM memory is used, you can clear the
-      cache with the :py:meth:`.clear_internal_cache` method.
+      is used thereafter. The cache is shared by all the nodes and its total
+      size is bounded by the `array.cache_size` property: the least recently
+      used arrays are evicted first. The arrays of stored nodes are always
+      read-only, also if they are too large to be cached or the cache is
+      disabled: copy them, e.g. with ``numpy.array(node.get_array(name))``,
+      to modify them.
+      To avoid reading large arrays in memory altogether, use
+      ``get_array(name, mmap=True)`` or :py:meth:`.get_array_slice`.
     """
     array_prefix = "array|"
 
-    def __init__(self, *args, **kwargs):
-        super(ArrayData, self).__init__(*args, **kwargs)
-        self._cached_arrays = {}
-
     def delete_array(self, name):
         """
         Delete an array from the node. Can only be called before storing.
@@ -115,43 +216,87 @@ class ArrayData(Data):
         for name in self.get_arraynames():
             yield (name, self.get_array(name))
 
-    def get_array(self, name):
+    def _get_array_from_file(self, name, mmap_mode=None):
         """
-        Return an array stored in the node
+        Read an array from the file in the repository of the node.
 
         :param name: The name of the array to return.
+        :param mmap_mode: the `mmap_mode` passed to `numpy.load`
         """
         import numpy
 
-        # raw function used only internally
-        def get_array_from_file(self, name):
-            fname = '{}.npy'.format(name)
-            if fname not in self.get_folder_list():
-                raise KeyError(
-                    "Array with name '{}' not found in node pk= {}".format(
-                        name, self.pk))
+        fname = '{}.npy'.format(name)
+        if fname not in self.get_folder_list():
+            raise KeyError(
+                "Array with name '{}' not found in node pk= {}".format(
+                    name, self.pk))
+
+        try:
+            return numpy.load(self.get_abs_path(fname), mmap_mode=mmap_mode)
+        except ValueError:
+            if mmap_mode is None:
+                raise
+            # Arrays of python objects cannot be memory-mapped, so they are read entirely
+            return numpy.load(self.get_abs_path(fname))
+
+    def get_array(self, name, mmap=False):
+        """
+        Return an array stored in the node
 
-            array = numpy.load(self.get_abs_path(fname))
-            return array
+        :param name: The name of the array to return.
+        :param mmap: If True, return a read-only memory-mapped array, whose
+            content is only read from disk when it is accessed. Memory-mapped
+            arrays are not cached.
+        :return: the array, which is read-only if the node is stored,
+            whether or not it is shared through the cache
+        """
+        if mmap:
+            return self._get_array_from_file(name, mmap_mode='r')
 
         # Return with proper caching, but only after storing. Before, instead,
         # always re-read from disk
         if not self.is_stored:
-            return get_array_from_file(self, name)
-        else:
-            if name not in self._cached_arrays:
-                self._cached_arrays[name] = get_array_from_file(self, name)
-            return self._cached_arrays[name]
+            return self._get_array_from_file(name)
+
+        key = (self.uuid, name)
+        array = ARRAY_CACHE.get(key)
+        if array is None:
+            array = self._get_array_from_file(name)
+            ARRAY_CACHE.put(key, array)
+        return array
+
+    def get_array_slice(self, name, index):
+        """
+        Return a part of an array stored in the node, reading from disk only
+        that part, unless the whole array is already cached.
+
+        :param name: The name of the array.
+        :param index: The index or slice to apply to the array, e.g.
+            ``numpy.s_[10:20, 0]``.
+        :return: a copy of the part of the array (or a scalar)
+        """
+        array = None
+        if self.is_stored:
+            array = ARRAY_CACHE.get((self.uuid, name))
+        if array is None:
+            array = self._get_array_from_file(name, mmap_mode='r')
+
+        result = array[index]
+        # Copy, such that the result neither keeps the file open nor modifies the cached array
+        if hasattr(result, 'copy'):
+            result = result.copy()
+        return result
 
     def clear_internal_cache(self):
         """
-        Clear the internal memory cache where the arrays are stored after being
-        read from disk (used in order to reduce at minimum the readings from
-        disk).
+        Remove the arrays of this node from the memory cache where the
+        arrays are stored after being read from disk (used in order to
+        reduce at minimum the readings from disk).
         This function is useful if you want to keep the node in memory, but you
         do not want to waste memory to cache the arrays in RAM.
         """
-        self._cached_arrays = {}
+        if self.is_stored:
+            ARRAY_CACHE.remove_node(self.uuid)
 
     def set_array(self, name, array):
         """
@@ -22,6 +22,11 @@ from functools import reduce
 import six
 from six.moves import range, zip
 
+try:
+    from collections.abc import Sequence
+except ImportError:  # Python 2
+    from collections import Sequence
+
 from aiida.orm import Data
 from aiida.common.exceptions import UnsupportedSpeciesError
 from aiida.common.utils import classproperty, xyz_parser_iterator
@@ -586,6 +591,30 @@ def get_symbols_string(symbols, weights):
         return "{{{}}}".format("".join(sorted(pieces)))
 
 
+def get_stored_site_kindnames(pk, raw_sites):
+    """
+    Return the kind names of the sites of a stored structure, from its
+    ``sites`` attribute as returned by a query or, if the sites are compact,
+    from the arrays in the repository.
+
+    :param pk: the pk of the structure
+    :param raw_sites: the ``sites`` attribute of the structure, or None if
+        it is not set
+    :return: a list of strings, or None if the structure has neither the
+        ``sites`` attribute nor compact sites
+    """
+    from aiida.orm import load_node
+
+    if raw_sites is not None:
+        return [raw_site['kind_name'] for raw_site in raw_sites]
+
+    structure = load_node(pk)
+    if not structure.has_compact_sites():
+        return None
+
+    return structure.get_site_kindnames()
+
+
 def has_vacancies(weights):
     """
     Returns True if the sum of the weights is less than one.
@@ -779,6 +808,10 @@ class StructureData(Data):
         3: "volume"
     }
 
+    # Prefix of the attributes with the shapes of the arrays of compact sites,
+    # that are stored in the repository as for ArrayData
+    _sites_array_prefix = "array|"
+
     @property
     def _set_defaults(self):
         parent_dict = super(StructureData, self)._set_defaults
@@ -823,17 +856,37 @@ class StructureData(Data):
 
         return retdict
 
-    def set_ase(self, aseatoms):
+    def set_ase(self, aseatoms, compact=False):
         """
         Load the structure from a ASE object
+
+        The kinds are created as by :py:meth:`append_atom`, but only once for
+        all the atoms with the same symbol, tag and mass.
+
+        :param compact: if True, store the sites as arrays, see
+            :py:meth:`set_sites_from_arrays`
         """
         if is_ase_atoms(aseatoms):
             # Read the ase structure
             self.cell = aseatoms.cell
             self.pbc = aseatoms.pbc
             self.clear_kinds()  # This also calls clear_sites
-            for atom in aseatoms:
-                self.append_atom(ase=atom)
+
+            kind_names = []
+            kind_names_of_atoms = {}
+            atoms = zip(aseatoms.get_chemical_symbols(),
+                        aseatoms.get_tags().tolist(),
+                        aseatoms.get_masses().tolist())
+            for index, atom in enumerate(atoms):
+                try:
+                    kind_name = kind_names_of_atoms[atom]
+                except KeyError:
+                    kind = Kind(ase=aseatoms[index])
+                    kind_name = self._get_or_append_kind(kind, name_given=False).name
+                    kind_names_of_atoms[atom] = kind_name
+                kind_names.append(kind_name)
+
+            self._set_sites_of_kinds(kind_names, aseatoms.get_positions(), compact)
         else:
             raise TypeError("The value is not an ase.Atoms object")
 
@@ -852,12 +905,14 @@ class StructureData(Data):
                                  "does not exist".format(typestr))
         func(obj, **kwargs)
 
-    def set_pymatgen_molecule(self, mol, margin=5):
+    def set_pymatgen_molecule(self, mol, margin=5, compact=False):
         """
         Load the structure from a pymatgen Molecule object.
 
         :param margin: the margin to be added in all directions of the
             bounding box of the molecule.
+        :param compact: if True, store the sites as arrays, see
+            :py:meth:`set_sites_from_arrays`
 
         .. note:: Requires the pymatgen module (version >= 3.0.13, usage
             of earlier versions may cause errors).
@@ -868,10 +923,10 @@ class StructureData(Data):
                min([x.coords.tolist()[1] for x in mol.sites]) + 2 * margin,
                max([x.coords.tolist()[2] for x in mol.sites]) -
                min([x.coords.tolist()[2] for x in mol.sites]) + 2 * margin]
-        self.set_pymatgen_structure(mol.get_boxed_structure(*box))
+        self.set_pymatgen_structure(mol.get_boxed_structure(*box), compact=compact)
         self.pbc = [False, False, False]
 
-    def set_pymatgen_structure(self, struct):
+    def set_pymatgen_structure(self, struct, compact=False):
         """
         Load the structure from a pymatgen Structure object.
 
@@ -880,6 +935,8 @@ class StructureData(Data):
         .. note:: Requires the pymatgen module (version >= 3.3.5, usage
             of earlier versions may cause errors).
 
+        :param compact: if True, store the sites as arrays, see
+            :py:meth:`set_sites_from_arrays`
         :raise ValueError: if there are partial occupancies together with spins.
         """
         def build_kind_name(species_and_occu):
@@ -922,23 +979,35 @@ class StructureData(Data):
         self.pbc = [True, True, True]
         self.clear_kinds()
 
+        # The kind is only created once for all the sites with the same
+        # species and kind name
+        kind_names = []
+        kind_names_of_species = {}
         for site in struct.sites:
+            species = (tuple(site.species_and_occu.items()),
+                       site.properties.get('kind_name', None))
+            try:
+                kind_name = kind_names_of_species[species]
+            except KeyError:
+                if 'kind_name' in site.properties:
+                    kind_name = site.properties['kind_name']
+                else:
+                    kind_name = build_kind_name(site.species_and_occu)
 
-            if 'kind_name' in site.properties:
-                kind_name = site.properties['kind_name']
-            else:
-                kind_name = build_kind_name(site.species_and_occu)
+                inputs = {
+                    'symbols': [x.symbol for x in site.species_and_occu.keys()],
+                    'weights': [x for x in site.species_and_occu.values()],
+                }
 
-            inputs = {
-                'symbols': [x.symbol for x in site.species_and_occu.keys()],
-                'weights': [x for x in site.species_and_occu.values()],
-                'position': site.coords.tolist()
-            }
+                if kind_name is not None:
+                    inputs['name'] = kind_name
 
-            if kind_name is not None:
-                inputs['name'] = kind_name
+                kind = self._get_or_append_kind(Kind(**inputs), name_given=kind_name is not None)
+                kind_name = kind.name
+                kind_names_of_species[species] = kind_name
+            kind_names.append(kind_name)
 
-            self.append_atom(**inputs)
+        self._set_sites_of_kinds(kind_names, struct.cart_coords, compact)
 
     def _validate(self):
         """
@@ -976,6 +1045,10 @@ class StructureData(Data):
                                       "instead of only one".format(
                     c, counts[c]))
 
+        if self.has_compact_sites():
+            self._validate_compact_sites(kinds)
+            return
+
         try:
             # This will try to create the sites objects
             sites = self.sites
@@ -983,19 +1056,65 @@ class StructureData(Data):
             raise ValidationError(
                 "Unable to validate the sites: {}".format(exc))
 
+        kind_names = set(k.name for k in kinds)
         for site in sites:
-            if site.kind_name not in [k.name for k in kinds]:
+            if site.kind_name not in kind_names:
                 raise ValidationError(
                     "A site has kind {}, but no specie with that name exists"
                     "".format(site.kind_name))
 
         kinds_without_sites = (
-            set(k.name for k in kinds) - set(s.kind_name for s in sites))
+            kind_names - set(s.kind_name for s in sites))
         if kinds_without_sites:
             raise ValidationError("The following kinds are defined, but there "
                                   "are no sites with that kind: {}".format(
                 list(kinds_without_sites)))
 
+    def _validate_compact_sites(self, kinds):
+        """
+        Check that the arrays of the compact sites match their attributes,
+        and that each site has a kind and each kind has a site.
+
+        :param kinds: the list of the Kind objects of the structure
+        """
+        import numpy
+        from aiida.common.exceptions import ValidationError
+
+        try:
+            positions = self._get_sites_array('positions', mmap_mode='r')
+            kind_indices = self._get_sites_array('kind_indices')
+        except (IOError, OSError, ValueError) as exc:
+            raise ValidationError(
+                "Unable to read the arrays of the sites: {}".format(exc))
+
+        for name, array in (('positions', positions), ('kind_indices', kind_indices)):
+            shape = self.get_attr("{}{}".format(self._sites_array_prefix, name), None)
+            if shape != list(array.shape):
+                raise ValidationError(
+                    "The shape of the {} array of the sites is {}, but the "
+                    "attribute says {}".format(name, list(array.shape), shape))
+
+        if positions.dtype.kind != 'f' or kind_indices.dtype.kind not in 'iu':
+            raise ValidationError("The positions of the sites must be floats "
+                                  "and their kind indices integers")
+        if positions.shape != (len(kind_indices), 3):
+            raise ValidationError(
+                "The positions of the sites must be an array of shape ({}, 3), "
+                "it is {}".format(len(kind_indices), positions.shape))
+
+        if len(kind_indices) and (kind_indices.min() < 0 or kind_indices.max() >= len(kinds)):
+            raise ValidationError(
+                "A site has a kind index out of the range of the {} kinds"
+                "".format(len(kinds)))
+
+        sites_per_kind = numpy.bincount(kind_indices, minlength=len(kinds))
+        kinds_without_sites = [
+            kind.name for kind, count in zip(kinds, sites_per_kind) if count == 0]
+        if kinds_without_sites:
+            raise ValidationError("The following kinds are defined, but there "
+                                  "are no sites with that kind: {}".format(
+                kinds_without_sites))
+
     def _prepare_xsf(self, main_file_name=""):
         """
         Write the given structure to a string of format XSF (for XCrySDen).
@@ -1048,7 +1167,7 @@ class StructureData(Data):
 
         # Get cell vectors and atomic position
         lattice_vectors = np.array(self.get_attr('cell'))
-        base_sites = self.get_attr('sites')
+        base_sites = [site.get_raw() for site in self.sites]
 
         start1 = -int(supercell_factors[0] / 2)
         start2 = -int(supercell_factors[1] / 2)
@@ -1173,14 +1292,17 @@ class StructureData(Data):
         self.set_pbc(pbc)
 
         # Calculating the minimal cell:
-        positions = np.array([site.position for site in self.sites])
+        positions = self.get_site_positions()
         position_min, position_max = get_extremas_from_positions(positions)
 
         # Translate the structure to the origin, such that the minimal values in each dimension
         # amount to (0,0,0)
         positions -= position_min
-        for index, site in enumerate(self.get_attr('sites')):
-            site['position'] = list(positions[index])
+        if self.has_compact_sites():
+            self._set_sites_array('positions', positions)
+        else:
+            for index, site in enumerate(self.get_attr('sites')):
+                site['position'] = list(positions[index])
 
         # The orthorhombic cell that (just) accomodates the whole structure is now given by the
         # extremas of position in each dimension:
@@ -1263,8 +1385,10 @@ class StructureData(Data):
             used to group and/or order the symbols in the formula
         """
 
-        symbol_list = [self.get_kind(s.kind_name).get_symbols_string()
-                       for s in self.sites]
+        kind_names = self.get_site_kindnames()
+        symbols = {kind_name: self.get_kind(kind_name).get_symbols_string()
+                   for kind_name in set(kind_names)}
+        symbol_list = [symbols[kind_name] for kind_name in kind_names]
 
         return get_formula(symbol_list, mode=mode, separator=separator)
 
@@ -1279,7 +1403,11 @@ class StructureData(Data):
 
         :return: a list of strings
         """
-        return [this_site.kind_name for this_site in self.sites]
+        if self.has_compact_sites():
+            kind_names = self.get_kind_names()
+            return [kind_names[index] for index in self._get_sites_array('kind_indices').tolist()]
+
+        return [raw_site['kind_name'] for raw_site in self.get_attr('sites', [])]
 
     def get_composition(self):
         """
@@ -1291,14 +1419,12 @@ class StructureData(Data):
 
         :returns: a dictionary with the composition
         """
-        symbols_list = [self.get_kind(s.kind_name).get_symbols_string()
-                        for s in self.sites]
-        composition = {
-            symbol: symbols_list.count(symbol)
-            for symbol
-            in set(symbols_list)
-            }
-        return composition
+        from collections import Counter
+
+        composition = Counter()
+        for kind_name, count in Counter(self.get_site_kindnames()).items():
+            composition[self.get_kind(kind_name).get_symbols_string()] += count
+        return dict(composition)
 
     def get_ase(self):
         """
@@ -1386,12 +1512,14 @@ class StructureData(Data):
 
         new_kind = Kind(kind=kind)  # So we make a copy
 
-        if kind.name in [k.name for k in self.kinds]:
+        kinds_index = self._get_kinds_index()
+        if kind.name in kinds_index:
             raise ValueError("A kind with the same name ({}) already exists."
                              "".format(kind.name))
 
         # If here, no exceptions have been raised, so I add the site.
         self._append_to_attr('kinds', new_kind.get_raw())
+        kinds_index[new_kind.name] = new_kind
         # Note, this is a dict (with integer keys) so it allows for empty
         # spots!
         if not hasattr(self, '_internal_kind_tags'):
@@ -1416,10 +1544,18 @@ class StructureData(Data):
 
         new_site = Site(site=site)  # So we make a copy
 
-        if site.kind_name not in [k.name for k in self.kinds]:
+        kinds_index = self._get_kinds_index()
+        if site.kind_name not in kinds_index:
             raise ValueError("No kind with name '{}', available kinds are: "
                              "{}".format(site.kind_name,
-                                         [k.name for k in self.kinds]))
+                                         list(kinds_index)))
+
+        # The arrays of compact sites are not extended one site at a time,
+        # the sites are moved back to the attribute instead
+        if self.has_compact_sites():
+            raw_sites = [this_site.get_raw() for this_site in self.sites]
+            self.clear_sites()
+            self._set_attr('sites', raw_sites, clean=False)
 
         # If here, no exceptions have been raised, so I add the site.
         self._append_to_attr('sites', new_site.get_raw())
@@ -1472,10 +1608,25 @@ class StructureData(Data):
             # all remaining parameters
             kind = Kind(**kwargs)
 
+        kind = self._get_or_append_kind(kind, name_given='name' in kwargs)
+
+        site = Site(kind_name=kind.name, position=position)
+        self.append_site(site)
+
+    def _get_or_append_kind(self, kind, name_given):
+        """
+        Return the kind of the structure to be used for a new site of the
+        given kind, appending the kind to the structure if needed, following
+        the rules described in :py:meth:`append_atom`.
+
+        :param kind: the Kind object of the new site
+        :param name_given: whether the name of the kind was explicitly set
+        :return: the Kind object to use for the new site
+        """
         # I look for identical species only if the name is not specified
-        _kinds = self.kinds
+        _kinds = list(self._get_kinds_index().values())
 
-        if 'name' not in kwargs:
+        if not name_given:
             # If the kind is identical to an existing one, I use the existing
             # one, otherwise I replace it
             exists_already = False
@@ -1507,7 +1658,7 @@ class StructureData(Data):
         else:  # 'name' was specified
             old_kind = None
             for existing_kind in _kinds:
-                if existing_kind.name == kwargs['name']:
+                if existing_kind.name == kind.name:
                     old_kind = existing_kind
                     break
             if old_kind is None:
@@ -1523,8 +1674,7 @@ class StructureData(Data):
                                      " (first difference: {})".format(
                         kind.name, firstdiff))
 
-        site = Site(kind_name=kind.name, position=position)
-        self.append_site(site)
+        return kind
 
         # def _set_site_type(self, new_site, reset_type_if_needed):
 
@@ -1622,13 +1772,229 @@ class StructureData(Data):
                 "The StructureData object cannot be modified, "
                 "it has already been stored")
 
+        if self.has_compact_sites():
+            for name in ('positions', 'kind_indices'):
+                self.remove_path('{}.npy'.format(name))
+                self._del_attr('{}{}'.format(self._sites_array_prefix, name))
+
         self._set_attr('sites', [])
 
+    def set_sites_from_arrays(self, symbols, positions, kind_names=None, compact=False):
+        """
+        Replace all the kinds and sites of the structure with those defined
+        by arrays with one element per site. This is much faster than
+        appending the atoms one by one for large structures.
+
+        A kind is created for each distinct kind name, in the order of their
+        first site, with the chemical symbol of its sites.
+
+        The sites can also be stored in a compact way: rather than in the
+        ``sites`` attribute, the positions and the indices of the kinds of
+        the sites are stored as ``.npy`` arrays in the repository, as in
+        :py:class:`~aiida.orm.data.array.ArrayData`. This is much faster to
+        store, load and hash for large structures, but the sites cannot be
+        queried. The :py:attr:`sites` are then created only when accessed.
+
+        :param symbols: the chemical symbols of the sites
+        :param positions: the positions of the sites in angstrom, as an
+            array of shape (number of sites, 3)
+        :param kind_names: the kind names of the sites; if not specified,
+            the chemical symbols are used
+        :param compact: if True, store the sites as arrays
+        :raise ValueError: if the arrays have different lengths, if a
+            position is not finite, or if sites with the same kind name
+            have different chemical symbols
+        """
+        import numpy as np
+        from aiida.common.exceptions import ModificationNotAllowed
+
+        if self.is_stored:
+            raise ModificationNotAllowed(
+                "The StructureData object cannot be modified, "
+                "it has already been stored")
+
+        symbols = np.asarray(symbols)
+        positions = np.asarray(positions, dtype=float)
+        kind_names = symbols if kind_names is None else np.asarray(kind_names)
+
+        if positions.size == 0:
+            positions = positions.reshape(0, 3)
+        if symbols.ndim != 1 or kind_names.shape != symbols.shape:
+            raise ValueError("symbols and kind_names must be lists with one "
+                             "element per site")
+        if positions.shape != (len(symbols), 3):
+            raise ValueError("positions must be an array of shape ({}, 3), "
+                             "it is {}".format(len(symbols), positions.shape))
+        if not np.isfinite(positions).all():
+            raise ValueError("The positions must be finite numbers")
+
+        unique_names, first_indices, inverse = np.unique(
+            kind_names, return_index=True, return_inverse=True)
+        kind_symbols = symbols[first_indices]
+        if not np.array_equal(kind_symbols[inverse], symbols):
+            raise ValueError("Sites with the same kind name must have the "
+                             "same chemical symbol")
+
+        # Kind validates the symbols
+        kind_symbols = kind_symbols.tolist()
+        unique_names = unique_names.tolist()
+        kinds = [Kind(symbols=kind_symbols[i], name=unique_names[i])
+                 for i in np.argsort(first_indices)]
+
+        self.clear_kinds()
+        self._set_attr('kinds', [kind.get_raw() for kind in kinds])
+        self._set_sites_of_kinds(kind_names.tolist(), positions, compact)
+
+    def _set_sites_of_kinds(self, kind_names, positions, compact):
+        """
+        Set the sites of the structure, whose kinds must have been set and
+        whose sites must have been cleared.
+
+        :param kind_names: the list of the kind names of the sites
+        :param positions: the positions of the sites, as an array of shape
+            (number of sites, 3)
+        :param compact: if True, store the sites as arrays in the repository,
+            otherwise in the ``sites`` attribute
+        """
+        import numpy
+
+        positions = numpy.asarray(positions, dtype=numpy.float64).reshape(len(kind_names), 3)
+
+        if compact:
+            kind_indices = {kind_name: index for index, kind_name in enumerate(self.get_kind_names())}
+            self._del_attr('sites')
+            self._set_sites_array('positions', positions)
+            self._set_sites_array('kind_indices', numpy.array(
+                [kind_indices[kind_name] for kind_name in kind_names], dtype=numpy.int64))
+        else:
+            # The values are already plain lists of floats and strings
+            self._set_attr('sites', [
+                {'position': position, 'kind_name': kind_name}
+                for kind_name, position in zip(kind_names, positions.tolist())], clean=False)
+
+    def _set_sites_array(self, name, array):
+        """
+        Store an array of the compact sites as a ``.npy`` file in the
+        repository, as :py:meth:`ArrayData.set_array
+        <aiida.orm.data.array.ArrayData.set_array>` does.
+
+        :param name: the name of the array
+        :param array: the numpy array
+        """
+        import tempfile
+
+        import numpy
+
+        with tempfile.NamedTemporaryFile() as f:
+            numpy.save(f, array)
+            f.flush()
+            self.add_path(f.name, "{}.npy".format(name))
+
+        self._set_attr("{}{}".format(self._sites_array_prefix, name),
+                       list(array.shape))
+
+    def _get_sites_array(self, name, mmap_mode=None):
+        """
+        Return an array of the compact sites. Once the structure is stored,
+        the arrays are cached in the same cache as those of ArrayData.
+
+        :param name: the name of the array
+        :param mmap_mode: if specified, the `mmap_mode` passed to
+            `numpy.load`, and the array is not cached
+        """
+        import numpy
+        from aiida.orm.data.array import ARRAY_CACHE
+
+        fname = self.get_abs_path("{}.npy".format(name))
+        if mmap_mode is not None or not self.is_stored:
+            return numpy.load(fname, mmap_mode=mmap_mode)
+
+        key = (self.uuid, name)
+        array = ARRAY_CACHE.get(key)
+        if array is None:
+            array = numpy.load(fname)
+            ARRAY_CACHE.put(key, array)
+        return array
+
+    def has_compact_sites(self):
+        """
+        Return whether the sites are stored as arrays in the repository
+        rather than in the ``sites`` attribute, see
+        :py:meth:`set_sites_from_arrays`.
+        """
+        return self.get_attr("{}positions".format(self._sites_array_prefix), None) is not None
+
+    def get_site_positions(self):
+        """
+        Return the positions of all the sites.
+
+        :return: a numpy array of shape (number of sites, 3)
+        """
+        import numpy
+
+        if self.has_compact_sites():
+            return numpy.array(self._get_sites_array('positions'))
+
+        return numpy.array([raw_site['position'] for raw_site in self.get_attr('sites', [])],
+                           dtype=numpy.float64).reshape(-1, 3)
+
+    def get_site_kind_indices(self):
+        """
+        Return the indices in the ``kinds`` of the kinds of all the sites.
+
+        :return: a numpy array of integers with one element per site
+        """
+        import numpy
+
+        if self.has_compact_sites():
+            return numpy.array(self._get_sites_array('kind_indices'))
+
+        kind_indices = {kind_name: index for index, kind_name in enumerate(self.get_kind_names())}
+        try:
+            return numpy.array([kind_indices[kind_name] for kind_name in self.get_site_kindnames()],
+                               dtype=numpy.int64)
+        except KeyError as exc:
+            raise ValueError("Kind name {} unknown".format(exc))
+
+    def _get_kinds_index(self):
+        """
+        Return a dictionary with the kinds of the structure by name, in the
+        order of the ``kinds`` attribute.
+
+        For an unstored structure, the same dictionary is returned as long as
+        the ``kinds`` attribute is only extended by ``append_kind``, which
+        adds the new kind to it, so that the kinds are not created again from
+        the attribute every time a site is appended.
+        """
+        from collections import OrderedDict
+
+        raw_kinds = self.get_attr('kinds', [])
+        try:
+            indexed_raw_kinds, kinds_index = self._kinds_index
+        except AttributeError:
+            indexed_raw_kinds, kinds_index = None, None
+
+        if (self.is_stored or indexed_raw_kinds is not raw_kinds or
+                len(kinds_index) != len(raw_kinds)):
+            kinds_index = OrderedDict((kind.name, kind) for kind in (Kind(raw=raw) for raw in raw_kinds))
+            self._kinds_index = (raw_kinds, kinds_index)
+
+        return kinds_index
+
     @property
     def sites(self):
         """
         Returns a list of sites.
+
+        .. note:: If the sites are compact, a read-only
+            :py:class:`SiteArrayView` is returned instead, that creates each
+            site only when it is accessed.
         """
+        if self.has_compact_sites():
+            return SiteArrayView(self._get_sites_array('positions'),
+                                 self._get_sites_array('kind_indices'),
+                                 self.get_kind_names())
+
         try:
             raw_sites = self.get_attr('sites')
         except AttributeError:
@@ -1665,7 +2031,7 @@ class StructureData(Data):
                 self._kinds_cache = {_.name: _ for _ in self.kinds}
                 kinds_dict = self._kinds_cache
         else:
-            kinds_dict = {_.name: _ for _ in self.kinds}
+            kinds_dict = self._get_kinds_index()
 
         # Will raise ValueError if the kind is not present
         try:
@@ -1757,6 +2123,20 @@ class StructureData(Data):
                 raise ValueError(
                     "the new positions should be as many as the previous structure.")
 
+            if self.has_compact_sites():
+                import numpy
+
+                try:
+                    positions = numpy.array(new_positions, dtype=numpy.float64)
+                except ValueError:
+                    raise ValueError("Expecting a list of lists of 3 floats. "
+                                     "Found instead {}".format(new_positions))
+                if positions.shape != (n_sites, 3):
+                    raise ValueError("Expecting a list of lists of length 3. "
+                                     "found instead an array of shape {}".format(positions.shape))
+                self._set_sites_array('positions', positions)
+                return
+
             new_sites = []
             for i in range(n_sites):
                 try:
@@ -1922,13 +2302,29 @@ class StructureData(Data):
         :return: an ase.Atoms object
         """
         import ase
+        import numpy
 
-        asecell = ase.Atoms(cell=self.cell, pbc=self.pbc)
         _kinds = self.kinds
-
-        for site in self.sites:
-            asecell.append(site.get_ase(kinds=_kinds))
-        return asecell
+        kind_indices = self.get_site_kind_indices()
+
+        # The ase atom is only created once for each kind, with the checks
+        # and the tag of Site.get_ase, and then replicated on all the sites
+        symbols = [None] * len(_kinds)
+        masses = numpy.zeros(len(_kinds))
+        tags = numpy.zeros(len(_kinds), dtype=int)
+        for index in numpy.unique(kind_indices).tolist():
+            aseatom = Site(kind_name=_kinds[index].name,
+                           position=[0., 0., 0.]).get_ase(kinds=_kinds)
+            symbols[index] = aseatom.symbol
+            masses[index] = aseatom.mass
+            tags[index] = aseatom.tag
+
+        tags = tags[kind_indices]
+        return ase.Atoms(symbols=[symbols[index] for index in kind_indices.tolist()],
+                         positions=self.get_site_positions(),
+                         masses=masses[kind_indices],
+                         tags=tags if tags.any() else None,
+                         cell=self.cell, pbc=self.pbc)
 
     def _get_object_pymatgen(self,**kwargs):
         """
@@ -1977,39 +2373,41 @@ class StructureData(Data):
             raise ValueError("Periodic boundary conditions must apply in "
                              "all three dimensions of real space")
 
-        species = []
         additional_kwargs = {}
+        site_kind_names = self.get_site_kindnames()
+        # The species are only created once for each kind
+        kind_species = {}
 
         if (kwargs.pop('add_spin',False) and 
             any([n.endswith('1') or n.endswith('2') for n in self.get_kind_names()])):
             # case when spins are defined -> no partial occupancy allowed
             from pymatgen.core.structure import Specie
             oxidation_state = 0 # now I always set the oxidation_state to zero
-            for s in self.sites:
-                k = self.get_kind(s.kind_name)
+            for name in set(site_kind_names):
+                k = self.get_kind(name)
                 if len(k.symbols)!=1 or (len(k.weights)!=1 or sum(k.weights)<1.):
                     raise ValueError("Cannot set partial occupancies and spins "
                                      "at the same time")
-                species.append(Specie(k.symbols[0],oxidation_state,
+                kind_species[name] = Specie(k.symbols[0],oxidation_state,
                                       properties={'spin': -1 if k.name.endswith('1')
-                                            else 1 if k.name.endswith('2') else 0}))
+                                            else 1 if k.name.endswith('2') else 0})
         else:
             # case when no spin are defined
-            for s in self.sites:
-                k = self.get_kind(s.kind_name)
-                species.append({s: w for s, w in zip(k.symbols, k.weights)})
+            for name in set(site_kind_names):
+                k = self.get_kind(name)
+                kind_species[name] = {s: w for s, w in zip(k.symbols, k.weights)}
             if any([create_automatic_kind_name(self.get_kind(name).symbols,self.get_kind(name).weights)!=name
-                    for name in self.get_site_kindnames()]):
+                    for name in kind_species]):
                     # add "kind_name" as a properties to each site, whenever
                     # the kind_name cannot be automatically obtained from the symbols
-                additional_kwargs['site_properties'] = {'kind_name': self.get_site_kindnames()}
+                additional_kwargs['site_properties'] = {'kind_name': site_kind_names}
         
         if kwargs:
             raise ValueError("Unrecognized parameters passed to pymatgen "
                              "converter: {}".format(kwargs.keys()))
 
-        positions = [list(x.position) for x in self.sites]
-        return Structure(self.cell, species, positions,
+        species = [kind_species[name] for name in site_kind_names]
+        return Structure(self.cell, species, self.get_site_positions(),
                          coords_are_cartesian=True,**additional_kwargs)
 
     def _get_object_pymatgen_molecule(self,**kwargs):
@@ -2031,13 +2429,14 @@ class StructureData(Data):
             raise ValueError("Unrecognized parameters passed to pymatgen "
                              "converter: {}".format(kwargs.keys()))
 
-        species = []
-        for s in self.sites:
-            k = self.get_kind(s.kind_name)
-            species.append({s: w for s, w in zip(k.symbols, k.weights)})
+        site_kind_names = self.get_site_kindnames()
+        kind_species = {}
+        for name in set(site_kind_names):
+            k = self.get_kind(name)
+            kind_species[name] = {s: w for s, w in zip(k.symbols, k.weights)}
 
-        positions = [list(x.position) for x in self.sites]
-        return Molecule(species, positions)
+        species = [kind_species[name] for name in site_kind_names]
+        return Molecule(species, self.get_site_positions())
 
 
 class Kind(object):
@@ -2631,5 +3030,39 @@ class Site(object):
                                                   self.position[1],
                                                   self.position[2])
 
+
+class SiteArrayView(Sequence):
+    """
+    A read-only list of the sites of a structure whose sites are stored as
+    arrays, that creates each :py:class:`Site` only when it is accessed.
+    """
+
+    def __init__(self, positions, kind_indices, kind_names):
+        """
+        :param positions: the array of the positions of the sites, of shape
+            (number of sites, 3)
+        :param kind_indices: the array of the indices of the kinds of the sites
+        :param kind_names: the list of the names of the kinds
+        """
+        self._positions = positions
+        self._kind_indices = kind_indices
+        self._kind_names = kind_names
+
+    def __len__(self):
+        return len(self._kind_indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return Site(kind_name=self._kind_names[int(self._kind_indices[index])],
+                    position=self._positions[index].tolist())
+
+    def __iter__(self):
+        for kind_index, position in zip(self._kind_indices.tolist(), self._positions.tolist()):
+            yield Site(kind_name=self._kind_names[kind_index], position=position)
+
+    def __repr__(self):
+        return '<{}: {} sites>'.format(self.__class__.__name__, len(self))
+
 # get_structuredata_from_qeinput has been moved to:
 # aiida.tools.codespecific.quantumespresso.qeinputparser
@@ -40,6 +40,24 @@ class DjangoLogCollection(LogCollection):
 
         return entry
 
+    def create_entries(self, entries):
+        """
+        Create many log entries with a single query
+        """
+        DbLog.objects.bulk_create([
+            DbLog(
+                time=entry['time'],
+                loggername=entry['loggername'],
+                levelname=entry['levelname'],
+                objname=entry['objname'],
+                objpk=entry['objpk'],
+                message=entry.get('message', ""),
+                metadata=json.dumps(entry.get('metadata', None))
+            )
+            for entry in entries
+            if entry.get('objpk', None) is not None and entry.get('objname', None) is not None
+        ])
+
     def find(self, filter_by=None, order_by=None, limit=None):
         """
         Find all entries in the Log collection that confirm to the filter and
@@ -371,6 +371,28 @@ class Node(AbstractNode):
         return DbExtra.del_value_for_node(self._dbnode, key)
         self._increment_version_number_db()
 
+    def _get_db_hash(self):
+        from aiida.backends.djsite.db.models import DbNodeHash
+        if self._dbnode.pk is None:
+            return None
+        try:
+            return DbNodeHash.objects.get(dbnode_id=self._dbnode.pk).hash
+        except ObjectDoesNotExist:
+            return None
+
+    def _set_db_hash(self, hash_):
+        from aiida.backends.djsite.db.models import DbNodeHash
+        if hash_ is None:
+            DbNodeHash.objects.filter(dbnode_id=self._dbnode.pk).delete()
+        else:
+            DbNodeHash.objects.update_or_create(
+                dbnode_id=self._dbnode.pk, defaults={'hash': hash_, 'type': self._dbnode.type})
+
+    def _get_same_node_pks(self, hash_):
+        from aiida.backends.djsite.db.models import DbNodeHash
+        return list(DbNodeHash.objects.filter(hash=hash_, type=self._dbnode.type).order_by(
+            'dbnode_id').values_list('dbnode_id', flat=True))
+
     def _db_iterextras(self):
         from aiida.backends.djsite.db.models import DbExtra
         extraslist = DbExtra.list_all_node_elements(self._dbnode)
@@ -670,6 +692,65 @@ class Node(AbstractNode):
 
         from aiida.backends.djsite.db.models import DbExtra
         # I store the hash without cleaning and without incrementing the nodeversion number
-        DbExtra.set_value_for_node(self._dbnode, _HASH_EXTRA_KEY, self.get_hash())
+        hash_ = self.get_hash()
+        DbExtra.set_value_for_node(self._dbnode, _HASH_EXTRA_KEY, hash_)
+        self._set_db_hash(hash_)
 
         return self
+
+    @classmethod
+    def _db_store_many(cls, nodes, hashes, with_transaction=True):
+        from django.db import connection
+        from aiida.common.utils import EmptyContextManager
+        from aiida.backends.djsite.db.models import DbNode, DbAttribute, DbExtra, DbNodeHash
+
+        if with_transaction:
+            context_man = transaction.atomic()
+        else:
+            context_man = EmptyContextManager()
+
+        dbnodes = [node._dbnode for node in nodes]
+
+        try:
+            with context_man:
+                if connection.vendor == 'postgresql':
+                    # The PKs are taken from the sequence all at once, so that the rows can be inserted in bulk
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                                       [DbNode._meta.db_table, len(dbnodes)])
+                        for dbnode, (pk,) in zip(dbnodes, cursor.fetchall()):
+                            dbnode.pk = pk
+                    DbNode.objects.bulk_create(dbnodes)
+                    for dbnode in dbnodes:
+                        dbnode._state.adding = False
+                        dbnode._state.db = DbNode.objects.db
+                else:
+                    for dbnode in dbnodes:
+                        dbnode.save()
+
+                DbAttribute.bulk_insert_node_rows([
+                    (node.pk,) + row for node in nodes for key, value in node._attrs_cache.items()
+                    for row in DbAttribute.create_value_rows(key, value)])
+                DbExtra.bulk_insert_node_rows([
+                    (node.pk,) + row for node, hash_ in zip(nodes, hashes)
+                    for row in DbExtra.create_value_rows(_HASH_EXTRA_KEY, hash_)])
+                DbNodeHash.objects.bulk_create([
+                    DbNodeHash(dbnode_id=node.pk, hash=hash_, type=node._dbnode.type)
+                    for node, hash_ in zip(nodes, hashes) if hash_ is not None])
+
+                # The input nodes are stored or in the batch, which has no loops, and the nodes have no outputs yet
+                DbLink.objects.bulk_create([
+                    DbLink(input_id=src.pk, output_id=node.pk, label=label, type=link_type.value)
+                    for node in nodes for label, (src, link_type) in node._inputlinks_cache.items()])
+        except:
+            for dbnode in dbnodes:
+                dbnode.pk = None
+                dbnode._state.adding = True
+            raise
+
+        for node in nodes:
+            # This should not be used anymore: I delete it to
+            # possibly free memory
+            del node._attrs_cache
+            node._to_be_stored = False
+            node._inputlinks_cache.clear()
@@ -35,6 +35,7 @@ class AbstractCalculation(Sealable):
     """
 
     CHECKPOINT_KEY = 'checkpoints'
+    CHECKPOINT_DELTA_KEY = 'checkpoints_delta'
     EXCEPTION_KEY = 'exception'
     EXIT_MESSAGE_KEY = 'exit_message'
     EXIT_STATUS_KEY = 'exit_status'
@@ -52,6 +53,7 @@ class AbstractCalculation(Sealable):
         return super(AbstractCalculation, cls)._updatable_attributes + (
             cls.PROCESS_PAUSED_KEY,
             cls.CHECKPOINT_KEY,
+            cls.CHECKPOINT_DELTA_KEY,
             cls.EXCEPTION_KEY,
             cls.EXIT_MESSAGE_KEY,
             cls.EXIT_STATUS_KEY,
@@ -431,21 +433,52 @@ class AbstractCalculation(Sealable):
 
     def set_checkpoint(self, checkpoint):
         """
-        Set the checkpoint bundle set for the Calculation
+        Set the checkpoint bundle set for the Calculation, deleting the delta checkpoint set against the previous one
+
+        .. note:: the new checkpoint is set before the delta is deleted, such that there is always a checkpoint
 
         :param state: string representation of the stepper state info
         """
-        return self._set_attr(self.CHECKPOINT_KEY, checkpoint)
+        result = self._set_attr(self.CHECKPOINT_KEY, checkpoint)
+        self._del_checkpoint_delta()
+        return result
+
+    @property
+    def checkpoint_delta(self):
+        """
+        Return the delta checkpoint set for the Calculation, with the changes since the checkpoint
+
+        :returns: delta checkpoint if it exists, None otherwise
+        """
+        return self.get_attr(self.CHECKPOINT_DELTA_KEY, None)
+
+    def set_checkpoint_delta(self, checkpoint_delta):
+        """
+        Set the delta checkpoint for the Calculation, with the changes since the checkpoint
+
+        :param checkpoint_delta: string representation of the changes of the stepper state info
+        """
+        return self._set_attr(self.CHECKPOINT_DELTA_KEY, checkpoint_delta)
 
     def del_checkpoint(self):
         """
         Delete the checkpoint bundle set for the Calculation
         """
+        self._del_checkpoint_delta()
         try:
             self._del_attr(self.CHECKPOINT_KEY)
         except AttributeError:
             pass
 
+    def _del_checkpoint_delta(self):
+        """
+        Delete the delta checkpoint set for the Calculation
+        """
+        try:
+            self._del_attr(self.CHECKPOINT_DELTA_KEY)
+        except AttributeError:
+            pass
+
     @property
     def paused(self):
         """
@@ -34,6 +34,9 @@ from aiida.plugins.loader import get_query_type_from_type_string, get_type_strin
 _NO_DEFAULT = tuple()
 _HASH_EXTRA_KEY = '_aiida_hash'
 
+# The number of threads that move the repository folders of the nodes stored by `store_many`
+STORE_FOLDER_WORKERS = 4
+
 
 def clean_value(value):
     """
@@ -1693,25 +1696,186 @@ class AbstractNode(object):
                 self._db_store(with_transaction)
 
             # Set up autogrouping used by verdi run
-            from aiida.orm.autogroup import current_autogroup, Autogroup, VERDIAUTOGROUP_TYPE
-            from aiida.orm import Group
-
-            if current_autogroup is not None:
-                if not isinstance(current_autogroup, Autogroup):
-                    raise ValidationError(
-                        "current_autogroup is not an AiiDA Autogroup")
-
-                if current_autogroup.is_to_be_grouped(self):
-                    group_name = current_autogroup.get_group_name()
-                    if group_name is not None:
-                        g = Group.get_or_create(
-                            name=group_name, type_string=VERDIAUTOGROUP_TYPE)[0]
-                        g.add_nodes(self)
+            self._add_to_autogroup([self])
 
         # This is useful because in this way I can do
         # n = Node().store()
         return self
 
+    @classmethod
+    def store_many(cls, nodes, with_transaction=True, use_cache=None):
+        """
+        Store many new nodes at once: the rows of the nodes, of their attributes and of their cached input links are
+        inserted with multi-row statements in a single transaction, the PKs are assigned in bulk, and the repository
+        folders are moved in parallel.
+
+        The input nodes of all nodes must be stored already, or be new nodes of the same call: the nodes are stored
+        in an order where the input nodes come first. Nodes that are already stored are skipped. Nodes for which an
+        equivalent node is found in the cache, and nodes whose class overrides `store`, are stored one by one with
+        `store` instead.
+
+        :param nodes: the nodes to store
+        :parameter with_transaction: if False, no transaction is used. This
+          is meant to be used ONLY if the outer calling function has already
+          a transaction open!
+        :param use_cache: Determines whether caching is used to find an equivalent node.
+        :return: the list of nodes
+        :raise ModificationNotAllowed: if one of the nodes has an input node that is neither stored nor in `nodes`
+        :raise ValueError: if the links between the new nodes form a loop
+        """
+        nodes = list(nodes)
+        new_nodes = {id(node): node for node in nodes if node._to_be_stored}
+
+        for node in new_nodes.values():
+            node._validate()
+            # Raises if the node has unstored input nodes that are not stored with it
+            for label, (parent, _) in node._inputlinks_cache.items():
+                if not parent.is_stored and id(parent) not in new_nodes:
+                    raise ModificationNotAllowed(
+                        "Cannot store the input link '{}' because the source node is not stored and is not one of "
+                        "the nodes to store".format(label))
+
+        to_store = []
+        for node in cls._sort_by_links(nodes, new_nodes):
+            node_use_cache = get_use_cache(type(node)) if use_cache is None else use_cache
+            if (six.get_unbound_function(type(node).store) is not six.get_unbound_function(AbstractNode.store) or
+                    (node_use_cache and node._get_same_node() is not None)):
+                # The input nodes that wait to be stored in bulk have to be stored first
+                if any(not parent.is_stored for parent, _ in node._inputlinks_cache.values()):
+                    cls._store_in_bulk(to_store, with_transaction=with_transaction)
+                    to_store = []
+                node.store(with_transaction=with_transaction, use_cache=use_cache)
+            else:
+                to_store.append(node)
+
+        cls._store_in_bulk(to_store, with_transaction=with_transaction)
+
+        return nodes
+
+    @staticmethod
+    def _sort_by_links(nodes, new_nodes):
+        """
+        Return the new nodes in the order of `nodes`, except that the input nodes that are new come before the nodes
+        they are linked to.
+
+        :param nodes: the nodes
+        :param new_nodes: the new nodes, by their id
+        :return: the list of new nodes, sorted
+        :raise ValueError: if the links between the new nodes form a loop
+        """
+        sorted_nodes = []
+        done = set()
+        visiting = set()
+
+        def visit(node):
+            if id(node) in done:
+                return
+            if id(node) in visiting:
+                raise ValueError('The links between the nodes to store form a loop')
+            visiting.add(id(node))
+            for parent, _ in node._inputlinks_cache.values():
+                if id(parent) in new_nodes:
+                    visit(parent)
+            visiting.remove(id(node))
+            done.add(id(node))
+            sorted_nodes.append(node)
+
+        for node in nodes:
+            if id(node) in new_nodes:
+                visit(node)
+
+        return sorted_nodes
+
+    @classmethod
+    def _store_in_bulk(cls, nodes, with_transaction=True):
+        """
+        Store new nodes whose input nodes are stored or among the nodes, with `_db_store_many`.
+
+        :param nodes: the nodes, sorted so that the input nodes come first
+        :parameter with_transaction: if False, no transaction is used. This
+          is meant to be used ONLY if the outer calling function has already
+          a transaction open!
+        """
+        if not nodes:
+            return
+
+        # The hashes are computed while the attributes are still in memory
+        hashes = [node.get_hash() for node in nodes]
+
+        # NOTE: as in `store`, the files are moved first, and only if this is successful the DB entries are stored
+        cls._replace_folders(nodes, to_repository=True)
+        try:
+            cls._db_store_many(nodes, hashes, with_transaction=with_transaction)
+        except:
+            # I put back the files in the sandbox folders since the
+            # transaction did not succeed
+            cls._replace_folders(nodes, to_repository=False)
+            raise
+
+        for node in nodes:
+            node._temp_folder = None
+
+        cls._add_to_autogroup(nodes)
+
+    @staticmethod
+    def _replace_folders(nodes, to_repository):
+        """
+        Move the sandbox folders of the nodes to the repository, or back, with a pool of threads.
+
+        :param nodes: the nodes
+        :param to_repository: if True the sandbox folders are moved to the repository, otherwise back
+        """
+        from multiprocessing.pool import ThreadPool
+
+        def replace_folder(node):
+            if to_repository:
+                node._repository_folder.replace_with_folder(node._get_temp_folder().abspath, move=True, overwrite=True)
+            else:
+                node._get_temp_folder().replace_with_folder(node._repository_folder.abspath, move=True, overwrite=True)
+
+        pool = ThreadPool(min(STORE_FOLDER_WORKERS, len(nodes)))
+        try:
+            pool.map(replace_folder, nodes)
+        finally:
+            pool.terminate()
+
+    @abstractclassmethod
+    def _db_store_many(cls, nodes, hashes, with_transaction=True):
+        """
+        Store new nodes in the DB in a single transaction, with their attributes, their cached input links, the
+        given hashes and the `_aiida_hash` extra. The repository folders have already been moved.
+
+        :param nodes: the nodes to store in bulk
+        :param hashes: the hashes of the nodes
+        :parameter with_transaction: if False, no transaction is used. This
+          is meant to be used ONLY if the outer calling function has already
+          a transaction open!
+        """
+        pass
+
+    @staticmethod
+    def _add_to_autogroup(nodes):
+        """
+        Add the stored nodes to the current autogroup used by verdi run, if any.
+
+        :param nodes: the nodes
+        """
+        from aiida.orm.autogroup import current_autogroup, Autogroup, VERDIAUTOGROUP_TYPE
+        from aiida.orm import Group
+
+        if current_autogroup is not None:
+            if not isinstance(current_autogroup, Autogroup):
+                raise ValidationError(
+                    "current_autogroup is not an AiiDA Autogroup")
+
+            nodes = [node for node in nodes if current_autogroup.is_to_be_grouped(node)]
+            if nodes:
+                group_name = current_autogroup.get_group_name()
+                if group_name is not None:
+                    g = Group.get_or_create(
+                        name=group_name, type_string=VERDIAUTOGROUP_TYPE)[0]
+                    g.add_nodes(nodes)
+
     def _store_from_cache(self, cache_node, with_transaction):
         from aiida.orm.mixins import Sealable
         assert self.type == cache_node.type
@@ -1774,9 +1938,18 @@ class AbstractNode(object):
     def get_hash(self, ignore_errors=True, **kwargs):
         """
         Making a hash based on my attributes
+
+        For stored nodes, the digests of the files in the repository folder are memoized in the cache directory of the
+        profile, such that files that did not change since the last time the hash was computed are not read again.
         """
-        from aiida.common.hashing import make_hash
+        from aiida.common.hashing import make_hash, FileDigestMemo
+        from aiida.common.profile import get_hash_memo_filepath
         try:
+            if self.is_stored and 'file_digest_memo' not in kwargs:
+                file_digest_memo = FileDigestMemo(self.folder.abspath, get_hash_memo_filepath(self.uuid))
+                hash_ = make_hash(self._get_objects_to_hash(), file_digest_memo=file_digest_memo, **kwargs)
+                file_digest_memo.save()
+                return hash_
             return make_hash(self._get_objects_to_hash(), **kwargs)
         except Exception as e:
             if ignore_errors:
@@ -1804,17 +1977,60 @@ class AbstractNode(object):
             computer.uuid if computer is not None else None
         ]
 
-    def rehash(self):
+    def rehash(self, incremental=False):
         """
         Re-generates the stored hash of the Node.
+
+        :param incremental: if True, the stored hash is only updated if it differs from the newly computed one
+        :return: True if the stored hash was updated, False otherwise
         """
-        self.set_extra(_HASH_EXTRA_KEY, self.get_hash())
+        hash_ = self.get_hash()
+
+        if incremental and self._get_db_hash() == hash_ and self.get_extra(_HASH_EXTRA_KEY, None) == hash_:
+            return False
+
+        self.set_extra(_HASH_EXTRA_KEY, hash_)
+        self._set_db_hash(hash_)
+        return True
 
     def clear_hash(self):
         """
         Sets the stored hash of the Node to None.
         """
         self.set_extra(_HASH_EXTRA_KEY, None)
+        self._set_db_hash(None)
+
+    @abstractmethod
+    def _get_db_hash(self):
+        """
+        Return the hash of the node stored in the indexed hash table of the DB.
+
+        :return: the hash or None if no hash is stored
+        """
+        pass
+
+    @abstractmethod
+    def _set_db_hash(self, hash_):
+        """
+        Store the hash of the node in the indexed hash table of the DB, where it is used to find the nodes that can be
+        used as a cache. The `_aiida_hash` extra is not modified.
+
+        DO NOT USE DIRECTLY.
+
+        :param hash_: the hash, if None the stored hash is removed
+        """
+        pass
+
+    @abstractmethod
+    def _get_same_node_pks(self, hash_):
+        """
+        Return the pks of the stored nodes with the same type as the current node and the given hash, looked up in the
+        indexed hash table of the DB.
+
+        :param hash_: the hash
+        :return: list of pks, in ascending order
+        """
+        pass
 
     def _get_same_node(self):
         """
@@ -1848,10 +2064,9 @@ class AbstractNode(object):
         if not hash_:
             return iter(())
 
-        from aiida.orm.querybuilder import QueryBuilder
-        qb = QueryBuilder()
-        qb.append(self.__class__, filters={'extras._aiida_hash': hash_}, project='*', subclassing=False)
-        same_nodes = (n[0] for n in qb.iterall())
+        from aiida.orm.utils import load_node
+        # The nodes are only loaded when iterating, since usually only the first valid cache is needed
+        same_nodes = (load_node(pk=pk) for pk in self._get_same_node_pks(hash_))
         return (n for n in same_nodes if n._is_valid_cache())
 
     def _is_valid_cache(self):
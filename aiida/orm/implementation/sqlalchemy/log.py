@@ -42,6 +42,33 @@ class SqlaLogCollection(LogCollection):
 
         return entry
 
+    def create_entries(self, entries):
+        """
+        Create many log entries with a single commit.
+
+        The session of the calling thread is used, such that entries can be
+        stored from a thread other than the one that imported this module.
+        """
+        thread_session = get_scoped_session()
+        try:
+            thread_session.add_all([
+                DbLog(
+                    time=entry['time'],
+                    loggername=entry['loggername'],
+                    levelname=entry['levelname'],
+                    objname=entry['objname'],
+                    objpk=entry['objpk'],
+                    message=entry.get('message', ""),
+                    metadata=entry.get('metadata', None)
+                )
+                for entry in entries
+                if entry.get('objpk', None) is not None and entry.get('objname', None) is not None
+            ])
+            thread_session.commit()
+        except Exception:
+            thread_session.rollback()
+            raise
+
     def find(self, filter_by=None, order_by=None, limit=None):
         """
         Find all entries in the Log collection that confirm to the filter and
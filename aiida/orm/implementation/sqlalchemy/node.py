@@ -414,6 +414,38 @@ class Node(AbstractNode):
             session.rollback()
             raise
 
+    def _get_db_hash(self):
+        from aiida.backends.sqlalchemy.models.node import DbNodeHash
+        if self._dbnode.id is None:
+            return None
+        dbhash = DbNodeHash.query.filter_by(dbnode_id=self._dbnode.id).first()
+        return dbhash.hash if dbhash is not None else None
+
+    def _set_db_hash(self, hash_):
+        from aiida.backends.sqlalchemy import get_scoped_session
+        from aiida.backends.sqlalchemy.models.node import DbNodeHash
+
+        session = get_scoped_session()
+        try:
+            dbhash = DbNodeHash.query.filter_by(dbnode_id=self._dbnode.id).first()
+            if hash_ is None:
+                if dbhash is not None:
+                    dbhash.delete()
+            else:
+                if dbhash is None:
+                    dbhash = DbNodeHash(dbnode_id=self._dbnode.id)
+                dbhash.hash = hash_
+                dbhash.type = self._dbnode.type
+                dbhash.save()
+        except:
+            session.rollback()
+            raise
+
+    def _get_same_node_pks(self, hash_):
+        from aiida.backends.sqlalchemy.models.node import DbNodeHash
+        query = DbNodeHash.query.filter_by(hash=hash_, type=self._dbnode.type).order_by(DbNodeHash.dbnode_id)
+        return [dbnode_id for dbnode_id, in query.with_entities(DbNodeHash.dbnode_id)]
+
     def _db_iterextras(self):
         extras = self._extras()
         if extras is None:
@@ -708,9 +740,62 @@ class Node(AbstractNode):
             self._get_temp_folder().replace_with_folder(self._repository_folder.abspath, move=True, overwrite=True)
             raise
 
-        self._dbnode.set_extra(_HASH_EXTRA_KEY, self.get_hash())
+        hash_ = self.get_hash()
+        self._dbnode.set_extra(_HASH_EXTRA_KEY, hash_)
+        self._set_db_hash(hash_)
         return self
 
+    @classmethod
+    def _db_store_many(cls, nodes, hashes, with_transaction=True):
+        from sqlalchemy import text
+        from aiida.backends.sqlalchemy import get_scoped_session
+        from aiida.backends.sqlalchemy.models.node import DbNodeHash
+
+        session = get_scoped_session()
+
+        try:
+            # The PKs are taken from the sequence all at once, so that the rows are inserted with a single executemany
+            # instead of one INSERT ... RETURNING per node
+            pks = session.execute(
+                text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+                {'table': DbNode.__tablename__, 'count': len(nodes)}).fetchall()
+
+            for node, (pk,), hash_ in zip(nodes, pks, hashes):
+                dbnode = node._dbnode
+                dbnode.id = pk
+                # Save its attributes 'manually' without incrementing
+                # the version for each add.
+                dbnode.attributes = node._attrs_cache
+                dbnode.extras = dict(dbnode.extras or {}, **{_HASH_EXTRA_KEY: hash_})
+
+            session.add_all([node._dbnode for node in nodes])
+            session.flush()
+
+            session.add_all([
+                DbNodeHash(dbnode_id=node.pk, hash=hash_, type=node._dbnode.type)
+                for node, hash_ in zip(nodes, hashes) if hash_ is not None])
+            # The input nodes are stored or in the batch, which has no loops, and the nodes have no outputs yet
+            session.add_all([
+                DbLink(input_id=src.pk, output_id=node.pk, label=label, type=link_type.value)
+                for node in nodes for label, (src, link_type) in node._inputlinks_cache.items()])
+            session.flush()
+
+            if with_transaction:
+                session.commit()
+        except:
+            if with_transaction:
+                session.rollback()
+            for node in nodes:
+                node._dbnode.id = None
+            raise
+
+        for node in nodes:
+            # This should not be used anymore: I delete it to
+            # possibly free memory
+            del node._attrs_cache
+            node._to_be_stored = False
+            node._inputlinks_cache.clear()
+
     @property
     def uuid(self):
         return six.text_type(self._dbnode.uuid)
@@ -13,9 +13,12 @@ from __future__ import print_function
 import sys
 
 import six
-from six.moves import zip
+from six.moves import zip, range
 from six.moves.html_parser import HTMLParser
 from aiida.common import exceptions
+from aiida.common.archive import (ArchiveDataReader, ArchiveDataWriter,
+                                  DEFAULT_RECORDS_PER_FILE, GROUPS_SECTION,
+                                  LINKS_SECTION, NODE_ATTRIBUTES_SECTION)
 from aiida.common.utils import (export_shard_uuid, get_class_string,
                                 get_object_from_string, grouper)
 from aiida.orm.computer import Computer
@@ -311,52 +314,138 @@ def deserialize_field(k, v, fields_info, import_unique_ids_mappings,
             return ("{}_id".format(k), None)
 
 
+# The number of records of the archive that are imported in a single batch
+IMPORT_BATCH_SIZE = 1000
+
+
+def unique_id_to_string(unique_id):
+    """
+    Return the unique identifier of an entry as found in the export file,
+    converting the UUID instances returned by some database fields.
+    """
+    from uuid import UUID
+
+    if isinstance(unique_id, UUID):
+        return str(unique_id)
+
+    return unique_id
+
+
+def get_unknown_node_uuids(reader):
+    """
+    Return the UUIDs of the nodes that are referred to by the links and the
+    groups of an archive, but that are neither in the archive nor in the
+    database.
+
+    :param reader: the :py:class:`ArchiveDataReader <aiida.common.archive.ArchiveDataReader>`
+        of the archive
+    :return: set of node UUIDs
+    """
+    from aiida.orm.querybuilder import QueryBuilder
+
+    # Only the UUIDs are kept in memory, not the entries themselves
+    import_nodes_uuid = set(fields['uuid'] for _, fields in
+                            reader.iter_records(NODE_ENTITY_NAME))
+
+    referred_nodes_uuid = set()
+    for link in reader.iter_records(LINKS_SECTION):
+        for node_uuid in (link['input'], link['output']):
+            if node_uuid not in import_nodes_uuid:
+                referred_nodes_uuid.add(node_uuid)
+    for _, node_uuids in reader.iter_records(GROUPS_SECTION):
+        referred_nodes_uuid.update(node_uuid for node_uuid in node_uuids
+                                   if node_uuid not in import_nodes_uuid)
+
+    # Check that UUIDs are valid, only those can be in the database
+    db_nodes_uuid = set()
+    for node_uuids in grouper(IMPORT_BATCH_SIZE, [node_uuid for node_uuid in referred_nodes_uuid
+                                                  if validate_uuid(node_uuid)]):
+        qb = QueryBuilder()
+        qb.append(Node, filters={'uuid': {'in': node_uuids}}, project=['uuid'])
+        db_nodes_uuid.update(str(res[0]) for res in qb.iterall())
+
+    return referred_nodes_uuid - db_nodes_uuid
+
+
+def get_import_unique_ids_mappings(reader, metadata, model_order):
+    """
+    Return the mappings from the pks in the archive to the unique identifiers,
+    for the entities that the entries of other entities refer to.
+
+    :param reader: the :py:class:`ArchiveDataReader <aiida.common.archive.ArchiveDataReader>`
+        of the archive
+    :param metadata: the content of the metadata file of the archive
+    :param model_order: the names of the entities in the order of import
+    :return: nested dictionary entity_name:{pk:unique_id}, e.g.
+        {u'User': {1: u'aiida@localhost'}}
+    """
+    required_entity_names = set(
+        field['requires'] for entity_name in model_order
+        for field in metadata['all_fields_info'].get(entity_name, {}).values()
+        if 'requires' in field)
+
+    import_unique_ids_mappings = {}
+    for entity_name in required_entity_names:
+        unique_identifier = metadata['unique_identifiers'][entity_name]
+        import_unique_ids_mappings[entity_name] = {
+            pk: fields[unique_identifier] for pk, fields in
+            reader.iter_records(entity_name)}
+
+    return import_unique_ids_mappings
+
+
 def import_data(in_path, ignore_unknown_nodes=False,
-                silent=False):
+                silent=False, copy_workers=None):
     from aiida.backends.settings import BACKEND
     from aiida.backends.profile import BACKEND_DJANGO, BACKEND_SQLA
 
     if BACKEND == BACKEND_SQLA:
         return import_data_sqla(in_path, ignore_unknown_nodes=ignore_unknown_nodes,
-                                silent=silent)
+                                silent=silent, copy_workers=copy_workers)
     elif BACKEND == BACKEND_DJANGO:
         return import_data_dj(in_path, ignore_unknown_nodes=ignore_unknown_nodes,
-                              silent=silent)
+                              silent=silent, copy_workers=copy_workers)
     else:
         raise Exception("Unknown settings.BACKEND: {}".format(
             BACKEND))
 
 
 def import_data_dj(in_path, ignore_unknown_nodes=False,
-                   silent=False):
+                   silent=False, copy_workers=None):
     """
     Import exported AiiDA environment to the AiiDA database.
     If the 'in_path' is a folder, calls export_tree; otherwise, tries to
     detect the compression format (zip, tar.gz, tar.bz2, ...) and calls the
     correct function.
 
+    The entries, attributes, links and group memberships are read and
+    stored in batches of IMPORT_BATCH_SIZE records.
+
     :param in_path: the path to a file or folder that can be imported in AiiDA
+    :param copy_workers: the number of threads that move the repository
+        folders of the nodes; by default the `export.copy_workers` property
     """
     import json
     import os
     import tarfile
     import zipfile
-    from itertools import chain
 
     from django.db import transaction
+    from django.db.models import Max
     from aiida.utils import timezone
 
     from aiida.orm import Node, Group
-    from aiida.common.archive import extract_tree, extract_tar, extract_zip, extract_cif
+    from aiida.common.archive import (extract_tree, extract_tar, extract_zip,
+                                      extract_cif, restore_duplicate_files)
     from aiida.common.links import LinkType
     from aiida.common.exceptions import UniquenessError
-    from aiida.common.folders import SandboxFolder, RepositoryFolder
+    from aiida.common.folders import SandboxFolder
     from aiida.backends.djsite.db import models
     from aiida.common.utils import get_class_string, get_object_from_string
     from aiida.common.datastructures import calc_states
 
-    # This is the export version expected by this function
-    expected_export_version = '0.3'
+    # These are the export versions expected by this function
+    expected_export_versions = ('0.3', '0.4')
 
     # The name of the subfolder in which the node files are stored
     nodes_export_subfolder = 'nodes'
@@ -398,48 +487,33 @@ def import_data_dj(in_path, ignore_unknown_nodes=False,
         try:
             with open(folder.get_abs_path('metadata.json')) as f:
                 metadata = json.load(f)
-
-            with open(folder.get_abs_path('data.json')) as f:
-                data = json.load(f)
         except IOError as e:
             raise ValueError("Unable to find the file {} in the import "
                              "file or folder".format(e.filename))
 
+        # The data is read record by record, from the JSON Lines files of the
+        # streaming format or from the single data file of the previous format
+        reader = ArchiveDataReader(folder, metadata)
+        if not reader.is_streaming and not os.path.isfile(folder.get_abs_path('data.json')):
+            raise ValueError("Unable to find the file {} in the import "
+                             "file or folder".format(folder.get_abs_path('data.json')))
+
         ######################
         # PRELIMINARY CHECKS #
         ######################
-        if metadata['export_version'] != expected_export_version:
+        if metadata['export_version'] not in expected_export_versions:
             raise exceptions.IncompatibleArchiveVersionError('Archive schema version {} is incompatible with the '
-                'currently supported schema version {}'.format(metadata['export_version'], expected_export_version))
+                'currently supported schema versions {}'.format(metadata['export_version'],
+                                                               ', '.join(expected_export_versions)))
+
+        # The files left out of the archive as duplicates are copied back
+        # before any node folder is moved into the repository
+        restore_duplicate_files(folder, metadata)
 
         ##########################################################################
         # CREATE UUID REVERSE TABLES AND CHECK IF I HAVE ALL NODES FOR THE LINKS #
         ##########################################################################
-        linked_nodes = set(chain.from_iterable((l['input'], l['output'])
-                                               for l in data['links_uuid']))
-        group_nodes = set(chain.from_iterable(six.itervalues(data['groups_uuid'])))
-
-        # I preload the nodes, I need to check each of them later, and I also
-        # store them in a reverse table
-        # I break up the query due to SQLite limitations..
-        relevant_db_nodes = {}
-        for group in grouper(999, linked_nodes):
-            relevant_db_nodes.update({n.uuid: n for n in
-                                      models.DbNode.objects.filter(
-                                          uuid__in=group)})
-
-        db_nodes_uuid = set(relevant_db_nodes.keys())
-        # ~ dbnode_model = get_class_string(models.DbNode)
-        # ~ print(dbnode_model)
-        if NODE_ENTITY_NAME in data['export_data']:
-            import_nodes_uuid = set(v['uuid'] for v in data['export_data'][NODE_ENTITY_NAME].values())
-        else:
-            import_nodes_uuid = set()
-
-        # the combined set of linked_nodes and group_nodes was obtained from looking at all the links
-        # the combined set of db_nodes_uuid and import_nodes_uuid was received from the staff actually referred to in export_data
-        unknown_nodes = linked_nodes.union(group_nodes) - db_nodes_uuid.union(
-            import_nodes_uuid)
+        unknown_nodes = get_unknown_node_uuids(reader)
 
         if unknown_nodes and not ignore_unknown_nodes:
             raise ValueError(
@@ -485,13 +559,8 @@ def import_data_dj(in_path, ignore_unknown_nodes=False,
         ###################################################
         # CREATE IMPORT DATA DIRECT UNIQUE_FIELD MAPPINGS #
         ###################################################
-        import_unique_ids_mappings = {}
-        for model_name, import_data in data['export_data'].items():
-            if model_name in metadata['unique_identifiers']:
-                # I have to reconvert the pk to integer
-                import_unique_ids_mappings[model_name] = {
-                    int(k): v[metadata['unique_identifiers'][model_name]] for k, v in
-                    import_data.items()}
+        import_unique_ids_mappings = get_import_unique_ids_mappings(
+            reader, metadata, model_order)
 
         ###############
         # IMPORT DATA #
@@ -499,285 +568,277 @@ def import_data_dj(in_path, ignore_unknown_nodes=False,
         # DO ALL WITH A TRANSACTION
         with transaction.atomic():
             foreign_ids_reverse_mappings = {}
-            new_entries = {}
-            existing_entries = {}
+            # The new pk of the new nodes, per import pk, to store their
+            # attributes once all nodes are stored
+            new_node_pks = {}
 
-            # I first generate the list of data
+            # I import data from the given model
             for model_name in model_order:
                 cls_signature = entity_names_to_signatures[model_name]
                 Model = get_object_from_string(cls_signature)
+                # Model = get_object_from_string(model_name)
                 fields_info = metadata['all_fields_info'].get(model_name, {})
                 unique_identifier = metadata['unique_identifiers'].get(
                     model_name, None)
 
-                new_entries[model_name] = {}
-                existing_entries[model_name] = {}
-
                 foreign_ids_reverse_mappings[model_name] = {}
+                dupl_counter = 0
+                imported_comp_names = set()
 
                 # Not necessarily all models are exported
-                if model_name in data['export_data']:
+                for batch in reader.iter_batches(model_name, IMPORT_BATCH_SIZE):
+                    new_entries = {}
+                    existing_entries = {}
 
                     if unique_identifier is not None:
-                        import_unique_ids = set(v[unique_identifier] for v in
-                                                data['export_data'][model_name].values())
+                        import_unique_ids = set(v[unique_identifier] for _, v in batch)
 
-                        relevant_db_entries = {getattr(n, unique_identifier): n
-                                               for n in Model.objects.filter(
+                        relevant_db_entries = dict(Model.objects.filter(
                             **{'{}__in'.format(unique_identifier):
-                                   import_unique_ids})}
+                                   import_unique_ids}).values_list(unique_identifier, 'pk'))
 
-                        foreign_ids_reverse_mappings[model_name] = {
-                            k: v.pk for k, v in relevant_db_entries.items()}
-                        for k, v in data['export_data'][model_name].items():
-                            if v[unique_identifier] in relevant_db_entries.keys():
+                        for unique_id, existing_pk in relevant_db_entries.items():
+                            foreign_ids_reverse_mappings[model_name][unique_id_to_string(unique_id)] = existing_pk
+                        for k, v in batch:
+                            if v[unique_identifier] in foreign_ids_reverse_mappings[model_name]:
                                 # Already in DB
-                                existing_entries[model_name][k] = v
+                                existing_entries[k] = v
                             else:
                                 # To be added
-                                new_entries[model_name][k] = v
+                                new_entries[k] = v
                     else:
-                        new_entries[model_name] = data['export_data'][model_name].copy()
-
-            # I import data from the given model
-            for model_name in model_order:
-                cls_signature = entity_names_to_signatures[model_name]
-                Model = get_object_from_string(cls_signature)
-                # Model = get_object_from_string(model_name)
-                fields_info = metadata['all_fields_info'].get(model_name, {})
-                unique_identifier = metadata['unique_identifiers'].get(
-                    model_name, None)
-
-                for import_entry_id, entry_data in existing_entries[model_name].items():
-                    unique_id = entry_data[unique_identifier]
-                    existing_entry_id = foreign_ids_reverse_mappings[model_name][unique_id]
-                    # TODO COMPARE, AND COMPARE ATTRIBUTES
-                    if model_name not in ret_dict:
-                        ret_dict[model_name] = {'new': [], 'existing': []}
-                    ret_dict[model_name]['existing'].append((import_entry_id,
-                                                             existing_entry_id))
-                    if not silent:
-                        print("existing %s: %s (%s->%s)" % (model_name, unique_id,
-                                                            import_entry_id,
-                                                            existing_entry_id))
-                        # print("  `-> WARNING: NO DUPLICITY CHECK DONE!")
-                        # CHECK ALSO FILES!
-
-                # Store all objects for this model in a list, and store them
-                # all in once at the end.
-                objects_to_create = []
-                # This is needed later to associate the import entry with the new pk
-                import_entry_ids = {}
-                dupl_counter = 0
-                imported_comp_names = set()
-                for import_entry_id, entry_data in new_entries[model_name].items():
-                    unique_id = entry_data[unique_identifier]
-                    import_data = dict(deserialize_field(
-                        k, v, fields_info=fields_info,
-                        import_unique_ids_mappings=import_unique_ids_mappings,
-                        foreign_ids_reverse_mappings=foreign_ids_reverse_mappings)
-                                       for k, v in entry_data.items())
-
-                    if Model is models.DbComputer:
-                        # Check if there is already a computer with the same
-                        # name in the database
-                        dupl = (Model.objects.filter(name=import_data['name'])
-                                or import_data['name'] in imported_comp_names)
-                        orig_name = import_data['name']
-                        while dupl:
-                            # Rename the new computer
-                            import_data['name'] = (
-                                    orig_name +
-                                    COMP_DUPL_SUFFIX.format(dupl_counter))
-                            dupl_counter += 1
-                            dupl = (
-                                    Model.objects.filter(name=import_data['name'])
+                        new_entries = dict(batch)
+
+                    for import_entry_id, entry_data in existing_entries.items():
+                        unique_id = entry_data[unique_identifier]
+                        existing_entry_id = foreign_ids_reverse_mappings[model_name][unique_id]
+                        # TODO COMPARE, AND COMPARE ATTRIBUTES
+                        if model_name not in ret_dict:
+                            ret_dict[model_name] = {'new': [], 'existing': []}
+                        ret_dict[model_name]['existing'].append((import_entry_id,
+                                                                 existing_entry_id))
+                        if not silent:
+                            print("existing %s: %s (%s->%s)" % (model_name, unique_id,
+                                                                import_entry_id,
+                                                                existing_entry_id))
+                            # print("  `-> WARNING: NO DUPLICITY CHECK DONE!")
+                            # CHECK ALSO FILES!
+
+                    # Store all objects of this batch in a list, and store them
+                    # all in once at the end.
+                    objects_to_create = []
+                    # This is needed later to associate the import entry with the new pk
+                    import_entry_ids = {}
+                    for import_entry_id, entry_data in new_entries.items():
+                        unique_id = entry_data[unique_identifier]
+                        import_data = dict(deserialize_field(
+                            k, v, fields_info=fields_info,
+                            import_unique_ids_mappings=import_unique_ids_mappings,
+                            foreign_ids_reverse_mappings=foreign_ids_reverse_mappings)
+                                           for k, v in entry_data.items())
+
+                        if Model is models.DbComputer:
+                            # Check if there is already a computer with the same
+                            # name in the database
+                            dupl = (Model.objects.filter(name=import_data['name'])
                                     or import_data['name'] in imported_comp_names)
-
-                        # The following is done for compatibility reasons
-                        # In case the export file was generate with the SQLA
-                        # export method
-                        if type(import_data['metadata']) is dict:
-                            import_data['metadata'] = json.dumps(
-                                import_data['metadata'])
-                        if type(import_data['transport_params']) is dict:
-                            import_data['transport_params'] = json.dumps(
-                                import_data['transport_params'])
-
-                        imported_comp_names.add(import_data['name'])
-
-                    objects_to_create.append(Model(**import_data))
-                    import_entry_ids[unique_id] = import_entry_id
-
-                # Before storing entries in the DB, I store the files (if these
-                # are nodes). Note: only for new entries!
-                if model_name == NODE_ENTITY_NAME:
-                    if not silent:
-                        print("STORING NEW NODE FILES...")
-                    for o in objects_to_create:
-
-                        subfolder = folder.get_subfolder(os.path.join(
-                            nodes_export_subfolder, export_shard_uuid(o.uuid)))
-                        if not subfolder.exists():
-                            raise ValueError("Unable to find the repository "
-                                             "folder for node with UUID={} " \
-                                             "in the exported "
-                                             "file".format(o.uuid))
-                        destdir = RepositoryFolder(
-                            section=Node._section_name,
-                            uuid=o.uuid)
-                        # Replace the folder, possibly destroying existing
-                        # previous folders, and move the files (faster if we
-                        # are on the same filesystem, and
-                        # in any case the source is a SandboxFolder)
-                        destdir.replace_with_folder(subfolder.abspath,
-                                                    move=True, overwrite=True)
-
-                # Store them all in once; however, the PK are not set in this way...
-                Model.objects.bulk_create(objects_to_create)
-
-                # Get back the just-saved entries
-                just_saved = dict(Model.objects.filter(
-                    **{"{}__in".format(unique_identifier):
-                           import_entry_ids.keys()}).values_list(unique_identifier, 'pk'))
-
-                imported_states = []
-                if model_name == NODE_ENTITY_NAME:
-                    if not silent:
-                        print("SETTING THE IMPORTED STATES FOR NEW NODES...")
-                    # I set for all nodes, even if I should set it only
-                    # for calculations
-                    for unique_id, new_pk in just_saved.items():
-                        imported_states.append(
-                            models.DbCalcState(dbnode_id=new_pk,
-                                               state=calc_states.IMPORTED))
-                    models.DbCalcState.objects.bulk_create(imported_states)
-
-                # Now I have the PKs, print the info
-                # Moreover, set the foreing_ids_reverse_mappings
-                for unique_id, new_pk in just_saved.items():
-                    import_entry_id = import_entry_ids[unique_id]
-                    foreign_ids_reverse_mappings[model_name][unique_id] = new_pk
-                    if model_name not in ret_dict:
-                        ret_dict[model_name] = {'new': [], 'existing': []}
-                    ret_dict[model_name]['new'].append((import_entry_id,
-                                                        new_pk))
-
-                    if not silent:
-                        print("NEW %s: %s (%s->%s)" % (model_name, unique_id,
-                                                       import_entry_id,
-                                                       new_pk))
-
-                # For DbNodes, we also have to store Attributes!
-                if model_name == NODE_ENTITY_NAME:
-                    if not silent:
-                        print("STORING NEW NODE ATTRIBUTES...")
+                            orig_name = import_data['name']
+                            while dupl:
+                                # Rename the new computer
+                                import_data['name'] = (
+                                        orig_name +
+                                        COMP_DUPL_SUFFIX.format(dupl_counter))
+                                dupl_counter += 1
+                                dupl = (
+                                        Model.objects.filter(name=import_data['name'])
+                                        or import_data['name'] in imported_comp_names)
+
+                            # The following is done for compatibility reasons
+                            # In case the export file was generate with the SQLA
+                            # export method
+                            if type(import_data['metadata']) is dict:
+                                import_data['metadata'] = json.dumps(
+                                    import_data['metadata'])
+                            if type(import_data['transport_params']) is dict:
+                                import_data['transport_params'] = json.dumps(
+                                    import_data['transport_params'])
+
+                            imported_comp_names.add(import_data['name'])
+
+                        objects_to_create.append(Model(**import_data))
+                        import_entry_ids[unique_id] = import_entry_id
+
+                    # Before storing entries in the DB, I store the files (if these
+                    # are nodes). Note: only for new entries!
+                    if model_name == NODE_ENTITY_NAME:
+                        if not silent:
+                            print("STORING NEW NODE FILES...")
+                        import_repository_folders(
+                            folder, [o.uuid for o in objects_to_create],
+                            nodes_export_subfolder, copy_workers=copy_workers,
+                            silent=silent)
+
+                    # Store them all in once; however, the PK are not set in this way...
+                    Model.objects.bulk_create(objects_to_create)
+
+                    # Get back the just-saved entries
+                    just_saved = dict(Model.objects.filter(
+                        **{"{}__in".format(unique_identifier):
+                               import_entry_ids.keys()}).values_list(unique_identifier, 'pk'))
+
+                    imported_states = []
+                    if model_name == NODE_ENTITY_NAME:
+                        if not silent:
+                            print("SETTING THE IMPORTED STATES FOR NEW NODES...")
+                        # I set for all nodes, even if I should set it only
+                        # for calculations
+                        for unique_id, new_pk in just_saved.items():
+                            imported_states.append(
+                                models.DbCalcState(dbnode_id=new_pk,
+                                                   state=calc_states.IMPORTED))
+                        models.DbCalcState.objects.bulk_create(imported_states)
+
+                    # Now I have the PKs, print the info
+                    # Moreover, set the foreing_ids_reverse_mappings
                     for unique_id, new_pk in just_saved.items():
+                        unique_id = unique_id_to_string(unique_id)
                         import_entry_id = import_entry_ids[unique_id]
-                        # Get attributes from import file
-                        try:
-                            attributes = data['node_attributes'][
-                                str(import_entry_id)]
-                            attributes_conversion = data[
-                                'node_attributes_conversion'][
-                                str(import_entry_id)]
-                        except KeyError:
-                            raise ValueError("Unable to find attribute info "
-                                             "for DbNode with UUID = {}".format(
-                                unique_id))
-
-                        # Here I have to deserialize the attributes
-                        deserialized_attributes = deserialize_attributes(
-                            attributes, attributes_conversion)
-                        models.DbAttribute.reset_values_for_node(
-                            dbnode=new_pk,
-                            attributes=deserialized_attributes,
-                            with_transaction=False)
+                        foreign_ids_reverse_mappings[model_name][unique_id] = new_pk
+                        if model_name not in ret_dict:
+                            ret_dict[model_name] = {'new': [], 'existing': []}
+                        ret_dict[model_name]['new'].append((import_entry_id,
+                                                            new_pk))
+                        if model_name == NODE_ENTITY_NAME:
+                            new_node_pks[import_entry_id] = new_pk
+
+                        if not silent:
+                            print("NEW %s: %s (%s->%s)" % (model_name, unique_id,
+                                                           import_entry_id,
+                                                           new_pk))
+
+            # For DbNodes, we also have to store Attributes!
+            if not silent:
+                print("STORING NEW NODE ATTRIBUTES...")
+            nodes_without_attributes = set(new_node_pks.keys())
+            for import_entry_id, attributes, attributes_conversion in reader.iter_records(
+                    NODE_ATTRIBUTES_SECTION):
+                try:
+                    new_pk = new_node_pks[import_entry_id]
+                except KeyError:
+                    # The node already existed
+                    continue
+
+                # Here I have to deserialize the attributes
+                deserialized_attributes = deserialize_attributes(
+                    attributes, attributes_conversion)
+                models.DbAttribute.reset_values_for_node(
+                    dbnode=new_pk,
+                    attributes=deserialized_attributes,
+                    with_transaction=False)
+                nodes_without_attributes.discard(import_entry_id)
+
+            if nodes_without_attributes:
+                raise ValueError("Unable to find attribute info "
+                                 "for DbNode with UUID = {}".format(
+                    models.DbNode.objects.get(
+                        pk=new_node_pks[nodes_without_attributes.pop()]).uuid))
 
             if not silent:
                 print("STORING NODE LINKS...")
             ## TODO: check that we are not creating input links of an already
             ##       existing node...
-            import_links = data['links_uuid']
-            links_to_store = []
 
-            # Needed for fast checks of existing links
-            existing_links_raw = models.DbLink.objects.all().values_list(
-                'input', 'output', 'label', 'type')
-            existing_links_labels = {(l[0], l[1]): l[2] for l in existing_links_raw}
-            existing_input_links = {(l[1], l[2]): l[0] for l in existing_links_raw}
+            # Only the links that existed before the import are checked, such
+            # that the batches of this import do not interfere with each other
+            last_existing_link_id = models.DbLink.objects.aggregate(
+                Max('id'))['id__max'] or 0
+            new_links_count = 0
 
             # ~ print(foreign_ids_reverse_mappings)
             dbnode_reverse_mappings = foreign_ids_reverse_mappings[NODE_ENTITY_NAME]
-            for link in import_links:
-                try:
-                    in_id = dbnode_reverse_mappings[link['input']]
-                    out_id = dbnode_reverse_mappings[link['output']]
-                except KeyError:
-                    if ignore_unknown_nodes:
-                        continue
-                    else:
-                        raise ValueError("Trying to create a link with one "
-                                         "or both unknown nodes, stopping "
-                                         "(in_uuid={}, out_uuid={}, "
-                                         "label={})".format(link['input'],
-                                                            link['output'],
-                                                            link['label']))
+            for import_links in reader.iter_batches(LINKS_SECTION, IMPORT_BATCH_SIZE):
+                links_to_store = []
+                resolved_links = []
 
-                try:
-                    existing_label = existing_links_labels[in_id, out_id]
-                    if existing_label != link['label']:
-                        raise ValueError("Trying to rename an existing link "
-                                         "name, stopping (in={}, out={}, "
-                                         "old_label={}, new_label={})"
-                                         .format(in_id, out_id, existing_label,
-                                                 link['label']))
-                        # Do nothing, the link is already in place and has
-                        # the correct name
-                except KeyError:
+                for link in import_links:
                     try:
-                        # We try to get the existing input of the link that
-                        # points to "out" and has label link['label'].
-                        # If there is no existing_input, it means that the
-                        # link doesn't exist and it has to be created. If
-                        # it exists, then the only case that we can have more
-                        # than one links with the same name entering a node
-                        # is the case of the RETURN links of workflows/
-                        # workchains. If it is not this case, then it is
-                        # an error.
-                        existing_input = existing_input_links[out_id,
-                                                              link['label']]
-
-                        if link['type'] != LinkType.RETURN:
-                            raise ValueError(
-                                "There exists already an input link to node "
-                                "with UUID {} with label {} but it does not "
-                                "come from the expected input with UUID {} "
-                                "but from a node with UUID {}."
-                                    .format(link['output'], link['label'],
-                                            link['input'], existing_input))
+                        in_id = dbnode_reverse_mappings[link['input']]
+                        out_id = dbnode_reverse_mappings[link['output']]
                     except KeyError:
-                        # New link
-                        links_to_store.append(models.DbLink(
-                            input_id=in_id, output_id=out_id, label=link['label'], type=LinkType(link['type']).value))
-                        if LINK_ENTITY_NAME not in ret_dict:
-                            ret_dict[LINK_ENTITY_NAME] = {'new': []}
-                        ret_dict[LINK_ENTITY_NAME]['new'].append((in_id, out_id))
-
-            # Store new links
-            if links_to_store:
-                if not silent:
-                    print("   ({} new links...)".format(len(links_to_store)))
+                        if ignore_unknown_nodes:
+                            continue
+                        else:
+                            raise ValueError("Trying to create a link with one "
+                                             "or both unknown nodes, stopping "
+                                             "(in_uuid={}, out_uuid={}, "
+                                             "label={})".format(link['input'],
+                                                                link['output'],
+                                                                link['label']))
+                    resolved_links.append((in_id, out_id, link))
+
+                if not resolved_links:
+                    continue
 
-                models.DbLink.objects.bulk_create(links_to_store)
-            else:
-                if not silent:
-                    print("   (0 new links...)")
+                # Needed for fast checks of existing links
+                existing_links_raw = models.DbLink.objects.filter(
+                    id__lte=last_existing_link_id,
+                    output_id__in=set(out_id for _, out_id, _ in resolved_links)).values_list(
+                    'input', 'output', 'label', 'type')
+                existing_links_labels = {(l[0], l[1]): l[2] for l in existing_links_raw}
+                existing_input_links = {(l[1], l[2]): l[0] for l in existing_links_raw}
+
+                for in_id, out_id, link in resolved_links:
+                    try:
+                        existing_label = existing_links_labels[in_id, out_id]
+                        if existing_label != link['label']:
+                            raise ValueError("Trying to rename an existing link "
+                                             "name, stopping (in={}, out={}, "
+                                             "old_label={}, new_label={})"
+                                             .format(in_id, out_id, existing_label,
+                                                     link['label']))
+                            # Do nothing, the link is already in place and has
+                            # the correct name
+                    except KeyError:
+                        try:
+                            # We try to get the existing input of the link that
+                            # points to "out" and has label link['label'].
+                            # If there is no existing_input, it means that the
+                            # link doesn't exist and it has to be created. If
+                            # it exists, then the only case that we can have more
+                            # than one links with the same name entering a node
+                            # is the case of the RETURN links of workflows/
+                            # workchains. If it is not this case, then it is
+                            # an error.
+                            existing_input = existing_input_links[out_id,
+                                                                  link['label']]
+
+                            if link['type'] != LinkType.RETURN:
+                                raise ValueError(
+                                    "There exists already an input link to node "
+                                    "with UUID {} with label {} but it does not "
+                                    "come from the expected input with UUID {} "
+                                    "but from a node with UUID {}."
+                                        .format(link['output'], link['label'],
+                                                link['input'], existing_input))
+                        except KeyError:
+                            # New link
+                            links_to_store.append(models.DbLink(
+                                input_id=in_id, output_id=out_id, label=link['label'], type=LinkType(link['type']).value))
+                            if LINK_ENTITY_NAME not in ret_dict:
+                                ret_dict[LINK_ENTITY_NAME] = {'new': []}
+                            ret_dict[LINK_ENTITY_NAME]['new'].append((in_id, out_id))
+
+                # Store new links
+                if links_to_store:
+                    models.DbLink.objects.bulk_create(links_to_store)
+                    new_links_count += len(links_to_store)
+
+            if not silent:
+                print("   ({} new links...)".format(new_links_count))
 
             if not silent:
                 print("STORING GROUP ELEMENTS...")
-            import_groups = data['groups_uuid']
-            for groupuuid, groupnodes in import_groups.items():
+            for groupuuid, groupnodes in reader.iter_records(GROUPS_SECTION):
                 # TODO: cache these to avoid too many queries
                 group = models.DbGroup.objects.get(uuid=groupuuid)
                 nodes_to_store = [dbnode_reverse_mappings[node_uuid]
@@ -787,18 +848,7 @@ def import_data_dj(in_path, ignore_unknown_nodes=False,
 
             ######################################################
             # Put everything in a specific group
-            dbnode_model_name = NODE_ENTITY_NAME
-
-            existing = existing_entries.get(dbnode_model_name, {})
-            existing_pk = [foreign_ids_reverse_mappings[
-                               dbnode_model_name][v['uuid']]
-                           for v in six.itervalues(existing)]
-            new = new_entries.get(dbnode_model_name, {})
-            new_pk = [foreign_ids_reverse_mappings[
-                          dbnode_model_name][v['uuid']]
-                      for v in six.itervalues(new)]
-
-            pks_for_group = existing_pk + new_pk
+            pks_for_group = list(dbnode_reverse_mappings.values())
 
             # So that we do not create empty groups
             if pks_for_group:
@@ -821,8 +871,8 @@ def import_data_dj(in_path, ignore_unknown_nodes=False,
 
                 # Add all the nodes to the new group
                 # TODO: decide if we want to return the group name
-                group.add_nodes(models.DbNode.objects.filter(
-                    pk__in=pks_for_group))
+                for pks in grouper(IMPORT_BATCH_SIZE, pks_for_group):
+                    group.add_nodes(models.DbNode.objects.filter(pk__in=pks))
 
                 if not silent:
                     print("IMPORTED NODES GROUPED IN IMPORT GROUP NAMED '{}'".format(group.name))
@@ -854,36 +904,44 @@ def validate_uuid(given_uuid):
     return str(parsed_uuid) == given_uuid
 
 
-def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
+def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False,
+                     copy_workers=None):
     """
     Import exported AiiDA environment to the AiiDA database.
     If the 'in_path' is a folder, calls export_tree; otherwise, tries to
     detect the compression format (zip, tar.gz, tar.bz2, ...) and calls the
     correct function.
 
+    The entries, attributes, links and group memberships are read and
+    stored in batches of IMPORT_BATCH_SIZE records.
+
     :param in_path: the path to a file or folder that can be imported in AiiDA
+    :param copy_workers: the number of threads that move the repository
+        folders of the nodes; by default the `export.copy_workers` property
     """
     import json
     import os
     import tarfile
     import zipfile
-    from itertools import chain
+
+    from sqlalchemy import func
 
     from aiida.utils import timezone
 
     from aiida.orm import Node, Group
-    from aiida.common.archive import extract_tree, extract_tar, extract_zip, extract_cif
-    from aiida.common.folders import SandboxFolder, RepositoryFolder
+    from aiida.common.archive import (extract_tree, extract_tar, extract_zip,
+                                      extract_cif, restore_duplicate_files)
+    from aiida.common.folders import SandboxFolder
     from aiida.common.utils import get_object_from_string
     from aiida.common.datastructures import calc_states
     from aiida.orm.querybuilder import QueryBuilder
     from aiida.common.links import LinkType
 
     # Backend specific imports
-    from aiida.backends.sqlalchemy.models.node import DbCalcState
+    from aiida.backends.sqlalchemy.models.node import DbCalcState, DbLink, DbNode
 
-    # This is the export version expected by this function
-    expected_export_version = '0.3'
+    # These are the export versions expected by this function
+    expected_export_versions = ('0.3', '0.4')
 
     # The name of the subfolder in which the node files are stored
     nodes_export_subfolder = 'nodes'
@@ -920,52 +978,34 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
         try:
             with open(folder.get_abs_path('metadata.json')) as f:
                 metadata = json.load(f)
-
-            with open(folder.get_abs_path('data.json')) as f:
-                data = json.load(f)
         except IOError as e:
             raise ValueError("Unable to find the file {} in the import "
                              "file or folder".format(e.filename))
 
+        # The data is read record by record, from the JSON Lines files of the
+        # streaming format or from the single data file of the previous format
+        reader = ArchiveDataReader(folder, metadata)
+        if not reader.is_streaming and not os.path.isfile(folder.get_abs_path('data.json')):
+            raise ValueError("Unable to find the file {} in the import "
+                             "file or folder".format(folder.get_abs_path('data.json')))
+
         ######################
         # PRELIMINARY CHECKS #
         ######################
-        if metadata['export_version'] != expected_export_version:
+        if metadata['export_version'] not in expected_export_versions:
             raise exceptions.IncompatibleArchiveVersionError('Archive schema version {} is incompatible with the '
-                'currently supported schema version {}'.format(metadata['export_version'], expected_export_version))
+                'currently supported schema versions {}'.format(metadata['export_version'],
+                                                               ', '.join(expected_export_versions)))
+
+        # The files left out of the archive as duplicates are copied back
+        # before any node folder is moved into the repository
+        restore_duplicate_files(folder, metadata)
 
         ###################################################################
         #           CREATE UUID REVERSE TABLES AND CHECK IF               #
         #              I HAVE ALL NODES FOR THE LINKS                     #
         ###################################################################
-        linked_nodes = set(chain.from_iterable((l['input'], l['output'])
-                                               for l in data['links_uuid']))
-        group_nodes = set(chain.from_iterable(
-            six.itervalues(data['groups_uuid'])))
-
-        # Check that UUIDs are valid
-        linked_nodes = set(x for x in linked_nodes if validate_uuid(x))
-        group_nodes = set(x for x in group_nodes if validate_uuid(x))
-
-        # I preload the nodes, I need to check each of them later, and I also
-        # store them in a reverse table
-        # I break up the query due to SQLite limitations..
-        # relevant_db_nodes = {}
-        db_nodes_uuid = set()
-        import_nodes_uuid = set()
-        if linked_nodes:
-            qb = QueryBuilder()
-            qb.append(Node, filters={"uuid": {"in": linked_nodes}},
-                      project=["uuid"])
-            for res in qb.iterall():
-                db_nodes_uuid.add(res[0])
-
-        if NODE_ENTITY_NAME in data['export_data']:
-            for v in data['export_data'][NODE_ENTITY_NAME].values():
-                import_nodes_uuid.add(v['uuid'])
-
-        unknown_nodes = linked_nodes.union(group_nodes) - db_nodes_uuid.union(
-            import_nodes_uuid)
+        unknown_nodes = get_unknown_node_uuids(reader)
 
         if unknown_nodes and not ignore_unknown_nodes:
             raise ValueError(
@@ -1023,21 +1063,15 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
         # CREATE IMPORT DATA DIRECT UNIQUE_FIELD MAPPINGS #
         ###################################################
         # This is ndested dictionary of entity_name:{id:uuid}
-        # to map one id (the pk) to a different one.
-        # One of the things to remove for v0.4
+        # to map one id (the pk) to a different one, for the entities that
+        # are referred to by the entries of other entities.
         # {
-        # u'Node': {2362: u'82a897b5-fb3a-47d7-8b22-c5fe1b4f2c14', 2363: u'ef04aa5d-99e7-4bfd-95ef-fe412a6a3524', 2364: u'1dc59576-af21-4d71-81c2-bac1fc82a84a'},
         # u'User': {1: u'aiida@localhost'}
         # }
-        import_unique_ids_mappings = {}
-        # Export data since v0.3 contains the keys entity_name
-        for entity_name, import_data in data['export_data'].items():
-            # Again I need the entity_name since that's what's being stored since 0.3
-            if entity_name in metadata['unique_identifiers']:
-                # I have to reconvert the pk to integer
-                import_unique_ids_mappings[entity_name] = {
-                    int(k): v[metadata['unique_identifiers'][entity_name]]
-                    for k, v in import_data.items()}
+        import_unique_ids_mappings = get_import_unique_ids_mappings(
+            reader, metadata,
+            [signatures_to_entity_names[entity_sig] for entity_sig in entity_sig_order])
+
         ###############
         # IMPORT DATA #
         ###############
@@ -1048,47 +1082,39 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
 
         try:
             foreign_ids_reverse_mappings = {}
-            new_entries = {}
-            existing_entries = {}
+            # The new pk of the new nodes, per import pk, to store their
+            # attributes once all nodes are stored
+            new_node_pks = {}
 
-            # I first generate the list of data
+            # I import data from the given model
             for entity_sig in entity_sig_order:
                 entity_name = signatures_to_entity_names[entity_sig]
                 entity = entity_names_to_entities[entity_name]
+                fields_info = metadata['all_fields_info'].get(entity_name, {})
                 # I get the unique identifier, since v0.3 stored under enity_name
                 unique_identifier = metadata['unique_identifiers'].get(entity_name, None)
 
-                # so, new_entries. Also,since v0.3 it makes more sense to used the entity_name
-                # ~ new_entries[entity_sig] = {}
-                new_entries[entity_name] = {}
-                # existing_entries[entity_sig] = {}
-                existing_entries[entity_name] = {}
-                # ~ foreign_ids_reverse_mappings[entity_sig] = {}
                 foreign_ids_reverse_mappings[entity_name] = {}
+                dupl_counter = 0
+                imported_comp_names = set()
 
                 # Not necessarily all models are exported
-                if entity_name in data['export_data']:
+                for batch in reader.iter_batches(entity_name, IMPORT_BATCH_SIZE):
+                    new_entries = {}
+                    existing_entries = {}
 
                     if unique_identifier is not None:
-                        import_unique_ids = set(v[unique_identifier] for v in data['export_data'][entity_name].values())
-
-                        relevant_db_entries = dict()
-                        if len(import_unique_ids) > 0:
-                            qb = QueryBuilder()
-                            qb.append(entity, filters={
-                                unique_identifier: {"in": import_unique_ids}},
-                                      project=["*"], tag="res")
-                            relevant_db_entries = {
-                                getattr(v[0], unique_identifier):
-                                    v[0] for v in qb.all()}
-
-                            foreign_ids_reverse_mappings[entity_name] = {
-                                k: v.pk for k, v in
-                                relevant_db_entries.items()}
-
-                        dupl_counter = 0
-                        imported_comp_names = set()
-                        for k, v in data['export_data'][entity_name].items():
+                        import_unique_ids = set(v[unique_identifier] for _, v in batch)
+
+                        qb = QueryBuilder()
+                        qb.append(entity, filters={
+                            unique_identifier: {"in": import_unique_ids}},
+                                  project=[unique_identifier, "id"], tag="res")
+                        for unique_id, existing_pk in qb.iterall():
+                            foreign_ids_reverse_mappings[entity_name][
+                                unique_id_to_string(unique_id)] = existing_pk
+
+                        for k, v in batch:
                             if entity_name == COMPUTER_ENTITY_NAME:
                                 # The following is done for compatibility
                                 # reasons in case the export file was generated
@@ -1132,259 +1158,251 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
 
                                 imported_comp_names.add(v["name"])
 
-                            if v[unique_identifier] in (relevant_db_entries.keys()):
+                            if v[unique_identifier] in foreign_ids_reverse_mappings[entity_name]:
                                 # Already in DB
                                 # again, switched to entity_name in v0.3
-                                existing_entries[entity_name][k] = v
+                                existing_entries[k] = v
                             else:
                                 # To be added
-                                new_entries[entity_name][k] = v
+                                new_entries[k] = v
+                    else:
+                        new_entries = dict(batch)
+
+                    for import_entry_id, entry_data in existing_entries.items():
+                        unique_id = entry_data[unique_identifier]
+                        existing_entry_id = foreign_ids_reverse_mappings[entity_name][unique_id]
+                        # TODO COMPARE, AND COMPARE ATTRIBUTES
+                        if entity_name not in ret_dict:
+                            ret_dict[entity_name] = {'new': [], 'existing': []}
+                        ret_dict[entity_name]['existing'].append((import_entry_id, existing_entry_id))
+                        if not silent:
+                            print("existing %s: %s (%s->%s)" % (entity_sig,
+                                                                unique_id,
+                                                                import_entry_id,
+                                                                existing_entry_id))
+
+                    # Store all objects of this batch in a list, and store them
+                    # all in once at the end.
+                    objects_to_create = list()
+                    # This is needed later to associate the import entry with the new pk
+                    import_entry_ids = dict()
+
+                    for import_entry_id, entry_data in new_entries.items():
+                        unique_id = entry_data[unique_identifier]
+                        import_data = dict(deserialize_field(
+                            k, v, fields_info=fields_info,
+                            import_unique_ids_mappings=import_unique_ids_mappings,
+                            foreign_ids_reverse_mappings=foreign_ids_reverse_mappings)
+                                           for k, v in entry_data.items())
+
+                        # We convert the Django fields to SQLA. Note that some of
+                        # the Django fields were converted to SQLA compatible
+                        # fields by the deserialize_field method. This was done
+                        # for optimization reasons in Django but makes them
+                        # compatible with the SQLA schema and they don't need any
+                        # further conversion.
+                        if entity_name in file_fields_to_model_fields:
+                            for file_fkey in (
+                                    file_fields_to_model_fields[entity_name].keys()):
+                                model_fkey = file_fields_to_model_fields[entity_name][file_fkey]
+                                if model_fkey in import_data.keys():
+                                    continue
+                                import_data[model_fkey] = import_data[file_fkey]
+                                import_data.pop(file_fkey, None)
+
+                        db_entity = get_object_from_string(
+                            entity_names_to_sqla_schema[entity_name])
+                        objects_to_create.append(db_entity(**import_data))
+                        import_entry_ids[unique_id] = import_entry_id
+
+                    # Before storing entries in the DB, I store the files (if these
+                    # are nodes). Note: only for new entries!
+                    if entity_sig == entity_names_to_signatures[NODE_ENTITY_NAME]:
+
+                        if not silent:
+                            print("STORING NEW NODE FILES...")
+                        import_repository_folders(
+                            folder, [o.uuid for o in objects_to_create],
+                            nodes_export_subfolder, copy_workers=copy_workers,
+                            silent=silent)
+
+                    # Store them all in once; However, the PK
+                    # are not set in this way...
+                    if objects_to_create:
+                        session.add_all(objects_to_create)
+
+                    session.flush()
+
+                    if import_entry_ids.keys():
+                        qb = QueryBuilder()
+                        qb.append(entity, filters={
+                            unique_identifier: {"in": list(import_entry_ids.keys())}},
+                                  project=[unique_identifier, "id"], tag="res")
+                        just_saved = {v[0]: v[1] for v in qb.all()}
                     else:
-                        # Why the copy:
-                        new_entries[entity_name] = data['export_data'][entity_name].copy()
+                        just_saved = dict()
+
+                    imported_states = []
+                    if entity_sig == entity_names_to_signatures[NODE_ENTITY_NAME]:
+                        ################################################
+                        # Needs more from here and below
+                        ################################################
+                        if not silent:
+                            print("SETTING THE IMPORTED STATES FOR NEW NODES...")
+                        # I set for all nodes, even if I should set it only
+                        # for calculations
+                        for unique_id, new_pk in just_saved.items():
+                            imported_states.append(
+                                DbCalcState(dbnode_id=new_pk,
+                                            state=calc_states.IMPORTED))
+
+                        session.add_all(imported_states)
+
+                    # Now I have the PKs, print the info
+                    # Moreover, set the foreing_ids_reverse_mappings
+                    for unique_id, new_pk in just_saved.items():
+                        unique_id = unique_id_to_string(unique_id)
+                        import_entry_id = import_entry_ids[unique_id]
+                        foreign_ids_reverse_mappings[entity_name][unique_id] = new_pk
+                        if entity_name not in ret_dict:
+                            ret_dict[entity_name] = {'new': [], 'existing': []}
+                        ret_dict[entity_name]['new'].append((import_entry_id,
+                                                             new_pk))
+                        if entity_name == NODE_ENTITY_NAME:
+                            new_node_pks[import_entry_id] = new_pk
+
+                        if not silent:
+                            print("NEW %s: %s (%s->%s)" % (entity_sig, unique_id,
+                                                           import_entry_id,
+                                                           new_pk))
+
+            # For DbNodes, we also have to store Attributes!
+            if not silent:
+                print("STORING NEW NODE ATTRIBUTES...")
+            nodes_without_attributes = set(new_node_pks.keys())
+            for import_attributes in reader.iter_batches(NODE_ATTRIBUTES_SECTION, IMPORT_BATCH_SIZE):
+                attributes_to_store = []
+                for import_entry_id, attributes, attributes_conversion in import_attributes:
+                    try:
+                        new_pk = new_node_pks[import_entry_id]
+                    except KeyError:
+                        # The node already existed
+                        continue
 
-            # I import data from the given model
-            for entity_sig in entity_sig_order:
-                entity_name = signatures_to_entity_names[entity_sig]
-                entity = entity_names_to_entities[entity_name]
-                fields_info = metadata['all_fields_info'].get(entity_name, {})
-                unique_identifier = metadata['unique_identifiers'].get(entity_name, None)
+                    # Here I have to deserialize the attributes
+                    attributes_to_store.append({
+                        'id': new_pk,
+                        'attributes': deserialize_attributes(
+                            attributes, attributes_conversion)})
+                    nodes_without_attributes.discard(import_entry_id)
 
-                for import_entry_id, entry_data in (existing_entries[entity_name].items()):
-                    unique_id = entry_data[unique_identifier]
-                    existing_entry_id = foreign_ids_reverse_mappings[entity_name][unique_id]
-                    # TODO COMPARE, AND COMPARE ATTRIBUTES
-                    if entity_name not in ret_dict:
-                        ret_dict[entity_name] = {'new': [], 'existing': []}
-                    ret_dict[entity_name]['existing'].append((import_entry_id, existing_entry_id))
-                    if not silent:
-                        print("existing %s: %s (%s->%s)" % (entity_sig,
-                                                            unique_id,
-                                                            import_entry_id,
-                                                            existing_entry_id))
-
-                # Store all objects for this model in a list, and store them
-                # all in once at the end.
-                objects_to_create = list()
-                # This is needed later to associate the import entry with the new pk
-                import_entry_ids = dict()
-
-                for import_entry_id, entry_data in (new_entries[entity_name].items()):
-                    unique_id = entry_data[unique_identifier]
-                    import_data = dict(deserialize_field(
-                        k, v, fields_info=fields_info,
-                        import_unique_ids_mappings=import_unique_ids_mappings,
-                        foreign_ids_reverse_mappings=foreign_ids_reverse_mappings)
-                                       for k, v in entry_data.items())
-
-                    # We convert the Django fields to SQLA. Note that some of
-                    # the Django fields were converted to SQLA compatible
-                    # fields by the deserialize_field method. This was done
-                    # for optimization reasons in Django but makes them
-                    # compatible with the SQLA schema and they don't need any
-                    # further conversion.
-                    if entity_name in file_fields_to_model_fields:
-                        for file_fkey in (
-                                file_fields_to_model_fields[entity_name].keys()):
-                            model_fkey = file_fields_to_model_fields[entity_name][file_fkey]
-                            if model_fkey in import_data.keys():
-                                continue
-                            import_data[model_fkey] = import_data[file_fkey]
-                            import_data.pop(file_fkey, None)
-
-                    db_entity = get_object_from_string(
-                        entity_names_to_sqla_schema[entity_name])
-                    objects_to_create.append(db_entity(**import_data))
-                    import_entry_ids[unique_id] = import_entry_id
-
-                # Before storing entries in the DB, I store the files (if these
-                # are nodes). Note: only for new entries!
-                if entity_sig == entity_names_to_signatures[NODE_ENTITY_NAME]:
-
-                    if not silent:
-                        print("STORING NEW NODE FILES & ATTRIBUTES...")
-                    for o in objects_to_create:
-
-                        # Creating the needed files
-                        subfolder = folder.get_subfolder(os.path.join(
-                            nodes_export_subfolder, export_shard_uuid(o.uuid)))
-                        if not subfolder.exists():
-                            raise ValueError("Unable to find the repository "
-                                             "folder for node with UUID={} "
-                                             "in the exported file"
-                                             .format(o.uuid))
-                        destdir = RepositoryFolder(
-                            section=Node._section_name,
-                            uuid=o.uuid)
-                        # Replace the folder, possibly destroying existing
-                        # previous folders, and move the files (faster if we
-                        # are on the same filesystem, and
-                        # in any case the source is a SandboxFolder)
-                        destdir.replace_with_folder(subfolder.abspath,
-                                                    move=True, overwrite=True)
-
-                        # For DbNodes, we also have to store Attributes!
-                        import_entry_id = import_entry_ids[str(o.uuid)]
-                        # Get attributes from import file
-                        try:
-                            attributes = data['node_attributes'][
-                                str(import_entry_id)]
+                if attributes_to_store:
+                    session.bulk_update_mappings(DbNode, attributes_to_store)
 
-                            attributes_conversion = data[
-                                'node_attributes_conversion'][
-                                str(import_entry_id)]
-                        except KeyError:
-                            raise ValueError(
-                                "Unable to find attribute info "
-                                "for DbNode with UUID = {}".format(
-                                    unique_id))
-
-                        # Here I have to deserialize the attributes
-                        deserialized_attributes = deserialize_attributes(
-                            attributes, attributes_conversion)
-
-                        if deserialized_attributes:
-                            from sqlalchemy.dialects.postgresql import JSONB
-                            o.attributes = dict()
-                            for k, v in deserialized_attributes.items():
-                                o.attributes[k] = v
-
-                # Store them all in once; However, the PK
-                # are not set in this way...
-                if objects_to_create:
-                    session.add_all(objects_to_create)
-
-                session.flush()
-
-                if import_entry_ids.keys():
-                    qb = QueryBuilder()
-                    qb.append(entity, filters={
-                        unique_identifier: {"in": list(import_entry_ids.keys())}},
-                              project=[unique_identifier, "id"], tag="res")
-                    just_saved = {v[0]: v[1] for v in qb.all()}
-                else:
-                    just_saved = dict()
-
-                imported_states = []
-                if entity_sig == entity_names_to_signatures[NODE_ENTITY_NAME]:
-                    ################################################
-                    # Needs more from here and below
-                    ################################################
-                    if not silent:
-                        print("SETTING THE IMPORTED STATES FOR NEW NODES...")
-                    # I set for all nodes, even if I should set it only
-                    # for calculations
-                    for unique_id, new_pk in just_saved.items():
-                        imported_states.append(
-                            DbCalcState(dbnode_id=new_pk,
-                                        state=calc_states.IMPORTED))
-
-                    session.add_all(imported_states)
-
-                # Now I have the PKs, print the info
-                # Moreover, set the foreing_ids_reverse_mappings
-                for unique_id, new_pk in just_saved.items():
-                    from uuid import UUID
-                    if isinstance(unique_id, UUID):
-                        unique_id = str(unique_id)
-                    import_entry_id = import_entry_ids[unique_id]
-                    foreign_ids_reverse_mappings[entity_name][unique_id] = new_pk
-                    if entity_name not in ret_dict:
-                        ret_dict[entity_name] = {'new': [], 'existing': []}
-                    ret_dict[entity_name]['new'].append((import_entry_id,
-                                                         new_pk))
-
-                    if not silent:
-                        print("NEW %s: %s (%s->%s)" % (entity_sig, unique_id,
-                                                       import_entry_id,
-                                                       new_pk))
+            if nodes_without_attributes:
+                raise ValueError("Unable to find attribute info "
+                                 "for DbNode with UUID = {}".format(
+                    session.query(DbNode.uuid).filter(
+                        DbNode.id == new_node_pks[nodes_without_attributes.pop()]).scalar()))
 
             if not silent:
                 print("STORING NODE LINKS...")
             ## TODO: check that we are not creating input links of an already
             ##       existing node...
-            import_links = data['links_uuid']
-            links_to_store = []
-
-            # Needed for fast checks of existing links
-            from aiida.backends.sqlalchemy.models.node import DbLink
-            existing_links_raw = session.query(
-                DbLink.input_id, DbLink.output_id,DbLink.label).all()
-            existing_links_labels = {(l[0], l[1]): l[2]
-                                     for l in existing_links_raw}
-            existing_input_links = {(l[1], l[2]): l[0]
-                                    for l in existing_links_raw}
+
+            # Only the links that existed before the import are checked, such
+            # that the batches of this import do not interfere with each other
+            last_existing_link_id = session.query(func.max(DbLink.id)).scalar() or 0
+            new_links_count = 0
 
             dbnode_reverse_mappings = foreign_ids_reverse_mappings[NODE_ENTITY_NAME]
-            for link in import_links:
-                try:
-                    in_id = dbnode_reverse_mappings[link['input']]
-                    out_id = dbnode_reverse_mappings[link['output']]
-                except KeyError:
-                    if ignore_unknown_nodes:
-                        continue
-                    else:
-                        raise ValueError("Trying to create a link with one "
-                                         "or both unknown nodes, stopping "
-                                         "(in_uuid={}, out_uuid={}, "
-                                         "label={})".format(link['input'],
-                                                            link['output'],
-                                                            link['label']))
+            for import_links in reader.iter_batches(LINKS_SECTION, IMPORT_BATCH_SIZE):
+                links_to_store = []
+                resolved_links = []
 
-                try:
-                    existing_label = existing_links_labels[in_id, out_id]
-                    if existing_label != link['label']:
-                        raise ValueError("Trying to rename an existing link "
-                                         "name, stopping (in={}, out={}, "
-                                         "old_label={}, new_label={})"
-                                         .format(in_id, out_id, existing_label,
-                                                 link['label']))
-                        # Do nothing, the link is already in place and has
-                        # the correct name
-                except KeyError:
+                for link in import_links:
                     try:
-                        # We try to get the existing input of the link that
-                        # points to "out" and has label link['label'].
-                        # If there is no existing_input, it means that the
-                        # link doesn't exist and it has to be created. If
-                        # it exists, then the only case that we can have more
-                        # than one links with the same name entering a node
-                        # is the case of the RETURN links of workflows/
-                        # workchains. If it is not this case, then it is
-                        # an error.
-                        existing_input = existing_input_links[out_id,
-                                                              link['label']]
-
-                        if link['type'] != LinkType.RETURN:
-                            raise ValueError(
-                                "There exists already an input link to node "
-                                "with UUID {} with label {} but it does not "
-                                "come from the expected input with UUID {} "
-                                "but from a node with UUID {}."
-                                    .format(link['output'], link['label'],
-                                            link['input'], existing_input))
+                        in_id = dbnode_reverse_mappings[link['input']]
+                        out_id = dbnode_reverse_mappings[link['output']]
                     except KeyError:
-                        # New link
-                        links_to_store.append(DbLink(
-                            input_id=in_id, output_id=out_id,
-                            label=link['label'], type=LinkType(link['type']).value))
-                        if LINK_ENTITY_NAME not in ret_dict:
-                            ret_dict[LINK_ENTITY_NAME] = {'new': []}
-                        ret_dict[LINK_ENTITY_NAME]['new'].append((in_id, out_id))
-
-            # Store new links
-            if links_to_store:
-                if not silent:
-                    print("   ({} new links...)".format(len(links_to_store)))
-                session.add_all(links_to_store)
-            else:
-                if not silent:
-                    print("   (0 new links...)")
+                        if ignore_unknown_nodes:
+                            continue
+                        else:
+                            raise ValueError("Trying to create a link with one "
+                                             "or both unknown nodes, stopping "
+                                             "(in_uuid={}, out_uuid={}, "
+                                             "label={})".format(link['input'],
+                                                                link['output'],
+                                                                link['label']))
+                    resolved_links.append((in_id, out_id, link))
+
+                if not resolved_links:
+                    continue
+
+                # Needed for fast checks of existing links
+                existing_links_raw = session.query(
+                    DbLink.input_id, DbLink.output_id, DbLink.label).filter(
+                    DbLink.id <= last_existing_link_id,
+                    DbLink.output_id.in_(set(out_id for _, out_id, _ in resolved_links))).all()
+                existing_links_labels = {(l[0], l[1]): l[2]
+                                         for l in existing_links_raw}
+                existing_input_links = {(l[1], l[2]): l[0]
+                                        for l in existing_links_raw}
+
+                for in_id, out_id, link in resolved_links:
+                    try:
+                        existing_label = existing_links_labels[in_id, out_id]
+                        if existing_label != link['label']:
+                            raise ValueError("Trying to rename an existing link "
+                                             "name, stopping (in={}, out={}, "
+                                             "old_label={}, new_label={})"
+                                             .format(in_id, out_id, existing_label,
+                                                     link['label']))
+                            # Do nothing, the link is already in place and has
+                            # the correct name
+                    except KeyError:
+                        try:
+                            # We try to get the existing input of the link that
+                            # points to "out" and has label link['label'].
+                            # If there is no existing_input, it means that the
+                            # link doesn't exist and it has to be created. If
+                            # it exists, then the only case that we can have more
+                            # than one links with the same name entering a node
+                            # is the case of the RETURN links of workflows/
+                            # workchains. If it is not this case, then it is
+                            # an error.
+                            existing_input = existing_input_links[out_id,
+                                                                  link['label']]
+
+                            if link['type'] != LinkType.RETURN:
+                                raise ValueError(
+                                    "There exists already an input link to node "
+                                    "with UUID {} with label {} but it does not "
+                                    "come from the expected input with UUID {} "
+                                    "but from a node with UUID {}."
+                                        .format(link['output'], link['label'],
+                                                link['input'], existing_input))
+                        except KeyError:
+                            # New link
+                            links_to_store.append(DbLink(
+                                input_id=in_id, output_id=out_id,
+                                label=link['label'], type=LinkType(link['type']).value))
+                            if LINK_ENTITY_NAME not in ret_dict:
+                                ret_dict[LINK_ENTITY_NAME] = {'new': []}
+                            ret_dict[LINK_ENTITY_NAME]['new'].append((in_id, out_id))
+
+                # Store new links
+                if links_to_store:
+                    session.add_all(links_to_store)
+                    session.flush()
+                    new_links_count += len(links_to_store)
+
+            if not silent:
+                print("   ({} new links...)".format(new_links_count))
 
             if not silent:
                 print("STORING GROUP ELEMENTS...")
-            import_groups = data['groups_uuid']
-            for groupuuid, groupnodes in import_groups.items():
+            for groupuuid, groupnodes in reader.iter_records(GROUPS_SECTION):
                 # # TODO: cache these to avoid too many queries
                 qb_group = QueryBuilder().append(
                     Group, filters={'uuid': {'==': groupuuid}})
@@ -1398,14 +1416,7 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
 
             ######################################################
             # Put everything in a specific group
-            existing = existing_entries.get(NODE_ENTITY_NAME, {})
-            existing_pk = [foreign_ids_reverse_mappings[NODE_ENTITY_NAME][v['uuid']]
-                           for v in six.itervalues(existing)]
-            new = new_entries.get(NODE_ENTITY_NAME, {})
-            new_pk = [foreign_ids_reverse_mappings[NODE_ENTITY_NAME][v['uuid']]
-                      for v in six.itervalues(new)]
-
-            pks_for_group = existing_pk + new_pk
+            pks_for_group = list(dbnode_reverse_mappings.values())
 
             # So that we do not create empty groups
             if pks_for_group:
@@ -1433,12 +1444,9 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
 
                 # Add all the nodes to the new group
                 # TODO: decide if we want to return the group name
-                from aiida.backends.sqlalchemy.models.node import DbNode
-                group.add_nodes(session.query(DbNode).filter(
-                    DbNode.id.in_(pks_for_group)).distinct().all())
-
-                # group.add_nodes(models.DbNode.objects.filter(
-                #     pk__in=pks_for_group))
+                for pks in grouper(IMPORT_BATCH_SIZE, pks_for_group):
+                    group.add_nodes(session.query(DbNode).filter(
+                        DbNode.id.in_(pks)).distinct().all())
 
                 if not silent:
                     print("IMPORTED NODES GROUPED IN IMPORT GROUP NAMED '{}'".format(group.name))
@@ -1684,9 +1692,407 @@ def fill_in_query(partial_query, originating_entity_str, current_entity_str,
                       new_tag_suffixes)
 
 
+# The number of node ids passed in a single `IN` filter when traversing the graph to export
+EXPORT_TRAVERSAL_CHUNK_SIZE = 1000
+
+
+def _get_linked_node_ids(source_ids, source_cls, target_cls, link_types, reverse=False):
+    """
+    Return the ids of the nodes linked to a set of nodes, with one query per chunk of nodes.
+
+    :param source_ids: the ids of the nodes to start from
+    :param source_cls: the class (or list of classes) of the nodes to start from
+    :param target_cls: the class (or list of classes) of the linked nodes to return
+    :param link_types: the list of the values of the link types to follow
+    :param reverse: if False, follow the links from the source to the target nodes (the source nodes are the inputs
+        of the links), otherwise follow the links from the target to the source nodes
+    :return: the set of ids of the linked nodes
+    """
+    from aiida.orm.querybuilder import QueryBuilder
+
+    source_ids = list(source_ids)
+    linked_ids = set()
+
+    for index in range(0, len(source_ids), EXPORT_TRAVERSAL_CHUNK_SIZE):
+        source_filters = {'id': {'in': source_ids[index:index + EXPORT_TRAVERSAL_CHUNK_SIZE]}}
+        edge_filters = {'type': {'in': link_types}}
+
+        qb = QueryBuilder()
+        if reverse:
+            qb.append(target_cls, tag='target', project=['id'])
+            qb.append(source_cls, output_of='target', filters=source_filters, edge_filters=edge_filters)
+        else:
+            qb.append(source_cls, tag='source', filters=source_filters)
+            qb.append(target_cls, output_of='source', project=['id'], edge_filters=edge_filters)
+
+        linked_ids.update(_[0] for _ in qb.distinct().all())
+
+    return linked_ids
+
+
+def retrieve_linked_nodes(calculation_ids, data_ids, input_forward=False, create_reversed=True,
+                          return_reversed=False, call_reversed=False):
+    """
+    Expand a set of calculations and data nodes to the set of nodes that should be exported with them, following the
+    links of the provenance graph according to the export rules.
+
+    The graph is explored breadth first: for every rule, a single query (per chunk of nodes) retrieves the nodes that
+    are linked to all the nodes of the current frontier. Code nodes are treated as Data nodes.
+
+    :param calculation_ids: the ids of the calculations to export
+    :param data_ids: the ids of the data and code nodes to export
+    :param input_forward: Follow forward INPUT links (recursively) when
+        calculating the node set to export. Currently without effect, as
+        in the previous node by node traversal.
+    :param create_reversed: Follow reversed CREATE links (recursively) when
+        calculating the node set to export.
+    :param return_reversed: Follow reversed RETURN links (recursively) when
+        calculating the node set to export. Currently without effect, as
+        in the previous node by node traversal.
+    :param call_reversed: Follow reversed CALL links (recursively) when
+        calculating the node set to export. Currently without effect, as
+        in the previous node by node traversal.
+    :return: the set of the ids of all the nodes to export
+    """
+    # pylint: disable=unused-argument
+    from aiida.orm import Calculation, Data, Code
+    from aiida.common.links import LinkType
+
+    # The Code node should be treated as a Data node, until Code becomes a subclass of Data
+    data_cls = [Data, Code]
+
+    to_be_exported = set()
+    calculation_frontier = set(calculation_ids)
+    data_frontier = set(data_ids)
+
+    # We repeat until there are no further nodes to be visited
+    while calculation_frontier or data_frontier:
+        to_be_exported.update(calculation_frontier)
+        to_be_exported.update(data_frontier)
+
+        new_calculation_ids = set()
+        new_data_ids = set()
+
+        if calculation_frontier:
+            # INPUT(Data, Calculation) - Reversed
+            new_data_ids.update(_get_linked_node_ids(
+                calculation_frontier, Calculation, data_cls, [LinkType.INPUT.value], reverse=True))
+
+            # CREATE/RETURN(Calculation, Data) - Forward
+            new_data_ids.update(_get_linked_node_ids(
+                calculation_frontier, Calculation, data_cls, [LinkType.CREATE.value, LinkType.RETURN.value]))
+
+            # CALL(Calculation, Calculation) - Forward
+            new_calculation_ids.update(_get_linked_node_ids(
+                calculation_frontier, Calculation, Calculation, [LinkType.CALL.value]))
+
+        # The INPUT - Forward, RETURN - Reversed and CALL - Reversed rules are not applied: the queries of the node by
+        # node traversal for these rules never matched any node, and the node set to export is kept the same
+        if data_frontier:
+            # CREATE(Calculation, Data) - Reversed
+            if create_reversed:
+                new_calculation_ids.update(_get_linked_node_ids(
+                    data_frontier, data_cls, Calculation, [LinkType.CREATE.value], reverse=True))
+
+        calculation_frontier = new_calculation_ids - to_be_exported
+        data_frontier = new_data_ids - to_be_exported
+
+    return to_be_exported
+
+
+# The number of bytes of the files of a node that a copy thread reads in
+# memory while it waits for its turn to write to a zip archive
+EXPORT_COPY_READAHEAD_SIZE = 16 * 1024 * 1024
+
+
+def get_copy_workers(copy_workers=None):
+    """
+    Return the number of threads that copy the repository folders of nodes.
+
+    :param copy_workers: the number of threads, if None the value of the
+        `export.copy_workers` property is returned
+    """
+    if copy_workers is None:
+        from aiida.common.setup import get_property
+        copy_workers = get_property('export.copy_workers')
+
+    return max(int(copy_workers), 1)
+
+
+def _print_copy_progress(count, total, silent):
+    """Print the number of node folders copied so far, about every tenth."""
+    if not silent and (count == total or count % max(total // 10, 1) == 0):
+        print("   ({} of {} node folders copied)".format(count, total))
+
+
+class _OrderedTurns(object):
+    """
+    Let tasks numbered from zero take turns in the order of their number,
+    while they run in a pool of threads.
+
+    Every task has to call `done` exactly once, also when it fails, otherwise
+    the tasks that follow wait forever.
+    """
+
+    def __init__(self):
+        import threading
+
+        self._next_index = 0
+        self._condition = threading.Condition()
+
+    def wait(self, index):
+        """Block until it is the turn of the task with the given index."""
+        with self._condition:
+            while self._next_index != index:
+                self._condition.wait()
+
+    def done(self, index):
+        """Wait for the turn of the task with the given index and pass it on."""
+        with self._condition:
+            while self._next_index != index:
+                self._condition.wait()
+            self._next_index += 1
+            self._condition.notify_all()
+
+
+class RepositoryFolderExporter(object):
+    """
+    Copy the repository folders of nodes into the `nodes` subfolder of an
+    export archive, with a pool of threads.
+
+    The files of the nodes are listed, read and copied by the threads in
+    parallel. The writes to a :py:class:`ZipFolder`, which cannot be shared
+    between threads, and the choice of which files are duplicates are done in
+    the order of the given nodes instead, such that the archive is the same
+    for any number of threads.
+    """
+
+    def __init__(self, folder, copy_workers=None, deduplicate=False,
+                 silent=False):
+        """
+        :param folder: the folder of the archive, a
+            :py:class:`Folder <aiida.common.folders.Folder>` or a
+            :py:class:`ZipFolder <aiida.orm.importexport.ZipFolder>`
+        :param copy_workers: the number of threads, see `get_copy_workers`
+        :param deduplicate: if True, a file with the same content as a file
+            that is already in the archive is not copied again, but listed in
+            `duplicate_files`
+        :param silent: suppress the progress prints
+        """
+        self._nodesubfolder = folder.get_subfolder('nodes', create=True,
+                                                   reset_limit=True)
+        self._is_zip = isinstance(folder, ZipFolder)
+        self._copy_workers = get_copy_workers(copy_workers)
+        self._deduplicate = deduplicate
+        self._silent = silent
+        self._turns = None
+        # The archive path of the first file with each (size, digest)
+        self._stored_files = {}
+        self._duplicate_files = {}
+
+    @property
+    def duplicate_files(self):
+        """
+        Return the files that were not copied because they are duplicates.
+
+        :return: dictionary with the path of each of these files, mapped to
+            the path of the file with the same content that is in the archive,
+            both relative to the archive folder
+        """
+        return self._duplicate_files
+
+    def export(self, nodes_uuid):
+        """
+        Copy the repository folders of the given nodes.
+
+        :param nodes_uuid: list of the UUIDs of the nodes
+        """
+        from multiprocessing.pool import ThreadPool
+
+        self._turns = _OrderedTurns()
+        pool = ThreadPool(self._copy_workers)
+        try:
+            tasks = pool.imap(self._export_node_folder, enumerate(nodes_uuid))
+            for count, _ in enumerate(tasks, start=1):
+                _print_copy_progress(count, len(nodes_uuid), self._silent)
+        finally:
+            pool.terminate()
+
+    def _export_node_folder(self, task):
+        """Copy the repository folder of a single node, run by the threads."""
+        import os
+        import shutil
+        from aiida.common.folders import RepositoryFolder
+
+        index, uuid = task
+        try:
+            sharded_uuid = export_shard_uuid(uuid)
+            src = RepositoryFolder(section=Node._section_name, uuid=uuid).abspath
+            entries = self._read_node_folder(src)
+
+            self._turns.wait(index)
+            if self._deduplicate:
+                archive_path = '/'.join(
+                    ['nodes'] + sharded_uuid.split(os.sep))
+                entries = self._remove_duplicates(archive_path, entries)
+            if self._is_zip:
+                for relpath, abspath, _, content in entries:
+                    self._nodesubfolder.insert_file(
+                        abspath, os.path.join(sharded_uuid, relpath),
+                        content=content)
+        finally:
+            self._turns.done(index)
+
+        if not self._is_zip:
+            dest = self._nodesubfolder.get_subfolder(
+                sharded_uuid, create=False, reset_limit=True).abspath
+            _makedirs(dest)
+            for relpath, abspath, _, _ in entries:
+                if os.path.isdir(abspath):
+                    _makedirs(os.path.join(dest, relpath))
+                else:
+                    shutil.copy2(abspath, os.path.join(dest, relpath))
+
+    def _read_node_folder(self, src):
+        """
+        Return the directories and files of a node folder, in a fixed order,
+        as tuples (relative path, absolute path, digest, content).
+
+        The digest is computed only to deduplicate. The content is read only
+        for zip archives, within EXPORT_COPY_READAHEAD_SIZE bytes per node.
+        """
+        import os
+
+        entries = []
+        readahead_size = EXPORT_COPY_READAHEAD_SIZE if self._is_zip else 0
+        for dirpath, dirnames, filenames in os.walk(src):
+            dirnames.sort()
+            relpath = os.path.relpath(dirpath, src)
+            for name in dirnames:
+                entries.append((os.path.normpath(os.path.join(relpath, name)),
+                                os.path.join(dirpath, name), None, None))
+            for name in sorted(filenames):
+                abspath = os.path.join(dirpath, name)
+                content = None
+                size = os.path.getsize(abspath)
+                if size <= readahead_size:
+                    with open(abspath, 'rb') as handle:
+                        content = handle.read()
+                    readahead_size -= size
+                digest = None
+                if self._deduplicate:
+                    digest = (size, _get_file_digest(abspath, content))
+                entries.append((os.path.normpath(os.path.join(relpath, name)),
+                                abspath, digest, content))
+
+        return entries
+
+    def _remove_duplicates(self, archive_path, entries):
+        """
+        Return the entries of a node folder without the files whose content
+        is already in the archive, and record them as duplicates.
+
+        :param archive_path: the path of the node folder in the archive
+        """
+        import os
+
+        unique_entries = []
+        for entry in entries:
+            relpath, _, digest, _ = entry
+            if digest is not None:
+                path = '/'.join([archive_path] + relpath.split(os.sep))
+                if digest in self._stored_files:
+                    self._duplicate_files[path] = self._stored_files[digest]
+                    continue
+                self._stored_files[digest] = path
+            unique_entries.append(entry)
+
+        return unique_entries
+
+
+def _get_file_digest(path, content=None):
+    """
+    Return the SHA-256 hex digest of the content of a file.
+
+    :param path: the absolute path of the file
+    :param content: the bytes of the file, if they were already read
+    """
+    import hashlib
+    from aiida.common.hashing import HASH_CHUNK_SIZE
+
+    digest = hashlib.sha256()
+    if content is not None:
+        digest.update(content)
+    else:
+        with open(path, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _makedirs(path):
+    """Create a directory with its parents, also if another thread does."""
+    import os
+
+    try:
+        os.makedirs(path)
+    except OSError:
+        if not os.path.isdir(path):
+            raise
+
+
+def import_repository_folders(folder, nodes_uuid, nodes_export_subfolder,
+                              copy_workers=None, silent=False):
+    """
+    Move the repository folders of newly imported nodes from an unpacked
+    archive into the repository, with a pool of threads.
+
+    :param folder: the folder with the unpacked archive
+    :param nodes_uuid: list of the UUIDs of the nodes
+    :param nodes_export_subfolder: the subfolder of the archive with the
+        node folders
+    :param copy_workers: the number of threads, see `get_copy_workers`
+    :param silent: suppress the progress prints
+    :raise ValueError: if the folder of a node is not in the archive
+    """
+    import os
+    from multiprocessing.pool import ThreadPool
+    from aiida.common.folders import RepositoryFolder
+
+    subfolders = []
+    for uuid in nodes_uuid:
+        subfolder = folder.get_subfolder(os.path.join(
+            nodes_export_subfolder, export_shard_uuid(uuid)))
+        if not subfolder.exists():
+            raise ValueError("Unable to find the repository "
+                             "folder for node with UUID={} "
+                             "in the exported file".format(uuid))
+        subfolders.append((uuid, subfolder.abspath))
+
+    def move_node_folder(task):
+        uuid, srcdir = task
+        destdir = RepositoryFolder(section=Node._section_name, uuid=uuid)
+        # Replace the folder, possibly destroying existing
+        # previous folders, and move the files (faster if we
+        # are on the same filesystem, and
+        # in any case the source is a SandboxFolder)
+        destdir.replace_with_folder(srcdir, move=True, overwrite=True)
+
+    pool = ThreadPool(get_copy_workers(copy_workers))
+    try:
+        tasks = pool.imap_unordered(move_node_folder, subfolders)
+        for count, _ in enumerate(tasks, start=1):
+            _print_copy_progress(count, len(subfolders), silent)
+    finally:
+        pool.terminate()
+
+
 def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
                 silent=False, input_forward=False, create_reversed=True,
-                return_reversed=False, call_reversed=False, **kwargs):
+                return_reversed=False, call_reversed=False,
+                records_per_file=DEFAULT_RECORDS_PER_FILE, copy_workers=None,
+                deduplicate=False, **kwargs):
     """
     Export the entries passed in the 'what' list to a file tree.
     :todo: limit the export to finished or failed calculations.
@@ -1709,6 +2115,13 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
     whether all licenses of Data nodes are in the list. If a function,
     then calls function for licenses of Data nodes expecting True if
     license is allowed, False otherwise.
+    :param records_per_file: the maximum number of records of each of the
+    JSON Lines data files of the archive.
+    :param copy_workers: the number of threads that copy the repository
+    folders of the nodes; by default the `export.copy_workers` property.
+    :param deduplicate: store the files with the same content only once in
+    the archive; the others are listed in the `duplicate_files` key of the
+    metadata and copied back on import.
     :param silent: suppress debug prints
     :raises LicensingException: if any node is licensed under forbidden
     license
@@ -1718,18 +2131,14 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
 
     from aiida.orm import Node, Calculation, Data, Group, Code
     from aiida.common.links import LinkType
-    from aiida.common.folders import RepositoryFolder
     from aiida.orm.querybuilder import QueryBuilder
     if not silent:
         print("STARTING EXPORT...")
 
-    EXPORT_VERSION = '0.3'
+    EXPORT_VERSION = '0.4'
 
     all_fields_info, unique_identifiers = get_all_fields_info()
 
-    # The set that contains the nodes ids of the nodes that should be exported
-    to_be_exported = set()
-
     given_data_entry_ids = set()
     given_calculation_entry_ids = set()
     given_group_entry_ids = set()
@@ -1768,191 +2177,10 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
 
     # We will iteratively explore the AiiDA graph to find further nodes that
     # should also be exported.
-
-    # We repeat until there are no further nodes to be visited
-    while given_calculation_entry_ids or given_data_entry_ids:
-
-        # If is is a calculation node
-        if given_calculation_entry_ids:
-            curr_node_id = given_calculation_entry_ids.pop()
-            # If it is already visited continue to the next node
-            if curr_node_id in to_be_exported:
-                continue
-            # Otherwise say that it is a node to be exported
-            else:
-                to_be_exported.add(curr_node_id)
-
-            # INPUT(Data, Calculation) - Reversed
-            qb = QueryBuilder()
-            qb.append(Data, tag='predecessor', project=['id'])
-            qb.append(Calculation, output_of='predecessor',
-                      filters={'id': {'==': curr_node_id}},
-                      edge_filters={
-                          'type': {
-                              '==': LinkType.INPUT.value}})
-            res = {_[0] for _ in qb.all()}
-            given_data_entry_ids.update(res - to_be_exported)
-            # The same until Code becomes a subclass of Data
-            qb = QueryBuilder()
-            qb.append(Code, tag='predecessor', project=['id'])
-            qb.append(Calculation, output_of='predecessor',
-                      filters={'id': {'==': curr_node_id}},
-                      edge_filters={
-                          'type': {
-                              '==': LinkType.INPUT.value}})
-            res = {_[0] for _ in qb.all()}
-            given_data_entry_ids.update(res - to_be_exported)
-
-
-            # INPUT(Data, Calculation) - Forward
-            if input_forward:
-                qb = QueryBuilder()
-                qb.append(Data, tag='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}})
-                qb.append(Calculation, output_of='predecessor',
-                          edge_filters={
-                              'type': {
-                                  '==': LinkType.INPUT.value}})
-                res = {_[0] for _ in qb.all()}
-                given_data_entry_ids.update(res - to_be_exported)
-                # The same until Code becomes a subclass of Data
-                qb = QueryBuilder()
-                qb.append(Code, tag='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}})
-                qb.append(Calculation, output_of='predecessor',
-                          edge_filters={
-                              'type': {
-                                  '==': LinkType.INPUT.value}})
-                res = {_[0] for _ in qb.all()}
-                given_data_entry_ids.update(res - to_be_exported)
-
-
-            # CREATE/RETURN(Calculation, Data) - Forward
-            qb = QueryBuilder()
-            qb.append(Calculation, tag='predecessor',
-                      filters={'id': {'==': curr_node_id}})
-            qb.append(Data, output_of='predecessor', project=['id'],
-                      edge_filters={
-                          'type': {
-                              'in': [LinkType.CREATE.value,
-                                     LinkType.RETURN.value]}})
-            res = {_[0] for _ in qb.all()}
-            given_data_entry_ids.update(res - to_be_exported)
-            # The same until Code becomes a subclass of Data
-            qb = QueryBuilder()
-            qb.append(Calculation, tag='predecessor',
-                      filters={'id': {'==': curr_node_id}})
-            qb.append(Code, output_of='predecessor', project=['id'],
-                      edge_filters={
-                          'type': {
-                              'in': [LinkType.CREATE.value,
-                                     LinkType.RETURN.value]}})
-            res = {_[0] for _ in qb.all()}
-            given_data_entry_ids.update(res - to_be_exported)
-
-
-            # CREATE(Calculation, Data) - Reversed
-            if create_reversed:
-                qb = QueryBuilder()
-                qb.append(Calculation, tag='predecessor')
-                qb.append(Data, output_of='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}},
-                          edge_filters={
-                              'type': {
-                                  'in': [LinkType.CREATE.value]}})
-                res = {_[0] for _ in qb.all()}
-                given_data_entry_ids.update(res - to_be_exported)
-                # The same until Code becomes a subclass of Data
-                qb = QueryBuilder()
-                qb.append(Calculation, tag='predecessor')
-                qb.append(Code, output_of='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}},
-                          edge_filters={
-                              'type': {
-                                  'in': [LinkType.CREATE.value]}})
-                res = {_[0] for _ in qb.all()}
-                given_data_entry_ids.update(res - to_be_exported)
-
-
-            # RETURN(Calculation, Data) - Reversed
-            if return_reversed:
-                qb = QueryBuilder()
-                qb.append(Calculation, tag='predecessor')
-                qb.append(Data, output_of='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}},
-                          edge_filters={
-                              'type': {
-                                  'in': [LinkType.RETURN.value]}})
-                res = {_[0] for _ in qb.all()}
-                given_data_entry_ids.update(res - to_be_exported)
-                # The same until Code becomes a subclass of Data
-                qb = QueryBuilder()
-                qb.append(Calculation, tag='predecessor')
-                qb.append(Code, output_of='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}},
-                          edge_filters={
-                              'type': {
-                                  'in': [LinkType.RETURN.value]}})
-                res = {_[0] for _ in qb.all()}
-                given_data_entry_ids.update(res - to_be_exported)
-
-            # CALL(Calculation, Calculation) - Forward
-            qb = QueryBuilder()
-            qb.append(Calculation, tag='predecessor',
-                      filters={'id': {'==': curr_node_id}})
-            qb.append(Calculation, output_of='predecessor', project=['id'],
-                      edge_filters={
-                          'type': {
-                              '==': LinkType.CALL.value}})
-            res = {_[0] for _ in qb.all()}
-            given_calculation_entry_ids.update(res - to_be_exported)
-
-
-            # CALL(Calculation, Calculation) - Reversed
-            if call_reversed:
-                qb = QueryBuilder()
-                qb.append(Calculation, tag='predecessor')
-                qb.append(Calculation, output_of='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}},
-                          edge_filters={
-                              'type': {
-                                  '==': LinkType.CALL.value}})
-                res = {_[0] for _ in qb.all()}
-                given_calculation_entry_ids.update(res - to_be_exported)
-
-
-        # If it is a Data node
-        else:
-            curr_node_id = given_data_entry_ids.pop()
-            # If it is already visited continue to the next node
-            if curr_node_id in to_be_exported:
-                continue
-            # Otherwise say that it is a node to be exported
-            else:
-                to_be_exported.add(curr_node_id)
-
-            # Case 2:
-            # CREATE(Calculation, Data) - Reversed
-            if create_reversed:
-                qb = QueryBuilder()
-                qb.append(Calculation, tag='predecessor', project=['id'])
-                qb.append(Data, output_of='predecessor',
-                          filters={'id': {'==': curr_node_id}},
-                          edge_filters={
-                              'type': {
-                                  '==': LinkType.CREATE.value}})
-                res = {_[0] for _ in qb.all()}
-                given_calculation_entry_ids.update(res - to_be_exported)
-                # The same until Code becomes a subclass of Data
-                qb = QueryBuilder()
-                qb.append(Calculation, tag='predecessor', project=['id'])
-                qb.append(Code, output_of='predecessor',
-                          filters={'id': {'==': curr_node_id}},
-                          edge_filters={
-                              'type': {
-                                  '==': LinkType.CREATE.value}})
-                res = {_[0] for _ in qb.all()}
-                given_calculation_entry_ids.update(res - to_be_exported)
+    to_be_exported = retrieve_linked_nodes(
+        given_calculation_entry_ids, given_data_entry_ids,
+        input_forward=input_forward, create_reversed=create_reversed,
+        return_reversed=return_reversed, call_reversed=call_reversed)
 
     # Here we get all the columns that we plan to project per entity that we
     # would like to extract
@@ -2010,7 +2238,10 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
     if not silent:
         print("STORING DATABASE ENTRIES...")
 
-    export_data = dict()
+    # The entries are written as soon as they are retrieved; only their ids
+    # are kept in memory, to skip the duplicates of the outer joins
+    writer = ArchiveDataWriter(folder, records_per_file=records_per_file)
+    exported_entity_ids = dict()
     entity_separator = '_'
     for entity_name, partial_query in entries_to_add.items():
 
@@ -2034,331 +2265,152 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
                 if temp_d[k]["id"] is None:
                     continue
 
-                temp_d2 = {
-                    temp_d[k]["id"]:
-                        serialize_dict(temp_d[k],
-                                       remove_fields=['id'],
-                                       rename_fields=
-                                       model_fields_to_file_fields[current_entity])}
-                try:
-                    export_data[current_entity].update(temp_d2)
-                except KeyError:
-                    export_data[current_entity] = temp_d2
+                entity_ids = exported_entity_ids.setdefault(current_entity, set())
+                if temp_d[k]["id"] in entity_ids:
+                    continue
+                entity_ids.add(temp_d[k]["id"])
+
+                writer.write(current_entity, [
+                    temp_d[k]["id"],
+                    serialize_dict(temp_d[k],
+                                   remove_fields=['id'],
+                                   rename_fields=
+                                   model_fields_to_file_fields[current_entity])])
 
     ######################################
     # Manually manage links and attributes
     ######################################
     # I use .get because there may be no nodes to export
-    all_nodes_pk = list()
-    if NODE_ENTITY_NAME in export_data:
-        all_nodes_pk.extend(export_data.get(NODE_ENTITY_NAME).keys())
+    all_nodes_pk = sorted(exported_entity_ids.get(NODE_ENTITY_NAME, set()))
 
-    if sum(len(model_data) for model_data in export_data.values()) == 0:
+    if sum(len(entity_ids) for entity_ids in exported_entity_ids.values()) == 0:
         if not silent:
             print("No nodes to store, exiting...")
         return
 
     if not silent:
         print("Exporting a total of {} db entries, of which {} nodes."
-              .format(sum(len(model_data) for model_data in export_data.values()),
+              .format(sum(len(entity_ids) for entity_ids in exported_entity_ids.values()),
                       len(all_nodes_pk)))
 
     ## ATTRIBUTES
     if not silent:
         print("STORING NODE ATTRIBUTES...")
-    node_attributes = {}
-    node_attributes_conversion = {}
 
     # A second QueryBuilder query to get the attributes. See if this can be
     # optimized
-    if len(all_nodes_pk) > 0:
+    for nodes_pk in grouper(EXPORT_TRAVERSAL_CHUNK_SIZE, all_nodes_pk):
         all_nodes_query = QueryBuilder()
-        all_nodes_query.append(Node, filters={"id": {"in": all_nodes_pk}},
+        all_nodes_query.append(Node, filters={"id": {"in": nodes_pk}},
                                project=["*"])
         for res in all_nodes_query.iterall():
             n = res[0]
-            (node_attributes[str(n.pk)],
-             node_attributes_conversion[str(n.pk)]) = serialize_dict(
+            attributes, attributes_conversion = serialize_dict(
                 n.get_attrs(), track_conversion=True)
+            writer.write(NODE_ATTRIBUTES_SECTION,
+                         [n.pk, attributes, attributes_conversion])
 
     if not silent:
         print("STORING NODE LINKS...")
 
-    links_uuid_dict = dict()
-    if len(all_nodes_pk) > 0:
-        # INPUT (Data, Calculation) - Forward, by the Calculation node
-        if input_forward:
-            # INPUT (Data, Calculation)
+    # The links to export, as tuples (input class, output class, link type,
+    # tag of the vertex that has to be one of the exported nodes)
+    link_specs = []
+    # INPUT (Data, Calculation) - Forward, by the Data node
+    # The same for Code until Code becomes a subclass of Data
+    if input_forward:
+        link_specs.append((Data, Calculation, LinkType.INPUT, 'input'))
+        link_specs.append((Code, Calculation, LinkType.INPUT, 'input'))
+    # INPUT (Data, Calculation) - Backward, by the Calculation node
+    link_specs.append((Data, Calculation, LinkType.INPUT, 'output'))
+    link_specs.append((Code, Calculation, LinkType.INPUT, 'output'))
+    # CREATE (Calculation, Data) - Forward, by the Calculation node
+    # This case will not happen for Code (with the current setup - a code is
+    # not created by a calculation) but it is addded for completeness
+    link_specs.append((Calculation, Data, LinkType.CREATE, 'input'))
+    link_specs.append((Calculation, Code, LinkType.CREATE, 'input'))
+    # CREATE (Calculation, Data) - Backward, by the Data node
+    if create_reversed:
+        link_specs.append((Calculation, Data, LinkType.CREATE, 'output'))
+        link_specs.append((Calculation, Code, LinkType.CREATE, 'output'))
+    # RETURN (Calculation, Data) - Forward, by the Calculation node
+    link_specs.append((Calculation, Data, LinkType.RETURN, 'input'))
+    # RETURN (Calculation, Data) - Backward, by the Data node
+    if return_reversed:
+        link_specs.append((Calculation, Data, LinkType.RETURN, 'output'))
+    # CALL (Calculation [caller], Calculation [called]) - Forward, by the
+    # Calculation [caller] node
+    link_specs.append((Calculation, Calculation, LinkType.CALL, 'input'))
+    # CALL (Calculation [caller], Calculation [called]) - Backward, by the
+    # Calculation [called] node
+    if call_reversed:
+        link_specs.append((Calculation, Calculation, LinkType.CALL, 'output'))
+
+    # The same link can be found by more than one query, only the link ids
+    # are kept in memory to skip the duplicates
+    exported_link_ids = set()
+    for input_cls, output_cls, link_type, filtered_tag in link_specs:
+        for nodes_pk in grouper(EXPORT_TRAVERSAL_CHUNK_SIZE, all_nodes_pk):
+            nodes_filter = {'id': {'in': nodes_pk}}
             links_qb = QueryBuilder()
-            links_qb.append(Data,
+            links_qb.append(input_cls,
                             project=['uuid'], tag='input',
-                            filters = {'id': {'in': all_nodes_pk}})
-            links_qb.append(Calculation,
+                            filters=nodes_filter if filtered_tag == 'input' else None)
+            links_qb.append(output_cls,
                             project=['uuid'], tag='output',
-                            edge_filters={'type':{'==':LinkType.INPUT.value}},
-                            edge_project=['label', 'type'], output_of='input')
-            for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-                val = {
-                    'input': str(input_uuid),
-                    'output': str(output_uuid),
-                    'label': str(link_label),
-                    'type':str(link_type)
-                }
-                links_uuid_dict[frozenset(val.items())] = val
-            # INPUT (Code, Calculation)
-            # The same as above until Code becomes a subclass of Data
-            links_qb = QueryBuilder()
-            links_qb.append(Code,
-                            project=['uuid'], tag='input',
-                            filters = {'id': {'in': all_nodes_pk}})
-            links_qb.append(Calculation,
-                            project=['uuid'], tag='output',
-                            edge_filters={'type':{'==':LinkType.INPUT.value}},
-                            edge_project=['label', 'type'], output_of='input')
-            for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-                val = {
-                    'input': str(input_uuid),
-                    'output': str(output_uuid),
-                    'label': str(link_label),
-                    'type':str(link_type)
-                }
-                links_uuid_dict[frozenset(val.items())] = val
-
-        # INPUT (Data, Calculation) - Backward, by the Calculation node
-        links_qb = QueryBuilder()
-        links_qb.append(Data,
-                        project=['uuid'], tag='input')
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='output',
-                        filters={'id': {'in': all_nodes_pk}},
-                        edge_filters={'type':{'==':LinkType.INPUT.value}},
-                        edge_project=['label', 'type'], output_of='input')
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            val = {
-                'input': str(input_uuid),
-                'output': str(output_uuid),
-                'label': str(link_label),
-                'type':str(link_type)
-            }
-            links_uuid_dict[frozenset(val.items())] = val
-        # INPUT (Data, Calculation) - Backward, by the Calculation node
-        # The same as above until Code becomes a subclass of Data
-        links_qb = QueryBuilder()
-        links_qb.append(Code,
-                        project=['uuid'], tag='input')
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='output',
-                        filters={'id': {'in': all_nodes_pk}},
-                        edge_filters={
-                            'type': {'==': LinkType.INPUT.value}},
-                        edge_project=['label', 'type'], output_of='input')
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            val = {
-                'input': str(input_uuid),
-                'output': str(output_uuid),
-                'label': str(link_label),
-                'type': str(link_type)
-            }
-            links_uuid_dict[frozenset(val.items())] = val
-
-        # CREATE (Calculation, Data) - Forward, by the Calculation node
-        links_qb = QueryBuilder()
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='input',
-                        filters={'id': {'in': all_nodes_pk}})
-        links_qb.append(Data,
-                        project=['uuid'], tag='output',
-                        edge_filters={'type': {'==': LinkType.CREATE.value}},
-                        edge_project=['label', 'type'], output_of='input')
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            val = {
-                'input': str(input_uuid),
-                'output': str(output_uuid),
-                'label': str(link_label),
-                'type':str(link_type)
-            }
-            links_uuid_dict[frozenset(val.items())] = val
-        # CREATE (Calculation, Code) - Forward, by the Calculation node
-        # The same as above until Code becomes a subclass of Data
-        # This case will not happen (with the current setup - a code is not
-        # created by a calculation) but it is addded for completeness
-        links_qb = QueryBuilder()
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='input',
-                        filters={'id': {'in': all_nodes_pk}})
-        links_qb.append(Code,
-                        project=['uuid'], tag='output',
-                        edge_filters={'type': {'==': LinkType.CREATE.value}},
-                        edge_project=['label', 'type'], output_of='input')
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            val = {
-                'input': str(input_uuid),
-                'output': str(output_uuid),
-                'label': str(link_label),
-                'type': str(link_type)
-            }
-            links_uuid_dict[frozenset(val.items())] = val
-
-
-        # CREATE (Calculation, Data) - Backward, by the Data node
-        if create_reversed:
-            links_qb = QueryBuilder()
-            links_qb.append(Calculation,
-                            project=['uuid'], tag='input',
-                            filters={'id': {'in': all_nodes_pk}})
-            links_qb.append(Data,
-                            project=['uuid'], tag='output',
-                            edge_filters={'type': {'==': LinkType.CREATE.value}},
-                            edge_project=['label', 'type'], output_of='input')
-            for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-                val = {
-                    'input': str(input_uuid),
-                    'output': str(output_uuid),
-                    'label': str(link_label),
-                    'type':str(link_type)
-                }
-                links_uuid_dict[frozenset(val.items())] = val
-        # CREATE (Calculation, Code) - Backward, by the Code node
-        # The same as above until Code becomes a subclass of Data
-        # This case will not happen (with the current setup - a code is not
-        # created by a calculation) but it is addded for completeness
-        if create_reversed:
-            links_qb = QueryBuilder()
-            links_qb.append(Calculation,
-                            project=['uuid'], tag='input',
-                            filters={'id': {'in': all_nodes_pk}})
-            links_qb.append(Data,
-                            project=['uuid'], tag='output',
-                            edge_filters={'type': {'==': LinkType.CREATE.value}},
-                            edge_project=['label', 'type'], output_of='input')
-            for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-                val = {
-                    'input': str(input_uuid),
-                    'output': str(output_uuid),
-                    'label': str(link_label),
-                    'type':str(link_type)
-                }
-                links_uuid_dict[frozenset(val.items())] = val
-
-        # RETURN (Calculation, Data) - Forward, by the Calculation node
-        links_qb = QueryBuilder()
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='input',
-                        filters={'id': {'in': all_nodes_pk}})
-        links_qb.append(Data,
-                        project=['uuid'], tag='output',
-                        edge_filters={'type': {'==': LinkType.RETURN.value}},
-                        edge_project=['label', 'type'], output_of='input')
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            val = {
-                'input': str(input_uuid),
-                'output': str(output_uuid),
-                'label': str(link_label),
-                'type':str(link_type)
-            }
-            links_uuid_dict[frozenset(val.items())] = val
-
-        # RETURN (Calculation, Data) - Backward, by the Data node
-        if return_reversed:
-            links_qb = QueryBuilder()
-            links_qb.append(Calculation,
-                            project=['uuid'], tag='input')
-            links_qb.append(Data,
-                            project=['uuid'], tag='output',
-                            filters={'id': {'in': all_nodes_pk}},
-                            edge_filters={'type': {'==': LinkType.RETURN.value}},
-                            edge_project=['label', 'type'], output_of='input')
-            for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-                val = {
-                    'input': str(input_uuid),
-                    'output': str(output_uuid),
-                    'label': str(link_label),
-                    'type':str(link_type)
-                }
-                links_uuid_dict[frozenset(val.items())] = val
-
-        # CALL (Calculation [caller], Calculation [called]) - Forward, by
-        # the Calculation node
-        links_qb = QueryBuilder()
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='input',
-                        filters={'id': {'in': all_nodes_pk}})
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='output',
-                        edge_filters={'type': {'==': LinkType.CALL.value}},
-                        edge_project=['label', 'type'], output_of='input')
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            val = {
-                'input': str(input_uuid),
-                'output': str(output_uuid),
-                'label': str(link_label),
-                'type':str(link_type)
-            }
-            links_uuid_dict[frozenset(val.items())] = val
-
-        # CALL (Calculation [caller], Calculation [called]) - Backward,
-        # by the Calculation [called] node
-        if call_reversed:
-            links_qb = QueryBuilder()
-            links_qb.append(Calculation,
-                            project=['uuid'], tag='input')
-            links_qb.append(Calculation,
-                            project=['uuid'], tag='output',
-                            filters={'id': {'in': all_nodes_pk}},
-                            edge_filters={'type': {'==': LinkType.CALL.value}},
-                            edge_project=['label', 'type'], output_of='input')
-            for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-                val = {
+                            filters=nodes_filter if filtered_tag == 'output' else None,
+                            edge_filters={'type': {'==': link_type.value}},
+                            edge_project=['id', 'label', 'type'], output_of='input')
+            for input_uuid, output_uuid, link_id, link_label, link_type_value in links_qb.iterall():
+                if link_id in exported_link_ids:
+                    continue
+                exported_link_ids.add(link_id)
+                writer.write(LINKS_SECTION, {
                     'input': str(input_uuid),
                     'output': str(output_uuid),
                     'label': str(link_label),
-                    'type':str(link_type)
-                }
-                links_uuid_dict[frozenset(val.items())] = val
-
-    links_uuid = list(links_uuid_dict.values())
+                    'type': str(link_type_value)
+                })
 
     if not silent:
         print("STORING GROUP ELEMENTS...")
-    groups_uuid = dict()
     # If a group is in the exported date, we export the group/node correlation
-    if GROUP_ENTITY_NAME in export_data:
-        for curr_group in export_data[GROUP_ENTITY_NAME]:
-            group_uuid_qb = QueryBuilder()
-            group_uuid_qb.append(entity_names_to_entities[GROUP_ENTITY_NAME],
-                                 filters={'id': {'==': curr_group}},
-                                 project=['uuid'], tag='group')
-            group_uuid_qb.append(entity_names_to_entities[NODE_ENTITY_NAME],
-                                 project=['uuid'], member_of='group')
-            for res in group_uuid_qb.iterall():
-                if str(res[0]) in groups_uuid:
-                    groups_uuid[str(res[0])].append(str(res[1]))
-                else:
-                    groups_uuid[str(res[0])] = [str(res[1])]
+    for curr_group in exported_entity_ids.get(GROUP_ENTITY_NAME, set()):
+        group_uuid_qb = QueryBuilder()
+        group_uuid_qb.append(entity_names_to_entities[GROUP_ENTITY_NAME],
+                             filters={'id': {'==': curr_group}},
+                             project=['uuid'], tag='group')
+        group_uuid_qb.append(entity_names_to_entities[NODE_ENTITY_NAME],
+                             project=['uuid'], member_of='group')
+        # The members of large groups are split over more than one record
+        for results in grouper(EXPORT_TRAVERSAL_CHUNK_SIZE, group_uuid_qb.iterall()):
+            writer.write(GROUPS_SECTION, [str(results[0][0]), [str(res[1]) for res in results]])
 
     ######################################
     # Now I store
     ######################################
-    # subfolder inside the export package
-    nodesubfolder = folder.get_subfolder('nodes', create=True,
-                                         reset_limit=True)
-
-    # Add the proper signatures to the exported data
-    for entity_name in export_data.keys():
-        export_data[entity_name] = (
-            export_data.pop(entity_name))
-
     if not silent:
         print("STORING DATA...")
 
-    with folder.open('data.json', 'w') as f:
-        json.dump({
-            'node_attributes': node_attributes,
-            'node_attributes_conversion': node_attributes_conversion,
-            'export_data': export_data,
-            'links_uuid': links_uuid,
-            'groups_uuid': groups_uuid,
-        }, f)
+    writer.close()
+
+    if silent is not True:
+        print("STORING FILES...")
+
+    # Large speed increase by not getting the node itself and looping in memory
+    # in python, but just getting the uuid
+    all_nodes_uuid = []
+    for nodes_pk in grouper(EXPORT_TRAVERSAL_CHUNK_SIZE, all_nodes_pk):
+        uuid_query = QueryBuilder()
+        uuid_query.append(Node, filters={"id": {"in": nodes_pk}},
+                          project=["uuid"])
+        all_nodes_uuid.extend(str(res[0]) for res in uuid_query.iterall())
+
+    # If there are no nodes, there are no files to store
+    repository_exporter = RepositoryFolderExporter(
+        folder, copy_workers=copy_workers, deduplicate=deduplicate,
+        silent=silent)
+    repository_exporter.export(all_nodes_uuid)
 
     # Add proper signature to unique identifiers & all_fields_info
     # Ignore if a key doesn't exist in any of the two dictionaries
@@ -2368,36 +2420,15 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
         'export_version': EXPORT_VERSION,
         'all_fields_info': all_fields_info,
         'unique_identifiers': unique_identifiers,
+        'data_files': writer.files,
     }
 
+    if repository_exporter.duplicate_files:
+        metadata['duplicate_files'] = repository_exporter.duplicate_files
+
     with folder.open('metadata.json', 'w') as f:
         json.dump(metadata, f)
 
-    if silent is not True:
-        print("STORING FILES...")
-
-    # If there are no nodes, there are no files to store
-    if len(all_nodes_pk) > 0:
-        # Large speed increase by not getting the node itself and looping in memory
-        # in python, but just getting the uuid
-        uuid_query = QueryBuilder()
-        uuid_query.append(Node, filters={"id": {"in": all_nodes_pk}},
-                          project=["uuid"])
-        for res in uuid_query.all():
-            uuid = str(res[0])
-            sharded_uuid = export_shard_uuid(uuid)
-
-            # Important to set create=False, otherwise creates
-            # twice a subfolder. Maybe this is a bug of insert_path??
-            thisnodefolder = nodesubfolder.get_subfolder(
-                sharded_uuid, create=False,
-                reset_limit=True)
-            # In this way, I copy the content of the folder, and not the folder
-            # itself
-            thisnodefolder.insert_path(src=RepositoryFolder(
-                section=Node._section_name, uuid=uuid).abspath,
-                                       dest_name='.')
-
 
 def check_licences(node_licenses, allowed_licenses, forbidden_licenses):
     from aiida.common.exceptions import LicensingException
@@ -2601,6 +2632,32 @@ class ZipFolder(object):
         else:
             self._zipfile.write(src, base_filename)
 
+    def insert_file(self, src, dest_name, content=None):
+        """
+        Insert a single file or directory, without walking into directories.
+
+        :param src: the absolute path of the file or directory
+        :param dest_name: the path in the zip file, relative to this folder
+        :param content: the bytes of the file, if they were already read
+            from src; the file is read again if None
+        """
+        import os
+        import time
+        import zipfile
+
+        dest_name = self._get_internal_path(six.text_type(dest_name))
+
+        if content is None:
+            self._zipfile.write(src, dest_name)
+            return
+
+        # The same entry that zipfile.ZipFile.write creates for src
+        stat = os.stat(src)
+        zinfo = zipfile.ZipInfo(dest_name, time.localtime(stat.st_mtime)[0:6])
+        zinfo.external_attr = (stat.st_mode & 0xFFFF) << 16
+        zinfo.compress_type = self._zipfile.compression
+        self._zipfile.writestr(zinfo, content)
+
 
 def export_zip(what, outfile='testzip', overwrite=False,
                silent=False, use_compression=True, **kwargs):
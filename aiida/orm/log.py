@@ -24,6 +24,35 @@ DESCENDING = -1
 OrderSpecifier = namedtuple("OrderSpecifier", ['field', 'direction'])
 
 
+def get_entry_from_record(record):
+    """
+    Return the keyword arguments of `LogCollection.create_entry` for a record
+    created as by the python logging library.
+
+    :param record: The record created by the logging module
+    :type record: :class:`logging.record`
+    :return: a dictionary, or None if the objpk or the objname of the record
+        are not set, since those records are not stored
+    """
+    from datetime import datetime
+
+    objpk = record.__dict__.get('objpk', None)
+    objname = record.__dict__.get('objname', None)
+
+    if objpk is None or objname is None:
+        return None
+
+    return {
+        'time': timezone.make_aware(datetime.fromtimestamp(record.created)),
+        'loggername': record.name,
+        'levelname': record.levelname,
+        'objname': objname,
+        'objpk': objpk,
+        'message': record.getMessage(),
+        'metadata': record.__dict__,
+    }
+
+
 @six.add_metaclass(ABCMeta)
 class LogCollection(Collection):
     """
@@ -66,24 +95,28 @@ class LogCollection(Collection):
         :return: An object implementing the log entry interface
         :rtype: :class:`aiida.orm.log.Log`
         """
-        from datetime import datetime
-
-        objpk = record.__dict__.get('objpk', None)
-        objname = record.__dict__.get('objname', None)
+        entry = get_entry_from_record(record)
 
         # Do not store if objpk and objname are not set
-        if objpk is None or objname is None:
+        if entry is None:
             return None
 
-        return self.create_entry(
-            time=timezone.make_aware(datetime.fromtimestamp(record.created)),
-            loggername=record.name,
-            levelname=record.levelname,
-            objname=objname,
-            objpk=objpk,
-            message=record.getMessage(),
-            metadata=record.__dict__
-        )
+        return self.create_entry(**entry)
+
+    def create_entries(self, entries):
+        """
+        Create many log entries at once.
+
+        Backends should override this to store all entries with a single
+        query; by default every entry is stored with `create_entry`. It is
+        called from the background thread of the asynchronous DBLogHandler,
+        so it should use the database connection of the calling thread.
+
+        :param entries: a list of dictionaries with the keyword arguments of
+            `create_entry`, e.g. as returned by `get_entry_from_record`
+        """
+        for entry in entries:
+            self.create_entry(**entry)
 
     @abstractmethod
     def find(self, filter_by=None, order_by=None, limit=None):
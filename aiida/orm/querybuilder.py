@@ -450,7 +450,7 @@ class QueryBuilder(object):
     def append(self, cls=None, type=None, tag=None,
                filters=None, project=None, subclassing=True,
                edge_tag=None, edge_filters=None, edge_project=None,
-               outerjoin=False, **kwargs
+               outerjoin=False, max_depth=None, link_types=None, prune_visited=False, **kwargs
                ):
         """
         Any iterative procedure to build the path for a graph query
@@ -496,6 +496,21 @@ class QueryBuilder(object):
             The filters to apply on the edge. Also here, details in :meth:`.add_filter`.
         :param str edge_project:
             The project from the edges. API-details in :meth:`.add_projection`.
+        :param int max_depth:
+            Only for *descendant_of* and *ancestor_of*: the maximum number of links between the two nodes.
+            The limit is applied inside the recursive query, such that longer paths are not even walked.
+            A filter on the *depth* of the edge (which is the number of links minus one) is used in the same
+            way, if it gives an upper bound.
+        :param link_types:
+            Only for *descendant_of* and *ancestor_of*: the :class:`~aiida.common.links.LinkType` (or their
+            values) of the links that are followed. The default is to follow CREATE and INPUT links.
+        :param bool prune_visited:
+            Only for *descendant_of* and *ancestor_of*: if True, a node that was already reached from the same
+            starting node with the same depth is not walked again, and if the path is projected or filtered,
+            nodes already on the path are not visited again, which also stops the recursion on cycles.
+            Each combination of starting node, node reached and depth is then returned only once.
+            If the path is not needed, this is the query that the transitive closure table can answer, so the table is
+            used instead of the recursive query whenever it is up to date (see :py:mod:`aiida.manage.database.closure`).
 
         A small usage example how this can be invoked::
 
@@ -745,6 +760,8 @@ class QueryBuilder(object):
                         "direction={}\n"
                         "{}\n".format(joining_value, exc))
 
+            recursion_options = self._get_recursion_options(joining_keyword, max_depth, link_types, prune_visited)
+
 
         except Exception as e:
             if self._debug:
@@ -809,13 +826,47 @@ class QueryBuilder(object):
 
             ################### EXTENDING THE PATH #################################
 
-        self._path.append(dict(
+        path_spec = dict(
             type=ormclasstype, tag=tag, joining_keyword=joining_keyword,
             joining_value=joining_value, outerjoin=outerjoin, edge_tag=edge_tag
-        ))
+        )
+        path_spec.update(recursion_options)
+        self._path.append(path_spec)
 
         return self
 
+    @staticmethod
+    def _get_recursion_options(joining_keyword, max_depth, link_types, prune_visited):
+        """
+        Validate the options of the recursive joins *descendant_of* and *ancestor_of*.
+
+        :returns: a dictionary with the options that differ from the default, to be stored in the path
+        """
+        options = {}
+
+        if max_depth is not None:
+            if not isinstance(max_depth, six.integer_types) or isinstance(max_depth, bool) or max_depth < 1:
+                raise InputValidationError("max_depth has to be a positive integer, got {}".format(max_depth))
+            options['max_depth'] = max_depth
+
+        if link_types is not None:
+            if isinstance(link_types, (LinkType, six.string_types)):
+                link_types = [link_types]
+            try:
+                options['link_types'] = [LinkType(link_type).value for link_type in link_types]
+            except (TypeError, ValueError):
+                raise InputValidationError("link_types has to be a list of LinkType, got {}".format(link_types))
+
+        if prune_visited:
+            options['prune_visited'] = True
+
+        if options and joining_keyword not in ('descendant_of', 'ancestor_of'):
+            raise InputValidationError(
+                "{} can only be specified when joining with descendant_of or ancestor_of".format(
+                    ', '.join(sorted(options.keys()))))
+
+        return options
+
     def order_by(self, order_by):
         """
         Set the entity to order by
@@ -1397,11 +1448,57 @@ class QueryBuilder(object):
         )
         return aliased_edge
 
-    def _join_descendants_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False):
+    @staticmethod
+    def _get_max_depth_from_filters(filter_spec):
+        """
+        Get the maximum number of links implied by the filters on the depth of a recursive edge, if any.
+
+        Only a filter directly on the depth column with the operators `==`, `<` and `<=` is taken into account.
+
+        :param filter_spec: the filters of the edge
+        :returns: the maximum number of links or None
+        """
+        depth_filter = filter_spec.get('depth', None)
+
+        if depth_filter is None:
+            return None
+
+        if not isinstance(depth_filter, dict):
+            depth_filter = {'==': depth_filter}
+
+        max_depths = []
+        for operator, value in depth_filter.items():
+            if not isinstance(value, six.integer_types) or isinstance(value, bool):
+                continue
+            if operator in ('==', '<='):
+                max_depths.append(value + 1)
+            elif operator == '<':
+                max_depths.append(value)
+
+        if not max_depths:
+            return None
+
+        # A non-positive maximum means no path can match, but at least the first link is always walked
+        return max(min(max_depths), 1)
+
+    @staticmethod
+    def _get_recursive_link_types(link_types):
+        """
+        :returns: the values of the link types that the recursive joins follow
+        """
+        if link_types is None:
+            # By default, I follow input and create links, and can't follow RETURN or CALL links
+            return (LinkType.CREATE.value, LinkType.INPUT.value)
+        return tuple(link_types)
+
+    def _join_descendants_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False,
+                                    max_depth=None, link_types=None, prune_visited=False):
         """
         joining descendants using the recursive functionality
-        :TODO: Move the filters to be done inside the recursive query (for example on depth)
-        :TODO: Pass an option to also show the path, if this is wanted.
+
+        :param max_depth: the maximum number of links that is walked, None for no limit
+        :param link_types: the values of the link types to follow, None for CREATE and INPUT links
+        :param prune_visited: whether rows of the recursive query that were already visited are walked again
         """
 
         self._check_dbentities(
@@ -1414,6 +1511,7 @@ class QueryBuilder(object):
         link2 = aliased(self._impl.Link)
         node1 = aliased(self._impl.Node)
         in_recursive_filters = self._build_filters(node1, filter_dict)
+        link_types = self._get_recursive_link_types(link_types)
 
         selection_walk_list = [
             link1.input_id.label('ancestor_id'),
@@ -1429,7 +1527,7 @@ class QueryBuilder(object):
             )
         ).where(and_(
             in_recursive_filters,  # I apply filters for speed here
-            link1.type.in_((LinkType.CREATE.value, LinkType.INPUT.value))  # I follow input and create links
+            link1.type.in_(link_types)
         )).cte(recursive=True)
 
         aliased_walk = aliased(walk)
@@ -1442,14 +1540,17 @@ class QueryBuilder(object):
         if expand_path:
             selection_union_list.append((aliased_walk.c.path + array([link2.output_id])).label('path'))
 
-        descendants_recursive = aliased(aliased_walk.union_all(
+        union_filters = self._get_recursive_union_filters(
+            aliased_walk, link2.type, link2.output_id, link_types, max_depth, prune_visited and expand_path)
+
+        descendants_recursive = aliased(self._get_recursive_union(aliased_walk, prune_visited)(
             select(selection_union_list).select_from(
                 join(
                     aliased_walk,
                     link2,
                     link2.input_id == aliased_walk.c.descendant_id,
                 )
-            ).where(link2.type.in_((LinkType.CREATE.value, LinkType.INPUT.value)))
+            ).where(union_filters)
         ))  # .alias()
 
         self._query = self._query.join(
@@ -1462,12 +1563,14 @@ class QueryBuilder(object):
         )
         return descendants_recursive.c
 
-    def _join_ancestors_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False):
+    def _join_ancestors_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False,
+                                  max_depth=None, link_types=None, prune_visited=False):
         """
         joining ancestors using the recursive functionality
-        :TODO: Move the filters to be done inside the recursive query (for example on depth)
-        :TODO: Pass an option to also show the path, if this is wanted.
 
+        :param max_depth: the maximum number of links that is walked, None for no limit
+        :param link_types: the values of the link types to follow, None for CREATE and INPUT links
+        :param prune_visited: whether rows of the recursive query that were already visited are walked again
         """
         self._check_dbentities(
             (joined_entity, self._impl.Node),
@@ -1479,6 +1582,7 @@ class QueryBuilder(object):
         link2 = aliased(self._impl.Link)
         node1 = aliased(self._impl.Node)
         in_recursive_filters = self._build_filters(node1, filter_dict)
+        link_types = self._get_recursive_link_types(link_types)
 
         selection_walk_list = [
             link1.input_id.label('ancestor_id'),
@@ -1492,8 +1596,7 @@ class QueryBuilder(object):
             join(
                 node1, link1, link1.output_id == node1.id
             )
-        ).where(and_(in_recursive_filters, link1.type.in_((LinkType.CREATE.value, LinkType.INPUT.value)))).cte(
-            recursive=True)
+        ).where(and_(in_recursive_filters, link1.type.in_(link_types))).cte(recursive=True)
 
         aliased_walk = aliased(walk)
 
@@ -1505,15 +1608,17 @@ class QueryBuilder(object):
         if expand_path:
             selection_union_list.append((aliased_walk.c.path + array([link2.input_id])).label('path'))
 
-        ancestors_recursive = aliased(aliased_walk.union_all(
+        union_filters = self._get_recursive_union_filters(
+            aliased_walk, link2.type, link2.input_id, link_types, max_depth, prune_visited and expand_path)
+
+        ancestors_recursive = aliased(self._get_recursive_union(aliased_walk, prune_visited)(
             select(selection_union_list).select_from(
                 join(
                     aliased_walk,
                     link2,
                     link2.output_id == aliased_walk.c.ancestor_id,
                 )
-            ).where(link2.type.in_((LinkType.CREATE.value, LinkType.INPUT.value)))
-            # I can't follow RETURN or CALL links
+            ).where(union_filters)
         ))
 
         self._query = self._query.join(
@@ -1526,6 +1631,90 @@ class QueryBuilder(object):
         )
         return ancestors_recursive.c
 
+    @staticmethod
+    def _get_recursive_union_filters(aliased_walk, link_type, next_node_id, link_types, max_depth, prune_path):
+        """
+        Build the filters of the recursive part of the queries of *descendant_of* and *ancestor_of*.
+
+        :param aliased_walk: the recursive common table expression
+        :param link_type: the type column of the link that is walked
+        :param next_node_id: the column with the id of the node reached through the link that is walked
+        :param link_types: the values of the link types to follow
+        :param max_depth: the maximum number of links that is walked, None for no limit
+        :param prune_path: whether to stop when the node reached is already on the path
+        """
+        filters = [link_type.in_(link_types)]
+        if max_depth is not None:
+            # The depth of the first link that is walked is 0
+            filters.append(aliased_walk.c.depth < max_depth - 1)
+        if prune_path:
+            filters.append(not_(aliased_walk.c.path.any(next_node_id)))
+        return and_(*filters)
+
+    @staticmethod
+    def _get_recursive_union(aliased_walk, prune_visited):
+        """
+        :returns: the method to combine the recursive common table expression with its recursive part; a UNION
+            discards rows that were already visited, whereas a UNION ALL walks every path
+        """
+        if prune_visited:
+            return aliased_walk.union
+        return aliased_walk.union_all
+
+    @staticmethod
+    def _can_use_closure(verticespec, expand_path):
+        """
+        Whether a recursive join can be done through the transitive closure table instead of a recursive query.
+
+        The closure table only contains every combination of ancestor, descendant and depth once, following the CREATE
+        and INPUT links, so it gives the same result only when visited rows are pruned and the path is not needed.
+        It is only used if it is up to date with the links in the database.
+        """
+        from aiida.manage.database.closure import CLOSURE_LINK_TYPES, is_closure_up_to_date
+
+        if not verticespec.get('prune_visited', False) or expand_path:
+            return False
+
+        link_types = verticespec.get('link_types', None)
+        if link_types is not None and set(link_types) != set(CLOSURE_LINK_TYPES):
+            return False
+
+        return is_closure_up_to_date()
+
+    def _join_closure(self, joined_entity, entity_to_join, isouterjoin, descendants, max_depth=None):
+        """
+        joining descendants or ancestors using the transitive closure table
+
+        :param descendants: True to join the descendants of the joined entity, False to join its ancestors
+        :param max_depth: the maximum number of links between the nodes, None for no limit
+        """
+        self._check_dbentities(
+            (joined_entity, self._impl.Node),
+            (entity_to_join, self._impl.Node),
+            'descendant_of' if descendants else 'ancestor_of'
+        )
+
+        closure = aliased(self._impl.Closure)
+
+        if descendants:
+            joined_id, to_join_id = closure.ancestor_id, closure.descendant_id
+        else:
+            joined_id, to_join_id = closure.descendant_id, closure.ancestor_id
+
+        join_condition = joined_id == joined_entity.id
+        if max_depth is not None:
+            join_condition = and_(join_condition, closure.depth < max_depth)
+
+        self._query = self._query.join(
+            closure,
+            join_condition
+        ).join(
+            entity_to_join,
+            to_join_id == entity_to_join.id,
+            isouter=isouterjoin
+        )
+        return closure
+
     def _join_group_members(self, joined_entity, entity_to_join, isouterjoin):
         """
         :param joined_entity:
@@ -1887,8 +2076,20 @@ class QueryBuilder(object):
                         (self._filters[edge_tag].get('path', None) is not None) or
                         any(['path' in d.keys() for d in self._projections[edge_tag]])
                 )
-                aliased_edge = connection_func(toconnectwith, alias, isouterjoin=isouterjoin, filter_dict=filter_dict,
-                                               expand_path=expand_path)
+                # The depth limit is pushed into the recursive query, also when it is only implied by a filter
+                # on the depth of the edge, which is then still applied on the result
+                max_depth = self._get_max_depth_from_filters(self._filters[edge_tag])
+                if verticespec.get('max_depth', None) is not None:
+                    max_depth = min(verticespec['max_depth'], max_depth or verticespec['max_depth'])
+                if self._can_use_closure(verticespec, expand_path):
+                    aliased_edge = self._join_closure(
+                        toconnectwith, alias, isouterjoin=isouterjoin,
+                        descendants=(verticespec['joining_keyword'] == 'descendant_of'), max_depth=max_depth)
+                else:
+                    aliased_edge = connection_func(toconnectwith, alias, isouterjoin=isouterjoin,
+                                                   filter_dict=filter_dict, expand_path=expand_path,
+                                                   max_depth=max_depth, link_types=verticespec.get('link_types', None),
+                                                   prune_visited=verticespec.get('prune_visited', False))
             else:
                 aliased_edge = connection_func(toconnectwith, alias, isouterjoin=isouterjoin)
             if aliased_edge is not None:
@@ -2330,6 +2531,84 @@ class QueryBuilder(object):
         """
         return list(self.iterdict(batch_size=batch_size))
 
+    def itercolumns(self, batch_size=10000, as_arrays=False):
+        """
+        Same as :meth:`.columns`, but returns a generator of the columns of chunks of at most `batch_size` rows.
+        Be aware that this is only safe if no commit will take place during this transaction.
+
+        :param int batch_size: The number of rows fetched from the database cursor per chunk.
+        :param bool as_arrays: If True, the columns are returned as numpy arrays instead of lists.
+
+        :returns: a generator of dictionaries of columns, with the same structure as returned by :meth:`.columns`
+        """
+        import numpy as np
+
+        query = self.get_query()
+
+        if '*' in self._attrkeys_as_in_sql_result.values():
+            raise InputValidationError(
+                "Columns can only be returned for the projections of properties,\n"
+                "not for entire entities (the '*' projection)"
+            )
+
+        for chunk in self._impl.itercolumns(query, batch_size, self.tag_to_projected_entity_dict):
+            yield {
+                tag: {
+                    attrkey: np.array(values) if as_arrays else list(values)
+                    for attrkey, values in columns.items()
+                }
+                for tag, columns in chunk.items()
+            }
+
+    def columns(self, batch_size=None, as_arrays=False):
+        """
+        Executes the full query and returns the results as columns rather than rows.
+        The values are fetched directly from the database cursor in chunks, without instantiating
+        ORM objects for every row, which is much faster than :meth:`.all` or :meth:`.dict`
+        for queries returning many rows.
+        Only the projections of properties, like ``id`` or ``attributes.energy``, are supported.
+
+        :param int batch_size:
+            The number of rows fetched from the database cursor per chunk.
+            Leave the default (*None*) to use chunks of 10000 rows.
+        :param bool as_arrays:
+            If True, the columns are returned as numpy arrays instead of lists.
+
+        :returns:
+            a dictionary where the key is the tag of the vertice and the value a dictionary where
+            the key is the entity description (a column name or attribute path) and the value
+            the list (or array) of the values of all rows, in the order returned by the backend.
+
+        Usage::
+
+            qb = QueryBuilder()
+            qb.append(ParameterData, project=['id', 'attributes.energy'], tag='parameters')
+            energies = qb.columns(as_arrays=True)['parameters']['attributes.energy']
+        """
+        import numpy as np
+
+        # Building the query first, which sets the projected entities of every tag
+        self.get_query()
+        results = {
+            tag: {attrkey: [] for attrkey in projected_entities_dict}
+            for tag, projected_entities_dict in self.tag_to_projected_entity_dict.items()
+        }
+
+        for chunk in self.itercolumns(batch_size=batch_size or 10000, as_arrays=as_arrays):
+            for tag, columns in chunk.items():
+                for attrkey, values in columns.items():
+                    if as_arrays:
+                        results[tag][attrkey].append(values)
+                    else:
+                        results[tag][attrkey].extend(values)
+
+        if as_arrays:
+            for columns in results.values():
+                for attrkey, chunks in columns.items():
+                    columns[attrkey] = np.concatenate(chunks) if chunks else np.array([])
+
+        return results
+
     def get_results_dict(self):
         """
         Deprecated, use :meth:`.dict` instead
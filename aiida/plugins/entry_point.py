@@ -11,6 +11,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
 import enum
+import os
 import traceback
 
 import six
@@ -171,14 +172,7 @@ def load_entry_point(group, name):
     :raises MultipleEntryPointError: entry point could not be uniquely resolved
     :raises LoadingEntryPointError: entry point could not be loaded
     """
-    entry_point = get_entry_point(group, name)
-
-    try:
-        loaded_entry_point = entry_point.load()
-    except ImportError as exception:
-        raise LoadingEntryPointError("Failed to load entry point '{}':\n{}".format(name, traceback.format_exc()))
-
-    return loaded_entry_point
+    return ENTRY_POINT_INDEX.load_entry_point(group, name)
 
 
 def get_entry_point_groups():
@@ -213,7 +207,7 @@ def get_entry_points(group):
     :param group: the entry point group
     :return: a list of entry points
     """
-    return [ep for ep in epm.iter_entry_points(group=group)]
+    return ENTRY_POINT_INDEX.get_entry_points(group)
 
 
 def get_entry_point(group, name):
@@ -226,15 +220,7 @@ def get_entry_point(group, name):
     :raises MissingEntryPointError: entry point was not registered
     :raises MultipleEntryPointError: entry point could not be uniquely resolved
     """
-    entry_points = [ep for ep in get_entry_points(group) if ep.name == name]
-
-    if not entry_points:
-        raise MissingEntryPointError("Entry point '{}' not found in group '{}'".format(name, group))
-
-    if len(entry_points) > 1:
-        raise MultipleEntryPointError("Multiple entry points '{}' found in group".format(name, group))
-
-    return entry_points[0]
+    return ENTRY_POINT_INDEX.get_entry_point(group, name)
 
 
 def get_entry_point_from_class(class_module, class_name):
@@ -252,17 +238,167 @@ def get_entry_point_from_class(class_module, class_name):
         class_path = class_name[len(prefix):]
         class_module, class_name = class_path.rsplit('.', 1)
 
-    for group in epm.get_entry_map().keys():
-        for entry_point in epm.iter_entry_points(group):
+    return ENTRY_POINT_INDEX.get_entry_point_from_class(class_module, class_name)
+
+
+def reset_entry_point_index():
+    """
+    Discard the index of the registered entry points, such that it is rebuilt at the next lookup. This is only needed
+    if entry points are registered in a way that the version check of the index does not detect.
+    """
+    ENTRY_POINT_INDEX.reset()
+
+
+def get_entry_point_registry_version():
+    """
+    Return a value that changes when the registered entry points change, which is cheap enough to compute at every
+    lookup in the index. For reentry this is the modification time and size of its data file, for pkg_resources the
+    identity of the working set and the number of its entries.
+
+    :return: the version of the registered entry points
+    """
+    datafile = getattr(getattr(epm, '_backend', None), 'datafile', None)
+
+    if datafile is not None:
+        try:
+            stat = os.stat(datafile)
+        except OSError:
+            return None
+        return stat.st_mtime, stat.st_size
+
+    working_set = getattr(epm, 'working_set', None)
+
+    if working_set is not None:
+        return id(working_set), len(working_set.entries)
 
-            if entry_point.module_name != class_module:
-                continue
+    return None
 
-            for entry_point_class_name in entry_point.attrs:
-                if entry_point_class_name == class_name:
-                    return group, entry_point
 
-    return None, None
+class EntryPointIndex(object):
+    """
+    Index of the registered entry points by group and name, and by the module and name of the class they point to.
+
+    Scanning the registered entry points for every lookup is expensive, and the lookups happen for every node class
+    that is resolved, for example when loading nodes. The index is built lazily for each group at its first lookup,
+    the classes loaded from the entry points are kept, and everything is discarded as soon as the version returned by
+    `get_entry_point_registry_version` changes, or when `reset` is called.
+    """
+
+    def __init__(self):
+        self._version = None
+        self._groups = {}  # Mapping: {group: ([entry_point], {name: [entry_point]})}
+        self._classes = None  # Mapping: {(class_module, class_name): (group, entry_point)}
+        self._loaded = {}  # Mapping: {(group, name): class}
+
+    def reset(self):
+        """Discard the index, that is rebuilt at the next lookup."""
+        self._version = None
+        self._groups = {}
+        self._classes = None
+        self._loaded = {}
+
+    def _validate(self):
+        """Discard the index if the registered entry points changed since it was built."""
+        version = get_entry_point_registry_version()
+        if version != self._version:
+            self.reset()
+            self._version = version
+
+    def _get_group(self, group):
+        """
+        Return the entry points of a group, scanning the group if it is not indexed yet.
+
+        :param group: the entry point group
+        :return: tuple of the list of the entry points in the group and the mapping of their names to them
+        """
+        self._validate()
+
+        try:
+            return self._groups[group]
+        except KeyError:
+            entry_points = list(epm.iter_entry_points(group=group))
+            by_name = {}
+            for entry_point in entry_points:
+                by_name.setdefault(entry_point.name, []).append(entry_point)
+            self._groups[group] = (entry_points, by_name)
+            return entry_points, by_name
+
+    def get_entry_points(self, group):
+        """
+        Return a list of all the entry points within a specific group
+
+        :param group: the entry point group
+        :return: a list of entry points
+        """
+        return list(self._get_group(group)[0])
+
+    def get_entry_point(self, group, name):
+        """
+        Return an entry point with a given name within a specific group
+
+        :param group: the entry point group
+        :param name: the name of the entry point
+        :return: the entry point
+        :raises MissingEntryPointError: entry point was not registered
+        :raises MultipleEntryPointError: entry point could not be uniquely resolved
+        """
+        entry_points = self._get_group(group)[1].get(name, [])
+
+        if not entry_points:
+            raise MissingEntryPointError("Entry point '{}' not found in group '{}'".format(name, group))
+
+        if len(entry_points) > 1:
+            raise MultipleEntryPointError("Multiple entry points '{}' found in group".format(name, group))
+
+        return entry_points[0]
+
+    def load_entry_point(self, group, name):
+        """
+        Load the class registered under the entry point for a given name and group
+
+        :param group: the entry point group
+        :param name: the name of the entry point
+        :return: class registered at the given entry point
+        :raises MissingEntryPointError: entry point was not registered
+        :raises MultipleEntryPointError: entry point could not be uniquely resolved
+        :raises LoadingEntryPointError: entry point could not be loaded
+        """
+        entry_point = self.get_entry_point(group, name)
+
+        try:
+            return self._loaded[(group, name)]
+        except KeyError:
+            pass
+
+        try:
+            loaded_entry_point = entry_point.load()
+        except ImportError as exception:
+            raise LoadingEntryPointError("Failed to load entry point '{}':\n{}".format(name, traceback.format_exc()))
+
+        self._loaded[(group, name)] = loaded_entry_point
+
+        return loaded_entry_point
+
+    def get_entry_point_from_class(self, class_module, class_name):
+        """
+        Return the entry point of a class given its module and name
+
+        :param class_module: module of the class
+        :param class_name: name of the class
+        :return: a tuple of the corresponding group and entry point or None if not found
+        """
+        self._validate()
+
+        if self._classes is None:
+            classes = {}
+            for group in epm.get_entry_map().keys():
+                for entry_point in self.get_entry_points(group):
+                    for entry_point_class_name in entry_point.attrs:
+                        # The first entry point found for a class is the one that is returned
+                        classes.setdefault((entry_point.module_name, entry_point_class_name), (group, entry_point))
+            self._classes = classes
+
+        return self._classes.get((class_module, class_name), (None, None))
 
 
 def get_entry_point_string_from_class(class_module, class_name):
@@ -308,3 +444,7 @@ def is_valid_entry_point_string(entry_point_string):
         return True
     else:
         return False
+
+
+# The index of the registered entry points that is shared by the whole interpreter
+ENTRY_POINT_INDEX = EntryPointIndex()
@@ -300,20 +300,35 @@ class Scheduler(object):
         # pylint: disable=no-self-use, not-callable, unused-argument
         raise FeatureNotAvailable("Cannot get detailed job info")
 
-    def get_detailed_jobinfo(self, jobid):
+    def _get_detailed_jobinfos_command(self, jobids):
         """
-        Return a string with the output of the detailed_jobinfo command.
+        Return the command to run to get the detailed information on many jobs at once.
 
-        At the moment, the output text is just retrieved
-        and stored for logging purposes, but no parsing is performed.
+        Plugins whose scheduler can report on several jobs with a single command should implement this together
+        with `_parse_detailed_jobinfos_output`.
 
+        :param jobids: a list of job ids
         :raises: :class:`aiida.common.exceptions.FeatureNotAvailable`
         """
+        # pylint: disable=no-self-use, not-callable, unused-argument
+        raise FeatureNotAvailable("Cannot get detailed job info of many jobs at once")
 
-        command = self._get_detailed_jobinfo_command(jobid=jobid)
-        with self.transport:
-            retval, stdout, stderr = self.transport.exec_command_wait(command)
+    def _parse_detailed_jobinfos_output(self, jobids, stdout):
+        """
+        Split the output of the command returned by `_get_detailed_jobinfos_command` into the output of each job.
 
+        :param jobids: the list of job ids passed to `_get_detailed_jobinfos_command`
+        :param stdout: the stdout of the command
+        :return: a dictionary with the job ids as keys and the part of stdout relative to each job as values
+        """
+        # pylint: disable=no-self-use, unused-argument
+        raise FeatureNotAvailable("Cannot get detailed job info of many jobs at once")
+
+    @staticmethod
+    def _format_detailed_jobinfo(command, retval, stdout, stderr):
+        """
+        Format the output of a detailed jobinfo command as returned by `get_detailed_jobinfo`.
+        """
         return u"""Detailed jobinfo obtained with command '{}'
 Return Code: {}
 -------------------------------------------------------------
@@ -323,6 +338,50 @@ stderr:
 {}
 """.format(command, retval, stdout, stderr)
 
+    def get_detailed_jobinfo(self, jobid):
+        """
+        Return a string with the output of the detailed_jobinfo command.
+
+        At the moment, the output text is just retrieved
+        and stored for logging purposes, but no parsing is performed.
+
+        :raises: :class:`aiida.common.exceptions.FeatureNotAvailable`
+        """
+
+        command = self._get_detailed_jobinfo_command(jobid=jobid)
+        with self.transport:
+            retval, stdout, stderr = self.transport.exec_command_wait(command)
+
+        return self._format_detailed_jobinfo(command, retval, stdout, stderr)
+
+    def get_detailed_jobinfos(self, jobids):
+        """
+        Return the output of the detailed_jobinfo command for many jobs, as returned by `get_detailed_jobinfo`.
+
+        If the plugin implements `_get_detailed_jobinfos_command`, the information of all the jobs is obtained with
+        a single command, otherwise the detailed_jobinfo command is run for each job.
+
+        :param jobids: a list of job ids
+        :return: a dictionary with the job ids as keys and the detailed job info strings as values
+        :raises: :class:`aiida.common.exceptions.FeatureNotAvailable`
+        """
+        if not jobids:
+            return {}
+
+        try:
+            command = self._get_detailed_jobinfos_command(jobids=jobids)
+        except FeatureNotAvailable:
+            return {jobid: self.get_detailed_jobinfo(jobid) for jobid in jobids}
+
+        with self.transport:
+            retval, stdout, stderr = self.transport.exec_command_wait(command)
+
+        outputs = self._parse_detailed_jobinfos_output(jobids, stdout)
+
+        return {
+            jobid: self._format_detailed_jobinfo(command, retval, outputs.get(jobid, ''), stderr) for jobid in jobids
+        }
+
     @abstractmethod
     def _parse_joblist_output(self, retval, stdout, stderr):
         """
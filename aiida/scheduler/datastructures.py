@@ -18,6 +18,8 @@ the data structure that is returned when querying for jobs in the scheduler
 from __future__ import print_function
 from __future__ import division
 from __future__ import absolute_import
+import six
+
 from aiida.common.extendeddicts import (DefaultFieldsAttributeDict, Enumerate)
 
 from aiida.common import aiidalogger
@@ -503,6 +505,152 @@ class JobInfo(DefaultFieldsAttributeDict):
         'finish_time': 'date',
     }
 
+    # Mapping of the fields that are not decoded yet: {field: (decoder, raw_value, error_message)}
+    _lazy_fields = None
+
+    def set_lazy_field(self, field, decoder, raw_value, error_message=None):
+        """
+        Set a field whose value is only decoded from its raw value the first time that it is accessed.
+
+        The scheduler plugins use this for the fields that are costly to parse, like times, such that parsing the
+        list of all the jobs of a user only pays this cost for the jobs whose information is actually used.
+
+        :param field: the name of the field
+        :param decoder: the function that returns the value of the field from its raw value, or raises ValueError
+        :param raw_value: the raw value, as output by the scheduler
+        :param error_message: the warning to log if the decoder raises ValueError, in which case the field is left
+            undefined. It is formatted with the `raw_value` and `job_id` keywords.
+
+        .. note:: on python 2 the field is decoded right away: ``dict(job_info)`` and the other C functions that copy
+            a dict read the storage of a dict subclass directly, and would miss the fields that are not decoded yet.
+        """
+        if self._lazy_fields is None:
+            self._lazy_fields = {}
+        dict.pop(self, field, None)
+        self._lazy_fields[field] = (decoder, raw_value, error_message)
+
+        if six.PY2:
+            self._decode_lazy_field(field)
+
+    def _decode_lazy_field(self, field):
+        """Decode a lazy field, if it is not decoded yet, and store its value."""
+        if not self._lazy_fields or field not in self._lazy_fields:
+            return
+
+        decoder, raw_value, error_message = self._lazy_fields.pop(field)
+        try:
+            value = decoder(raw_value)
+        except ValueError:
+            if error_message is not None:
+                SCHEDULER_LOGGER.warning(error_message.format(raw_value=raw_value, job_id=dict.get(self, 'job_id')))
+        else:
+            dict.__setitem__(self, field, value)
+
+    def _decode_lazy_fields(self):
+        """Decode all the lazy fields."""
+        if self._lazy_fields:
+            for field in list(self._lazy_fields):
+                self._decode_lazy_field(field)
+
+    def __getitem__(self, key):
+        if self._lazy_fields and key in self._lazy_fields:
+            self._decode_lazy_field(key)
+        return super(JobInfo, self).__getitem__(key)
+
+    def __setitem__(self, key, value):
+        if self._lazy_fields and key in self._lazy_fields:
+            del self._lazy_fields[key]
+        super(JobInfo, self).__setitem__(key, value)
+
+    def update(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        values = dict(*args, **kwargs)
+        if self._lazy_fields:
+            for key in values:
+                self._lazy_fields.pop(key, None)
+        super(JobInfo, self).update(values)
+
+    def __delitem__(self, key):
+        if self._lazy_fields and key in self._lazy_fields:
+            self._decode_lazy_field(key)
+        super(JobInfo, self).__delitem__(key)
+
+    def __contains__(self, key):
+        if self._lazy_fields and key in self._lazy_fields:
+            self._decode_lazy_field(key)
+        return super(JobInfo, self).__contains__(key)
+
+    def get(self, key, default=None):
+        if self._lazy_fields and key in self._lazy_fields:
+            self._decode_lazy_field(key)
+        return super(JobInfo, self).get(key, default)
+
+    def pop(self, key, *args):
+        if self._lazy_fields and key in self._lazy_fields:
+            self._decode_lazy_field(key)
+        return super(JobInfo, self).pop(key, *args)
+
+    def __iter__(self):
+        self._decode_lazy_fields()
+        return super(JobInfo, self).__iter__()
+
+    def __len__(self):
+        self._decode_lazy_fields()
+        return super(JobInfo, self).__len__()
+
+    def __eq__(self, other):
+        self._decode_lazy_fields()
+        if isinstance(other, JobInfo):
+            other._decode_lazy_fields()  # pylint: disable=protected-access
+        return super(JobInfo, self).__eq__(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        self._decode_lazy_fields()
+        return super(JobInfo, self).__repr__()
+
+    def keys(self):
+        self._decode_lazy_fields()
+        return super(JobInfo, self).keys()
+
+    def values(self):
+        self._decode_lazy_fields()
+        return super(JobInfo, self).values()
+
+    def items(self):
+        self._decode_lazy_fields()
+        return super(JobInfo, self).items()
+
+    if six.PY2:
+
+        def iterkeys(self):
+            self._decode_lazy_fields()
+            return super(JobInfo, self).iterkeys()  # pylint: disable=no-member
+
+        def itervalues(self):
+            self._decode_lazy_fields()
+            return super(JobInfo, self).itervalues()  # pylint: disable=no-member
+
+        def iteritems(self):
+            self._decode_lazy_fields()
+            return super(JobInfo, self).iteritems()  # pylint: disable=no-member
+
+    def copy(self):
+        self._decode_lazy_fields()
+        return super(JobInfo, self).copy()
+
+    def __deepcopy__(self, memo=None):
+        self._decode_lazy_fields()
+        return super(JobInfo, self).__deepcopy__(memo)
+
+    def __getstate__(self):
+        # The decoders are not pickled
+        self._decode_lazy_fields()
+        state = super(JobInfo, self).__getstate__()
+        state.pop('_lazy_fields', None)
+        return state
+
     @staticmethod
     def _serialize_date(value):
         """
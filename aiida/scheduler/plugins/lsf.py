@@ -556,17 +556,16 @@ fi
              percent_complete, submission_time, job_name) = job
 
             this_job.job_owner = username
-            try:
-                this_job.num_machines = int(number_nodes)
-            except ValueError:
-                self.logger.warning("The number of allocated nodes is not "
-                                    "an integer ({}) for job id {}!".format(number_nodes, this_job.job_id))
 
-            try:
-                this_job.num_mpiprocs = int(number_cpus)
-            except ValueError:
-                self.logger.warning("The number of allocated cores is not "
-                                    "an integer ({}) for job id {}!".format(number_cpus, this_job.job_id))
+            # The numbers and times are only parsed if they are accessed, as the information of most of the jobs of
+            # the list is not used
+            this_job.set_lazy_field('num_machines', int, number_nodes,
+                                    "The number of allocated nodes is not "
+                                    "an integer ({raw_value}) for job id {job_id}!")
+
+            this_job.set_lazy_field('num_mpiprocs', int, number_cpus,
+                                    "The number of allocated cores is not "
+                                    "an integer ({raw_value}) for job id {job_id}!")
 
             # ALLOCATED NODES HERE
             # string may be in the format
@@ -579,45 +578,20 @@ fi
 
             this_job.queue_name = partition
 
-            psd_finish_time = self._parse_time_string(finish_time, fmt='%b %d %H:%M')
-            psd_start_time = self._parse_time_string(start_time, fmt='%b %d %H:%M')
-            psd_submission_time = self._parse_time_string(submission_time, fmt='%b %d %H:%M')
-
             # Now get the time in seconds which has been used
             # Only if it is RUNNING; otherwise it is not meaningful,
             # and may be not set (in my test, it is set to zero)
             if this_job.job_state == JOB_STATES.RUNNING:
-                try:
-                    requested_walltime = psd_finish_time - psd_start_time
-                    # fix of a weird bug. Since the year is not parsed, it is assumed
-                    # to always be 1900. Therefore, job submitted
-                    # in december and finishing in january would produce negative time differences
-                    if requested_walltime.total_seconds() < 0:
-                        import datetime
-                        old_month = psd_finish_time.month
-                        old_day = psd_finish_time.day
-                        old_hour = psd_finish_time.hour
-                        old_minute = psd_finish_time.minute
-                        new_year = psd_start_time.year + 1
-                        # note: we assume that no job will last more than 1 year...
-                        psd_finish_time = datetime.datetime(
-                            year=new_year, month=old_month, day=old_day, hour=old_hour, minute=old_minute)
-                        requested_walltime = psd_finish_time - psd_start_time
-
-                    this_job.requested_wallclock_time_seconds = requested_walltime.total_seconds()
-                except (TypeError, ValueError):
-                    self.logger.warning("Error parsing the time limit " "for job id {}".format(this_job.job_id))
-
-                try:
-                    psd_percent_complete = float(percent_complete.strip(' L').strip("%"))
-                    this_job.wallclock_time_seconds = requested_walltime.total_seconds() * psd_percent_complete / 100.
-                except ValueError:
-                    self.logger.warning("Error parsing the time used " "for job id {}".format(this_job.job_id))
+                this_job.set_lazy_field('requested_wallclock_time_seconds', self._parse_requested_walltime,
+                                        (finish_time, start_time),
+                                        "Error parsing the time limit " "for job id {job_id}")
 
-            try:
-                this_job.submission_time = psd_submission_time
-            except ValueError:
-                self.logger.warning("Error parsing submission time for job " "id {}".format(this_job.job_id))
+                this_job.set_lazy_field('wallclock_time_seconds', self._parse_used_walltime,
+                                        (finish_time, start_time, percent_complete),
+                                        "Error parsing the time used " "for job id {job_id}")
+
+            this_job.set_lazy_field('submission_time', self._parse_time_string, submission_time,
+                                    "Error parsing submission time for job " "id {job_id}")
 
             this_job.title = job_name
 
@@ -668,6 +642,50 @@ fi
         except IndexError:
             raise SchedulerParsingError("Cannot parse submission output: {}" "".format(stdout))
 
+    def _parse_requested_walltime(self, times):
+        """
+        Return the requested wallclock time in seconds from the expected finish time and the start time.
+
+        :param times: tuple of the finish and start time strings
+        :raises ValueError: if the times could not be parsed
+        """
+        finish_time, start_time = times
+        psd_finish_time = self._parse_time_string(finish_time, fmt='%b %d %H:%M')
+        psd_start_time = self._parse_time_string(start_time, fmt='%b %d %H:%M')
+
+        try:
+            requested_walltime = psd_finish_time - psd_start_time
+        except TypeError:
+            raise ValueError("The finish or start time is not defined.")
+
+        # fix of a weird bug. Since the year is not parsed, it is assumed
+        # to always be 1900. Therefore, job submitted
+        # in december and finishing in january would produce negative time differences
+        if requested_walltime.total_seconds() < 0:
+            import datetime
+            old_month = psd_finish_time.month
+            old_day = psd_finish_time.day
+            old_hour = psd_finish_time.hour
+            old_minute = psd_finish_time.minute
+            new_year = psd_start_time.year + 1
+            # note: we assume that no job will last more than 1 year...
+            psd_finish_time = datetime.datetime(
+                year=new_year, month=old_month, day=old_day, hour=old_hour, minute=old_minute)
+            requested_walltime = psd_finish_time - psd_start_time
+
+        return requested_walltime.total_seconds()
+
+    def _parse_used_walltime(self, times):
+        """
+        Return the used wallclock time in seconds from the percentage of the requested wallclock time.
+
+        :param times: tuple of the finish and start time strings and of the percentage complete string
+        :raises ValueError: if the times could not be parsed
+        """
+        finish_time, start_time, percent_complete = times
+        psd_percent_complete = float(percent_complete.strip(' L').strip("%"))
+        return self._parse_requested_walltime((finish_time, start_time)) * psd_percent_complete / 100.
+
     def _parse_time_string(self, string, fmt='%b %d %H:%M'):
         """
         Parse a time string and returns a datetime object.
@@ -440,11 +440,10 @@ class PbsBaseClass(Scheduler):
                 _LOGGER.error("There are lines without equals sign! {}" "".format(lines_without_equals_sign))
                 raise SchedulerParsingError("There are lines without equals sign.")
 
-            raw_data = {
-                i.split('=', 1)[0].strip().lower(): i.split('=', 1)[1].lstrip()
-                for i in job['lines']
-                if '=' in i
-            }
+            raw_data = {}
+            for line in job['lines']:
+                key, _, value = line.partition('=')
+                raw_data[key.strip().lower()] = value.lstrip()
 
             ## I ignore the errors for the time being - this seems to be
             ## a problem if there are \n in the content of some variables?
@@ -500,42 +499,12 @@ class PbsBaseClass(Scheduler):
             except KeyError:
                 _LOGGER.debug("No 'substate' field for job id {}".format(this_job.job_id))
 
-            try:
-                exec_hosts = raw_data['exec_host'].split('+')
-            except KeyError:
-                # No exec_host information found (it may be ok, if the job
-                # is not running)
-                pass
-            else:
-                # parse each host; syntax, from the man page:
-                # hosta/J1+hostb/J2*P+...
-                # where  J1 and J2 are an index of the job
-                # on the named host and P is the number of
-                # processors allocated from that host to this job.
-                # P does not appear if it is 1.
-                try:
-
-                    exec_host_list = []
-                    for exec_host in exec_hosts:
-                        node = MachineInfo()
-                        node.name, data = exec_host.split('/')
-                        data = data.split('*')
-                        if len(data) == 1:
-                            node.jobIndex = int(data[0])
-                            node.num_cpus = 1
-                        elif len(data) == 2:
-                            node.jobIndex = int(data[0])
-                            node.num_cpus = int(data[1])
-                        else:
-                            raise ValueError("Wrong number of pieces: {} "
-                                             "instead of 1 or 2 in exec_hosts: "
-                                             "{}".format(len(data), exec_hosts))
-                        exec_host_list.append(node)
-                    this_job.allocated_machines = exec_host_list
-                except Exception as exc:
-                    _LOGGER.debug("Problem parsing the node names, I "
-                                  "got Exception {} with message {}; "
-                                  "exec_hosts was {}".format(str(type(exc)), exc, exec_hosts))
+            # The numbers, times and hosts are only parsed if they are accessed, as the information of most of the
+            # jobs of the list is not used
+            if 'exec_host' in raw_data:
+                this_job.set_lazy_field('allocated_machines', self._parse_exec_host, raw_data)
+            # else: no exec_host information found (it may be ok, if the job
+            # is not running)
 
             try:
                 # I strip the part after the @: is this always ok?
@@ -543,69 +512,37 @@ class PbsBaseClass(Scheduler):
             except KeyError:
                 _LOGGER.debug("No 'job_owner' field for job id {}".format(this_job.job_id))
 
-            try:
-                this_job.num_cpus = int(raw_data['resource_list.ncpus'])
-                # TODO: understand if this is the correct field also for
-                #       multithreaded (OpenMP) jobs.
-            except KeyError:
-                _LOGGER.debug("No 'resource_list.ncpus' field for job id " "{}".format(this_job.job_id))
-            except ValueError:
-                _LOGGER.warning("'resource_list.ncpus' is not an integer "
-                                "({}) for job id {}!".format(raw_data['resource_list.ncpus'], this_job.job_id))
-
-            try:
-                this_job.num_mpiprocs = int(raw_data['resource_list.mpiprocs'])
-                # TODO: understand if this is the correct field also for
-                #       multithreaded (OpenMP) jobs.
-            except KeyError:
-                _LOGGER.debug("No 'resource_list.mpiprocs' field for job id " "{}".format(this_job.job_id))
-            except ValueError:
-                _LOGGER.warning("'resource_list.mpiprocs' is not an integer "
-                                "({}) for job id {}!".format(raw_data['resource_list.mpiprocs'], this_job.job_id))
-
-            try:
-                this_job.num_machines = int(raw_data['resource_list.nodect'])
-            except KeyError:
-                _LOGGER.debug("No 'resource_list.nodect' field for job id " "{}".format(this_job.job_id))
-            except ValueError:
-                _LOGGER.warning("'resource_list.nodect' is not an integer "
-                                "({}) for job id {}!".format(raw_data['resource_list.nodect'], this_job.job_id))
-
-            # Double check of redundant info
-            if (this_job.allocated_machines is not None and this_job.num_machines is not None):
-                if len(set(machine.name for machine in this_job.allocated_machines)) != this_job.num_machines:
-                    _LOGGER.error("The length of the list of allocated "
-                                  "nodes ({}) is different from the "
-                                  "expected number of nodes ({})!".format(
-                                      len(this_job.allocated_machines), this_job.num_machines))
+            # TODO: understand if these are the correct fields also for
+            #       multithreaded (OpenMP) jobs.
+            for field, key in (('num_cpus', 'resource_list.ncpus'), ('num_mpiprocs', 'resource_list.mpiprocs'),
+                               ('num_machines', 'resource_list.nodect')):
+                if key in raw_data:
+                    this_job.set_lazy_field(field, int, raw_data[key], "'" + key + "' is not an integer "
+                                            "({raw_value}) for job id {job_id}!")
+                else:
+                    _LOGGER.debug("No '{}' field for job id " "{}".format(key, this_job.job_id))
 
             try:
                 this_job.queue_name = raw_data['queue']
             except KeyError:
                 _LOGGER.debug("No 'queue' field for job id " "{}".format(this_job.job_id))
 
-            try:
-                this_job.RequestedWallclockTime = (self._convert_time(raw_data['resource_list.walltime']))
-            except KeyError:
+            if 'resource_list.walltime' in raw_data:
+                this_job.set_lazy_field('RequestedWallclockTime', self._convert_time,
+                                        raw_data['resource_list.walltime'],
+                                        "Error parsing 'resource_list.walltime' " "for job id {job_id}")
+            else:
                 _LOGGER.debug("No 'resource_list.walltime' field for " "job id {}".format(this_job.job_id))
-            except ValueError:
-                _LOGGER.warning("Error parsing 'resource_list.walltime' " "for job id {}".format(this_job.job_id))
 
-            try:
-                this_job.wallclock_time_seconds = (self._convert_time(raw_data['resources_used.walltime']))
-            except KeyError:
-                # May not have started yet
-                pass
-            except ValueError:
-                _LOGGER.warning("Error parsing 'resources_used.walltime' " "for job id {}".format(this_job.job_id))
+            # May not have started yet
+            if 'resources_used.walltime' in raw_data:
+                this_job.set_lazy_field('wallclock_time_seconds', self._convert_time,
+                                        raw_data['resources_used.walltime'],
+                                        "Error parsing 'resources_used.walltime' " "for job id {job_id}")
 
-            try:
-                this_job.cpu_time = (self._convert_time(raw_data['resources_used.cput']))
-            except KeyError:
-                # May not have started yet
-                pass
-            except ValueError:
-                _LOGGER.warning("Error parsing 'resources_used.cput' " "for job id {}".format(this_job.job_id))
+            if 'resources_used.cput' in raw_data:
+                this_job.set_lazy_field('cpu_time', self._convert_time, raw_data['resources_used.cput'],
+                                        "Error parsing 'resources_used.cput' " "for job id {job_id}")
 
             #
             # ctime: The time that the job was created
@@ -616,20 +553,16 @@ class PbsBaseClass(Scheduler):
             # etime: The time that the job became eligible to run, i.e. in a
             #        queued state while residing in an execution queue.
 
-            try:
-                this_job.submission_time = self._parse_time_string(raw_data['ctime'])
-            except KeyError:
+            if 'ctime' in raw_data:
+                this_job.set_lazy_field('submission_time', self._parse_time_string, raw_data['ctime'],
+                                        "Error parsing 'ctime' for job id " "{job_id}")
+            else:
                 _LOGGER.debug("No 'ctime' field for job id " "{}".format(this_job.job_id))
-            except ValueError:
-                _LOGGER.warning("Error parsing 'ctime' for job id " "{}".format(this_job.job_id))
 
-            try:
-                this_job.dispatch_time = self._parse_time_string(raw_data['stime'])
-            except KeyError:
-                # The job may not have been started yet
-                pass
-            except ValueError:
-                _LOGGER.warning("Error parsing 'stime' for job id " "{}".format(this_job.job_id))
+            # The job may not have been started yet
+            if 'stime' in raw_data:
+                this_job.set_lazy_field('dispatch_time', self._parse_time_string, raw_data['stime'],
+                                        "Error parsing 'stime' for job id " "{job_id}")
 
             # TODO: see if we want to set also finish_time for finished jobs,
             # if there are any
@@ -642,6 +575,60 @@ class PbsBaseClass(Scheduler):
 
         return job_list
 
+    @staticmethod
+    def _parse_exec_host(raw_data):
+        """
+        Parse the list of the machines allocated to a job from its exec_host field.
+
+        :param raw_data: the dictionary of the fields of the job in the qstat output
+        :return: the list of MachineInfo objects
+        :raises ValueError: if the field could not be parsed
+        """
+        exec_hosts = raw_data['exec_host'].split('+')
+
+        # parse each host; syntax, from the man page:
+        # hosta/J1+hostb/J2*P+...
+        # where  J1 and J2 are an index of the job
+        # on the named host and P is the number of
+        # processors allocated from that host to this job.
+        # P does not appear if it is 1.
+        try:
+
+            exec_host_list = []
+            for exec_host in exec_hosts:
+                node = MachineInfo()
+                node.name, data = exec_host.split('/')
+                data = data.split('*')
+                if len(data) == 1:
+                    node.jobIndex = int(data[0])
+                    node.num_cpus = 1
+                elif len(data) == 2:
+                    node.jobIndex = int(data[0])
+                    node.num_cpus = int(data[1])
+                else:
+                    raise ValueError("Wrong number of pieces: {} "
+                                     "instead of 1 or 2 in exec_hosts: "
+                                     "{}".format(len(data), exec_hosts))
+                exec_host_list.append(node)
+        except Exception as exc:
+            _LOGGER.debug("Problem parsing the node names, I "
+                          "got Exception {} with message {}; "
+                          "exec_hosts was {}".format(str(type(exc)), exc, exec_hosts))
+            raise ValueError('Problem parsing the node names')
+
+        # Double check of redundant info
+        try:
+            num_machines = int(raw_data['resource_list.nodect'])
+        except (KeyError, ValueError):
+            pass
+        else:
+            if len(set(machine.name for machine in exec_host_list)) != num_machines:
+                _LOGGER.error("The length of the list of allocated "
+                              "nodes ({}) is different from the "
+                              "expected number of nodes ({})!".format(len(exec_host_list), num_machines))
+
+        return exec_host_list
+
     @staticmethod
     def _convert_time(string):
         """
@@ -354,13 +354,14 @@ class SgeScheduler(aiida.scheduler.Scheduler):
             this_job = JobInfo()
 
             # In case the user needs more information the xml-data for
-            # each job is stored:
-            this_job.raw_data = job.toxml()
+            # each job is stored, but only serialized if it is accessed:
+            this_job.set_lazy_field('raw_data', lambda element: element.toxml(), job)
+
+            # Collect the text of all the elements of the job at once, rather than searching the job for each of them
+            texts = self._get_element_texts(job)
 
             try:
-                job_element = job.getElementsByTagName('JB_job_number').pop(0)
-                element_child = job_element.childNodes.pop(0)
-                this_job.job_id = str(element_child.data).strip()
+                this_job.job_id = texts['JB_job_number']
                 if not this_job.job_id:
                     raise SchedulerError
             except SchedulerError:
@@ -368,85 +369,90 @@ class SgeScheduler(aiida.scheduler.Scheduler):
                                   "no job id is given, stdout={}" \
                                   .format(stdout))
                 raise SchedulerError("Error in sge._parse_joblist_output:" "no job id is given")
-            except IndexError:
+            except KeyError:
                 self.logger.error("No 'job_number' given for job index {} in "
                                   "job list, stdout={}".format(jobs.index(job) \
                                                                , stdout))
                 raise IndexError("Error in sge._parse_joblist_output:" "no job id is given")
 
             try:
-                job_element = job.getElementsByTagName('state').pop(0)
-                element_child = job_element.childNodes.pop(0)
-                job_state_string = str(element_child.data).strip()
+                job_state_string = texts['state']
                 try:
                     this_job.job_state = _MAP_STATUS_SGE[job_state_string]
                 except KeyError:
                     self.logger.warning("Unrecognized job_state '{}' for job "
                                         "id {}".format(job_state_string, this_job.job_id))
                     this_job.job_state = JOB_STATES.UNDETERMINED
-            except IndexError:
+            except KeyError:
                 self.logger.warning("No 'job_state' field for job id {} in" "stdout={}".format(this_job.job_id, stdout))
                 this_job.job_state = JOB_STATES.UNDETERMINED
 
             try:
-                job_element = job.getElementsByTagName('JB_owner').pop(0)
-                element_child = job_element.childNodes.pop(0)
-                this_job.job_owner = str(element_child.data).strip()
-            except IndexError:
+                this_job.job_owner = texts['JB_owner']
+            except KeyError:
                 self.logger.warning("No 'job_owner' field for job " "id {}".format(this_job.job_id))
 
             try:
-                job_element = job.getElementsByTagName('JB_name').pop(0)
-                element_child = job_element.childNodes.pop(0)
-                this_job.title = str(element_child.data).strip()
-            except IndexError:
+                this_job.title = texts['JB_name']
+            except KeyError:
                 self.logger.warning("No 'title' field for job " "id {}".format(this_job.job_id))
 
             try:
-                job_element = job.getElementsByTagName('queue_name').pop(0)
-                element_child = job_element.childNodes.pop(0)
-                this_job.queue_name = str(element_child.data).strip()
-            except IndexError:
+                this_job.queue_name = texts['queue_name']
+            except KeyError:
                 if this_job.job_state == JOB_STATES.RUNNING:
                     self.logger.warning("No 'queue_name' field for job " "id {}".format(this_job.job_id))
 
-            try:
-                job_element = job.getElementsByTagName('JB_submission_time').pop(0)
-                element_child = job_element.childNodes.pop(0)
-                time_string = str(element_child.data).strip()
-                try:
-                    this_job.submission_time = self._parse_time_string(time_string)
-                except ValueError:
-                    self.logger.warning("Error parsing 'JB_submission_time' "
-                                        "for job id {} ('{}')".format(this_job.job_id, time_string))
-            except IndexError:
-                try:
-                    job_element = job.getElementsByTagName('JAT_start_time').pop(0)
-                    element_child = job_element.childNodes.pop(0)
-                    time_string = str(element_child.data).strip()
-                    try:
-                        this_job.dispatch_time = self._parse_time_string(time_string)
-                    except ValueError:
-                        self.logger.warning("Error parsing 'JAT_start_time'"
-                                            "for job id {} ('{}')".format(this_job.job_id, time_string))
-                except IndexError:
-                    self.logger.warning("No 'JB_submission_time' and no "
-                                        "'JAT_start_time' field for job "
-                                        "id {}".format(this_job.job_id))
+            # The times are only parsed if they are accessed
+            if 'JB_submission_time' in texts:
+                this_job.set_lazy_field('submission_time', self._parse_time_string, texts['JB_submission_time'],
+                                        "Error parsing 'JB_submission_time' "
+                                        "for job id {job_id} ('{raw_value}')")
+            elif 'JAT_start_time' in texts:
+                this_job.set_lazy_field('dispatch_time', self._parse_time_string, texts['JAT_start_time'],
+                                        "Error parsing 'JAT_start_time'"
+                                        "for job id {job_id} ('{raw_value}')")
+            else:
+                self.logger.warning("No 'JB_submission_time' and no "
+                                    "'JAT_start_time' field for job "
+                                    "id {}".format(this_job.job_id))
 
             # There is also cpu_usage, mem_usage, io_usage information available:
             if this_job.job_state == JOB_STATES.RUNNING:
                 try:
-                    job_element = job.getElementsByTagName('slots').pop(0)
-                    element_child = job_element.childNodes.pop(0)
-                    this_job.num_mpiprocs = str(element_child.data).strip()
-                except IndexError:
+                    this_job.num_mpiprocs = texts['slots']
+                except KeyError:
                     self.logger.warning("No 'slots' field for job " "id {}".format(this_job.job_id))
 
             joblist.append(this_job)
         # self.logger.debug("joblist final: {}".format(joblist))
         return joblist
 
+    @staticmethod
+    def _get_element_texts(element):
+        """
+        Return the text of the descendants of an xml element, with a single traversal of the element.
+
+        Only the first descendant with a given tag name is considered, and only if its first child is a text node,
+        as for the fields of a job in the output of `qstat -xml`.
+
+        :param element: the xml element
+        :return: a dictionary {tag name: stripped text}
+        """
+        texts = {}
+        seen = set()
+        stack = list(reversed(element.childNodes))
+        while stack:
+            node = stack.pop()
+            if node.nodeType != node.ELEMENT_NODE:
+                continue
+            if node.tagName not in seen:
+                seen.add(node.tagName)
+                if node.childNodes and hasattr(node.childNodes[0], 'data'):
+                    texts[node.tagName] = str(node.childNodes[0].data).strip()
+            stack.extend(reversed(node.childNodes))
+        return texts
+
     def _parse_submit_output(self, retval, stdout, stderr):
         """
         Parse the output of the submit command, as returned by executing the
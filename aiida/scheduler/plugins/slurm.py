@@ -17,7 +17,6 @@ from __future__ import absolute_import
 import re
 
 import six
-from six.moves import zip
 
 import aiida.scheduler
 from aiida.common.utils import escape_for_bash
@@ -106,6 +105,15 @@ _TIME_REGEXP = re.compile(r"""
 # Separator between fields in the output of squeue
 _FIELD_SEPARATOR = "^^^"
 
+# Fields requested to sacct for the detailed job info
+_DETAILED_JOBINFO_FIELDS = (
+    'AllocCPUS', 'Account', 'AssocID', 'AveCPU', 'AvePages', 'AveRSS', 'AveVMSize', 'Cluster', 'Comment', 'CPUTime',
+    'CPUTimeRAW', 'DerivedExitCode', 'Elapsed', 'Eligible', 'End', 'ExitCode', 'GID', 'Group', 'JobID', 'JobName',
+    'MaxRSS', 'MaxRSSNode', 'MaxRSSTask', 'MaxVMSize', 'MaxVMSizeNode', 'MaxVMSizeTask', 'MinCPU', 'MinCPUNode',
+    'MinCPUTask', 'NCPUS', 'NNodes', 'NodeList', 'NTasks', 'Priority', 'Partition', 'QOSRAW', 'ReqCPUS', 'Reserved',
+    'ResvCPU', 'ResvCPURAW', 'Start', 'State', 'Submit', 'Suspended', 'SystemCPU', 'Timelimit', 'TotalCPU', 'UID',
+    'User', 'UserCPU')
+
 
 class SlurmJobResource(NodeNumberJobResource):
     """
@@ -231,13 +239,41 @@ class SlurmScheduler(aiida.scheduler.Scheduler):
         --parsable split the fields with a pipe (|), adding a pipe also at
         the end.
         """
-        return "sacct --format=AllocCPUS,Account,AssocID,AveCPU,AvePages," \
-               "AveRSS,AveVMSize,Cluster,Comment,CPUTime,CPUTimeRAW,DerivedExitCode," \
-               "Elapsed,Eligible,End,ExitCode,GID,Group,JobID,JobName,MaxRSS,MaxRSSNode," \
-               "MaxRSSTask,MaxVMSize,MaxVMSizeNode,MaxVMSizeTask,MinCPU,MinCPUNode," \
-               "MinCPUTask,NCPUS,NNodes,NodeList,NTasks,Priority,Partition,QOSRAW,ReqCPUS," \
-               "Reserved,ResvCPU,ResvCPURAW,Start,State,Submit,Suspended,SystemCPU,Timelimit," \
-               "TotalCPU,UID,User,UserCPU --parsable --jobs={}".format(jobid)
+        return self._get_detailed_jobinfos_command([jobid])
+
+    def _get_detailed_jobinfos_command(self, jobids):
+        """
+        Return the command to run to get the detailed information on many jobs at once,
+        even after they have finished.
+
+        sacct accepts a comma-separated list of jobs, the JobID column allows
+        to split the output per job afterwards.
+        """
+        return "sacct --format={} --parsable --jobs={}".format(','.join(_DETAILED_JOBINFO_FIELDS), ','.join(jobids))
+
+    def _parse_detailed_jobinfos_output(self, jobids, stdout):
+        """
+        Split the output of sacct in the lines relative to each job. The header
+        line is kept in the output of every job; the lines of the job steps
+        (with a JobID like '1234.batch') go with their parent job.
+        """
+        lines = stdout.splitlines()
+        if not lines:
+            return {}
+
+        header = lines[0]
+        jobid_index = _DETAILED_JOBINFO_FIELDS.index('JobID')
+        job_lines = {jobid: [header] for jobid in jobids}
+
+        for line in lines[1:]:
+            fields = line.split('|')
+            if len(fields) <= jobid_index:
+                continue
+            jobid = fields[jobid_index].split('.')[0]
+            if jobid in job_lines:
+                job_lines[jobid].append(line)
+
+        return {jobid: '\n'.join(job_lines[jobid]) + '\n' for jobid in jobids}
 
     def _get_submit_script_header(self, job_tmpl):
         """
@@ -496,29 +532,30 @@ class SlurmScheduler(aiida.scheduler.Scheduler):
         # appears in any previous field.
         jobdata_raw = [l.split(_FIELD_SEPARATOR, num_fields) for l in stdout.splitlines() if _FIELD_SEPARATOR in l]
 
-        # Create dictionary and parse specific fields
+        # The index of each field in the split lines, computed once for all the jobs
+        field_index = {field[1]: index for index, field in enumerate(self.fields)}
+        job_id_index = field_index['job_id']
+        annotation_index = field_index['annotation']
+        state_raw_index = field_index['state_raw']
+        min_num_fields = max(job_id_index, annotation_index, state_raw_index) + 1
+
+        # Parse specific fields
         job_list = []
         for job in jobdata_raw:
 
-            thisjob_dict = {k[1]: v for k, v in zip(self.fields, job)}
-
-            this_job = JobInfo()
-            try:
-                this_job.job_id = thisjob_dict['job_id']
-
-                this_job.annotation = thisjob_dict['annotation']
-                job_state_raw = thisjob_dict['state_raw']
-            except KeyError:
+            if len(job) < min_num_fields:
                 # I skip this calculation if I couldn't find this basic info
                 # (I don't append anything to job_list before continuing)
                 self.logger.error("Wrong line length in squeue output! '{}'" "".format(job))
                 continue
 
+            job_state_raw = job[state_raw_index]
+
             try:
                 job_state_string = _MAP_STATUS_SLURM[job_state_raw]
             except KeyError:
                 self.logger.warning("Unrecognized job_state '{}' for job "
-                                    "id {}".format(job_state_raw, this_job.job_id))
+                                    "id {}".format(job_state_raw, job[job_id_index]))
                 job_state_string = JOB_STATES.UNDETERMINED
             # QUEUED_HELD states are not specific states in SLURM;
             # they are instead set with state QUEUED, and then the
@@ -536,10 +573,12 @@ class SlurmScheduler(aiida.scheduler.Scheduler):
             # failures, or partition-related reasons, but for the moment I
             # leave them in the QUEUED state.
             if (job_state_string == JOB_STATES.QUEUED and
-                    this_job.annotation in ['Dependency', 'JobHeldUser', 'JobHeldAdmin', 'BeginTime']):
+                    job[annotation_index] in ['Dependency', 'JobHeldUser', 'JobHeldAdmin', 'BeginTime']):
                 job_state_string = JOB_STATES.QUEUED_HELD
 
-            this_job.job_state = job_state_string
+            # The fields that need no parsing are set at once, which is much faster than one by one
+            this_job = JobInfo(
+                job_id=job[job_id_index], annotation=job[annotation_index], job_state=job_state_string)
 
             ####
             # Up to here, I just made sure that there were at least three
@@ -558,21 +597,22 @@ class SlurmScheduler(aiida.scheduler.Scheduler):
 
             # TODO: store executing_host?
 
-            this_job.job_owner = thisjob_dict['username']
+            this_job.update(
+                job_owner=job[field_index['username']],
+                queue_name=job[field_index['partition']],
+                title=job[field_index['job_name']],
+                # Everything goes here anyway for debugging purposes
+                raw_data=job)
 
-            try:
-                this_job.num_machines = int(thisjob_dict['number_nodes'])
-            except ValueError:
-                self.logger.warning("The number of allocated nodes is not "
-                                    "an integer ({}) for job id {}!".format(thisjob_dict['number_nodes'],
-                                                                            this_job.job_id))
+            # The numbers and times are only parsed if they are accessed, as the information of most of the jobs of
+            # the list is not used
+            this_job.set_lazy_field('num_machines', int, job[field_index['number_nodes']],
+                                    "The number of allocated nodes is not "
+                                    "an integer ({raw_value}) for job id {job_id}!")
 
-            try:
-                this_job.num_mpiprocs = int(thisjob_dict['number_cpus'])
-            except ValueError:
-                self.logger.warning("The number of allocated cores is not "
-                                    "an integer ({}) for job id {}!".format(thisjob_dict['number_cpus'],
-                                                                            this_job.job_id))
+            this_job.set_lazy_field('num_mpiprocs', int, job[field_index['number_cpus']],
+                                    "The number of allocated cores is not "
+                                    "an integer ({raw_value}) for job id {job_id}!")
 
             # ALLOCATED NODES HERE
             # string may be in the format
@@ -580,38 +620,24 @@ class SlurmScheduler(aiida.scheduler.Scheduler):
             # therefore it requires some parsing, that is unnecessary now.
             # I just store is as a raw string for the moment, and I leave
             # this_job.allocated_machines undefined
-            if this_job.job_state == JOB_STATES.RUNNING:
-                this_job.allocated_machines_raw = thisjob_dict['allocated_machines']
+            if job_state_string == JOB_STATES.RUNNING:
+                this_job.allocated_machines_raw = job[field_index['allocated_machines']]
 
-            this_job.queue_name = thisjob_dict['partition']
-
-            try:
-                this_job.requested_wallclock_time_seconds = (self._convert_time(thisjob_dict['time_limit']))
-            except ValueError:
-                self.logger.warning("Error parsing the time limit " "for job id {}".format(this_job.job_id))
+            this_job.set_lazy_field('requested_wallclock_time_seconds', self._convert_time,
+                                    job[field_index['time_limit']],
+                                    "Error parsing the time limit " "for job id {job_id}")
 
             # Only if it is RUNNING; otherwise it is not meaningful,
             # and may be not set (in my test, it is set to zero)
-            if this_job.job_state == JOB_STATES.RUNNING:
-                try:
-                    this_job.wallclock_time_seconds = (self._convert_time(thisjob_dict['time_used']))
-                except ValueError:
-                    self.logger.warning("Error parsing time_used " "for job id {}".format(this_job.job_id))
-
-                try:
-                    this_job.dispatch_time = self._parse_time_string(thisjob_dict['dispatch_time'])
-                except ValueError:
-                    self.logger.warning("Error parsing dispatch_time for job " "id {}".format(this_job.job_id))
-
-            try:
-                this_job.submission_time = self._parse_time_string(thisjob_dict['submission_time'])
-            except ValueError:
-                self.logger.warning("Error parsing submission_time for job " "id {}".format(this_job.job_id))
+            if job_state_string == JOB_STATES.RUNNING:
+                this_job.set_lazy_field('wallclock_time_seconds', self._convert_time, job[field_index['time_used']],
+                                        "Error parsing time_used " "for job id {job_id}")
 
-            this_job.title = thisjob_dict['job_name']
+                this_job.set_lazy_field('dispatch_time', self._parse_time_string, job[field_index['dispatch_time']],
+                                        "Error parsing dispatch_time for job " "id {job_id}")
 
-            # Everything goes here anyway for debugging purposes
-            this_job.raw_data = job
+            this_job.set_lazy_field('submission_time', self._parse_time_string, job[field_index['submission_time']],
+                                    "Error parsing submission_time for job " "id {job_id}")
 
             # Double check of redundant info
             # Not really useful now, allocated_machines in this
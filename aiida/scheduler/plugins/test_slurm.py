@@ -96,6 +96,38 @@ class TestParserSqueue(unittest.TestCase):
         #                self.assertTrue( j.num_machines==num_machines )
         #                self.assertTrue( j.num_mpiprocs==num_mpiprocs )
 
+    def test_parse_repeated_joblist_output(self):
+        """
+        Test the parsing of an output with the test jobs repeated, whose times and resources are only decoded when
+        they are accessed
+        """
+        scheduler = SlurmScheduler()
+
+        lines = TEXT_SQUEUE_TO_TEST.splitlines()
+        num_jobs = 3 * len(lines)
+        stdout = '\n'.join(
+            '{}{}'.format(index, lines[index % len(lines)][lines[index % len(lines)].index('^^^'):])
+            for index in range(num_jobs))
+
+        job_list = scheduler._parse_joblist_output(0, stdout, '')
+
+        self.assertEquals(len(job_list), num_jobs)
+        # The last three jobs of the test output are running
+        self.assertEquals(len([j for j in job_list if j.job_state == JOB_STATES.RUNNING]),
+                          len([index for index in range(num_jobs) if index % len(lines) >= 4]))
+
+        job = job_list[len(lines) + 6]
+        self.assertEquals(job.job_id, str(len(lines) + 6))
+        self.assertEquals(job.requested_wallclock_time_seconds, 30 * 60)
+        self.assertEquals(job.wallclock_time_seconds, 29 * 60 + 29)
+        self.assertEquals(job.dispatch_time, datetime.datetime(2013, 5, 23, 11, 44, 11))
+        self.assertEquals(job.num_mpiprocs, 32)
+
+        # The fields that are not accessed yet are decoded when the job is converted to a dict
+        job = dict(job_list[6])
+        self.assertEquals(job['requested_wallclock_time_seconds'], 30 * 60)
+        self.assertEquals(job['num_mpiprocs'], 32)
+
 
 class TestTimes(unittest.TestCase):
 
@@ -320,5 +352,39 @@ class TestSubmitScript(unittest.TestCase):
                 num_machines=1, num_mpiprocs_per_machine=1, num_cores_per_machine=24, num_cores_per_mpiproc=23)
 
 
+class TestDetailedJobinfo(unittest.TestCase):
+    """
+    Tests for the retrieval of the detailed job info of many jobs with a single sacct command
+    """
+
+    def test_detailed_jobinfos_command(self):
+        scheduler = SlurmScheduler()
+
+        command = scheduler._get_detailed_jobinfos_command(['123', '456'])
+        self.assertTrue(command.startswith('sacct --format='))
+        self.assertTrue(command.endswith('--parsable --jobs=123,456'))
+        self.assertEqual(scheduler._get_detailed_jobinfo_command('123'), command.replace('123,456', '123'))
+
+    def test_parse_detailed_jobinfos_output(self):
+        from aiida.scheduler.plugins.slurm import _DETAILED_JOBINFO_FIELDS
+
+        scheduler = SlurmScheduler()
+        jobid_index = _DETAILED_JOBINFO_FIELDS.index('JobID')
+
+        def make_line(jobid):
+            fields = [''] * (jobid_index + 2)
+            fields[jobid_index] = jobid
+            return '|'.join(fields)
+
+        header = make_line('JobID')
+        stdout = '\n'.join([header, make_line('123'), make_line('123.batch'), make_line('456'), make_line('789')])
+
+        outputs = scheduler._parse_detailed_jobinfos_output(['123', '456', '999'], stdout)
+
+        self.assertEqual(outputs['123'].splitlines(), [header, make_line('123'), make_line('123.batch')])
+        self.assertEqual(outputs['456'].splitlines(), [header, make_line('456')])
+        self.assertEqual(outputs['999'].splitlines(), [header])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -870,6 +870,38 @@ class TestParserQstat(unittest.TestCase):
                 self.assertTrue(j.num_cpus == num_cpus)
                 # TODO : parse the env_vars
 
+    def test_parse_repeated_joblist_output(self):
+        """
+        Test the parsing of an output with the test jobs repeated, whose times and resources are only decoded when
+        they are accessed
+        """
+        s = TorqueScheduler()
+
+        blocks = ['Job Id: ' + block for block in text_qstat_f_to_test.split('Job Id: ')[1:]]
+        num_jobs = 3 * len(blocks)
+        lines = []
+        for index in range(num_jobs):
+            block = blocks[index % len(blocks)]
+            lines.extend(block.replace(block.splitlines()[0], 'Job Id: {}.mycluster'.format(index)).splitlines())
+        stdout = '\n'.join(lines)
+
+        job_list = s._parse_joblist_output(0, stdout, '')
+
+        self.assertEquals(len(job_list), num_jobs)
+
+        j = job_list[len(blocks) + 2]
+        self.assertEquals(j.job_id, '{}.mycluster'.format(len(blocks) + 2))
+        self.assertEquals(j.job_state, JOB_STATES.RUNNING)
+        self.assertEquals(j.num_machines, 4)
+        self.assertEquals(j.RequestedWallclockTime, 72 * 3600)
+        self.assertEquals(j.wallclock_time_seconds, 64 * 3600 + 26 * 60 + 16)
+        self.assertEquals([machine.name for machine in j.allocated_machines], ['b141', 'b142', 'b143', 'b144'])
+
+        # The fields that are not accessed yet are decoded when the job is converted to a dict
+        j = dict(job_list[2])
+        self.assertEquals(j['wallclock_time_seconds'], 64 * 3600 + 26 * 60 + 16)
+        self.assertEquals([machine.name for machine in j['allocated_machines']], ['b141', 'b142', 'b143', 'b144'])
+
 
 class TestSubmitScript(unittest.TestCase):
 
@@ -15,6 +15,8 @@ from __future__ import print_function
 from __future__ import absolute_import
 import unittest
 
+import six
+
 
 class TestNodeNumberJobResource(unittest.TestCase):
     """Unit tests for the NodeNumberJobResource class."""
@@ -78,3 +80,79 @@ class TestNodeNumberJobResource(unittest.TestCase):
 
         with self.assertRaises(ValueError):
             _ = NodeNumberJobResource(num_mpiprocs_per_machine=8, tot_num_mpiprocs=15)
+
+
+class TestJobInfo(unittest.TestCase):
+    """Unit tests for the JobInfo class."""
+
+    @unittest.skipIf(six.PY2, 'the lazy fields are decoded right away on python 2')
+    def test_lazy_fields(self):
+        """Test that the lazy fields are only decoded when accessed, and then behave as normal fields."""
+        from aiida.scheduler.datastructures import JobInfo
+
+        decoded = []
+
+        def decoder(raw_value):
+            decoded.append(raw_value)
+            return int(raw_value)
+
+        job_info = JobInfo()
+        job_info.job_id = '123'
+        job_info.set_lazy_field('num_machines', decoder, '4')
+        job_info.set_lazy_field('num_mpiprocs', decoder, '16')
+        self.assertEqual(decoded, [])
+
+        self.assertEqual(job_info.num_machines, 4)
+        self.assertEqual(job_info['num_machines'], 4)
+        self.assertEqual(decoded, ['4'])
+
+        # Setting a lazy field overrides the value that is not decoded yet
+        job_info.num_mpiprocs = 8
+        self.assertEqual(job_info.num_mpiprocs, 8)
+        self.assertEqual(decoded, ['4'])
+
+    def test_lazy_fields_dict(self):
+        """Test that the lazy fields that are not accessed yet are copied to a dict and listed with the items."""
+        from aiida.scheduler.datastructures import JobInfo
+
+        expected = {'job_id': '123', 'num_machines': 4, 'num_cpus': 32}
+
+        for copy_function in (dict, lambda job_info: dict(job_info.items()), lambda job_info: dict(**job_info)):
+            job_info = JobInfo()
+            job_info.job_id = '123'
+            job_info.set_lazy_field('num_machines', int, '4')
+            job_info.set_lazy_field('num_cpus', int, '32')
+            self.assertEqual(copy_function(job_info), expected)
+
+    def test_lazy_field_error(self):
+        """Test that a lazy field that cannot be decoded is left undefined."""
+        from aiida.scheduler.datastructures import JobInfo
+
+        job_info = JobInfo()
+        job_info.set_lazy_field('num_machines', int, 'invalid')
+        self.assertIsNone(job_info.num_machines)
+        self.assertNotIn('num_machines', job_info)
+
+    def test_lazy_fields_serialization(self):
+        """Test that the lazy fields are serialized, copied and compared as the normal fields."""
+        import copy
+        import pickle
+        from aiida.scheduler.datastructures import JobInfo
+
+        job_info = JobInfo()
+        job_info.job_id = '123'
+        job_info.set_lazy_field('wallclock_time_seconds', int, '3600')
+
+        expected = JobInfo()
+        expected.job_id = '123'
+        expected.wallclock_time_seconds = 3600
+
+        self.assertEqual(job_info, expected)
+        self.assertEqual(copy.deepcopy(job_info), expected)
+        self.assertEqual(pickle.loads(pickle.dumps(job_info)), expected)
+
+        job_info = JobInfo()
+        job_info.set_lazy_field('wallclock_time_seconds', int, '3600')
+        loaded = JobInfo()
+        loaded.load_from_serialized(job_info.serialize())
+        self.assertEqual(loaded.wallclock_time_seconds, 3600)
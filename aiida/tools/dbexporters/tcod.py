@@ -739,6 +739,7 @@ def _collect_tags(node, calc,parameters=None,
 
     if dump_aiida_database and node.is_stored:
         import json
+        from aiida.common.archive import ArchiveDataReader, NODE_ATTRIBUTES_SECTION
         from aiida.common.exceptions import LicensingException
         from aiida.common.folders import SandboxFolder
         from aiida.orm.importexport import export_tree
@@ -751,12 +752,12 @@ def _collect_tags(node, calc,parameters=None,
                 raise LicensingException("{}. Only CC0 license is accepted.".format(exc))
 
             files = _collect_files(folder.abspath)
-            with open(folder.get_abs_path('data.json')) as f:
-                data = json.loads(f.read())
+            with open(folder.get_abs_path('metadata.json')) as f:
+                metadata = json.loads(f.read())
             md5_to_url = {}
             if exclude_external_contents:
-                for pk in data['node_attributes']:
-                    n = data['node_attributes'][pk]
+                reader = ArchiveDataReader(folder, metadata)
+                for _, n, _ in reader.iter_records(NODE_ATTRIBUTES_SECTION):
                     if 'md5' in n.keys() and 'source' in n.keys() and \
                       'uri' in n['source'].keys():
                         md5_to_url[n['md5']] = n['source']['uri']
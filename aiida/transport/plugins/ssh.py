@@ -365,6 +365,24 @@ class SshTransport(aiida.transport.Transport):
         self._client.close()
         self._is_open = False
 
+    def is_alive(self):
+        """
+        Check whether the transport is open and the underlying SSH connection is still active.
+
+        :return: True if the transport can be used
+        """
+        if not self._is_open:
+            return False
+
+        transport = self._client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def send_keepalive(self):
+        """
+        Send an ignore message over the SSH connection, which keeps it alive without any reply from the server.
+        """
+        self._client.get_transport().send_ignore()
+
     @property
     def sshclient(self):
         if not self._is_open:
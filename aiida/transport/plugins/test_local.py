@@ -10,6 +10,8 @@
 from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
+import os
+import shutil
 import unittest
 
 from aiida.transport.plugins.local import *
@@ -52,5 +54,197 @@ class TestBasicConnection(unittest.TestCase):
             pass
 
 
+class CountingLocalTransport(LocalTransport):
+    """
+    LocalTransport that counts the operations that would cost a round-trip on a remote transport.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(CountingLocalTransport, self).__init__(*args, **kwargs)
+        self.round_trips = 0
+
+    def putfile(self, *args, **kwargs):
+        self.round_trips += 1
+        return super(CountingLocalTransport, self).putfile(*args, **kwargs)
+
+    def puttree(self, *args, **kwargs):
+        self.round_trips += 1
+        return super(CountingLocalTransport, self).puttree(*args, **kwargs)
+
+    def getfile(self, *args, **kwargs):
+        self.round_trips += 1
+        return super(CountingLocalTransport, self).getfile(*args, **kwargs)
+
+    def remove(self, *args, **kwargs):
+        self.round_trips += 1
+        return super(CountingLocalTransport, self).remove(*args, **kwargs)
+
+    def chmod(self, *args, **kwargs):
+        self.round_trips += 1
+        return super(CountingLocalTransport, self).chmod(*args, **kwargs)
+
+    def exec_command_wait(self, *args, **kwargs):
+        self.round_trips += 1
+        return super(CountingLocalTransport, self).exec_command_wait(*args, **kwargs)
+
+
+class TestPutArchive(unittest.TestCase):
+    """
+    Test the upload of many files through a single archive.
+    """
+
+    num_files = 50
+
+    def setUp(self):
+        import tempfile
+
+        self.local_dir = tempfile.mkdtemp()
+        self.remote_dir = tempfile.mkdtemp()
+        self.entries = []
+
+        for index in range(self.num_files):
+            filename = 'file_{}.txt'.format(index)
+            with open(os.path.join(self.local_dir, filename), 'w') as handle:
+                handle.write(u'content {}'.format(index))
+            self.entries.append((os.path.join(self.local_dir, filename), filename))
+
+        os.mkdir(os.path.join(self.local_dir, 'subfolder'))
+        with open(os.path.join(self.local_dir, 'subfolder', 'nested.txt'), 'w') as handle:
+            handle.write(u'nested')
+        self.entries.append((os.path.join(self.local_dir, 'subfolder'), 'subfolder'))
+
+        # The last entry overwrites the first one, as with consecutive calls to put
+        self.entries.append((os.path.join(self.local_dir, 'file_1.txt'), 'file_0.txt'))
+
+    def tearDown(self):
+        shutil.rmtree(self.local_dir)
+        shutil.rmtree(self.remote_dir)
+
+    def assert_remote_content(self):
+        with open(os.path.join(self.remote_dir, 'file_0.txt')) as handle:
+            self.assertEqual(handle.read(), 'content 1')
+        with open(os.path.join(self.remote_dir, 'subfolder', 'nested.txt')) as handle:
+            self.assertEqual(handle.read(), 'nested')
+        with open(os.path.join(self.remote_dir, 'file_{}.txt'.format(self.num_files - 1))) as handle:
+            self.assertEqual(handle.read(), 'content {}'.format(self.num_files - 1))
+        self.assertTrue(os.access(os.path.join(self.remote_dir, 'file_2.txt'), os.X_OK))
+        self.assertFalse([name for name in os.listdir(self.remote_dir) if name.startswith('.aiida_upload')])
+
+    def test_put_archive(self):
+        """The archive upload should cost a constant number of round-trips."""
+        with CountingLocalTransport() as transport:
+            transport.chdir(self.remote_dir)
+            self.assertTrue(transport.put_archive(self.entries, executables=['file_2.txt']))
+            self.assertEqual(transport.round_trips, 2)
+
+        self.assert_remote_content()
+
+    def test_put_archive_fallback(self):
+        """Without a working `tar` on the remote the files should be copied one by one."""
+
+        class NoTarLocalTransport(CountingLocalTransport):
+
+            def exec_command_wait(self, command, **kwargs):
+                command = command.replace('tar -xzf', 'aiida-nonexistent-tar -xzf')
+                return super(NoTarLocalTransport, self).exec_command_wait(command, **kwargs)
+
+        with NoTarLocalTransport() as transport:
+            transport.chdir(self.remote_dir)
+            self.assertFalse(transport.put_archive(self.entries, executables=['file_2.txt']))
+            self.assertEqual(transport.round_trips, 2 + len(self.entries) + 1)
+
+        self.assert_remote_content()
+
+
+class TestGetArchive(unittest.TestCase):
+    """
+    Test the retrieval of many files through a single archive.
+    """
+
+    def setUp(self):
+        import tempfile
+
+        self.local_dir = tempfile.mkdtemp()
+        self.remote_dir = tempfile.mkdtemp()
+
+        os.mkdir(os.path.join(self.remote_dir, 'subfolder'))
+        for filename in ['out_1.xml', 'out_2.xml', 'log.txt', os.path.join('subfolder', 'nested.xml')]:
+            with open(os.path.join(self.remote_dir, filename), 'w') as handle:
+                handle.write(filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.local_dir)
+        shutil.rmtree(self.remote_dir)
+
+    def test_get_archive(self):
+        """The archive retrieval should cost a constant number of round-trips and resolve the wildcards remotely."""
+        with CountingLocalTransport() as transport:
+            transport.chdir(self.remote_dir)
+            self.assertTrue(transport.get_archive(['out_*.xml', 'subfolder/*.xml', 'missing.txt'], self.local_dir))
+            self.assertEqual(transport.round_trips, 3)
+
+            # The remote archive should have been removed
+            self.assertEqual(sorted(os.listdir(self.remote_dir)), ['log.txt', 'out_1.xml', 'out_2.xml', 'subfolder'])
+
+        self.assertEqual(sorted(os.listdir(self.local_dir)), ['out_1.xml', 'out_2.xml', 'subfolder'])
+        self.assertEqual(os.listdir(os.path.join(self.local_dir, 'subfolder')), ['nested.xml'])
+
+    def test_get_archive_symlinks(self):
+        """The links are followed on the remote, such that only regular files and folders are unpacked."""
+        import tempfile
+
+        outside_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(outside_dir, 'secret.txt'), 'w') as handle:
+                handle.write('remote content')
+            os.symlink(os.path.join(outside_dir, 'secret.txt'), os.path.join(self.remote_dir, 'out_link.xml'))
+            os.symlink(outside_dir, os.path.join(self.remote_dir, 'linked'))
+
+            with CountingLocalTransport() as transport:
+                transport.chdir(self.remote_dir)
+                self.assertTrue(transport.get_archive(['out_link.xml', 'linked'], self.local_dir))
+        finally:
+            shutil.rmtree(outside_dir)
+
+        for path in ['out_link.xml', 'linked', os.path.join('linked', 'secret.txt')]:
+            self.assertFalse(os.path.islink(os.path.join(self.local_dir, path)))
+        for path in ['out_link.xml', os.path.join('linked', 'secret.txt')]:
+            with open(os.path.join(self.local_dir, path)) as handle:
+                self.assertEqual(handle.read(), 'remote content')
+
+    def test_get_archive_links_rejected(self):
+        """An archive with links is not unpacked, as they could write or point outside of the local folder."""
+        import tarfile
+
+        class LinkArchiveLocalTransport(CountingLocalTransport):
+            """Transport whose retrieved archive contains a link to a folder, and a file below the link."""
+
+            link_target = None
+
+            def getfile(self, remotepath, localpath, *args, **kwargs):
+                with tarfile.open(localpath, 'w:gz') as archive:
+                    link = tarfile.TarInfo('out')
+                    link.type = tarfile.SYMTYPE
+                    link.linkname = self.link_target
+                    archive.addfile(link)
+                    archive.addfile(tarfile.TarInfo('out/x'))
+
+        with LinkArchiveLocalTransport() as transport:
+            transport.link_target = self.remote_dir
+            transport.chdir(self.remote_dir)
+            with self.assertRaises(IOError):
+                transport.get_archive(['out_*.xml'], self.local_dir)
+
+        self.assertEqual(os.listdir(self.local_dir), [])
+
+    def test_get_archive_invalid_paths(self):
+        """Paths outside of the current working directory cannot be retrieved through the archive."""
+        with CountingLocalTransport() as transport:
+            transport.chdir(self.remote_dir)
+            self.assertFalse(transport.get_archive(['../out_*.xml'], self.local_dir))
+            self.assertFalse(transport.get_archive(['/etc/hosts'], self.local_dir))
+            self.assertEqual(transport.round_trips, 0)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -36,6 +36,7 @@ class Transport(object):
     # See the ssh or local plugin to see the format
     _valid_auth_params = None
     _MAGIC_CHECK = re.compile('[*?[]')
+    _GLOB_SPLIT = re.compile(r'([*?]|\[!?[^]\'"\s$`\\]+\])')
     _valid_auth_options = []
     _common_auth_options = [('safe_interval', {
         'type': int,
@@ -110,6 +111,24 @@ class Transport(object):
         """
         raise NotImplementedError
 
+    def is_alive(self):
+        """
+        Check whether the transport is open and its connection is still usable.
+
+        Plugins whose connection can drop while the transport is open (e.g. over a network) should override this.
+
+        :return: True if the transport can be used
+        """
+        return self.is_open
+
+    def send_keepalive(self):
+        """
+        Send a keepalive message over the connection, to prevent an idle transport from being disconnected.
+
+        In the main class this does nothing; plugins with a connection that can time out should override it.
+        """
+        pass
+
     def __repr__(self):
         return '<{}: {}>'.format(self.__class__.__name__, str(self))
 
@@ -577,6 +596,157 @@ class Transport(object):
         """
         raise NotImplementedError
 
+    def put_archive(self, entries, executables=None):
+        """
+        Put a list of local files and folders to the remote, packed in a single tar archive.
+
+        The entries are packed locally in a gzipped tar archive, which is copied with a single `putfile` and unpacked
+        in the current remote working directory with a single `exec_command_wait`. Entries later in the list overwrite
+        the ones that come earlier, exactly as a sequence of calls to `put` would. If the archive cannot be unpacked
+        on the remote, for example because `tar` is not available, this falls back to calling `put` for every entry.
+
+        :param entries: list of tuples (localpath, remotepath), where localpath is the absolute path of a local file
+            or folder and remotepath a path relative to the current remote working directory
+        :param executables: optional list of remote paths, relative to the current remote working directory, that
+            should be made executable after the upload
+        :return: True if the entries were uploaded through the archive, False if the fallback was used
+        """
+        import tarfile
+        import tempfile
+        import uuid
+        from aiida.common.utils import escape_for_bash
+
+        executables = executables or []
+
+        # The archive can only be used if all the destinations live within the current remote working directory
+        use_archive = all(
+            not os.path.isabs(remotepath) and not os.path.normpath(remotepath).startswith(os.pardir)
+            for _, remotepath in entries)
+
+        if use_archive and entries:
+            archive_name = '.aiida_upload_{}.tar.gz'.format(uuid.uuid4().hex)
+            handle, local_archive = tempfile.mkstemp(suffix='.tar.gz')
+            os.close(handle)
+
+            try:
+                with tarfile.open(local_archive, 'w:gz', dereference=True) as archive:
+                    for localpath, remotepath in entries:
+                        archive.add(localpath, arcname=os.path.normpath(remotepath))
+
+                self.putfile(local_archive, archive_name)
+            finally:
+                os.remove(local_archive)
+
+            command = 'tar -xzf {archive}'.format(archive=escape_for_bash(archive_name))
+            if executables:
+                command += ' && chmod 755 {}'.format(' '.join(escape_for_bash(path) for path in executables))
+            command += '; retval=$?; rm -f {archive}; exit $retval'.format(archive=escape_for_bash(archive_name))
+
+            retval, stdout, stderr = self.exec_command_wait(command)
+
+            if retval == 0:
+                return True
+
+            self.logger.warning('unpacking the upload archive failed with exit code {}, falling back to copying the '
+                                'files one by one. stdout: {}, stderr: {}'.format(retval, stdout, stderr))
+
+        for localpath, remotepath in entries:
+            self.put(localpath, remotepath)
+
+        for path in executables:
+            self.chmod(path, 0o755)  # rwxr-xr-x
+
+        return False
+
+    def get_archive(self, remotepaths, localpath):
+        """
+        Retrieve the remote files and folders matching the given paths, packed in a single tar archive.
+
+        The paths, which may contain shell wildcards, are resolved and packed by a single remote `tar` command; the
+        archive is then copied with a single `getfile` and unpacked in `localpath`, preserving the paths relative to
+        the current remote working directory. Paths that do not match anything on the remote are silently ignored.
+
+        :param remotepaths: list of paths, relative to the current remote working directory
+        The links are followed on the remote: the files and folders they point to are retrieved in their place.
+
+        :param localpath: absolute path of an existing local folder in which to unpack the archive
+        :return: True if the archive was retrieved and unpacked, False if the archive could not be created on the
+            remote (e.g. no GNU `tar` is available) or the paths are not suited for it, in which case nothing was
+            retrieved and the caller should fall back to retrieving the paths one by one
+        :raise IOError: if the archive contains links, or paths outside of `localpath`, in which case nothing is
+            unpacked
+        """
+        import tarfile
+        import tempfile
+
+        if any(os.path.isabs(path) or os.path.normpath(path).startswith(os.pardir) for path in remotepaths):
+            return False
+
+        if not remotepaths:
+            return True
+
+        patterns = ' '.join(self._escape_glob_for_bash(path) for path in remotepaths)
+        # The symbolic and hard links are dereferenced on the remote, as when retrieving the files one by one, such
+        # that the archive only contains regular files and folders
+        command = ('archive=$(mktemp) || exit 1; '
+                   'tar -czf "$archive" --dereference --hard-dereference --ignore-failed-read -- {} || '
+                   '{{ rm -f "$archive"; exit 1; }}; '
+                   'echo "$archive"'.format(patterns))
+
+        retval, stdout, stderr = self.exec_command_wait(command)
+
+        if retval != 0 or not stdout.strip():
+            self.logger.warning('creating the retrieve archive failed with exit code {}, falling back to retrieving '
+                                'the files one by one. stdout: {}, stderr: {}'.format(retval, stdout, stderr))
+            return False
+
+        remote_archive = stdout.strip().splitlines()[-1]
+        handle, local_archive = tempfile.mkstemp(suffix='.tar.gz')
+        os.close(handle)
+
+        try:
+            self.getfile(remote_archive, local_archive)
+            with tarfile.open(local_archive, 'r:gz') as archive:
+                members = archive.getmembers()
+                root = os.path.realpath(localpath)
+                for member in members:
+                    # A link could point anywhere on the local machine, once the archive is extracted
+                    if not (member.isfile() or member.isdir()):
+                        raise IOError('the retrieve archive contains {}, which is not a regular file or folder'.format(
+                            member.name))
+                    target = os.path.realpath(os.path.join(root, member.name))
+                    if os.path.isabs(member.name) or not (target == root or target.startswith(root + os.sep)):
+                        raise IOError('the retrieve archive contains the invalid path {}'.format(member.name))
+                archive.extractall(localpath, members=members)
+        finally:
+            os.remove(local_archive)
+            self.remove(remote_archive)
+
+        return True
+
+    def _escape_glob_for_bash(self, pathname):
+        """
+        Escape a path for bash, leaving its wildcards unquoted such that they are expanded by the shell.
+
+        :param str pathname: the path, possibly containing wildcards
+        :return: the escaped path
+        """
+        from aiida.common.utils import escape_for_bash
+
+        if not self.has_magic(pathname):
+            return escape_for_bash(pathname)
+
+        escaped = []
+        for part in self._GLOB_SPLIT.split(pathname):
+            if not part:
+                continue
+            if self._GLOB_SPLIT.match(part):
+                escaped.append(part)
+            else:
+                escaped.append(escape_for_bash(part))
+
+        return ''.join(escaped)
+
     def remove(self, path):
         """
         Remove the file at the given path. This only works on files;
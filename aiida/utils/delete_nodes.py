@@ -12,8 +12,16 @@
 from __future__ import division
 from __future__ import absolute_import
 from __future__ import print_function
+from multiprocessing.pool import ThreadPool
+
 from six.moves import zip, input
 
+# The number of pks passed to the same query
+DELETE_QUERY_CHUNK_SIZE = 1000
+
+# The number of threads that erase the repository folders of the deleted nodes
+DELETE_FOLDER_WORKERS = 4
+
 
 def delete_nodes(pks, follow_calls=False, follow_returns=False, 
                  dry_run=False, force=False, disable_checks=False, verbosity=0):
@@ -45,6 +53,8 @@ def delete_nodes(pks, follow_calls=False, follow_returns=False,
     from aiida.orm import load_node
     from aiida.orm.backend import construct_backend
     from aiida.backends.utils import delete_nodes_and_connections
+    from aiida.common.folders import RepositoryFolder
+    from aiida.common.utils import grouper
 
     backend = construct_backend()
     user_email = backend.users.get_automatic_user().email
@@ -74,9 +84,11 @@ def delete_nodes(pks, follow_calls=False, follow_returns=False,
     while operational_set:
         # new_pks_set are the the pks of all nodes that are connected to the operational node set
         # with the links specified.
-        new_pks_set = set([i for i, in QueryBuilder().append(
-            Node, filters={'id': {'in': operational_set}}).append(
-            Node, project='id', edge_filters=edge_filters).iterall()])
+        new_pks_set = set()
+        for operational_pks in grouper(DELETE_QUERY_CHUNK_SIZE, operational_set):
+            new_pks_set.update(i for i, in QueryBuilder().append(
+                Node, filters={'id': {'in': operational_pks}}).append(
+                Node, project='id', edge_filters=edge_filters).iterall())
         # The operational set is only those pks that haven't been yet put into the pks_set_to_delete.
         operational_set = new_pks_set.difference(pks_set_to_delete)
 
@@ -89,15 +101,16 @@ def delete_nodes(pks, follow_calls=False, follow_returns=False,
                       len(pks_set_to_delete),
                       's' if len(pks_set_to_delete) > 1 else ''))
         if verbosity > 1:
-            qb = QueryBuilder().append(Node, filters={'id': {'in': pks_set_to_delete}},
-                                       project=('uuid', 'id', 'type', 'label'))
             print("The nodes I {} delete:".format('would' if dry_run else 'will'))
-            for uuid, pk, type_string, label in qb.iterall():
-                try:
-                    short_type_string = type_string.split('.')[-2]
-                except IndexError:
-                    short_type_string = type_string
-                print("   {} {} {} {}".format(uuid, pk, short_type_string, label))
+            for pks_chunk in grouper(DELETE_QUERY_CHUNK_SIZE, sorted(pks_set_to_delete)):
+                qb = QueryBuilder().append(Node, filters={'id': {'in': pks_chunk}},
+                                           project=('uuid', 'id', 'type', 'label'))
+                for uuid, pk, type_string, label in qb.iterall():
+                    try:
+                        short_type_string = type_string.split('.')[-2]
+                    except IndexError:
+                        short_type_string = type_string
+                    print("   {} {} {} {}".format(uuid, pk, short_type_string, label))
 
 
     # Here I am checking whether I am deleting
@@ -105,12 +118,17 @@ def delete_nodes(pks, follow_calls=False, follow_returns=False,
     ## A calculation instance that was called, without also deleting the caller.
 
     if not disable_checks:
-        called_qb = QueryBuilder()
-        called_qb.append(Calculation, filters={'id': {'!in': pks_set_to_delete}}, project='id')
-        called_qb.append(Calculation, project='type', edge_project='label',
-                         filters={'id': {'in': pks_set_to_delete}},
-                         edge_filters={'type': {'==': LinkType.CALL.value}})
-        caller_to_called2delete = called_qb.all()
+        # The nodes to delete are filtered in chunks and the callers that are not deleted are selected in python, as
+        # the set can be too large for the parameters of a single query
+        caller_to_called2delete = []
+        for pks_chunk in grouper(DELETE_QUERY_CHUNK_SIZE, sorted(pks_set_to_delete)):
+            called_qb = QueryBuilder()
+            called_qb.append(Calculation, project=['id', 'type'])
+            called_qb.append(Calculation, project='type', edge_project='label',
+                             filters={'id': {'in': pks_chunk}},
+                             edge_filters={'type': {'==': LinkType.CALL.value}})
+            caller_to_called2delete.extend(
+                row for row in called_qb.iterall() if row[0] not in pks_set_to_delete)
 
         if verbosity > 0 and caller_to_called2delete:
             calculation_pks_losing_called = set(next(zip(*caller_to_called2delete)))
@@ -124,13 +142,16 @@ def delete_nodes(pks, follow_calls=False, follow_returns=False,
                 for calc_losing_called_pk in calculation_pks_losing_called:
                     print('  ', load_node(calc_losing_called_pk))
 
-        created_qb = QueryBuilder()
-        created_qb.append(Calculation, filters={'id': {'!in': pks_set_to_delete}}, project='id')
-        created_qb.append(Data, project='type', edge_project='label',
-                          filters={'id': {'in': pks_set_to_delete}},
-                          edge_filters={'type': {'==': LinkType.CREATE.value}})
+        creator_to_created2delete = []
+        for pks_chunk in grouper(DELETE_QUERY_CHUNK_SIZE, sorted(pks_set_to_delete)):
+            created_qb = QueryBuilder()
+            created_qb.append(Calculation, project=['id', 'type'])
+            created_qb.append(Data, project='type', edge_project='label',
+                              filters={'id': {'in': pks_chunk}},
+                              edge_filters={'type': {'==': LinkType.CREATE.value}})
+            creator_to_created2delete.extend(
+                row for row in created_qb.iterall() if row[0] not in pks_set_to_delete)
 
-        creator_to_created2delete = created_qb.all()
         if verbosity > 0 and creator_to_created2delete:
             calculation_pks_losing_created = set(next(zip(*creator_to_created2delete)))
             print("\n{} calculation{} {} lose at least one created data-instance"
@@ -161,30 +182,66 @@ def delete_nodes(pks, follow_calls=False, follow_returns=False,
     # the nodes.  I will delete the folders only later, so that if
     # there is a problem during the deletion of the nodes in
     # the DB, I don't delete the folders
-    folders = [load_node(_).folder for _ in pks_set_to_delete]
+    # Only the UUIDs are needed, so that no node has to be loaded
+    folders = []
+    for pks_chunk in grouper(DELETE_QUERY_CHUNK_SIZE, sorted(pks_set_to_delete)):
+        qb = QueryBuilder().append(Node, filters={'id': {'in': pks_chunk}}, project='uuid')
+        folders.extend(RepositoryFolder(section=Node._section_name, uuid=str(uuid)) for uuid, in qb.iterall())
 
-    delete_nodes_and_connections(pks_set_to_delete)
+    def print_progress(count, total, action):
+        """Print the number of nodes processed so far, about every tenth."""
+        if verbosity > 0 and (count == total or count % max(total // 10, 1) == 0):
+            print("   ({} of {} nodes {})".format(count, total, action))
+
+    delete_nodes_and_connections(
+        pks_set_to_delete, callback=lambda count: print_progress(count, len(pks_set_to_delete), 'deleted'))
 
     if not disable_checks:
         # I pass now to the log the information for calculations losing created data or called instances
-        for calc_pk, calc_type_string, link_label in caller_to_called2delete:
-            calc = load_node(calc_pk)
-            calc.logger.warning("User {} deleted "
-                                "an instance of type {} "
-                                "called with the label {} "
-                                "by this calculation".format(
-                user_email, calc_type_string, link_label))
-
-        for calc_pk, data_type_string, link_label in creator_to_created2delete:
-            calc = load_node(calc_pk)
-            calc.logger.warning("User {} deleted "
-                                "an instance of type {} "
-                                "created with the label {} "
-                                "by this calculation".format(
-                user_email, data_type_string, link_label))
+        for calc_pk, calc_type, calc_type_string, link_label in caller_to_called2delete:
+            get_calculation_logger(calc_pk, calc_type).warning(
+                "User {} deleted "
+                "an instance of type {} "
+                "called with the label {} "
+                "by this calculation".format(
+                    user_email, calc_type_string, link_label))
+
+        for calc_pk, calc_type, data_type_string, link_label in creator_to_created2delete:
+            get_calculation_logger(calc_pk, calc_type).warning(
+                "User {} deleted "
+                "an instance of type {} "
+                "created with the label {} "
+                "by this calculation".format(
+                    user_email, data_type_string, link_label))
 
     # If we are here, we managed to delete the entries from the DB.
-    # I can now delete the folders
-    for f in folders:
-        f.erase()
+    # I can now delete the folders, with a pool of threads
+    pool = ThreadPool(DELETE_FOLDER_WORKERS)
+    try:
+        for count, _ in enumerate(pool.imap_unordered(lambda folder: folder.erase(), folders), start=1):
+            print_progress(count, len(folders), 'with their folder erased')
+    finally:
+        pool.terminate()
+
+
+def get_calculation_logger(pk, type_string):
+    """
+    Return the same logger as the `logger` property of a calculation, without loading the calculation.
+
+    :param pk: the pk of the calculation
+    :param type_string: the type string of the calculation
+    :return: LoggerAdapter object, that also logs to the DB
+    """
+    import logging
+    from aiida.orm.calculation import Calculation
+    from aiida.plugins.loader import get_plugin_type_from_type_string, load_plugin
+
+    try:
+        calculation_class = load_plugin(get_plugin_type_from_type_string(type_string), safe=True)
+    except Exception:  # pylint: disable=broad-except
+        calculation_class = Calculation
 
+    # See aiida.common.log.get_dblogger_extra
+    return logging.LoggerAdapter(
+        logger=calculation_class._logger,  # pylint: disable=protected-access
+        extra={'objpk': pk, 'objname': 'node.' + type_string})
@@ -46,6 +46,7 @@ class JobsList(object):
         self._jobs_cache = {}
         self._last_updated = None  # type: float
         self._job_update_requests = {}  # Mapping: {job_id: Future}
+        self._job_states_delivered = {}  # Mapping: {job_id: JobInfo last set as result of an update request}
         self._update_handle = None
 
     def get_minimum_update_interval(self):
@@ -70,8 +71,13 @@ class JobsList(object):
         """
         Get the current jobs list from the scheduler
 
-        :return: A dictionary of {job_id: job info}
-        :rtype: dict
+        The detailed job information of the jobs that are done is fetched only for the jobs that have been requested,
+        with a single scheduler command if the plugin supports it, and is reused from the cache for jobs that were
+        already done at the previous update.
+
+        :return: A tuple with a dictionary of {job_id: job info} and the list of the job ids that were requested at
+            the time of the query, which are the only ones whose state is known to be up to date
+        :rtype: tuple
         """
         with self._transport_queue.request_transport(self._authinfo) as request:
             transport = yield request
@@ -85,22 +91,32 @@ class JobsList(object):
             else:
                 kwargs['jobs'] = self._get_jobs_with_scheduler()
 
+            jobs_requested = list(self._job_update_requests.keys())
             scheduler_response = scheduler.getJobs(**kwargs)
-            jobs_cache = {}
+            jobs_detailed_info = {}
+            jobs_missing_detailed_info = []
 
             for job_id, job_info in iteritems(scheduler_response):
-                # If the job is done then get detailed job information
-                detailed_job_info = None
-                if job_info.job_state == schedulers.JOB_STATES.DONE:
-                    try:
-                        detailed_job_info = scheduler.get_detailed_jobinfo(job_id)
-                    except exceptions.FeatureNotAvailable:
-                        detailed_job_info = 'This scheduler does not implement get_detailed_jobinfo'
+                if job_info.job_state != schedulers.JOB_STATES.DONE:
+                    continue
+
+                cached_job_info = self._jobs_cache.get(job_id, None)
+                if (cached_job_info is not None and cached_job_info.job_state == schedulers.JOB_STATES.DONE and
+                        cached_job_info.detailedJobinfo is not None):
+                    jobs_detailed_info[job_id] = cached_job_info.detailedJobinfo
+                elif job_id in self._job_update_requests:
+                    jobs_missing_detailed_info.append(job_id)
+
+            try:
+                jobs_detailed_info.update(scheduler.get_detailed_jobinfos(jobs_missing_detailed_info))
+            except exceptions.FeatureNotAvailable:
+                for job_id in jobs_missing_detailed_info:
+                    jobs_detailed_info[job_id] = 'This scheduler does not implement get_detailed_jobinfo'
 
-                job_info.detailedJobinfo = detailed_job_info
-                jobs_cache[job_id] = job_info
+            for job_id, job_info in iteritems(scheduler_response):
+                job_info.detailedJobinfo = jobs_detailed_info.get(job_id, None)
 
-            raise gen.Return(jobs_cache)
+            raise gen.Return((scheduler_response, jobs_requested))
 
     @gen.coroutine
     def _update_job_info(self):
@@ -109,26 +125,72 @@ class JobsList(object):
         all the jobs on a particular machine for a particular user.
 
         This will set the futures for all pending update requests where the corresponding job
-        has a new status compared to the last update.
+        has a new status compared to the one last delivered for that job, or is no longer found
+        in the jobs list.
         """
+        self._discard_done_requests()
+
         try:
             if not self._update_requests_outstanding():
                 return
 
             # Update our cache of the job states
-            self._jobs_cache = yield self._get_jobs_from_scheduler()
+            scheduler_response, jobs_requested = yield self._get_jobs_from_scheduler()
+            self._update_jobs_cache(scheduler_response, jobs_requested)
         except Exception as exception:
-            # Set the exception on all the update futures
+            # Set the exception on all the update futures, which are then dropped
             for future in itervalues(self._job_update_requests):
                 if not future.done():
                     future.set_exception(exception)
+            self._job_update_requests = {}
             raise
         else:
-            for job_id, future in iteritems(self._job_update_requests):
-                if not future.done():
-                    future.set_result(self._jobs_cache.get(job_id, None))
+            self._last_updated = time.time()
+
+            for job_id in jobs_requested:
+                future = self._job_update_requests.get(job_id, None)
+                if future is None or future.done():
+                    continue
+
+                job_info = self._jobs_cache.get(job_id, None)
+                if job_id not in self._job_states_delivered or job_info is None or self._has_job_state_changed(
+                        self._job_states_delivered[job_id], job_info):
+                    future.set_result(job_info)
+                    self._job_states_delivered[job_id] = job_info
+
+            # Forget the states delivered for the jobs that are gone and no longer waited for
+            for job_id in list(self._job_states_delivered):
+                if job_id not in self._jobs_cache and job_id not in self._job_update_requests:
+                    self._job_states_delivered.pop(job_id)
         finally:
-            self._job_update_requests = {}
+            self._discard_done_requests()
+
+    def _discard_done_requests(self):
+        """Remove the update requests whose future is done, because it was resolved, failed or was cancelled."""
+        for job_id, future in list(iteritems(self._job_update_requests)):
+            if future.done():
+                self._job_update_requests.pop(job_id)
+
+    def _update_jobs_cache(self, scheduler_response, jobs_requested):
+        """
+        Update the cache of the job states with the response of the scheduler.
+
+        Only the entries of the jobs in the response are replaced. The entries of the jobs that are no longer in the
+        response are removed: all of them if the scheduler was queried by user, otherwise only those of the jobs that
+        were requested, since the others were not queried.
+
+        :param scheduler_response: dictionary of {job_id: job info} returned by the scheduler
+        :param jobs_requested: the list of job ids that were requested at the time of the query
+        """
+        if self._authinfo.computer.get_scheduler().get_feature('can_query_by_user'):
+            jobs_removed = (set(self._jobs_cache) | set(jobs_requested)) - set(scheduler_response)
+        else:
+            jobs_removed = set(jobs_requested) - set(scheduler_response)
+
+        for job_id in jobs_removed:
+            self._jobs_cache.pop(job_id, None)
+
+        self._jobs_cache.update(scheduler_response)
 
     @contextlib.contextmanager
     def request_job_info_update(self, job_id):
@@ -139,8 +201,11 @@ class JobsList(object):
         :param job_id: The job identifier
         :return: A future that will resolve to a JobInfo object when the job changes state
         """
-        # Get or create the future
-        request = self._job_update_requests.setdefault(job_id, concurrent.Future())
+        # Get or create the future, replacing the one of a previous request that was cancelled
+        request = self._job_update_requests.get(job_id, None)
+        if request is None or request.done():
+            request = concurrent.Future()
+            self._job_update_requests[job_id] = request
         assert not request.done(), "The future should be no be in the done state"
 
         try:
@@ -12,17 +12,30 @@
 from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
+import base64
 import logging
 import traceback
+import uuid
+import zlib
 import yaml
 
+import six
+from six.moves import cPickle as pickle
 import plumpy
 
-__all__ = ['ObjectLoader', 'get_object_loader']
+from aiida.common.extendeddicts import AttributeDict
+
+__all__ = ['ObjectLoader', 'get_object_loader', 'CheckpointCodec', 'PickleCheckpointCodec', 'CHECKPOINT_CODECS']
 
 LOGGER = logging.getLogger(__name__)
 OBJECT_LOADER = None
 
+# Prefix of the checkpoints that are not in the legacy YAML format, followed by the name of their codec
+CHECKPOINT_PREFIX = 'aiida-checkpoint:'
+
+# A delta checkpoint is only saved if its sections take at most this fraction of the size of the full checkpoint
+CHECKPOINT_DELTA_MAX_FRACTION = 0.5
+
 
 def get_object_loader():
     """
@@ -37,12 +50,89 @@ def get_object_loader():
     return OBJECT_LOADER
 
 
+class CheckpointCodec(object):
+    """
+    Base class of the codecs that serialize the values of the sections of a process checkpoint to bytes. The codecs
+    are registered in `CHECKPOINT_CODECS` by their name, that is stored with the checkpoints they encode.
+    """
+
+    name = None
+
+    def encode(self, value):
+        """
+        Serialize a value
+
+        :param value: the value, that can contain any object that can be in a `plumpy.Bundle`
+        :return: the serialized value
+        :rtype: bytes
+        """
+        raise NotImplementedError
+
+    def decode(self, data):
+        """
+        Deserialize a value serialized by `encode`
+
+        :param data: the serialized value
+        :return: the value
+        """
+        raise NotImplementedError
+
+
+class PickleCheckpointCodec(CheckpointCodec):
+    """Serialize with the highest pickle protocol, compressed with zlib."""
+
+    name = 'pickle'
+
+    # Fast compression, since the checkpoints are saved at every step of a process
+    compression_level = 1
+
+    def encode(self, value):
+        return zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self.compression_level)
+
+    def decode(self, data):
+        return pickle.loads(zlib.decompress(data))
+
+
+# The codecs of the checkpoints by name, the legacy YAML format is not a codec and is handled by the persister itself
+CHECKPOINT_CODECS = {
+    PickleCheckpointCodec.name: PickleCheckpointCodec(),
+}
+
+
 class AiiDAPersister(plumpy.Persister):
     """
     This node is responsible to taking saved process instance states and
     persisting them to the database.
+
+    The checkpoints are serialized with the codec set by the `persistence.checkpoint_codec` property, or with YAML in
+    the legacy format. Each top level item of the bundle is serialized separately, such that after a full checkpoint
+    only the items that changed since then are saved, as a delta checkpoint, until the delta becomes too large
+    compared to the full checkpoint. The checkpoints of both formats can be loaded whatever the codec.
     """
 
+    def __init__(self, codec=None):
+        """
+        :param codec: the name of the codec of the checkpoints, `yaml` for the legacy format, if None it is read from
+            the `persistence.checkpoint_codec` property
+        """
+        super(AiiDAPersister, self).__init__()
+
+        if codec is None:
+            from aiida.common.setup import get_property
+            codec = get_property('persistence.checkpoint_codec')
+
+        if codec != 'yaml' and codec not in CHECKPOINT_CODECS:
+            raise ValueError('unknown checkpoint codec {}'.format(codec))
+
+        self._codec = codec
+        # The last full checkpoint saved or loaded for each process, mapping: {pid: _FullCheckpoint}
+        self._full_checkpoints = {}
+
+    @property
+    def codec(self):
+        """Return the name of the codec of the checkpoints that are saved."""
+        return self._codec
+
     def save_checkpoint(self, process, tag=None):
         """
         Persist a Process instance
@@ -64,10 +154,46 @@ class AiiDAPersister(plumpy.Persister):
                 process, traceback.format_exc()))
         else:
             calc = process.calc
-            calc.set_checkpoint(yaml.dump(bundle))
+            if self._codec == 'yaml':
+                calc.set_checkpoint(yaml.dump(bundle))
+            else:
+                self._save_sections(calc, bundle)
 
         return bundle
 
+    def _save_sections(self, calc, bundle):
+        """
+        Save the checkpoint of a bundle with the codec, as a delta of the last full checkpoint if it is small enough.
+
+        :param calc: the calculation of the process
+        :param bundle: the bundle of the process
+        """
+        codec = CHECKPOINT_CODECS[self._codec]
+        sections = _split_sections(codec, bundle)
+
+        full_checkpoint = self._full_checkpoints.get(calc.pk, None)
+        if full_checkpoint is not None and full_checkpoint.codec == self._codec:
+            changed = {
+                key: value for key, value in sections.items() if full_checkpoint.sections.get(key, None) != value
+            }
+            removed = [key for key in full_checkpoint.sections if key not in sections]
+
+            if sum(len(value) for value in changed.values()) <= CHECKPOINT_DELTA_MAX_FRACTION * full_checkpoint.size:
+                delta = _encode_checkpoint(codec, {
+                    'token': full_checkpoint.token,
+                    'sections': changed,
+                    'removed': removed
+                })
+                # A step that did not change the state does not need to write anything
+                if delta != full_checkpoint.delta:
+                    calc.set_checkpoint_delta(delta)
+                    full_checkpoint.delta = delta
+                return
+
+        token = uuid.uuid4().hex
+        calc.set_checkpoint(_encode_checkpoint(codec, {'token': token, 'sections': sections}))
+        self._full_checkpoints[calc.pk] = _FullCheckpoint(self._codec, token, sections)
+
     def load_checkpoint(self, pid, tag=None):
         """
         Load a process from a persisted checkpoint by its process id
@@ -89,9 +215,42 @@ class AiiDAPersister(plumpy.Persister):
         if checkpoint is None:
             raise plumpy.PersistenceError('Calculation<{}> does not have a saved checkpoint'.format(calculation.pk))
 
-        bundle = yaml.load(checkpoint)
+        if not checkpoint.startswith(CHECKPOINT_PREFIX):
+            bundle = yaml.load(checkpoint)
+            return bundle
+
+        codec, full = _decode_checkpoint(checkpoint)
+        sections = dict(full['sections'])
+
+        delta_checkpoint = calculation.checkpoint_delta
+        delta = _decode_checkpoint(delta_checkpoint)[1] if delta_checkpoint is not None else None
+        if delta is not None and delta['token'] != full['token']:
+            # A delta of the previous full checkpoint, left if the process stopped before deleting it
+            LOGGER.debug('Ignoring the delta checkpoint of Calculation<%d> based on another full checkpoint',
+                         calculation.pk)
+            delta_checkpoint = delta = None
+        if delta is not None:
+            sections.update(delta['sections'])
+            for key in delta['removed']:
+                sections.pop(key, None)
+
+        bundle = _join_sections(codec, sections)
+
+        # The next checkpoints of the process can be deltas of its full checkpoint
+        self._full_checkpoints[calculation.pk] = _FullCheckpoint(codec.name, full['token'], full['sections'],
+                                                                 delta_checkpoint)
+
         return bundle
 
+    def discard_full_checkpoint(self, pid):
+        """
+        Forget the last full checkpoint of a process that is closed, for instance because it is continued by another
+        worker, such that this persister does not save deltas of a checkpoint that may have been replaced since
+
+        :param pid: the process id of the :class:`plumpy.Process`
+        """
+        self._full_checkpoints.pop(pid, None)
+
     def get_checkpoints(self):
         """
         Return a list of all the current persisted process checkpoints
@@ -121,6 +280,7 @@ class AiiDAPersister(plumpy.Persister):
         """
         from aiida.orm import load_node
 
+        self._full_checkpoints.pop(pid, None)
         calc = load_node(pid)
         calc.del_checkpoint()
 
@@ -133,6 +293,89 @@ class AiiDAPersister(plumpy.Persister):
         pass
 
 
+class _FullCheckpoint(object):
+    """The serialized sections of the last full checkpoint of a process, with the last delta saved against it."""
+
+    def __init__(self, codec, token, sections, delta=None):
+        self.codec = codec
+        self.token = token
+        self.sections = sections
+        self.size = sum(len(value) for value in sections.values())
+        self.delta = delta
+
+
+def _split_sections(codec, bundle):
+    """
+    Serialize a bundle as separate sections, such that a delta checkpoint only contains the sections that changed.
+
+    Each value of the bundle is a section, except for the plain mappings, like the context of a work chain, whose
+    values are each a section of their own, next to the section of the empty mapping.
+
+    :param codec: the `CheckpointCodec`
+    :param bundle: the bundle of the process
+    :return: dictionary of the serialized sections, by tuples of the key in the bundle and the key in the mapping
+    """
+    sections = {}
+    for key, value in bundle.items():
+        if type(value) in (dict, AttributeDict):  # pylint: disable=unidiomatic-typecheck
+            sections[(key,)] = codec.encode(type(value)())
+            for item_key, item_value in value.items():
+                sections[(key, item_key)] = codec.encode(item_value)
+        else:
+            sections[(key,)] = codec.encode(value)
+    return sections
+
+
+def _join_sections(codec, sections):
+    """
+    Deserialize the sections returned by `_split_sections` to the bundle.
+
+    :param codec: the `CheckpointCodec`
+    :param sections: dictionary of the serialized sections
+    :return: the bundle
+    :rtype: :class:`plumpy.Bundle`
+    """
+    # The bundle is filled with the sections as unpickling it would do
+    bundle = plumpy.Bundle.__new__(plumpy.Bundle)
+    for section_key in sorted(sections, key=len):
+        value = codec.decode(sections[section_key])
+        if len(section_key) == 1:
+            bundle[section_key[0]] = value
+        else:
+            bundle[section_key[0]][section_key[1]] = value
+    return bundle
+
+
+def _encode_checkpoint(codec, checkpoint):
+    """
+    Encode a checkpoint as a string, prefixed by the name of its codec.
+
+    :param codec: the `CheckpointCodec`
+    :param checkpoint: dictionary with the serialized sections of the checkpoint
+    :return: the checkpoint string
+    """
+    data = base64.b64encode(codec.encode(checkpoint))
+    if six.PY3:
+        data = data.decode('ascii')
+    return '{}{}:{}'.format(CHECKPOINT_PREFIX, codec.name, data)
+
+
+def _decode_checkpoint(checkpoint):
+    """
+    Decode a checkpoint string encoded by `_encode_checkpoint`.
+
+    :param checkpoint: the checkpoint string
+    :return: tuple of the `CheckpointCodec` and the dictionary with the serialized sections of the checkpoint
+    :raises: :class:`plumpy.PersistenceError` if the codec of the checkpoint is unknown
+    """
+    name, data = checkpoint[len(CHECKPOINT_PREFIX):].split(':', 1)
+    try:
+        codec = CHECKPOINT_CODECS[name]
+    except KeyError:
+        raise plumpy.PersistenceError('Unknown checkpoint codec {}'.format(name))
+    return codec, codec.decode(base64.b64decode(data))
+
+
 class ObjectLoader(plumpy.DefaultObjectLoader):
     """
     The AiiDA specific object loader.
@@ -37,6 +37,7 @@ from aiida.orm.calculation.function import FunctionCalculation
 from aiida.orm.calculation.work import WorkCalculation
 from aiida.orm.data import Data
 from aiida.utils.serialize import serialize_data, deserialize_data
+from aiida.work.persistence import AiiDAPersister
 from aiida.work.ports import InputPort, PortNamespace
 from aiida.work.process_spec import ProcessSpec, ExitCode
 from aiida.work.process_builder import ProcessBuilder
@@ -121,6 +122,16 @@ class Process(plumpy.Process):
     def calc(self):
         return self._calc
 
+    @override
+    def close(self):
+        """
+        Close the process, after which it can only be continued from its checkpoint, possibly by another worker
+        """
+        persister = self.runner.persister
+        if isinstance(persister, AiiDAPersister):
+            persister.discard_full_checkpoint(self.pid)
+        super(Process, self).close()
+
     def _save_checkpoint(self):
         """
         Save the current state in a chechpoint if persistence is enabled and the process state is not terminal
@@ -226,6 +226,8 @@ class ExecuteProcessAction(plumpy.Action):
         proc = self._process_class(*self._args, **self._kwargs)
         self._persister.save_checkpoint(proc)
         proc.close()
+        # The process is continued by whichever worker receives the task
+        self._persister.discard_full_checkpoint(proc.pid)
 
         continue_action = plumpy.ContinueProcessAction(proc.calc.pk, play=True)
         continue_action.execute(publisher)
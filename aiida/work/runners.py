@@ -19,13 +19,13 @@ import tornado.ioloop
 
 import plumpy
 
-from aiida.orm import load_node, load_workflow
 from . import job_calcs
 from . import futures
 from . import persistence
 from . import rmq
 from . import transports
 from . import utils
+from . import watchers
 
 __all__ = ['Runner', 'DaemonRunner', 'new_runner', 'set_runner', 'get_runner']
 
@@ -34,6 +34,9 @@ ResultAndPid = namedtuple('ResultAndPid', ['result', 'pid'])
 
 RUNNER = None
 
+# Number of batches of links that a daemon runner adds to the closure table at a time, without yielding the event loop
+CLOSURE_UPDATE_MAX_BATCHES = 1
+
 
 def new_runner(**kwargs):
     """
@@ -85,11 +88,12 @@ class Runner(object):
                  loop=None,
                  rmq_submit=False,
                  enable_persistence=True,
-                 persister=None):
+                 persister=None,
+                 transport_options=None):
         self._loop = loop if loop is not None else tornado.ioloop.IOLoop()
         self._poll_interval = poll_interval
         self._rmq_submit = rmq_submit
-        self._transport = transports.TransportQueue(self._loop)
+        self._transport = transports.TransportQueue(self._loop, **(transport_options or {}))
         self._job_manager = job_calcs.JobManager(self._transport)
 
         if enable_persistence:
@@ -102,12 +106,15 @@ class Runner(object):
             logger.warning('Disabling rmq submission, no RMQ config provided')
             self._rmq_submit = False
 
+        self._watcher = watchers.TerminationWatcher(self._loop, poll_interval, self._communicator)
+
         # Save kwargs for creating child runners
         self._kwargs = {
             'rmq_config': rmq_config,
             'poll_interval': poll_interval,
             'rmq_submit': rmq_submit,
-            'enable_persistence': enable_persistence
+            'enable_persistence': enable_persistence,
+            'transport_options': transport_options
         }
 
     def __enter__(self):
@@ -140,6 +147,10 @@ class Runner(object):
     def job_manager(self):
         return self._job_manager
 
+    @property
+    def watcher(self):
+        return self._watcher
+
     def is_closed(self):
         return self._closed
 
@@ -161,6 +172,8 @@ class Runner(object):
         assert not self._closed
 
         self.stop()
+        self._transport.close()
+        self._watcher.close()
 
         if self._rmq_connector is not None:
             self._rmq_connector.disconnect()
@@ -295,8 +308,7 @@ class Runner(object):
         :param pk: the pk of the workflow
         :param callback: the function to be called upon workflow termination
         """
-        workflow = load_workflow(pk=pk)
-        self._poll_legacy_wf(workflow, callback)
+        self._watcher.add_legacy_workflow(pk, callback)
 
     def call_on_calculation_finish(self, pk, callback):
         """
@@ -305,8 +317,7 @@ class Runner(object):
         :param pk: the pk of the calculation
         :param callback: the function to be called upon calculation termination
         """
-        calculation = load_node(pk=pk)
-        self._poll_calculation(calculation, callback)
+        self._watcher.add_calculation(pk, callback)
 
     def get_calculation_future(self, pk):
         """
@@ -357,18 +368,6 @@ class Runner(object):
     def _create_child_runner(self):
         return Runner(**self._kwargs)
 
-    def _poll_legacy_wf(self, workflow, callback):
-        if workflow.has_finished_ok() or workflow.has_failed():
-            self._loop.add_callback(callback, workflow.pk)
-        else:
-            self._loop.call_later(self._poll_interval, self._poll_legacy_wf, workflow, callback)
-
-    def _poll_calculation(self, calc_node, callback):
-        if calc_node.is_terminated:
-            self._loop.add_callback(callback, calc_node.pk)
-        else:
-            self._loop.call_later(self._poll_interval, self._poll_calculation, calc_node, callback)
-
 
 class DaemonRunner(Runner):
     """
@@ -377,8 +376,39 @@ class DaemonRunner(Runner):
 
     def __init__(self, *args, **kwargs):
         kwargs['rmq_submit'] = True
+        if kwargs.get('transport_options', None) is None:
+            # The daemon keeps transports in a pool, such that bursts of tasks do not have to reconnect every time
+            kwargs['transport_options'] = transports.get_transport_queue_options()
         super(DaemonRunner, self).__init__(*args, **kwargs)
 
+        from aiida.common.setup import get_property
+        self._closure_update_interval = get_property('closure.update_interval')
+        if self._closure_update_interval:
+            self._loop.call_later(self._closure_update_interval, self._update_closure)
+
+    def _update_closure(self):
+        """
+        Add the links stored since the last update to the transitive closure table, if it was built.
+
+        Only the worker that holds the updater lock does the update, a bounded number of batches at a time so as not to
+        block the event loop. While there is a backlog of links, the next update is scheduled right away.
+        """
+        from aiida.manage.database.closure import DEFAULT_BATCH_SIZE, acquire_updater_lock, update_closure
+
+        if self._closed:
+            return
+
+        interval = self._closure_update_interval
+        try:
+            if acquire_updater_lock():
+                processed = update_closure(max_batches=CLOSURE_UPDATE_MAX_BATCHES)
+                if processed is not None and processed >= DEFAULT_BATCH_SIZE * CLOSURE_UPDATE_MAX_BATCHES:
+                    interval = 0
+        except Exception:  # pylint: disable=broad-except
+            logging.getLogger(__name__).exception('failed to update the transitive closure table')
+
+        self._loop.call_later(interval, self._update_closure)
+
     def _setup_rmq(self, url, prefix=None, task_prefetch_count=None, testing_mode=False):
         super(DaemonRunner, self)._setup_rmq(url, prefix, task_prefetch_count, testing_mode)
 
@@ -11,7 +11,7 @@
 from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
-from collections import namedtuple
+from collections import namedtuple, deque, OrderedDict
 import contextlib
 import logging
 import traceback
@@ -20,6 +20,22 @@ from tornado import concurrent, gen, ioloop
 _LOGGER = logging.getLogger(__name__)
 
 
+def get_transport_queue_options():
+    """
+    Return the options of the transport pool of a `TransportQueue` as configured in the AiiDA config file.
+
+    :return: dictionary with the keyword arguments for the `TransportQueue` constructor
+    """
+    from aiida.common.setup import get_property
+
+    return {
+        'idle_timeout': get_property('transport.pool_idle_timeout'),
+        'max_idle_transports': get_property('transport.pool_max_idle') or None,
+        'max_channels': get_property('transport.pool_max_channels') or None,
+        'keepalive_interval': get_property('transport.pool_keepalive_interval') or None,
+    }
+
+
 class TransportRequest(object):
     """ Information kept about request for a transport object """
 
@@ -28,6 +44,19 @@ class TransportRequest(object):
         super(TransportRequest, self).__init__()
         self.future = concurrent.Future()
         self.count = 0
+        self.channels = 0
+        self.waiting = deque()
+
+
+class IdleTransport(object):
+    """ Information kept about an open transport that is kept in the pool while no one is using it """
+
+    # pylint: disable=too-few-public-methods
+    def __init__(self, transport):
+        super(IdleTransport, self).__init__()
+        self.transport = transport
+        self.evict_handle = None
+        self.keepalive_handle = None
 
 
 class TransportQueue(object):
@@ -40,21 +69,55 @@ class TransportQueue(object):
     it will open the transport and give it to all the clients that asked for it
     up to that point.  This way opening of transports (a costly operation) can
     be minimised.
+
+    Optionally, transports that are no longer used are kept open in a pool for
+    `idle_timeout` seconds, such that a following request for the same authinfo
+    can reuse them immediately.  While idle, a keepalive is sent every
+    `keepalive_interval` seconds and the transport is health checked before it
+    is reused.  If more than `max_idle_transports` are idle, the least recently
+    used one is closed.  The number of clients that can use the same transport
+    at the same time can be capped with `max_channels`.
     """
     AuthInfoEntry = namedtuple('AuthInfoEntry', ['authinfo', 'transport', 'callbacks', 'callback_handle'])
 
-    def __init__(self, loop=None):
+    # pylint: disable=too-many-arguments
+    def __init__(self, loop=None, idle_timeout=0., max_idle_transports=None, max_channels=None,
+                 keepalive_interval=None):
         """
         :param loop: The event loop to use, will use `tornado.ioloop.IOLoop.current()` if not supplied
         :type loop: :class:`tornado.ioloop.IOLoop`
+        :param idle_timeout: seconds an unused transport is kept open, 0 to close it as soon as it is no longer used
+        :param max_idle_transports: maximum number of unused transports kept open, None for no limit
+        :param max_channels: maximum number of clients using the same transport at the same time, None for no limit
+        :param keepalive_interval: seconds between keepalives sent over unused transports, None to send none
         """
         self._loop = loop if loop is not None else ioloop.IOLoop.current()
         self._transport_requests = {}
+        self._idle_timeout = idle_timeout
+        self._max_idle_transports = max_idle_transports
+        self._max_channels = max_channels
+        self._keepalive_interval = keepalive_interval
+        self._idle_transports = OrderedDict()
+        self._statistics = {'hits': 0, 'misses': 0, 'opened': 0, 'closed': 0, 'evicted': 0}
 
     def loop(self):
         """ Get the loop being used by this transport queue """
         return self._loop
 
+    def get_statistics(self):
+        """
+        Get the counters of the transport pool
+
+        :return: dictionary with the number of pool `hits` and `misses`, and the number of transports that were
+            `opened`, `closed` and `evicted` from the pool before their idle timeout expired
+        """
+        return dict(self._statistics)
+
+    def close(self):
+        """ Close all the transports that are kept open in the pool """
+        for authinfo_id in list(self._idle_transports.keys()):
+            self._discard_idle_transport(authinfo_id)
+
     @contextlib.contextmanager
     def request_transport(self, authinfo):
         """
@@ -74,36 +137,53 @@ class TransportQueue(object):
         open_callback_handle = None
         transport_request = self._transport_requests.get(authinfo.id, None)
 
-        if transport_request is None:
+        if transport_request is not None:
+            self._statistics['hits'] += 1
+        else:
             # There is no existing request for this transport (i.e. on this authinfo)
             transport_request = TransportRequest()
             self._transport_requests[authinfo.id] = transport_request
 
-            transport = authinfo.get_transport()
-            safe_open_interval = transport.get_safe_open_interval()
+            pooled_transport = self._pop_idle_transport(authinfo.id)
+
+            if pooled_transport is not None:
+                _LOGGER.debug('Transport request reusing pooled transport for %s', authinfo)
+                self._statistics['hits'] += 1
+                transport_request.future.set_result(pooled_transport)
+            else:
+                self._statistics['misses'] += 1
+                transport = authinfo.get_transport()
+                safe_open_interval = transport.get_safe_open_interval()
 
-            def do_open():
-                """ Actually open the transport """
-                if transport_request.count > 0:
-                    # The user still wants the transport so open it
-                    _LOGGER.debug('Transport request opening transport for %s', authinfo)
-                    try:
-                        transport.open()
-                    except Exception as exception:  # pylint: disable=broad-except
-                        _LOGGER.error('exception occurred while trying to open transport:\n %s', exception)
-                        transport_request.future.set_exception(exception)
+                def do_open():
+                    """ Actually open the transport """
+                    if transport_request.count > 0:
+                        # The user still wants the transport so open it
+                        _LOGGER.debug('Transport request opening transport for %s', authinfo)
+                        try:
+                            transport.open()
+                        except Exception as exception:  # pylint: disable=broad-except
+                            _LOGGER.error('exception occurred while trying to open transport:\n %s', exception)
+                            transport_request.future.set_exception(exception)
 
-                        # Cleanup of the stale TransportRequest with the excepted transport future
-                        self._transport_requests.pop(authinfo.id, None)
-                    else:
-                        transport_request.future.set_result(transport)
+                            # Cleanup of the stale TransportRequest with the excepted transport future
+                            self._transport_requests.pop(authinfo.id, None)
+                        else:
+                            self._statistics['opened'] += 1
+                            transport_request.future.set_result(transport)
 
-            # Save the handle so that we can cancel the callback if the user no longer wants it
-            open_callback_handle = self._loop.call_later(safe_open_interval, do_open)
+                # Save the handle so that we can cancel the callback if the user no longer wants it
+                open_callback_handle = self._loop.call_later(safe_open_interval, do_open)
+
+        channel_future = None
 
         try:
             transport_request.count += 1
-            yield transport_request.future
+            if self._max_channels is None:
+                yield transport_request.future
+            else:
+                channel_future = self._request_channel(transport_request)
+                yield channel_future
         except gen.Return:
             # Have to have this special case so tornado returns are propagated up to the loop
             raise
@@ -113,12 +193,164 @@ class TransportQueue(object):
         finally:
             transport_request.count -= 1
             assert transport_request.count >= 0, "Transport request count dropped below 0!"
+
+            if channel_future is not None:
+                self._release_channel(transport_request, channel_future)
+
             # Check if there are no longer any users that want the transport
             if transport_request.count == 0:
                 if transport_request.future.done():
-                    _LOGGER.debug('Transport request closing transport for %s', authinfo)
-                    transport_request.future.result().close()
+                    if transport_request.future.exception() is None:
+                        self._release_transport(authinfo, transport_request.future.result())
                 elif open_callback_handle is not None:
                     self._loop.remove_timeout(open_callback_handle)
 
                 self._transport_requests.pop(authinfo.id, None)
+
+    def _request_channel(self, transport_request):
+        """
+        Request one of the channels of a transport, which will be granted as soon as the transport is open and less
+        than `max_channels` clients are using it.
+
+        :param transport_request: the request of the transport
+        :return: a future that resolves to the transport once the channel is granted
+        """
+        future = concurrent.Future()
+        transport_request.waiting.append(future)
+
+        if transport_request.future.done():
+            self._dispatch_channels(transport_request)
+        else:
+            self._loop.add_future(transport_request.future, lambda _: self._dispatch_channels(transport_request))
+
+        return future
+
+    def _release_channel(self, transport_request, future):
+        """
+        Release a channel requested through `_request_channel`, granting it to the next client that is waiting.
+
+        :param transport_request: the request of the transport
+        :param future: the future returned by `_request_channel`
+        """
+        if future in transport_request.waiting:
+            transport_request.waiting.remove(future)
+        elif future.done() and future.exception() is None:
+            transport_request.channels -= 1
+            self._dispatch_channels(transport_request)
+
+    def _dispatch_channels(self, transport_request):
+        """
+        Grant the free channels of an open transport to the clients that are waiting for one.
+
+        :param transport_request: the request of the transport
+        """
+        if not transport_request.future.done():
+            return
+
+        exception = transport_request.future.exception()
+
+        while transport_request.waiting:
+            if exception is not None:
+                transport_request.waiting.popleft().set_exception(exception)
+            elif transport_request.channels < self._max_channels:
+                transport_request.channels += 1
+                transport_request.waiting.popleft().set_result(transport_request.future.result())
+            else:
+                break
+
+    def _release_transport(self, authinfo, transport):
+        """
+        Put a transport that is no longer used in the pool or close it if pooling is disabled.
+
+        :param authinfo: the authinfo of the transport
+        :param transport: the open transport
+        """
+        if not self._idle_timeout or self._max_idle_transports == 0 or not transport.is_alive():
+            _LOGGER.debug('Transport request closing transport for %s', authinfo)
+            self._close_transport(transport)
+            return
+
+        if self._max_idle_transports is not None:
+            while self._idle_transports and len(self._idle_transports) >= self._max_idle_transports:
+                # Evict the least recently used transport to make space
+                authinfo_id = next(iter(self._idle_transports))
+                _LOGGER.debug('Evicting the least recently used pooled transport for authinfo<%s>', authinfo_id)
+                self._statistics['evicted'] += 1
+                self._discard_idle_transport(authinfo_id)
+
+        idle_transport = IdleTransport(transport)
+        idle_transport.evict_handle = self._loop.call_later(self._idle_timeout, self._discard_idle_transport,
+                                                            authinfo.id)
+        if self._keepalive_interval:
+            idle_transport.keepalive_handle = self._loop.call_later(self._keepalive_interval, self._send_keepalive,
+                                                                    authinfo.id)
+
+        self._idle_transports[authinfo.id] = idle_transport
+
+    def _pop_idle_transport(self, authinfo_id):
+        """
+        Take the transport of an authinfo out of the pool, if it is there and still healthy.
+
+        :param authinfo_id: the id of the authinfo
+        :return: the open transport or None
+        """
+        idle_transport = self._idle_transports.pop(authinfo_id, None)
+
+        if idle_transport is None:
+            return None
+
+        self._cancel_idle_callbacks(idle_transport)
+
+        if not idle_transport.transport.is_alive():
+            _LOGGER.debug('Discarding the pooled transport for authinfo<%s> that failed the health check', authinfo_id)
+            self._close_transport(idle_transport.transport)
+            return None
+
+        return idle_transport.transport
+
+    def _discard_idle_transport(self, authinfo_id):
+        """
+        Remove the transport of an authinfo from the pool and close it.
+
+        :param authinfo_id: the id of the authinfo
+        """
+        idle_transport = self._idle_transports.pop(authinfo_id, None)
+
+        if idle_transport is not None:
+            self._cancel_idle_callbacks(idle_transport)
+            self._close_transport(idle_transport.transport)
+
+    def _send_keepalive(self, authinfo_id):
+        """
+        Send a keepalive over the pooled transport of an authinfo and schedule the next one.
+
+        :param authinfo_id: the id of the authinfo
+        """
+        idle_transport = self._idle_transports.get(authinfo_id, None)
+
+        if idle_transport is None:
+            return
+
+        try:
+            idle_transport.transport.send_keepalive()
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug('Keepalive failed for the pooled transport of authinfo<%s>:\n%s', authinfo_id,
+                          traceback.format_exc())
+            self._discard_idle_transport(authinfo_id)
+        else:
+            idle_transport.keepalive_handle = self._loop.call_later(self._keepalive_interval, self._send_keepalive,
+                                                                    authinfo_id)
+
+    def _cancel_idle_callbacks(self, idle_transport):
+        """ Cancel the eviction and keepalive callbacks of a pooled transport """
+        for handle in (idle_transport.evict_handle, idle_transport.keepalive_handle):
+            if handle is not None:
+                self._loop.remove_timeout(handle)
+
+    def _close_transport(self, transport):
+        """ Close a transport, ignoring the errors of connections that already dropped """
+        try:
+            transport.close()
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug('Exception while closing transport:\n%s', traceback.format_exc())
+        self._statistics['closed'] += 1
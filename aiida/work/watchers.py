@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Watcher of the termination of the calculations and legacy workflows awaited by the processes of a runner."""
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+import logging
+
+import kiwipy
+from plumpy import ProcessState
+
+__all__ = ['TerminationWatcher']
+
+LOGGER = logging.getLogger(__name__)
+
+# The process states of a terminated calculation
+TERMINAL_PROCESS_STATES = (ProcessState.FINISHED, ProcessState.KILLED, ProcessState.EXCEPTED)
+
+
+class TerminationWatcher(object):
+    """
+    Call the callbacks registered for calculations and legacy workflows once they are terminated.
+
+    Rather than checking each node separately, all the nodes that are waited for are checked together at every poll,
+    with a single query for the calculations and one for the legacy workflows. If a communicator is given, the
+    state change broadcasts of the calculations resolve them as soon as they terminate, and the calculations are only
+    polled every `runner.broadcast_poll_interval` seconds, to catch the broadcasts that were missed.
+    """
+
+    def __init__(self, loop, poll_interval=0., communicator=None):
+        """
+        :param loop: the event loop
+        :param poll_interval: the interval in seconds between the polls
+        :param communicator: the communicator to receive the state change broadcasts from, if None the nodes are only
+            polled
+        """
+        self._loop = loop
+        self._poll_interval = poll_interval
+        self._communicator = communicator
+        self._calculation_callbacks = {}  # Mapping: {pk: [callback]}
+        self._workflow_callbacks = {}  # Mapping: {pk: [callback]}
+        self._poll_handle = None
+        self._poll_scheduled_now = False
+        self._num_queries = 0
+        self._broadcast_filter = None
+        self._broadcast_poll_interval = None
+
+        if self._communicator is not None:
+            from aiida.common.setup import get_property
+            self._broadcast_poll_interval = max(poll_interval, get_property('runner.broadcast_poll_interval'))
+
+            self._broadcast_filter = kiwipy.BroadcastFilter(self._on_broadcast)
+            for state in TERMINAL_PROCESS_STATES:
+                self._broadcast_filter.add_subject_filter('state_changed.*.{}'.format(state.value))
+            self._communicator.add_broadcast_subscriber(self._broadcast_filter)
+
+    @property
+    def num_queries(self):
+        """Return the number of queries to the database done so far to check the nodes."""
+        return self._num_queries
+
+    @property
+    def num_waiting(self):
+        """Return the number of nodes that are waited for."""
+        return len(self._calculation_callbacks) + len(self._workflow_callbacks)
+
+    def add_calculation(self, pk, callback):
+        """
+        Call the callback with the pk of a calculation once it is terminated.
+
+        :param pk: the pk of the calculation
+        :param callback: the function to call
+        """
+        self._calculation_callbacks.setdefault(pk, []).append(callback)
+        self._schedule_poll(now=True)
+
+    def add_legacy_workflow(self, pk, callback):
+        """
+        Call the callback with the pk of a legacy workflow once it has finished or failed.
+
+        :param pk: the pk of the workflow
+        :param callback: the function to call
+        """
+        self._workflow_callbacks.setdefault(pk, []).append(callback)
+        self._schedule_poll(now=True)
+
+    def close(self):
+        """Stop polling and receiving broadcasts: the callbacks that have not been called will never be."""
+        if self._poll_handle is not None:
+            self._loop.remove_timeout(self._poll_handle)
+            self._poll_handle = None
+
+        if self._broadcast_filter is not None:
+            self._communicator.remove_broadcast_subscriber(self._broadcast_filter)
+            self._broadcast_filter = None
+
+        self._calculation_callbacks = {}
+        self._workflow_callbacks = {}
+
+    def poll(self):
+        """Check all the nodes that are waited for, and call the callbacks of those that are terminated."""
+        if self._calculation_callbacks:
+            for pk in self._get_terminated_calculations(list(self._calculation_callbacks)):
+                self._resolve(self._calculation_callbacks, pk)
+
+        if self._workflow_callbacks:
+            for pk in self._get_terminated_workflows(list(self._workflow_callbacks)):
+                self._resolve(self._workflow_callbacks, pk)
+
+    def _get_terminated_calculations(self, pks):
+        """
+        Return the pks of the terminated calculations among those given, with a single query.
+
+        :param pks: the list of the pks of the calculations
+        :return: the list of the pks of the calculations that are terminated
+        """
+        from aiida.orm.calculation import Calculation
+        from aiida.orm.querybuilder import QueryBuilder
+
+        self._num_queries += 1
+        filters = {
+            'id': {'in': pks},
+            'attributes.{}'.format(Calculation.PROCESS_STATE_KEY): {
+                'in': [state.value for state in TERMINAL_PROCESS_STATES]
+            }
+        }
+        builder = QueryBuilder().append(Calculation, filters=filters, project='id')
+        return [pk for pk, in builder.iterall()]
+
+    def _get_terminated_workflows(self, pks):
+        """
+        Return the pks of the legacy workflows among those given that have finished or failed, with a single query.
+
+        :param pks: the list of the pks of the workflows
+        :return: the list of the pks of the workflows that have finished or failed
+        """
+        from aiida.common.datastructures import wf_states
+        from aiida.orm.workflow import Workflow
+
+        self._num_queries += 1
+        states = [wf_states.FINISHED, wf_states.SLEEP, wf_states.ERROR]
+        return [workflow.pk for workflow in Workflow.query(id__in=pks, state__in=states)]
+
+    def _resolve(self, callbacks, pk):
+        """Schedule the callbacks registered for a node, that will not be called again."""
+        for callback in callbacks.pop(pk, []):
+            self._loop.add_callback(callback, pk)
+
+    def _on_broadcast(self, _body, sender, _subject, _correlation_id):
+        """Resolve the calculation that sent a broadcast of having reached a terminal state."""
+        self._resolve(self._calculation_callbacks, sender)
+
+    def _schedule_poll(self, now=False):
+        """
+        Schedule the next poll, if there are nodes to wait for.
+
+        :param now: if True, poll at the next iteration of the loop, such that the nodes that were just added are
+            checked straight away, all together
+        """
+        if self._poll_scheduled_now or not self.num_waiting:
+            return
+
+        if now:
+            if self._poll_handle is not None:
+                self._loop.remove_timeout(self._poll_handle)
+                self._poll_handle = None
+            self._poll_scheduled_now = True
+            self._loop.add_callback(self._do_poll)
+        elif self._poll_handle is None:
+            if self._broadcast_poll_interval is not None and not self._workflow_callbacks:
+                interval = self._broadcast_poll_interval
+            else:
+                interval = self._poll_interval
+            self._poll_handle = self._loop.call_later(interval, self._do_poll)
+
+    def _do_poll(self):
+        """Poll the nodes and schedule the next poll."""
+        self._poll_handle = None
+        self._poll_scheduled_now = False
+
+        try:
+            self.poll()
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.exception('failed to check the termination of the awaited nodes')
+
+        self._schedule_poll()